@@ -221,25 +221,43 @@ namespace UnityMCP.Editor.Commands
         /// </summary>
         /// <summary>
         /// 获取项目中的资产列表，可选择按类型过滤
+        /// 传入page_size时按页返回，cursor为下一页的起始位置，next_cursor为null表示已是最后一页
         /// </summary>
         public static object GetAssetList(JObject @params)
         {
             string type = (string)@params["type"]; // 从参数中获取资产类型过滤条件
             string searchPattern = (string)@params["search_pattern"] ?? "*"; // 从参数中获取搜索模式，默认为"*"（全部）
             string folder = (string)@params["folder"] ?? "Assets"; // 从参数中获取搜索文件夹，默认为"Assets"
+            int cursor = System.Math.Max((int?)@params["cursor"] ?? 0, 0); // 本页在结果中的起始位置
+            int pageSize = (int?)@params["page_size"] ?? 0; // 每页数量，0表示一次返回全部
 
             var guids = AssetDatabase.FindAssets(searchPattern, new[] { folder }); // 使用搜索模式和文件夹查找资产GUID
-            var assets = new List<object>(); // 创建资产对象列表
+            var matches = new List<string>(); // 符合类型过滤的资产GUID
 
             foreach (var guid in guids) // 遍历每个找到的GUID
             {
-                var path = AssetDatabase.GUIDToAssetPath(guid); // 将GUID转换为资产路径
-                var assetType = AssetDatabase.GetMainAssetTypeAtPath(path); // 获取路径上主资产的类型
+                // 没有类型过滤时不必逐个查询类型，只处理本页的资产
+                if (string.IsNullOrEmpty(type))
+                {
+                    matches.Add(guid);
+                    continue;
+                }
 
+                var path = AssetDatabase.GUIDToAssetPath(guid); // 将GUID转换为资产路径
                 // Skip if type filter is specified and doesn't match
                 // 如果指定了类型过滤且不匹配则跳过
-                if (!string.IsNullOrEmpty(type) && assetType?.Name != type)
-                    continue; // 如果指定了类型且不匹配，跳过这个资产
+                if (!MatchesType(path, AssetDatabase.GetMainAssetTypeAtPath(path), type))
+                    continue;
+                matches.Add(guid);
+            }
+
+            int end = pageSize > 0 ? System.Math.Min(cursor + pageSize, matches.Count) : matches.Count;
+            var assets = new List<object>(); // 创建资产对象列表
+            for (int i = cursor; i < end; i++)
+            {
+                var guid = matches[i];
+                var path = AssetDatabase.GUIDToAssetPath(guid); // 将GUID转换为资产路径
+                var assetType = AssetDatabase.GetMainAssetTypeAtPath(path); // 获取路径上主资产的类型
 
                 assets.Add(new
                 {
@@ -250,7 +268,22 @@ namespace UnityMCP.Editor.Commands
                 });
             }
 
-            return new { assets }; // 返回资产列表
+            return new
+            {
+                assets, // 返回资产列表
+                total = matches.Count, // 符合条件的资产总数
+                next_cursor = end < matches.Count ? (int?)end : null // 下一页的游标
+            };
+        }
+
+        // 工具按"Scene"和"Prefab"查找，它们的主资产类型在Unity中为SceneAsset和GameObject（与模型相同），按扩展名判断
+        private static bool MatchesType(string path, System.Type assetType, string type)
+        {
+            if (type == "Scene")
+                return path.EndsWith(".unity", System.StringComparison.OrdinalIgnoreCase);
+            if (type == "Prefab")
+                return path.EndsWith(".prefab", System.StringComparison.OrdinalIgnoreCase);
+            return assetType?.Name == type;
         }
     }
 }
\ No newline at end of file
@@ -35,6 +35,7 @@ namespace UnityMCP.Editor.Commands
             { "FIND_OBJECTS_BY_NAME", parameters => ObjectCommandHandler.FindObjectsByName(parameters) },
             { "FIND_OBJECTS_BY_TAG", parameters => ObjectCommandHandler.FindObjectsByTag(parameters) },
             { "GET_HIERARCHY", _ => ObjectCommandHandler.GetHierarchy() },
+            { "GET_SCENE_CHANGES", parameters => SceneRevisionTracker.GetSceneChanges(parameters) },
             { "SELECT_OBJECT", parameters => ObjectCommandHandler.SelectObject(parameters) },
             { "GET_SELECTED_OBJECT", _ => ObjectCommandHandler.GetSelectedObject() },
             { "MODIFY_OBJECT", parameters => ObjectCommandHandler.ModifyObject(parameters) },
@@ -43,7 +44,7 @@ namespace UnityMCP.Editor.Commands
             { "EXECUTE_CONTEXT_MENU_ITEM", parameters => ObjectCommandHandler.ExecuteContextMenuItem(parameters) },
             { "FIND_CAMERA_OBJECTS", _ => ObjectCommandHandler.FindCameraObjects() },
             { "FIND_OBJECTS_BY_NAME_PATTERN", parameters => ObjectCommandHandler.FindObjectsByNamePattern(parameters) },
-            { "GET_ALL_SCENE_OBJECTS", _ => ObjectCommandHandler.GetAllSceneObjects() },
+            { "GET_ALL_SCENE_OBJECTS", parameters => ObjectCommandHandler.GetAllSceneObjects(parameters) },
             { "GET_OBJECT_TRANSFORM_INFO", parameters => ObjectCommandHandler.GetObjectTransformInfo(parameters) },
 
             // Generate management commands
@@ -55,6 +56,7 @@ namespace UnityMCP.Editor.Commands
             { "VERIFY_TIMELINE_ASSET_EXISTS", parameters => CreateAnimationCommandHandler.VerifyTimelineAssetExists(parameters) },
             { "CREATE_SEPARATE_TIMELINES", parameters => CreateAnimationCommandHandler.CreateSeparateTimelines(parameters) },
             { "CREATE_COMBINED_TIMELINE", parameters => CreateAnimationCommandHandler.CreateCombinedTimeline(parameters) },
+            { "IMPORT_TIMELINE_ASSETS", parameters => CreateAnimationCommandHandler.ImportTimelineAssets(parameters) },
 
             // ScriptCommandHandler
             { "VIEW_SCRIPT", parameters => ScriptCommandHandler.ViewScript(parameters) },
@@ -87,6 +89,8 @@ namespace UnityMCP.Editor.Commands
             { "GET_NODEGRAPH_INFO", parameters => NodeGraphCommandHandler.GetNodeGraphInfo(parameters) },
             // ImportExcelToNodeGraph
             { "IMPORT_EXCEL_TO_NODEGRAPH", parameters => NodeGraphCommandHandler.ImportExcelToNodeGraph(parameters) },
+            // ApplyExcelRowsToNodeGraph
+            { "APPLY_EXCEL_ROWS_TO_NODEGRAPH", parameters => NodeGraphCommandHandler.ApplyExcelRowsToNodeGraph(parameters) },
             // GetFlowEventNodes
             { "GET_FLOW_EVENT_NODES", parameters => NodeGraphCommandHandler.GetFlowEventNodes(parameters) },
             // GetFlowEventNodeNames
@@ -95,6 +99,8 @@ namespace UnityMCP.Editor.Commands
             { "GET_FLOW_EVENT_NODE_BY_NAME", parameters => NodeGraphCommandHandler.GetFlowEventNodeByName(parameters) },
             // UpdateFlowEventNodeTimelineAssets
             { "UPDATE_FLOW_EVENT_NODE_TIMELINE_ASSETS", parameters => NodeGraphCommandHandler.UpdateFlowEventNodeTimelineAssets(parameters) },
+            // BulkUpdateFlowEventNodes
+            { "BULK_UPDATE_FLOW_EVENT_NODES", parameters => NodeGraphCommandHandler.BulkUpdateFlowEventNodes(parameters) },
             // SaveNodeGraphChangesS
             { "SAVE_NODEGRAPH_CHANGES", parameters => NodeGraphCommandHandler.SaveNodeGraphChanges(parameters) },
                         
@@ -17,6 +17,10 @@ namespace UnityMCP.Editor.Commands
     /// </summary>
     public static class CreateAnimationCommandHandler
     {
+        // keyframe_buffer每行的浮点数个数：time, position xyz, rotation xyz
+        private const int KeyframeBufferStride = 7;
+
+
         /// <summary>
         /// 递归创建文件夹结构
         /// </summary>
@@ -177,6 +181,14 @@ namespace UnityMCP.Editor.Commands
                         }
                     }
                 }
+                // 数组形式的关键帧（Python端已完成路径采样）
+                else if (@params["keyframe_buffer"] != null && @params["keyframe_buffer"].Type == JTokenType.Object)
+                {
+                    if (ReadKeyframeBuffer((JObject)@params["keyframe_buffer"], positionKeyframes, rotationKeyframes))
+                    {
+                        includeRotation = true;                               // 含有旋转关键帧时设置包含旋转标志
+                    }
+                }
                 
                 // 如果没有提供多点关键帧，则使用开始/结束点创建默认关键帧
                 if (positionKeyframes.Count == 0)
@@ -971,6 +983,87 @@ namespace UnityMCP.Editor.Commands
             }
         }
 
+        /// <summary>
+        /// 导入Python端直接写入的Timeline资产并注册轨道绑定
+        /// 所有文件只刷新一次AssetDatabase，之后按轨道名称绑定场景物体
+        /// </summary>
+        /// <param name="params">timelines: [{timeline_path, bindings: [{track, object}]}]</param>
+        public static object ImportTimelineAssets(JObject @params)
+        {
+            try
+            {
+                JArray timelines = @params["timelines"] as JArray;
+                if (timelines == null || timelines.Count == 0)
+                {
+                    return new { success = false, message = "timelines参数不能为空" };
+                }
+
+                AssetDatabase.Refresh();
+
+                var results = new List<object>();
+                PlayableDirector director = null;
+                int importedCount = 0;
+                foreach (JObject timeline in timelines.OfType<JObject>())
+                {
+                    string assetPath = (string)timeline["timeline_path"];
+                    TimelineAsset timelineAsset = string.IsNullOrEmpty(assetPath) ? null : AssetDatabase.LoadAssetAtPath<TimelineAsset>(assetPath);
+                    if (timelineAsset == null)
+                    {
+                        results.Add(new { success = false, timeline_path = assetPath, message = $"无法加载Timeline资产 '{assetPath}'" });
+                        continue;
+                    }
+
+                    var trackBindings = new Dictionary<TrackAsset, GameObject>();
+                    var missing = new List<string>();
+                    foreach (JObject binding in (timeline["bindings"] as JArray ?? new JArray()).OfType<JObject>())
+                    {
+                        string trackName = (string)binding["track"];
+                        string objectName = (string)binding["object"];
+                        TrackAsset track = timelineAsset.GetOutputTracks().FirstOrDefault(t => t.name == trackName);
+                        GameObject targetObject = string.IsNullOrEmpty(objectName) ? null : GameObject.Find(objectName);
+                        if (track == null || targetObject == null)
+                        {
+                            missing.Add(track == null ? $"轨道 '{trackName}'" : $"物体 '{objectName}'");
+                            continue;
+                        }
+                        trackBindings[track] = targetObject;
+                    }
+
+                    director = GetOrCreateTimelineManager(timelineAsset, trackBindings);
+                    importedCount++;
+                    results.Add(new
+                    {
+                        success = missing.Count == 0,
+                        timeline_path = assetPath,
+                        bindings = trackBindings.Select(b => $"{b.Key.name} -> {b.Value.name}").ToArray(),
+                        message = missing.Count == 0 ? "导入成功" : $"无法找到{string.Join("、", missing)}"
+                    });
+                }
+
+                if (director != null)
+                {
+                    Selection.activeObject = director.gameObject;
+                }
+
+                return new
+                {
+                    success = importedCount == timelines.Count,
+                    message = $"导入{importedCount}/{timelines.Count}个Timeline资产",
+                    director_object = director != null ? director.gameObject.name : null,
+                    results = results
+                };
+            }
+            catch (Exception ex)
+            {
+                Debug.LogError($"ImportTimelineAssets错误: {ex.Message}\n{ex.StackTrace}");
+                return new
+                {
+                    success = false,
+                    message = $"导入Timeline资产时发生错误: {ex.Message}"
+                };
+            }
+        }
+
         /// <summary>
         /// 创建静态状态保持剪辑（用于维持当前Transform状态）
         /// </summary>
@@ -1325,6 +1418,48 @@ namespace UnityMCP.Editor.Commands
             return result.OrderBy(k => k.time).ToList();                     // 返回按时间排序的结果
         }
         
+        /// <summary>
+        /// 解析keyframe_buffer：base64编码的小端float32数组，每行为(time, pos xyz, rot xyz)，NaN表示缺少该分量
+        /// </summary>
+        /// <param name="buffer">包含stride、count和data的JSON对象</param>
+        /// <param name="positionKeyframes">输出的位置关键帧列表</param>
+        /// <param name="rotationKeyframes">输出的旋转关键帧列表</param>
+        /// <returns>是否包含旋转关键帧</returns>
+        private static bool ReadKeyframeBuffer(JObject buffer, List<KeyframeData> positionKeyframes, List<KeyframeData> rotationKeyframes)
+        {
+            int stride = buffer["stride"] != null ? (int)buffer["stride"] : KeyframeBufferStride;
+            if (stride != KeyframeBufferStride)
+                throw new Exception($"keyframe_buffer的stride必须为{KeyframeBufferStride}，实际为{stride}");
+
+            byte[] bytes = Convert.FromBase64String((string)buffer["data"] ?? "");
+            if (bytes.Length % (stride * sizeof(float)) != 0)
+                throw new Exception("keyframe_buffer数据长度无效");
+
+            float[] values = new float[bytes.Length / sizeof(float)];
+            if (!BitConverter.IsLittleEndian)
+            {
+                for (int i = 0; i < bytes.Length; i += sizeof(float))
+                    Array.Reverse(bytes, i, sizeof(float));
+            }
+            Buffer.BlockCopy(bytes, 0, values, 0, bytes.Length);
+
+            bool hasRotation = false;
+            for (int offset = 0; offset < values.Length; offset += stride)
+            {
+                float time = values[offset];
+                if (!float.IsNaN(values[offset + 1]))
+                {
+                    positionKeyframes.Add(new KeyframeData(time, new Vector3(values[offset + 1], values[offset + 2], values[offset + 3])));
+                }
+                if (!float.IsNaN(values[offset + 4]))
+                {
+                    rotationKeyframes.Add(new KeyframeData(time, new Vector3(values[offset + 4], values[offset + 5], values[offset + 6])));
+                    hasRotation = true;
+                }
+            }
+            return hasRotation;
+        }
+
         /// <summary>
         /// 关键帧数据类，存储时间和向量值
         /// </summary>
@@ -8,6 +8,8 @@ using Newtonsoft.Json.Linq;       // 导入JSON处理库命名空间
 using NodeGraph;                 // 导入NodeGraph命名空间
 using System.Collections.Generic;  // 添加集合功能命名空间
 using System.Reflection;           // 添加反射功能命名空间
+using System.Collections;          // 添加协程枚举器命名空间
+using Unity.EditorCoroutines.Editor; // 添加编辑器协程命名空间
 
 
 namespace UnityMCP.Editor.Commands 
@@ -21,6 +23,7 @@ namespace UnityMCP.Editor.Commands
         // public static object CreateEmptyNodeGraph(JObject @params); 创建一个空的NodeGraph ScriptableObject文件
         // public static object GetNodeGraphInfo(JObject @params); 获取NodeGraph信息给LLM
         // public static object ImportExcelToNodeGraph(JObject @params); 将Excel文件数据导入到NodeGraph SO文件
+        // public static object ApplyExcelRowsToNodeGraph(JObject @params); 将Excel中变化的行应用到已导入的NodeGraph
         
         
         
@@ -440,162 +443,19 @@ namespace UnityMCP.Editor.Commands
                 // 步骤4: 创建节点
                 // 首先清空现有数据
                 nodeGraph.ClearAllNodeDatas();
-                
-                Dictionary<Vector2, NodeBaseData> positionToNodeMap = new Dictionary<Vector2, NodeBaseData>();
-        
-                int x = 0;
-                int y = 0;
-                string tempFlowGraph = "";
-                int count = 0;
-                string nowFlowGraph = "";
-                
-                Rect startNodePos = new Rect(300 * x, 300 * y, 100, 150);
-                StartNodeData startNode = new StartNodeData();
-                startNode.Position = startNodePos;
-                startNode.GUID = Guid.NewGuid().ToString();
-                startNode.NodeName = "StartNode";
-                nodeGraph.startNodeDatas.Add(startNode);
-                positionToNodeMap[new Vector2(x, y)] = startNode;
-        
+
                 // 创建节点，复制自NodeGraphWindow.CreateAllVoice中的逻辑
-                for (int i = 0; i < dataInfoCreator.datas.Count; i++)
+                List<FlowEventNodeData> steps = new List<FlowEventNodeData>();
+                foreach (FlowNodeTempAsset data in dataInfoCreator.datas)
                 {
-                    EditorUtility.DisplayProgressBar("从Excel中生成节点", "创建节点中", (float)i / dataInfoCreator.datas.Count);
-        
-                    // 创建 FlowEventNodeD 结构
-                    FlowEventNodeD nodeData = new FlowEventNodeD
-                    {
-                        currentClickObj = dataInfoCreator.datas[i].handTip,
-                        enterEvent = dataInfoCreator.datas[i].enterEventName,
-                        enterDes = dataInfoCreator.datas[i].enterEventContent,
-                        exitEvent = dataInfoCreator.datas[i].exitEventName,
-                        exitDes = dataInfoCreator.datas[i].exitEventContent
-                    };
-                    
-                    allUnityEvent.flownodeDic[dataInfoCreator.datas[i].eventName] = nodeData;
-        
-                    // 按步骤名称组织节点布局
-                    if (tempFlowGraph != dataInfoCreator.datas[i].flowGraph)
-                    {
-                        y = 0;
-        
-                        if (count > 0)
-                        {
-                            x++;
-                            Vector2 combinePos = new Vector2(300 * x, 0);
-
-                            // 创建合并节点数据
-                            x++;
-                            Rect combineNodePos = new Rect(300 * x, 300 * y, 100, 150);
-                            CombineNodeData combineNode = new CombineNodeData();
-                            combineNode.Position = combineNodePos;
-                            combineNode.GUID = Guid.NewGuid().ToString();
-                            combineNode.NodeName = "CombineNode";
-                            combineNode.inputCount = count + 1;
-                            nodeGraph.combineNodes.Add(combineNode);
-                            positionToNodeMap[new Vector2(x, y)] = combineNode;
-
-                    
-                            // 在CombineNode右侧创建一个空的FlowEventNodeData节点
-                            x++;
-                            Rect emptyNodePos = new Rect(300 * x, 300 * y, 100, 150);
-                            FlowEventNodeData emptyNode = new FlowEventNodeData();
-                            emptyNode.Position = emptyNodePos;
-                            emptyNode.GUID = Guid.NewGuid().ToString();
-                            emptyNode.NodeName = "FlowEventNode";
-                            emptyNode.eventName = nowFlowGraph + "后置";
-                            emptyNode.enterEventName = nowFlowGraph + "后置事件";
-                            nodeGraph.flowEventNodes.Add(emptyNode);
-                            
-                            // 添加到字典中
-                            FlowEventNodeD nodedata = new FlowEventNodeD
-                            {
-                                enterEvent = emptyNode.enterEventName
-                            };
-                            allUnityEvent.flownodeDic[emptyNode.eventName] = nodedata;
-                            
-                            positionToNodeMap[new Vector2(x, y)] = emptyNode;
-                        }
-        
-                        x++;
-                        Rect nodePos = new Rect(300 * x, 300 * y, 100, 150);
-        
-                        // 创建流程事件节点
-                        nowFlowGraph = dataInfoCreator.datas[i].flowGraph;
-                        
-                        FlowEventNodeData flowEventNode = new FlowEventNodeData();
-                        flowEventNode.Position = nodePos;
-                        flowEventNode.GUID = Guid.NewGuid().ToString();
-                        flowEventNode.NodeName = "FlowEventNode";
-                
-                        // 设置节点属性
-                        flowEventNode.flowGraph = dataInfoCreator.datas[i].flowGraph;
-                        flowEventNode.eventName = dataInfoCreator.datas[i].eventName;
-                        flowEventNode.eventContent = dataInfoCreator.datas[i].eventContent;
-                        flowEventNode.enterEventName = dataInfoCreator.datas[i].enterEventName;
-                        flowEventNode.enterEventContent = dataInfoCreator.datas[i].enterEventContent;
-                        flowEventNode.exitEventName = dataInfoCreator.datas[i].exitEventName;
-                        flowEventNode.exitEventContent = dataInfoCreator.datas[i].exitEventContent;
-                        flowEventNode.cameraTimelineName = dataInfoCreator.datas[i].cameraTimelineName;
-                        flowEventNode.cameraTimelineContent = dataInfoCreator.datas[i].cameraTimelineContent;
-                        flowEventNode.objectTimelineName = dataInfoCreator.datas[i].objectTimelineName;
-                        flowEventNode.objectTimelineContent = dataInfoCreator.datas[i].objectTimelineContent;
-                        flowEventNode.voiceName = dataInfoCreator.datas[i].voiceName;
-
-                        // 如果需要，还可以加载音频资源
-                        if (generateVoice)
-                        {
-                            // 这里可以添加音频资源的处理
-                            string voicePath = $"Lesson/{i}_{dataInfoCreator.datas[i].eventName}/{dataInfoCreator.datas[i].voiceName}";
-                            // 注意：在CommandHandler中可能无法直接加载和设置AudioClip
-                        }
-
-                        nodeGraph.flowEventNodes.Add(flowEventNode);
-                        positionToNodeMap[new Vector2(x, y)] = flowEventNode;
-                
-                        count = 0;
-                        tempFlowGraph = dataInfoCreator.datas[i].flowGraph;
-                    }
-                    else
-                    {
-                        // 相同步骤名称的节点垂直排列
-                        y++;
-                        count++;
-                        Rect nodePos = new Rect(300 * x, 300 * y, 100, 150);
-                
-                        FlowEventNodeData flowEventNode = new FlowEventNodeData();
-                        flowEventNode.Position = nodePos;
-                        flowEventNode.GUID = Guid.NewGuid().ToString();
-                        flowEventNode.NodeName = "FlowEventNode";
-                
-                        // 设置节点属性
-                        flowEventNode.flowGraph = dataInfoCreator.datas[i].flowGraph;
-                        flowEventNode.eventName = dataInfoCreator.datas[i].eventName;
-                        flowEventNode.eventContent = dataInfoCreator.datas[i].eventContent;
-                        flowEventNode.enterEventName = dataInfoCreator.datas[i].enterEventName;
-                        flowEventNode.enterEventContent = dataInfoCreator.datas[i].enterEventContent;
-                        flowEventNode.exitEventName = dataInfoCreator.datas[i].exitEventName;
-                        flowEventNode.exitEventContent = dataInfoCreator.datas[i].exitEventContent;
-                        flowEventNode.cameraTimelineName = dataInfoCreator.datas[i].cameraTimelineName;
-                        flowEventNode.cameraTimelineContent = dataInfoCreator.datas[i].cameraTimelineContent;
-                        flowEventNode.objectTimelineName = dataInfoCreator.datas[i].objectTimelineName;
-                        flowEventNode.objectTimelineContent = dataInfoCreator.datas[i].objectTimelineContent;
-                        flowEventNode.voiceName = dataInfoCreator.datas[i].voiceName;
-
-                        // 处理音频资源
-                        if (generateVoice)
-                        {
-                            // 这里可以添加音频资源的处理
-                            string voicePath = $"Lesson/{i}_{dataInfoCreator.datas[i].eventName}/{dataInfoCreator.datas[i].voiceName}";
-                            // 注意：在CommandHandler中可能无法直接加载和设置AudioClip
-                        }
-
-                        nodeGraph.flowEventNodes.Add(flowEventNode);
-                        positionToNodeMap[new Vector2(x, y)] = flowEventNode;
-                    }
+                    FlowEventNodeData flowEventNode = NewFlowEventNode();
+                    ApplyExcelRow(flowEventNode, data, allUnityEvent);
+                    steps.Add(flowEventNode);
                 }
-        
-                EditorUtility.ClearProgressBar();
+
+                // 按步骤名称组织节点布局
+                object layout = LayoutFlowEventNodes(nodeGraph, steps, new Dictionary<string, FlowEventNodeData>(),
+                    allUnityEvent, out Dictionary<Vector2, NodeBaseData> positionToNodeMap, out string tempFlowGraph);
         
                 // 步骤5: 保存数据
                 EditorUtility.SetDirty(nodeGraph);
@@ -627,12 +487,7 @@ namespace UnityMCP.Editor.Commands
                     dataCount = dataInfoCreator.datas.Count,
                     generatedVoice = generateVoice,
                     autoRegistered = autoRegisterAndOpen,
-                    layout = new {
-                        columnsCount = x + 1,
-                        maxRowCount = count + 1,
-                        layoutWidth = 300 * (x + 1),
-                        layoutHeight = 300 * Math.Max(y + 1, count + 1)
-                    },
+                    layout = layout,
                     lastFlowGraph = tempFlowGraph
                 };
             }
@@ -644,6 +499,392 @@ namespace UnityMCP.Editor.Commands
         }
         
         
+        /// <summary>
+        /// 将Excel中新增、修改和删除的步骤行应用到已导入的NodeGraph（差异由Python端对比行清单得出）
+        /// 未变化的节点保持不变；行的顺序或分组变化时复用已有节点重新排列，保留其GUID和Timeline；
+        /// 只为配音文案变化的行生成语音，行号变化的行移动已有的语音文件
+        /// </summary>
+        /// <param name="params">包含nodeGraphPath、rows、removed、expected、order、voiceMoves、voiceRows的JSON对象</param>
+        /// <returns>应用结果，NodeGraph与上次导入不一致时needsFullImport为true</returns>
+        public static object ApplyExcelRowsToNodeGraph(JObject @params)
+        {
+            // 获取必需参数
+            string nodeGraphPath = (string)@params["nodeGraphPath"] ?? throw new Exception("参数'nodeGraphPath'是必需的。");
+
+            // 获取可选参数
+            JArray rows = @params["rows"] as JArray ?? new JArray();
+            List<string> removed = @params["removed"]?.ToObject<List<string>>() ?? new List<string>();
+            List<string> expected = @params["expected"]?.ToObject<List<string>>() ?? new List<string>();
+            List<string> order = @params["order"]?.Type == JTokenType.Array ? @params["order"].ToObject<List<string>>() : null;
+            JArray voiceMoves = @params["voiceMoves"] as JArray ?? new JArray();
+            JArray voiceRows = @params["voiceRows"] as JArray ?? new JArray();
+            bool generateVoice = @params["generateVoice"] != null ? (bool)@params["generateVoice"] : true;
+
+            // 加载NodeGraph资产
+            string fullNodeGraphPath = nodeGraphPath;
+            if (!nodeGraphPath.StartsWith("Assets/"))
+            {
+                fullNodeGraphPath = $"Assets/{nodeGraphPath}";
+            }
+
+            var nodeGraph = AssetDatabase.LoadAssetAtPath<NodeGraph.NodeGraph>(fullNodeGraphPath);
+            if (nodeGraph == null)
+            {
+                throw new Exception($"NodeGraph文件不存在: {fullNodeGraphPath}");
+            }
+
+            // 第一步：检查NodeGraph仍是上次导入的结果，此时不修改任何节点
+            var nodesByEvent = new Dictionary<string, FlowEventNodeData>();
+            var duplicates = new HashSet<string>();
+            foreach (var node in nodeGraph.flowEventNodes)
+            {
+                if (string.IsNullOrEmpty(node.eventName))
+                    continue;
+                if (nodesByEvent.ContainsKey(node.eventName))
+                    duplicates.Add(node.eventName);
+                else
+                    nodesByEvent[node.eventName] = node;
+            }
+
+            List<string> mismatched = expected.Where(name => !nodesByEvent.ContainsKey(name) || duplicates.Contains(name)).ToList();
+            if (mismatched.Count > 0)
+            {
+                return new
+                {
+                    success = false,
+                    needsFullImport = true,
+                    message = $"NodeGraph与上次导入的Excel不一致，缺少或重复的节点: {string.Join(", ", mismatched.Take(10))}"
+                };
+            }
+
+            List<FlowNodeTempAsset> datas = rows.OfType<JObject>().Select(ExcelRowFromJson).ToList();
+            HashSet<string> known = new HashSet<string>(nodesByEvent.Keys.Concat(datas.Select(data => data.eventName)));
+            if (order == null && (removed.Count > 0 || datas.Any(data => !nodesByEvent.ContainsKey(data.eventName))))
+            {
+                throw new Exception("新增或删除行时参数'order'是必需的。");
+            }
+            if (order != null && order.Any(name => !known.Contains(name) || removed.Contains(name)))
+            {
+                throw new Exception("参数'order'中包含不存在或已删除的节点。");
+            }
+
+            var allUnityEvent = AllUnityEvent.GetInstanceInEditor();
+            if (allUnityEvent == null)
+            {
+                throw new Exception("AllUnityEvent实例未找到，请确保已正确初始化");
+            }
+            if (allUnityEvent.flownodeDic == null)
+            {
+                allUnityEvent.flownodeDic = new Dictionary<string, FlowEventNodeD>();
+            }
+
+            try
+            {
+                // 第二步：修改和新增行
+                int added = 0;
+                foreach (FlowNodeTempAsset data in datas)
+                {
+                    if (!nodesByEvent.TryGetValue(data.eventName, out FlowEventNodeData node))
+                    {
+                        node = NewFlowEventNode();
+                        nodesByEvent[data.eventName] = node;
+                        added++;
+                    }
+                    ApplyExcelRow(node, data, allUnityEvent);
+                }
+
+                foreach (string name in removed)
+                {
+                    allUnityEvent.flownodeDic.Remove(name);
+                }
+
+                // 第三步：行的顺序或分组变化时重新排列，删除的行和不再需要的后置节点不再加入
+                object layout = null;
+                if (order != null)
+                {
+                    HashSet<string> ordered = new HashSet<string>(order);
+                    var emptyNodes = nodesByEvent.Values
+                        .Where(node => !ordered.Contains(node.eventName) && string.IsNullOrEmpty(node.flowGraph) && node.eventName.EndsWith("后置"))
+                        .ToDictionary(node => node.eventName);
+
+                    nodeGraph.ClearAllNodeDatas();
+                    layout = LayoutFlowEventNodes(nodeGraph, order.Select(name => nodesByEvent[name]).ToList(), emptyNodes,
+                        allUnityEvent, out Dictionary<Vector2, NodeBaseData> positionToNodeMap, out _);
+                    ConnectNodes(nodeGraph, positionToNodeMap);
+
+                    foreach (string name in emptyNodes.Keys)
+                    {
+                        allUnityEvent.flownodeDic.Remove(name);
+                    }
+                }
+
+                // 第四步：保存并注册nodegraph
+                EditorUtility.SetDirty(nodeGraph);
+                AssetDatabase.SaveAssets();
+                AddGraphPool(nodeGraph);
+
+                // 第五步：移动行号变化的语音，为配音文案变化的行生成语音
+                List<string> missingVoices = MoveVoiceFiles(voiceMoves, out int voicesMoved);
+                List<(string content, string fileName, string fold)> voices = generateVoice
+                    ? voiceRows.OfType<JObject>().Select(voice => ((string)voice["content"], (string)voice["fileName"], (string)voice["fold"])).ToList()
+                    : new List<(string content, string fileName, string fold)>();
+                if (voices.Count > 0)
+                {
+                    EditorCoroutineUtility.StartCoroutineOwnerless(GenerateVoices(voices));
+                }
+
+                return new
+                {
+                    success = true,
+                    path = fullNodeGraphPath,
+                    added,
+                    updated = datas.Count - added,
+                    removed = removed.Count,
+                    relayout = order != null,
+                    layout,
+                    nodeCount = GetTotalNodeCount(nodeGraph),
+                    linkCount = nodeGraph.Links.Count,
+                    voicesMoved,
+                    missingVoices,
+                    voicesGenerating = voices.Count
+                };
+            }
+            catch (Exception ex)
+            {
+                EditorUtility.ClearProgressBar();
+                throw new Exception($"应用Excel行变化失败: {ex.Message}");
+            }
+        }
+
+        // 从JSON创建Excel步骤行，字段名与FlowNodeTempAsset相同
+        private static FlowNodeTempAsset ExcelRowFromJson(JObject row)
+        {
+            return new FlowNodeTempAsset(
+                (string)row["flowGraph"] ?? "",
+                (string)row["eventName"] ?? "",
+                (string)row["eventContent"] ?? "",
+                (string)row["handTip"] ?? "",
+                (string)row["enterEventName"] ?? "",
+                (string)row["enterEventContent"] ?? "",
+                (string)row["exitEventName"] ?? "",
+                (string)row["exitEventContent"] ?? "",
+                (string)row["voiceName"] ?? "",
+                (string)row["voiceContent"] ?? "",
+                (string)row["cameraTimelineName"] ?? "",
+                (string)row["cameraTimelineContent"] ?? "",
+                (string)row["objectTimelineName"] ?? "",
+                (string)row["objectTimelineContent"] ?? ""
+            );
+        }
+
+        // 创建空的流程事件节点
+        private static FlowEventNodeData NewFlowEventNode()
+        {
+            FlowEventNodeData flowEventNode = new FlowEventNodeData();
+            flowEventNode.GUID = Guid.NewGuid().ToString();
+            flowEventNode.NodeName = "FlowEventNode";
+            return flowEventNode;
+        }
+
+        // 用Excel步骤行设置节点属性，并更新AllUnityEvent中对应的事件
+        private static void ApplyExcelRow(FlowEventNodeData flowEventNode, FlowNodeTempAsset data, AllUnityEvent allUnityEvent)
+        {
+            // 创建 FlowEventNodeD 结构
+            allUnityEvent.flownodeDic[data.eventName] = new FlowEventNodeD
+            {
+                currentClickObj = data.handTip,
+                enterEvent = data.enterEventName,
+                enterDes = data.enterEventContent,
+                exitEvent = data.exitEventName,
+                exitDes = data.exitEventContent
+            };
+
+            // 设置节点属性
+            flowEventNode.flowGraph = data.flowGraph;
+            flowEventNode.eventName = data.eventName;
+            flowEventNode.eventContent = data.eventContent;
+            flowEventNode.enterEventName = data.enterEventName;
+            flowEventNode.enterEventContent = data.enterEventContent;
+            flowEventNode.exitEventName = data.exitEventName;
+            flowEventNode.exitEventContent = data.exitEventContent;
+            flowEventNode.cameraTimelineName = data.cameraTimelineName;
+            flowEventNode.cameraTimelineContent = data.cameraTimelineContent;
+            flowEventNode.objectTimelineName = data.objectTimelineName;
+            flowEventNode.objectTimelineContent = data.objectTimelineContent;
+            flowEventNode.voiceName = data.voiceName;
+        }
+
+        /// <summary>
+        /// 按步骤行顺序排列节点：相同flowGraph的节点纵向排成一列，两组之间插入CombineNode和"{flowGraph}后置"节点
+        /// </summary>
+        /// <param name="nodeGraph">已清空的NodeGraph</param>
+        /// <param name="steps">按行顺序排列、已设置属性的流程事件节点</param>
+        /// <param name="emptyNodes">可复用的后置节点，复用的节点会从中移除</param>
+        /// <param name="allUnityEvent">AllUnityEvent实例</param>
+        /// <param name="positionToNodeMap">各节点的网格位置，用于ConnectNodes</param>
+        /// <param name="lastFlowGraph">最后一组的flowGraph</param>
+        /// <returns>布局信息</returns>
+        private static object LayoutFlowEventNodes(NodeGraph.NodeGraph nodeGraph, List<FlowEventNodeData> steps,
+            Dictionary<string, FlowEventNodeData> emptyNodes, AllUnityEvent allUnityEvent,
+            out Dictionary<Vector2, NodeBaseData> positionToNodeMap, out string lastFlowGraph)
+        {
+            positionToNodeMap = new Dictionary<Vector2, NodeBaseData>();
+
+            int x = 0;
+            int y = 0;
+            string tempFlowGraph = "";
+            int count = 0;
+            string nowFlowGraph = "";
+
+            Rect startNodePos = new Rect(300 * x, 300 * y, 100, 150);
+            StartNodeData startNode = new StartNodeData();
+            startNode.Position = startNodePos;
+            startNode.GUID = Guid.NewGuid().ToString();
+            startNode.NodeName = "StartNode";
+            nodeGraph.startNodeDatas.Add(startNode);
+            positionToNodeMap[new Vector2(x, y)] = startNode;
+
+            for (int i = 0; i < steps.Count; i++)
+            {
+                EditorUtility.DisplayProgressBar("从Excel中生成节点", "创建节点中", (float)i / steps.Count);
+
+                FlowEventNodeData flowEventNode = steps[i];
+                if (tempFlowGraph != flowEventNode.flowGraph)
+                {
+                    y = 0;
+
+                    if (count > 0)
+                    {
+                        x++;
+
+                        // 创建合并节点数据
+                        x++;
+                        Rect combineNodePos = new Rect(300 * x, 300 * y, 100, 150);
+                        CombineNodeData combineNode = new CombineNodeData();
+                        combineNode.Position = combineNodePos;
+                        combineNode.GUID = Guid.NewGuid().ToString();
+                        combineNode.NodeName = "CombineNode";
+                        combineNode.inputCount = count + 1;
+                        nodeGraph.combineNodes.Add(combineNode);
+                        positionToNodeMap[new Vector2(x, y)] = combineNode;
+
+                        // 在CombineNode右侧创建一个空的FlowEventNodeData节点
+                        x++;
+                        string emptyName = nowFlowGraph + "后置";
+                        if (emptyNodes.TryGetValue(emptyName, out FlowEventNodeData emptyNode))
+                        {
+                            emptyNodes.Remove(emptyName);
+                        }
+                        else
+                        {
+                            emptyNode = NewFlowEventNode();
+                            emptyNode.eventName = emptyName;
+                            emptyNode.enterEventName = nowFlowGraph + "后置事件";
+                        }
+                        emptyNode.Position = new Rect(300 * x, 300 * y, 100, 150);
+                        nodeGraph.flowEventNodes.Add(emptyNode);
+
+                        // 添加到字典中
+                        allUnityEvent.flownodeDic[emptyNode.eventName] = new FlowEventNodeD
+                        {
+                            enterEvent = emptyNode.enterEventName
+                        };
+
+                        positionToNodeMap[new Vector2(x, y)] = emptyNode;
+                    }
+
+                    x++;
+                    nowFlowGraph = flowEventNode.flowGraph;
+                    count = 0;
+                    tempFlowGraph = flowEventNode.flowGraph;
+                }
+                else
+                {
+                    // 相同步骤名称的节点垂直排列
+                    y++;
+                    count++;
+                }
+
+                flowEventNode.Position = new Rect(300 * x, 300 * y, 100, 150);
+                nodeGraph.flowEventNodes.Add(flowEventNode);
+                positionToNodeMap[new Vector2(x, y)] = flowEventNode;
+            }
+
+            EditorUtility.ClearProgressBar();
+
+            lastFlowGraph = tempFlowGraph;
+            return new {
+                columnsCount = x + 1,
+                maxRowCount = count + 1,
+                layoutWidth = 300 * (x + 1),
+                layoutHeight = 300 * Math.Max(y + 1, count + 1)
+            };
+        }
+
+        /// <summary>
+        /// 移动语音文件（行号或语音名称变化、配音文案未变时不必重新生成）
+        /// </summary>
+        /// <param name="voiceMoves">每项包含from和to资产路径</param>
+        /// <param name="moved">移动的文件数</param>
+        /// <returns>原文件不存在或移动失败的目标路径</returns>
+        private static List<string> MoveVoiceFiles(JArray voiceMoves, out int moved)
+        {
+            moved = 0;
+            List<string> missing = new List<string>();
+            string projectRoot = Directory.GetParent(Application.dataPath).FullName;
+            foreach (JObject move in voiceMoves.OfType<JObject>())
+            {
+                string from = (string)move["from"];
+                string to = (string)move["to"];
+                if (string.IsNullOrEmpty(from) || string.IsNullOrEmpty(to) || !File.Exists(Path.Combine(projectRoot, from)))
+                {
+                    missing.Add(to);
+                    continue;
+                }
+
+                CreateAssetFolder(Path.GetDirectoryName(to).Replace("\\", "/"));
+                if (File.Exists(Path.Combine(projectRoot, to)))
+                {
+                    AssetDatabase.DeleteAsset(to);
+                }
+
+                string error = AssetDatabase.MoveAsset(from, to);
+                if (string.IsNullOrEmpty(error))
+                {
+                    moved++;
+                }
+                else
+                {
+                    Debug.LogWarning($"移动语音文件失败 {from} -> {to}: {error}");
+                    missing.Add(to);
+                }
+            }
+            return missing;
+        }
+
+        // 逐级创建资产目录
+        private static void CreateAssetFolder(string folderPath)
+        {
+            if (AssetDatabase.IsValidFolder(folderPath))
+                return;
+
+            string parentPath = Path.GetDirectoryName(folderPath).Replace("\\", "/");
+            CreateAssetFolder(parentPath);
+            AssetDatabase.CreateFolder(parentPath, Path.GetFileName(folderPath));
+        }
+
+        // 依次生成语音，保存到Resources/Lesson/{fold}/{fileName}.wav
+        private static IEnumerator GenerateVoices(List<(string content, string fileName, string fold)> voices)
+        {
+            for (int i = 0; i < voices.Count; i++)
+            {
+                EditorUtility.DisplayProgressBar("从Excel中生成节点中", "创建音频" + voices[i].fileName, (float)i / voices.Count);
+                yield return TTSUtillity.TTS(voices[i].content, voices[i].fileName, voices[i].fold);
+            }
+            EditorUtility.ClearProgressBar();
+        }
+        
+        
         /// <summary>
         /// 将NodeGraph添加到图形池中并初始化
         /// </summary>
@@ -1150,6 +1391,206 @@ namespace UnityMCP.Editor.Commands
             }
         }
         
+        /// <summary>
+        /// 批量更新多个FlowEventNode节点（timeline资产和字段），全部修改只标记一次脏数据、只写一次资产
+        /// updates: [{ eventName, timelineAssets: [路径], replaceTimelineAssets: bool, fields: { 字段名: 值 } }]
+        /// atomic为true时任一更新无效则不做任何修改
+        /// </summary>
+        /// <param name="params">包含批量更新信息的JSON对象</param>
+        /// <returns>每个节点的更新结果</returns>
+        public static object BulkUpdateFlowEventNodes(JObject @params)
+        {
+            try
+            {
+                // 获取必需参数
+                string name = (string)@params["name"] ?? throw new Exception("参数'name'是必需的。");
+                JArray updates = @params["updates"] as JArray ?? throw new Exception("参数'updates'是必需的。");
+
+                // 获取可选参数
+                string path = (string)@params["path"] ?? "Assets/NodeGraphTool/Test";
+                bool save = @params["save"]?.ToObject<bool>() ?? true;
+                bool atomic = @params["atomic"]?.ToObject<bool>() ?? true;
+
+                // 构建完整的资产路径
+                string assetPath = $"{path}/{name}.asset";
+
+                // 加载NodeGraph资产
+                var nodeGraph = AssetDatabase.LoadAssetAtPath<NodeGraph.NodeGraph>(assetPath);
+
+                if (nodeGraph == null)
+                {
+                    return new
+                    {
+                        success = false,
+                        message = $"NodeGraph资产未找到: {assetPath}"
+                    };
+                }
+
+                // 第一步：解析并验证所有更新，此时不修改任何节点
+                var nodesByEvent = new Dictionary<string, FlowEventNodeData>();
+                foreach (var node in nodeGraph.flowEventNodes)
+                {
+                    if (node.eventName != null && !nodesByEvent.ContainsKey(node.eventName))
+                    {
+                        nodesByEvent[node.eventName] = node;
+                    }
+                }
+
+                var actions = new List<(FlowEventNodeData node, JObject update, List<UnityEngine.Timeline.TimelineAsset> timelines, List<(FieldInfo field, object value)> fields)>();
+                var errors = new List<object>();
+                foreach (JObject update in updates.OfType<JObject>())
+                {
+                    string eventName = (string)update["eventName"];
+                    if (eventName == null || !nodesByEvent.TryGetValue(eventName, out var flowEventNode))
+                    {
+                        errors.Add(new { eventName, success = false, message = $"未找到名为'{eventName}'的FlowEventNode节点" });
+                        continue;
+                    }
+
+                    string error = null;
+                    var timelines = new List<UnityEngine.Timeline.TimelineAsset>();
+                    foreach (var timelinePath in (update["timelineAssets"] as JArray ?? new JArray()).Values<string>())
+                    {
+                        var timeline = AssetDatabase.LoadAssetAtPath<UnityEngine.Timeline.TimelineAsset>(timelinePath);
+                        if (timeline == null)
+                        {
+                            error = $"Timeline资产未找到: {timelinePath}";
+                            break;
+                        }
+                        timelines.Add(timeline);
+                    }
+
+                    var fields = new List<(FieldInfo field, object value)>();
+                    foreach (var property in (update["fields"] as JObject ?? new JObject()).Properties())
+                    {
+                        if (error != null)
+                        {
+                            break;
+                        }
+                        var field = typeof(FlowEventNodeData).GetField(property.Name, BindingFlags.Public | BindingFlags.Instance);
+                        if (field == null || field.IsInitOnly)
+                        {
+                            error = $"FlowEventNode没有可写字段'{property.Name}'";
+                            break;
+                        }
+                        try
+                        {
+                            object value;
+                            if (typeof(UnityEngine.Object).IsAssignableFrom(field.FieldType))
+                            {
+                                string valuePath = (string)property.Value;
+                                value = string.IsNullOrEmpty(valuePath) ? null : AssetDatabase.LoadAssetAtPath(valuePath, field.FieldType);
+                                if (!string.IsNullOrEmpty(valuePath) && value == null)
+                                {
+                                    error = $"字段'{property.Name}'的资产未找到: {valuePath}";
+                                    break;
+                                }
+                            }
+                            else if (field.FieldType.IsEnum)
+                            {
+                                value = Enum.Parse(field.FieldType, (string)property.Value, true);
+                            }
+                            else
+                            {
+                                value = property.Value.ToObject(field.FieldType);
+                            }
+                            fields.Add((field, value));
+                        }
+                        catch (Exception ex)
+                        {
+                            error = $"字段'{property.Name}'的值无效: {ex.Message}";
+                        }
+                    }
+
+                    if (error != null)
+                    {
+                        errors.Add(new { eventName, success = false, message = error });
+                        continue;
+                    }
+                    actions.Add((flowEventNode, update, timelines, fields));
+                }
+
+                if (atomic && errors.Count > 0)
+                {
+                    return new
+                    {
+                        success = false,
+                        message = $"{errors.Count}个更新无效，未做任何修改",
+                        nodeGraphPath = assetPath,
+                        results = errors
+                    };
+                }
+
+                // 第二步：应用全部修改
+                var results = new List<object>(errors);
+                foreach (var (flowEventNode, update, timelines, fields) in actions)
+                {
+                    int previousTimelineCount = flowEventNode.timelineCount;
+                    if (flowEventNode.timelineAssets == null || (update["replaceTimelineAssets"]?.ToObject<bool>() ?? false))
+                    {
+                        flowEventNode.timelineAssets = new List<UnityEngine.Timeline.TimelineAsset>();
+                    }
+
+                    List<string> updatedAssets = new List<string>();
+                    foreach (var timeline in timelines)
+                    {
+                        // 检查是否已存在，避免重复添加
+                        if (!flowEventNode.timelineAssets.Contains(timeline))
+                        {
+                            flowEventNode.timelineAssets.Add(timeline);
+                            updatedAssets.Add(AssetDatabase.GetAssetPath(timeline));
+                        }
+                    }
+                    foreach (var (field, value) in fields)
+                    {
+                        field.SetValue(flowEventNode, value);
+                    }
+
+                    results.Add(new
+                    {
+                        eventName = flowEventNode.eventName,
+                        success = true,
+                        updatedAssets = updatedAssets,
+                        updatedFields = fields.Select(f => f.field.Name).ToList(),
+                        timelineAssets = flowEventNode.timelineAssets.Where(t => t != null).Select(t => AssetDatabase.GetAssetPath(t)).ToList(),
+                        timelineCountBefore = previousTimelineCount,
+                        timelineCountAfter = flowEventNode.timelineCount
+                    });
+                }
+
+                // 标记为脏数据，只写入这一个资产
+                bool saved = false;
+                if (actions.Count > 0)
+                {
+                    EditorUtility.SetDirty(nodeGraph);
+                    if (save)
+                    {
+                        AssetDatabase.SaveAssetIfDirty(nodeGraph);
+                        saved = true;
+                    }
+                }
+
+                return new
+                {
+                    success = errors.Count == 0,
+                    message = $"批量更新FlowEventNode: 成功{actions.Count}个，失败{errors.Count}个" + (saved ? "，已保存" : ""),
+                    nodeGraphPath = assetPath,
+                    appliedCount = actions.Count,
+                    failedCount = errors.Count,
+                    saved = saved,
+                    results = results
+                };
+            }
+            catch (Exception ex)
+            {
+                return new
+                {
+                    success = false,
+                    message = $"批量更新FlowEventNode失败: {ex.Message}"
+                };
+            }
+        }
+
         /// <summary>
         /// 保存NodeGraph文件的所有修改
         /// </summary>
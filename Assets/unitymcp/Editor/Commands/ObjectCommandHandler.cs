@@ -598,11 +598,32 @@ namespace UnityMCP.Editor.Commands
         /// <summary>
         /// 获取场景中的所有游戏对象
         /// </summary>
-        public static object GetAllSceneObjects()
+        public static object GetAllSceneObjects(JObject @params = null)
         {
+            // include_transforms为true时，额外返回与GET_OBJECT_INFO相同的变换和bounds信息，用于一次性预热客户端场景缓存
+            bool includeTransforms = (bool?)@params?["include_transforms"] ?? false;
+
             // 获取场景中的所有游戏对象（包括非激活的）
             var objects = GameObject.FindObjectsByType<GameObject>(FindObjectsInactive.Include, FindObjectsSortMode.None)
-                .Select(o => new
+                .Select(o => includeTransforms ? (object)new
+                {
+                    o.name,  // 对象名称
+                    path = GetGameObjectPath(o),  // 对象路径
+                    active = o.activeSelf,  // 是否激活
+                    activeInHierarchy = o.activeInHierarchy,  // GameObject.Find只能找到层级中激活的对象
+                    tag = o.tag,  // 标签
+                    layer = o.layer,  // 层级
+                    layerName = LayerMask.LayerToName(o.layer),  // 层级名称，用于按名称匹配障碍物层级
+                    components = o.GetComponents<Component>().Select(c => c.GetType().Name).ToArray(),  // 组件列表
+                    position = new[] { o.transform.position.x, o.transform.position.y, o.transform.position.z },
+                    rotation = new[] { o.transform.eulerAngles.x, o.transform.eulerAngles.y, o.transform.eulerAngles.z },
+                    scale = new[] { o.transform.localScale.x, o.transform.localScale.y, o.transform.localScale.z },
+                    bounds = new
+                    {
+                        renderer = GetRendererBounds(o),
+                        collider = GetColliderBounds(o)
+                    }
+                } : new
                 {
                     o.name,  // 对象名称
                     path = GetGameObjectPath(o),  // 对象路径
@@ -0,0 +1,179 @@
+using UnityEngine;
+using UnityEditor;
+using Newtonsoft.Json.Linq;
+using System;
+using System.Linq;
+using System.Collections.Generic;
+using UnityEngine.SceneManagement;
+
+namespace UnityMCP.Editor.Commands
+{
+    /// <summary>
+    /// 为客户端的层级镜像提供按修订号的增量同步
+    /// 每次查询时在编辑器内扫描所有GameObject并与上次快照比较，只把变化的对象和删除的ID发给客户端，
+    /// 避免每次都传输整个场景的层级数据
+    /// </summary>
+    [InitializeOnLoad]
+    public static class SceneRevisionTracker
+    {
+        // 删除记录最多保留的条数，更早的客户端修订号只能拿到完整快照
+        private const int MaxRemovedLog = 10000;
+
+        private class Entry
+        {
+            public string name;
+            public int parent;
+            public int sibling;
+            public bool active;
+            public bool activeInHierarchy;
+            public string tag;
+            public int layer;
+            public string[] components;
+            public int scene;
+
+            public bool SameAs(Entry other)
+            {
+                return name == other.name && parent == other.parent && sibling == other.sibling
+                    && active == other.active && activeInHierarchy == other.activeInHierarchy
+                    && tag == other.tag && layer == other.layer && scene == other.scene
+                    && components.SequenceEqual(other.components);
+            }
+        }
+
+        // 域重载后修订号从0开始，客户端用epoch判断修订号是否属于同一段历史
+        private static readonly string epoch = Guid.NewGuid().ToString("N");
+        private static readonly Dictionary<int, Entry> snapshot = new();
+        private static readonly Dictionary<int, long> changedAt = new();
+        private static readonly List<(long revision, int id)> removedLog = new();
+        private static long revision;
+        private static long baseRevision;  // 早于该修订号的客户端需要完整快照
+        private static string loadedScenes;
+        // 手动移动物体、撤销/重做等编辑不改变层级，但会让客户端缓存的变换和包围盒过期，单独计数
+        private static long editRevision;
+
+        static SceneRevisionTracker()
+        {
+            ObjectChangeEvents.changesPublished += (ref ObjectChangeEventStream stream) => editRevision++;
+            Undo.postprocessModifications += modifications =>
+            {
+                editRevision++;
+                return modifications;
+            };
+            Undo.undoRedoPerformed += () => editRevision++;
+        }
+
+        /// <summary>
+        /// 返回since_revision之后变化的对象和被删除的对象ID
+        /// 参数epoch与当前不一致、修订号过旧或超前时返回完整快照（full=true）
+        /// edit_revision在编辑器内每次修改后递增，客户端据此丢弃缓存的变换
+        /// </summary>
+        public static object GetSceneChanges(JObject @params)
+        {
+            long since = (long?)@params?["since_revision"] ?? -1;
+            string clientEpoch = (string)@params?["epoch"];
+
+            Scan();
+
+            bool full = clientEpoch != epoch || since < baseRevision || since > revision;
+            var objects = snapshot
+                .Where(kvp => full || changedAt[kvp.Key] > since)
+                .Select(kvp => Serialize(kvp.Key, kvp.Value))
+                .ToList();
+            var removed = full
+                ? new List<int>()
+                : removedLog.Where(item => item.revision > since).Select(item => item.id).ToList();
+
+            return new
+            {
+                epoch,
+                revision,
+                edit_revision = editRevision,
+                full,
+                active_scene = SceneManager.GetActiveScene().handle,
+                objects,
+                removed
+            };
+        }
+
+        // 扫描所有已加载场景的GameObject（包括非激活的）并更新快照
+        // 组件、标签和层级的变化不一定触发hierarchyChanged，所以每次查询都重新扫描，扫描远比序列化整个层级便宜
+        private static void Scan()
+        {
+            string scenes = string.Join(",", Enumerable.Range(0, SceneManager.sceneCount)
+                .Select(i => SceneManager.GetSceneAt(i).handle));
+            long next = revision + 1;
+            bool changed = false;
+
+            // 打开或关闭场景后旧的历史没有意义，重新开始
+            if (scenes != loadedScenes)
+            {
+                snapshot.Clear();
+                changedAt.Clear();
+                removedLog.Clear();
+                baseRevision = next;
+                loadedScenes = scenes;
+                changed = true;
+            }
+
+            var seen = new HashSet<int>();
+            foreach (var obj in GameObject.FindObjectsByType<GameObject>(FindObjectsInactive.Include, FindObjectsSortMode.None))
+            {
+                int id = obj.GetInstanceID();
+                seen.Add(id);
+                var entry = new Entry
+                {
+                    name = obj.name,
+                    parent = obj.transform.parent != null ? obj.transform.parent.gameObject.GetInstanceID() : 0,
+                    sibling = obj.transform.GetSiblingIndex(),
+                    active = obj.activeSelf,
+                    activeInHierarchy = obj.activeInHierarchy,
+                    tag = obj.tag,
+                    layer = obj.layer,
+                    components = obj.GetComponents<Component>().Select(c => c != null ? c.GetType().Name : "Missing").ToArray(),
+                    scene = obj.scene.handle
+                };
+                if (snapshot.TryGetValue(id, out var previous) && previous.SameAs(entry))
+                    continue;
+
+                snapshot[id] = entry;
+                changedAt[id] = next;
+                changed = true;
+            }
+
+            foreach (int id in snapshot.Keys.Where(id => !seen.Contains(id)).ToList())
+            {
+                snapshot.Remove(id);
+                changedAt.Remove(id);
+                removedLog.Add((next, id));
+                changed = true;
+            }
+
+            if (removedLog.Count > MaxRemovedLog)
+            {
+                int drop = removedLog.Count - MaxRemovedLog;
+                baseRevision = Math.Max(baseRevision, removedLog[drop - 1].revision);
+                removedLog.RemoveRange(0, drop);
+            }
+
+            if (changed)
+                revision = next;
+        }
+
+        private static object Serialize(int id, Entry entry)
+        {
+            return new
+            {
+                id,
+                entry.name,
+                entry.parent,
+                entry.sibling,
+                entry.active,
+                entry.activeInHierarchy,
+                entry.tag,
+                entry.layer,
+                entry.components,
+                entry.scene
+            };
+        }
+    }
+}
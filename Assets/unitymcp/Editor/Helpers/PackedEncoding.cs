@@ -0,0 +1,201 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using Newtonsoft.Json;
+using Newtonsoft.Json.Linq;
+
+namespace UnityMCP.Editor.Helpers
+{
+    /// <summary>
+    /// Compact "packed" frame encoding negotiated in the framing handshake.
+    /// A frame body is a 4-byte little-endian JSON length, the JSON envelope, then float32 blocks:
+    /// numeric arrays become {"$f32":[offset,count]} (or [offset,count,width] for lists of equal
+    /// length vectors) and lists of objects with identical keys become {"$table":[keys,columns]}.
+    /// Mirrors packed_encoding.py on the Python side.
+    /// </summary>
+    public static class PackedEncoding
+    {
+        public const string Name = "packed";
+        private const int MinPackedFloats = 16;
+        private const int MinTableRows = 8;
+
+        /// <summary>
+        /// Encodes a response token tree as a packed frame body
+        /// </summary>
+        public static byte[] Encode(JToken response)
+        {
+            var blocks = new List<float>();
+            var envelope = Pack(response, blocks);
+            byte[] jsonBytes = Encoding.UTF8.GetBytes(envelope.ToString(Formatting.None));
+
+            var body = new byte[4 + jsonBytes.Length + blocks.Count * 4];
+            WriteInt32(body, 0, jsonBytes.Length);
+            Buffer.BlockCopy(jsonBytes, 0, body, 4, jsonBytes.Length);
+            var floats = blocks.ToArray();
+            if (BitConverter.IsLittleEndian)
+            {
+                Buffer.BlockCopy(floats, 0, body, 4 + jsonBytes.Length, floats.Length * 4);
+            }
+            else
+            {
+                for (int i = 0; i < floats.Length; i++)
+                {
+                    byte[] bytes = BitConverter.GetBytes(floats[i]);
+                    Array.Reverse(bytes);
+                    Buffer.BlockCopy(bytes, 0, body, 4 + jsonBytes.Length + i * 4, 4);
+                }
+            }
+            return body;
+        }
+
+        /// <summary>
+        /// Encodes a preformatted JSON response (pong, transport errors) as a packed frame body
+        /// </summary>
+        public static byte[] Encode(string json) => Encode(Parse(json));
+
+        /// <summary>
+        /// Decodes a packed frame body into the command object handed to the dispatcher
+        /// </summary>
+        public static JObject Decode(byte[] body)
+        {
+            if (body.Length < 4)
+                throw new Exception("Packed frame is too short");
+            int jsonLength = ReadInt32(body, 0);
+            if (jsonLength < 0 || 4 + jsonLength > body.Length)
+                throw new Exception($"Invalid packed JSON length: {jsonLength}");
+
+            int floatCount = (body.Length - 4 - jsonLength) / 4;
+            var floats = new float[floatCount];
+            for (int i = 0; i < floatCount; i++)
+            {
+                int offset = 4 + jsonLength + i * 4;
+                floats[i] = BitConverter.IsLittleEndian
+                    ? BitConverter.ToSingle(body, offset)
+                    : BitConverter.ToSingle(new[] { body[offset + 3], body[offset + 2], body[offset + 1], body[offset] }, 0);
+            }
+
+            var envelope = Parse(Encoding.UTF8.GetString(body, 4, jsonLength));
+            return Unpack(envelope, floats) as JObject ?? throw new Exception("Packed command is not a JSON object");
+        }
+
+        // Dates and large numbers must survive the round trip unchanged
+        private static JToken Parse(string json)
+        {
+            using var reader = new JsonTextReader(new StringReader(json))
+            {
+                DateParseHandling = DateParseHandling.None,
+                FloatParseHandling = FloatParseHandling.Double
+            };
+            return JToken.ReadFrom(reader);
+        }
+
+        private static bool IsNumber(JToken token) => token.Type == JTokenType.Float || token.Type == JTokenType.Integer;
+
+        // Integer-only arrays (instance IDs, indices) stay JSON so they keep their exact values
+        private static bool IsFloatVector(JArray array) =>
+            array.Count > 0 && array.All(IsNumber) && array.Any(item => item.Type == JTokenType.Float);
+
+        private static JToken Reference(IEnumerable<JToken> values, List<float> blocks, int count, int width)
+        {
+            int offset = blocks.Count;
+            blocks.AddRange(values.Select(value => (float)value));
+            var reference = new JArray(offset, count);
+            if (width > 0)
+                reference.Add(width);
+            return new JObject { ["$f32"] = reference };
+        }
+
+        private static JToken Pack(JToken token, List<float> blocks)
+        {
+            if (token is JObject obj)
+            {
+                var packed = new JObject();
+                foreach (var property in obj.Properties())
+                    packed[property.Name] = Pack(property.Value, blocks);
+                return packed;
+            }
+            if (!(token is JArray array))
+                return token;
+
+            if (array.Count >= MinPackedFloats && IsFloatVector(array))
+                return Reference(array, blocks, array.Count, 0);
+
+            if (array.Count > 0 && array.All(item => item is JArray))
+            {
+                int width = ((JArray)array[0]).Count;
+                bool isMatrix = width > 0 && array.Count * width >= MinPackedFloats
+                    && array.All(item => ((JArray)item).Count == width && ((JArray)item).All(IsNumber))
+                    && array.Any(item => item.Any(value => value.Type == JTokenType.Float));
+                if (isMatrix)
+                    return Reference(array.SelectMany(item => item), blocks, array.Count * width, width);
+            }
+
+            if (array.Count >= MinTableRows && array.All(item => item is JObject))
+            {
+                var keys = ((JObject)array[0]).Properties().Select(p => p.Name).ToList();
+                bool isTable = keys.Count > 0 && array.All(item => ((JObject)item).Properties().Select(p => p.Name).SequenceEqual(keys));
+                if (isTable)
+                {
+                    var columns = new JArray(keys.Select(key => Pack(new JArray(array.Select(item => item[key])), blocks)));
+                    return new JObject { ["$table"] = new JArray(new JArray(keys), columns) };
+                }
+            }
+
+            return new JArray(array.Select(item => Pack(item, blocks)));
+        }
+
+        private static JToken Unpack(JToken token, float[] floats)
+        {
+            if (token is JArray array)
+                return new JArray(array.Select(item => Unpack(item, floats)));
+            if (!(token is JObject obj))
+                return token;
+
+            if (obj.Count == 1 && obj["$f32"] is JArray reference)
+            {
+                int offset = (int)reference[0];
+                int count = (int)reference[1];
+                int width = reference.Count > 2 ? (int)reference[2] : 0;
+                if (offset < 0 || count < 0 || offset + count > floats.Length)
+                    throw new Exception("Packed float block is out of range");
+                if (width <= 0)
+                    return new JArray(Enumerable.Range(offset, count).Select(i => new JValue(floats[i])));
+                return new JArray(Enumerable.Range(0, count / width).Select(row =>
+                    new JArray(Enumerable.Range(offset + row * width, width).Select(i => new JValue(floats[i])))));
+            }
+            if (obj.Count == 1 && obj["$table"] is JArray table)
+            {
+                var keys = table[0].Select(key => (string)key).ToList();
+                var columns = table[1].Select(column => (JArray)Unpack(column, floats)).ToList();
+                int rows = columns.Count > 0 ? columns[0].Count : 0;
+                return new JArray(Enumerable.Range(0, rows).Select(row =>
+                {
+                    var item = new JObject();
+                    for (int k = 0; k < keys.Count; k++)
+                        item[keys[k]] = columns[k][row];
+                    return item;
+                }));
+            }
+
+            var unpacked = new JObject();
+            foreach (var property in obj.Properties())
+                unpacked[property.Name] = Unpack(property.Value, floats);
+            return unpacked;
+        }
+
+        private static void WriteInt32(byte[] buffer, int offset, int value)
+        {
+            buffer[offset] = (byte)value;
+            buffer[offset + 1] = (byte)(value >> 8);
+            buffer[offset + 2] = (byte)(value >> 16);
+            buffer[offset + 3] = (byte)(value >> 24);
+        }
+
+        private static int ReadInt32(byte[] buffer, int offset)
+        {
+            return buffer[offset] | (buffer[offset + 1] << 8) | (buffer[offset + 2] << 16) | (buffer[offset + 3] << 24);
+        }
+    }
+}
@@ -3,6 +3,7 @@ using System.Collections.Generic;
 using System.Linq;
 using System.Net;
 using System.Net.Sockets;
+using System.Threading;
 using System.Threading.Tasks;
 using UnityEditor;
 using UnityEngine;
@@ -11,6 +12,7 @@ using Newtonsoft.Json.Linq;
 using System.IO;
 using UnityMCP.Editor.Models;
 using UnityMCP.Editor.Commands;
+using UnityMCP.Editor.Helpers;
 
 namespace UnityMCP.Editor
 {
@@ -20,7 +22,8 @@ namespace UnityMCP.Editor
         private static TcpListener listener;
         private static bool isRunning = false;
         private static readonly object lockObj = new();
-        private static Dictionary<string, (string commandJson, TaskCompletionSource<string> tcs)> commandQueue = new();
+        // Commands that arrive already parsed (packed or multiplexed frames) carry their JObject so they are not parsed again
+        private static Dictionary<string, (string commandJson, JObject command, bool packed, TaskCompletionSource<object> tcs)> commandQueue = new();
         private static readonly int unityPort = 6400;  // Hardcoded port
 
         public static bool IsRunning => isRunning;
@@ -86,40 +89,74 @@ namespace UnityMCP.Editor
             }
         }
 
+        // Framed wire mode: 8-byte big-endian length header followed by a UTF-8 JSON body
+        private const int FrameProtocolVersion = 1;
+        private const int FrameHeaderSize = 8;
+        private const long MaxFrameSize = 256L * 1024 * 1024;
+        private const string PongResponse = "{\"status\":\"success\",\"result\":{\"message\":\"pong\"}}";
+
         private static async Task HandleClientAsync(TcpClient client)
         {
             using (client)
             using (var stream = client.GetStream())
             {
                 var buffer = new byte[8192];
+                bool framed = false;
+                bool multiplexed = false;
+                bool packed = false;
+                var writeLock = new SemaphoreSlim(1, 1);
                 while (isRunning)
                 {
                     try
                     {
-                        int bytesRead = await stream.ReadAsync(buffer, 0, buffer.Length);
-                        if (bytesRead == 0) break; // Client disconnected
+                        string commandText;
+                        JObject command = null;
+                        if (framed)
+                        {
+                            (commandText, command) = await ReadFrameAsync(stream, packed);
+                            if (commandText == null && command == null) break; // Client disconnected
+
+                            // Multiplexed frames are dispatched without waiting, so several commands can be in flight
+                            if (multiplexed)
+                            {
+                                _ = HandleMultiplexedFrameAsync(stream, writeLock, commandText, command, packed);
+                                continue;
+                            }
+                        }
+                        else
+                        {
+                            int bytesRead = await stream.ReadAsync(buffer, 0, buffer.Length);
+                            if (bytesRead == 0) break; // Client disconnected
+
+                            commandText = System.Text.Encoding.UTF8.GetString(buffer, 0, bytesRead);
+
+                            // Handshake is answered in legacy mode, then the connection switches to framing
+                            if (TryHandleHandshake(commandText, out string handshakeResponse, out multiplexed, out packed))
+                            {
+                                await WriteResponseAsync(stream, handshakeResponse, false);
+                                framed = true;
+                                continue;
+                            }
+                        }
 
-                        string commandText = System.Text.Encoding.UTF8.GetString(buffer, 0, bytesRead);
                         string commandId = Guid.NewGuid().ToString();
-                        var tcs = new TaskCompletionSource<string>();
+                        var tcs = new TaskCompletionSource<object>();
 
                         // Special handling for ping command to avoid JSON parsing
-                        if (commandText.Trim() == "ping")
+                        if (commandText?.Trim() == "ping")
                         {
                             // Direct response to ping without going through JSON parsing
-                            byte[] pingResponseBytes = System.Text.Encoding.UTF8.GetBytes("{\"status\":\"success\",\"result\":{\"message\":\"pong\"}}");
-                            await stream.WriteAsync(pingResponseBytes, 0, pingResponseBytes.Length);
+                            await WriteResponseAsync(stream, PongResponse, framed, packed);
                             continue;
                         }
 
                         lock (lockObj)
                         {
-                            commandQueue[commandId] = (commandText, tcs);
+                            commandQueue[commandId] = (commandText, command, packed, tcs);
                         }
 
-                        string response = await tcs.Task;
-                        byte[] responseBytes = System.Text.Encoding.UTF8.GetBytes(response);
-                        await stream.WriteAsync(responseBytes, 0, responseBytes.Length);
+                        object response = await tcs.Task;
+                        await WriteResponseAsync(stream, response, framed, packed);
                     }
                     catch (Exception ex)
                     {
@@ -130,6 +167,150 @@ namespace UnityMCP.Editor
             }
         }
 
+        // Accepts {"type":"HANDSHAKE","params":{"protocol":"framed",...}} and builds the reply
+        private static bool TryHandleHandshake(string commandText, out string response, out bool multiplex, out bool packed)
+        {
+            response = null;
+            multiplex = false;
+            packed = false;
+            if (!commandText.Contains("\"HANDSHAKE\"") || !IsValidJson(commandText))
+                return false;
+
+            var handshake = JObject.Parse(commandText);
+            if ((string)handshake["type"] != "HANDSHAKE" || (string)handshake["params"]?["protocol"] != "framed")
+                return false;
+
+            // Multiplexed frames carry an "id" that is echoed back on the matching response
+            multiplex = (bool?)handshake["params"]?["multiplex"] ?? false;
+            // Frames switch to the packed encoding only when the client asks for it; JSON stays the default
+            packed = (string)handshake["params"]?["encoding"] == PackedEncoding.Name;
+
+            response = JsonConvert.SerializeObject(new
+            {
+                status = "success",
+                result = new
+                {
+                    protocol = "framed",
+                    version = FrameProtocolVersion,
+                    header_bytes = FrameHeaderSize,
+                    multiplex,
+                    batch = true,
+                    encoding = packed ? PackedEncoding.Name : "json"
+                }
+            });
+            return true;
+        }
+
+        private static async Task HandleMultiplexedFrameAsync(NetworkStream stream, SemaphoreSlim writeLock, string commandText, JObject request, bool packed)
+        {
+            string requestId = null;
+            object response;
+            try
+            {
+                request ??= JObject.Parse(commandText);
+                requestId = (string)request["id"];
+
+                // Heartbeat pings are answered here and never wait for the editor update loop
+                if ((string)request["type"] == "ping")
+                {
+                    response = PongResponse;
+                }
+                else
+                {
+                    var tcs = new TaskCompletionSource<object>();
+                    lock (lockObj)
+                    {
+                        commandQueue[Guid.NewGuid().ToString()] = (commandText, request, packed, tcs);
+                    }
+                    response = await tcs.Task;
+                }
+            }
+            catch (Exception ex)
+            {
+                response = JsonConvert.SerializeObject(new { status = "error", error = ex.Message });
+            }
+
+            // Prepend the request id to the response object
+            if (response is JObject responseObject)
+            {
+                responseObject.AddFirst(new JProperty("id", requestId));
+            }
+            else
+            {
+                string text = (string)response;
+                string idField = "\"id\":" + JsonConvert.ToString(requestId);
+                response = text.Length > 2 ? "{" + idField + "," + text.Substring(1) : "{" + idField + "}";
+            }
+
+            await writeLock.WaitAsync();
+            try
+            {
+                await WriteResponseAsync(stream, response, true, packed);
+            }
+            catch (Exception ex)
+            {
+                Debug.LogError($"Client handler error: {ex.Message}");
+            }
+            finally
+            {
+                writeLock.Release();
+            }
+        }
+
+        // Returns the frame text, or for packed frames the decoded command object; both are null once the client disconnects
+        private static async Task<(string text, JObject command)> ReadFrameAsync(NetworkStream stream, bool packed)
+        {
+            var header = new byte[FrameHeaderSize];
+            if (!await ReadExactAsync(stream, header, FrameHeaderSize)) return (null, null);
+
+            long length = 0;
+            for (int i = 0; i < FrameHeaderSize; i++)
+            {
+                length = (length << 8) | header[i];
+            }
+            if (length < 0 || length > MaxFrameSize)
+                throw new Exception($"Invalid frame length: {length}");
+
+            var body = new byte[length];
+            if (!await ReadExactAsync(stream, body, (int)length)) return (null, null);
+            // A bare "ping" is never packed
+            if (packed && !(length == 4 && System.Text.Encoding.UTF8.GetString(body) == "ping"))
+                return (null, PackedEncoding.Decode(body));
+            return (System.Text.Encoding.UTF8.GetString(body), null);
+        }
+
+        private static async Task<bool> ReadExactAsync(NetworkStream stream, byte[] buffer, int count)
+        {
+            int offset = 0;
+            while (offset < count)
+            {
+                int read = await stream.ReadAsync(buffer, offset, count - offset);
+                if (read == 0) return false;
+                offset += read;
+            }
+            return true;
+        }
+
+        // Packed connections receive token trees from the dispatcher; JSON connections and canned replies are strings
+        private static async Task WriteResponseAsync(NetworkStream stream, object response, bool framed, bool packed = false)
+        {
+            byte[] responseBytes = !packed
+                ? System.Text.Encoding.UTF8.GetBytes((string)response)
+                : response is JToken token ? PackedEncoding.Encode(token) : PackedEncoding.Encode((string)response);
+            if (framed)
+            {
+                var header = new byte[FrameHeaderSize];
+                long length = responseBytes.Length;
+                for (int i = FrameHeaderSize - 1; i >= 0; i--)
+                {
+                    header[i] = (byte)(length & 0xFF);
+                    length >>= 8;
+                }
+                await stream.WriteAsync(header, 0, header.Length);
+            }
+            await stream.WriteAsync(responseBytes, 0, responseBytes.Length);
+        }
+
         private static void ProcessCommands()
         {
             List<string> processedIds = new();
@@ -138,11 +319,18 @@ namespace UnityMCP.Editor
                 foreach (var kvp in commandQueue.ToList())
                 {
                     string id = kvp.Key;
-                    string commandText = kvp.Value.commandJson;
-                    var tcs = kvp.Value.tcs;
+                    var (commandText, parsed, packed, tcs) = kvp.Value;
 
                     try
                     {
+                        // Decoded packed frames and multiplexed requests are already parsed
+                        if (parsed != null)
+                        {
+                            tcs.SetResult(ExecuteCommand(parsed.ToObject<Command>(), packed));
+                            processedIds.Add(id);
+                            continue;
+                        }
+
                         // Special case handling
                         if (string.IsNullOrEmpty(commandText))
                         {
@@ -151,7 +339,7 @@ namespace UnityMCP.Editor
                                 status = "error",
                                 error = "Empty command received"
                             };
-                            tcs.SetResult(JsonConvert.SerializeObject(emptyResponse));
+                            tcs.SetResult(SerializeResponse(emptyResponse, packed));
                             processedIds.Add(id);
                             continue;
                         }
@@ -167,7 +355,7 @@ namespace UnityMCP.Editor
                                 status = "success",
                                 result = new { message = "pong" }
                             };
-                            tcs.SetResult(JsonConvert.SerializeObject(pingResponse));
+                            tcs.SetResult(SerializeResponse(pingResponse, packed));
                             processedIds.Add(id);
                             continue;
                         }
@@ -181,7 +369,7 @@ namespace UnityMCP.Editor
                                 error = "Invalid JSON format",
                                 receivedText = commandText.Length > 50 ? commandText.Substring(0, 50) + "..." : commandText
                             };
-                            tcs.SetResult(JsonConvert.SerializeObject(invalidJsonResponse));
+                            tcs.SetResult(SerializeResponse(invalidJsonResponse, packed));
                             processedIds.Add(id);
                             continue;
                         }
@@ -196,12 +384,11 @@ namespace UnityMCP.Editor
                                 error = "Command deserialized to null",
                                 details = "The command was valid JSON but could not be deserialized to a Command object"
                             };
-                            tcs.SetResult(JsonConvert.SerializeObject(nullCommandResponse));
+                            tcs.SetResult(SerializeResponse(nullCommandResponse, packed));
                         }
                         else
                         {
-                            string responseJson = ExecuteCommand(command);
-                            tcs.SetResult(responseJson);
+                            tcs.SetResult(ExecuteCommand(command, packed));
                         }
                     }
                     catch (Exception ex)
@@ -215,8 +402,7 @@ namespace UnityMCP.Editor
                             commandType = "Unknown (error during processing)",
                             receivedText = commandText?.Length > 50 ? commandText.Substring(0, 50) + "..." : commandText
                         };
-                        string responseJson = JsonConvert.SerializeObject(response);
-                        tcs.SetResult(responseJson);
+                        tcs.SetResult(SerializeResponse(response, packed));
                     }
 
                     processedIds.Add(id);
@@ -253,7 +439,12 @@ namespace UnityMCP.Editor
             return false;
         }
 
-        private static string ExecuteCommand(Command command)
+        // Serialized on the main thread, since handler results may touch the Unity API while they are enumerated.
+        // Packed connections get a token tree the encoder walks directly instead of JSON text it would parse again
+        private static object SerializeResponse(object response, bool packed) =>
+            packed ? JToken.FromObject(response) : JsonConvert.SerializeObject(response);
+
+        private static object ExecuteCommand(Command command, bool packed = false)
         {
             try
             {
@@ -265,18 +456,19 @@ namespace UnityMCP.Editor
                         error = "Command type cannot be empty",
                         details = "A valid command type is required for processing"
                     };
-                    return JsonConvert.SerializeObject(errorResponse);
+                    return SerializeResponse(errorResponse, packed);
                 }
 
                 // Handle ping command for connection verification
                 if (command.type == "ping")
                 {
                     var pingResponse = new { status = "success", result = new { message = "pong" } };
-                    return JsonConvert.SerializeObject(pingResponse);
+                    return SerializeResponse(pingResponse, packed);
                 }
 
                 object result = command.type switch
                 {
+                    "BATCH" => ExecuteBatch(command.@params, packed),
                     "GET_SCENE_INFO" => SceneCommandHandler.GetSceneInfo(),
                     "OPEN_SCENE" => SceneCommandHandler.OpenScene(command.@params),
                     "SAVE_SCENE" => SceneCommandHandler.SaveScene(),
@@ -291,11 +483,12 @@ namespace UnityMCP.Editor
                     "GET_COMPONENT_PROPERTIES" => ObjectCommandHandler.GetComponentProperties(command.@params),
                     "FIND_OBJECTS_BY_NAME" => ObjectCommandHandler.FindObjectsByName(command.@params),
                     "FIND_OBJECTS_BY_TAG" => ObjectCommandHandler.FindObjectsByTag(command.@params),
-                    "GET_ALL_SCENE_OBJECTS" => ObjectCommandHandler.GetAllSceneObjects(),
+                    "GET_ALL_SCENE_OBJECTS" => ObjectCommandHandler.GetAllSceneObjects(command.@params),
                     "GET_OBJECT_TRANSFORM_INFO" => ObjectCommandHandler.GetObjectTransformInfo(command.@params),
                     "FIND_CAMERA_OBJECTS" => ObjectCommandHandler.FindCameraObjects(),
                     "FIND_OBJECTS_BY_NAME_PATTERN" => ObjectCommandHandler.FindObjectsByNamePattern(command.@params),
                     "GET_HIERARCHY" => ObjectCommandHandler.GetHierarchy(),
+                    "GET_SCENE_CHANGES" => SceneRevisionTracker.GetSceneChanges(command.@params),
                     "SELECT_OBJECT" => ObjectCommandHandler.SelectObject(command.@params),
                     "GET_SELECTED_OBJECT" => ObjectCommandHandler.GetSelectedObject(),
                     "SET_MATERIAL" => MaterialCommandHandler.SetMaterial(command.@params),
@@ -319,6 +512,7 @@ namespace UnityMCP.Editor
                     "VERIFY_TIMELINE_ASSET_EXISTS"=>CreateAnimationCommandHandler.VerifyTimelineAssetExists(command.@params),
                     "CREATE_SEPARATE_TIMELINES"=>CreateAnimationCommandHandler.CreateSeparateTimelines(command.@params),
                     "CREATE_COMBINED_TIMELINE"=>CreateAnimationCommandHandler.CreateCombinedTimeline(command.@params),
+                    "IMPORT_TIMELINE_ASSETS"=>CreateAnimationCommandHandler.ImportTimelineAssets(command.@params),
 
                     //2025.3.24 add ui
                     //"CREATE_UI_BUTTON" => UICommandHandler.CreateUIButton(command.@params),
@@ -333,6 +527,8 @@ namespace UnityMCP.Editor
                     "GET_NODEGRAPH_INFO" => NodeGraphCommandHandler.GetNodeGraphInfo(command.@params),
                     // ImportExcelToNodeGraph
                     "IMPORT_EXCEL_TO_NODEGRAPH" => NodeGraphCommandHandler.ImportExcelToNodeGraph(command.@params),
+                    // ApplyExcelRowsToNodeGraph
+                    "APPLY_EXCEL_ROWS_TO_NODEGRAPH" => NodeGraphCommandHandler.ApplyExcelRowsToNodeGraph(command.@params),
                     //  GetFlowEventNodes
                     "GET_FLOW_EVENT_NODES" => NodeGraphCommandHandler.GetFlowEventNodes(command.@params),
                     // GetFlowEventNodeNames
@@ -341,6 +537,8 @@ namespace UnityMCP.Editor
                     "GET_FLOW_EVENT_NODE_BY_NAME" => NodeGraphCommandHandler.GetFlowEventNodeByName(command.@params),
                     // UpdateFlowEventNodeTimelineAssets
                     "UPDATE_FLOW_EVENT_NODE_TIMELINE_ASSETS" => NodeGraphCommandHandler.UpdateFlowEventNodeTimelineAssets(command.@params),
+                    // BulkUpdateFlowEventNodes
+                    "BULK_UPDATE_FLOW_EVENT_NODES" => NodeGraphCommandHandler.BulkUpdateFlowEventNodes(command.@params),
                     // SaveNodeGraphChanges
                     "SAVE_NODEGRAPH_CHANGES" => NodeGraphCommandHandler.SaveNodeGraphChanges(command.@params),
                     
@@ -373,7 +571,7 @@ namespace UnityMCP.Editor
                 };
 
                 var response = new { status = "success", result };
-                return JsonConvert.SerializeObject(response);
+                return SerializeResponse(response, packed);
             }
             catch (Exception ex)
             {
@@ -386,8 +584,33 @@ namespace UnityMCP.Editor
                     stackTrace = ex.StackTrace,
                     paramsSummary = command.@params != null ? GetParamsSummary(command.@params) : "No parameters"
                 };
-                return JsonConvert.SerializeObject(response);
+                return SerializeResponse(response, packed);
+            }
+        }
+
+        // Executes {"commands":[{type, params}, ...]} in order; every item gets its own status so one failure does not abort the rest
+        private static object ExecuteBatch(JObject @params, bool packed)
+        {
+            var commands = @params?["commands"] as JArray ?? throw new Exception("Parameter 'commands' is required.");
+            var results = new List<object>(commands.Count);
+            // JSON results are spliced in verbatim; packed results are already tokens
+            object Item(object response) => packed ? response : new JRaw((string)response);
+            foreach (JToken item in commands)
+            {
+                var subCommand = item.Type == JTokenType.Object ? item.ToObject<Command>() : null;
+                if (subCommand == null || subCommand.type == "BATCH")
+                {
+                    results.Add(Item(SerializeResponse(new
+                    {
+                        status = "error",
+                        error = "Invalid batch item",
+                        details = "Each batch item must be a {type, params} object and batches cannot be nested"
+                    }, packed)));
+                    continue;
+                }
+                results.Add(Item(ExecuteCommand(subCommand, packed)));
             }
+            return new { results, count = results.Count };
         }
 
         // Helper method to get a summary of parameters for error reporting
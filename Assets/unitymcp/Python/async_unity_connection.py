@@ -0,0 +1,468 @@
+"""
+Asyncio client for the Unity MCP bridge.
+
+AsyncUnityConnection speaks the same wire protocol as UnityConnection (framing
+handshake, multiplexing and BATCH) on asyncio streams, so a slow Unity command only
+suspends the tool that issued it instead of blocking the whole MCP server.
+"""
+
+import asyncio
+import json
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List
+from config import config
+from contextvars import ContextVar
+from scene_cache import SceneCache, scene_cache
+from scene_mirror import SceneMirror, scene_mirror
+import packed_encoding
+from command_metrics import command_metrics, CommandSample
+from unity_connection import logger, FRAME_HEADER, FRAME_PROTOCOL_VERSION, MAX_FRAME_SIZE
+
+@dataclass
+class AsyncUnityConnection:
+    """Manages an asyncio stream connection to the Unity Editor."""
+    host: str = config.unity_host
+    port: int = config.unity_port
+    reader: asyncio.StreamReader = None
+    writer: asyncio.StreamWriter = None
+    framed: bool = False  # True once the bridge has accepted length-prefixed framing
+    multiplexed: bool = False  # True when commands carry request IDs and may be pipelined
+    supports_batch: bool = False  # True when the bridge understands the BATCH command
+    encoding: str = "json"  # Frame body encoding agreed in the handshake, "json" or "packed"
+    last_heartbeat: float = 0.0  # time.monotonic() of the last successful heartbeat
+    connections: int = 0  # Successful connects, more than one means the stream was re-established
+    cache: SceneCache = field(default_factory=lambda: scene_cache, repr=False)  # Editors in a pool get their own
+    mirror: SceneMirror = field(default_factory=lambda: scene_mirror, repr=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)  # One request at a time (non-multiplexed)
+    _pending: Dict[str, asyncio.Future] = field(default_factory=dict, repr=False)  # In-flight requests by ID
+    _request_ids: Any = field(default_factory=lambda: itertools.count(1), repr=False)
+    _tasks: List[asyncio.Task] = field(default_factory=list, repr=False)  # Reader and heartbeat tasks
+
+    async def connect(self) -> bool:
+        """Establish a connection to the Unity Editor."""
+        if self.writer:
+            return True
+        try:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.framed = False
+            self.multiplexed = False
+            self.supports_batch = False
+            self.encoding = "json"
+            logger.info(f"Connected to Unity at {self.host}:{self.port}")
+            if config.enable_framing:
+                await self.negotiate_framing()
+            self._start_background_tasks()
+            self.connections += 1
+            if self.connections > 1:
+                command_metrics.record_reconnect()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to connect to Unity: {str(e)}")
+            self._close_streams()
+            return False
+
+    def is_alive(self) -> bool:
+        """Whether the stream is still considered healthy by the heartbeat."""
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def negotiate_framing(self) -> bool:
+        """Ask the bridge to switch this connection to length-prefixed framing.
+
+        Older bridges answer the handshake with an "Unknown command type" error, in
+        which case the connection keeps using the legacy protocol.
+        """
+        handshake = {
+            "type": "HANDSHAKE",
+            "params": {
+                "protocol": "framed",
+                "version": FRAME_PROTOCOL_VERSION,
+                "header_bytes": FRAME_HEADER.size,
+                "multiplex": config.enable_multiplexing,
+                "encoding": config.wire_encoding
+            }
+        }
+        try:
+            await self.send_message(json.dumps(handshake).encode('utf-8'))
+            response = json.loads(await self.receive_full_response())
+        except Exception as e:
+            logger.warning(f"Framing handshake failed, using legacy protocol: {str(e)}")
+            self._close_streams()
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            return False
+
+        result = response.get("result") or {}
+        if response.get("status") == "success" and result.get("protocol") == "framed":
+            self.framed = True
+            self.multiplexed = bool(result.get("multiplex")) and config.enable_multiplexing
+            self.supports_batch = bool(result.get("batch"))
+            if result.get("encoding") == packed_encoding.PACKED_ENCODING:
+                self.encoding = packed_encoding.PACKED_ENCODING
+            logger.info(f"Using framed protocol v{result.get('version', FRAME_PROTOCOL_VERSION)}"
+                        f"{' with multiplexing' if self.multiplexed else ''}"
+                        f"{' and packed encoding' if self.encoding != 'json' else ''}")
+        else:
+            logger.info("Unity bridge does not support framing, using legacy protocol")
+        return self.framed
+
+    async def disconnect(self):
+        """Close the connection to the Unity Editor."""
+        current = asyncio.current_task()
+        for task in self._tasks:
+            if task is not current:
+                task.cancel()
+        self._tasks = []
+        self._close_streams()
+        self._fail_pending(ConnectionError("Connection to Unity closed"))
+
+    def _close_streams(self):
+        if self.writer:
+            try:
+                self.writer.close()
+            except Exception as e:
+                logger.error(f"Error disconnecting from Unity: {str(e)}")
+        self.reader = None
+        self.writer = None
+
+    def _start_background_tasks(self):
+        """Start the response reader (multiplexed mode) and the heartbeat for the current stream."""
+        self.last_heartbeat = time.monotonic()
+        writer = self.writer
+        if self.multiplexed:
+            self._tasks.append(asyncio.create_task(self._reader_loop(writer)))
+        if config.heartbeat_interval > 0:
+            self._tasks.append(asyncio.create_task(self._heartbeat_loop(writer)))
+
+    async def _reader_loop(self, writer):
+        """Read tagged frames and resolve the matching pending requests."""
+        while self.writer is writer:
+            try:
+                data = await self.receive_frame()
+                response = self.decode(data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.writer is writer:
+                    logger.error(f"Unity connection reader stopped: {str(e)}")
+                    await self.disconnect()
+                return
+            future = self._pending.pop(str(response.pop("id", None)), None)
+            if future is None:
+                logger.debug("Dropping response for unknown or expired request")
+            elif not future.done():
+                future.set_result((response, len(data)))
+
+    async def _heartbeat_loop(self, writer):
+        """Ping the bridge periodically so that callers never need a per-call ping."""
+        while self.writer is writer:
+            await asyncio.sleep(config.heartbeat_interval)
+            try:
+                if self.multiplexed:
+                    response = await self._request({"type": "ping", "params": {}}, config.heartbeat_timeout)
+                elif not self._lock.locked():
+                    async with self._lock:
+                        await self.send_message(b"ping")
+                        response = self.decode(await self.receive_message(config.heartbeat_timeout))
+                else:
+                    continue  # A command is in flight, so the stream is being exercised anyway
+                if response.get("status") != "success":
+                    raise ConnectionError("Heartbeat response was not successful")
+                self.last_heartbeat = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.writer is writer:
+                    logger.warning(f"Unity heartbeat failed: {str(e)}")
+                    await self.disconnect()
+                return
+
+    def _fail_pending(self, error: Exception):
+        """Fail every in-flight request with `error`."""
+        while self._pending:
+            _, future = self._pending.popitem()
+            if not future.done():
+                future.set_exception(error)
+
+    async def _request(self, command: Dict[str, Any], timeout: float, sample: CommandSample = None) -> Dict[str, Any]:
+        """Send a tagged command and wait for the response with the same ID."""
+        request_id = str(next(self._request_ids))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            payload = self.encode({"id": request_id, **command})
+            await self.send_message(payload)
+            response, response_bytes = await asyncio.wait_for(future, timeout)
+            if sample is not None:
+                sample.request_bytes, sample.response_bytes = len(payload), response_bytes
+            return response
+        except asyncio.TimeoutError:
+            raise Exception("Timeout receiving Unity response")
+        finally:
+            self._pending.pop(request_id, None)
+
+    def encode(self, command: Dict[str, Any]) -> bytes:
+        """Serialize a command with the negotiated frame encoding."""
+        if self.encoding == packed_encoding.PACKED_ENCODING:
+            return packed_encoding.encode(command)
+        return json.dumps(command).encode('utf-8')
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        """Parse a response with the negotiated frame encoding."""
+        if self.encoding == packed_encoding.PACKED_ENCODING:
+            return packed_encoding.decode(data)
+        return json.loads(data)
+
+    async def send_message(self, payload: bytes):
+        """Write one message, prefixed with its length when framing is active."""
+        if self.framed:
+            # A single write keeps header and body together when commands are pipelined
+            self.writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+        else:
+            self.writer.write(payload)
+        await self.writer.drain()
+
+    async def receive_message(self, timeout: float = None) -> bytes:
+        """Read one complete message using the negotiated wire mode."""
+        if self.framed:
+            try:
+                return await asyncio.wait_for(self.receive_frame(), timeout or config.connection_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Socket timeout during receive")
+                raise Exception("Timeout receiving Unity response")
+        return await self.receive_full_response(timeout)
+
+    async def receive_frame(self) -> bytes:
+        """Receive one length-prefixed frame."""
+        try:
+            (length,) = FRAME_HEADER.unpack(await self.reader.readexactly(FRAME_HEADER.size))
+            if length > MAX_FRAME_SIZE:
+                raise Exception(f"Frame of {length} bytes exceeds limit of {MAX_FRAME_SIZE} bytes")
+            data = await self.reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise Exception("Connection closed before receiving data")
+        logger.info(f"Received complete response ({length} bytes)")
+        return data
+
+    async def receive_full_response(self, timeout: float = None) -> bytes:
+        """Receive a legacy (unframed) response by reading until the buffer holds valid JSON."""
+        data = bytearray()
+
+        async def read_until_complete() -> bytes:
+            while True:
+                chunk = await self.reader.read(config.buffer_size)
+                if not chunk:
+                    if not data:
+                        raise Exception("Connection closed before receiving data")
+                    return bytes(data)
+                data.extend(chunk)
+                try:
+                    json.loads(data)
+                    logger.info(f"Received complete response ({len(data)} bytes)")
+                    return bytes(data)
+                except ValueError:
+                    # We haven't received a complete valid JSON response yet
+                    continue
+
+        try:
+            return await asyncio.wait_for(read_until_complete(), timeout or config.connection_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Socket timeout during receive")
+            raise Exception("Timeout receiving Unity response")
+
+    async def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Send a command to Unity and return its response."""
+        if self.mirror.enabled and self.cache.may_answer(command_type, params) and self.mirror.needs_sync():
+            await self._sync_mirror()
+        cached = self.cache.lookup(command_type, params)
+        if cached is None and self.mirror.handles(command_type, params):
+            cached = await self._answer_from_mirror(command_type, params)
+        if cached is not None:
+            command_metrics.record_cached(command_type)
+            return cached
+
+        if not self.writer and not await self.connect():
+            raise ConnectionError("Not connected to Unity")
+
+        self.mirror.note_command(command_type, params)
+        revision = self.cache.before_command(command_type, params)
+        if self.multiplexed:
+            with command_metrics.measure(command_type) as sample:
+                result = await self._send_multiplexed(command_type, params, sample)
+        else:
+            async with self._lock:
+                with command_metrics.measure(command_type) as sample:
+                    result = await self._send_sequential(command_type, params, sample)
+        self.cache.after_command(command_type, params, result, revision)
+        self.mirror.note_command(command_type, params)
+        return result
+
+    async def _answer_from_mirror(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Answer a hierarchy query locally, first fetching the scene changes when the mirror is stale."""
+        if self.mirror.needs_sync() and not await self._sync_mirror():
+            return None
+        return self.mirror.answer(command_type, params)
+
+    async def _sync_mirror(self) -> bool:
+        """Fetch the scene changes into the mirror; Editor edits they report also invalidate the scene cache."""
+        request, token = self.mirror.sync_request()
+        try:
+            changes = await self.send_command("GET_SCENE_CHANGES", request)
+        except Exception as e:
+            if "Unknown command type" in str(e):
+                self.mirror.disable("bridge does not support GET_SCENE_CHANGES")
+            return False
+        self.mirror.apply(changes, token)
+        self.cache.note_scene_changes(changes)
+        return True
+
+    async def send_batch(self, commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send several commands to Unity in one round trip.
+
+        Same contract as UnityConnection.send_batch: one {"status": ...} response per
+        command, with sequential sends on bridges that lack BATCH.
+        """
+        if (self.mirror.enabled and self.mirror.needs_sync()
+                and any(self.cache.may_answer(command.get("type"), command.get("params")) for command in commands)):
+            await self._sync_mirror()
+        responses, missing = self.cache.lookup_batch(commands)
+        if not missing:
+            command_metrics.record_batch(commands, missing, False)
+            return responses
+        if not self.writer and not await self.connect():
+            raise ConnectionError("Not connected to Unity")
+
+        command_metrics.record_batch(commands, missing, self.supports_batch)
+        pending = [commands[index] for index in missing]
+        if self.supports_batch:
+            revision = self.cache.before_batch(pending)
+            fetched = (await self.send_command("BATCH", {"commands": pending})).get("results", [])
+            self.cache.after_batch(pending, fetched, revision)
+        else:
+            fetched = []
+            for command in pending:
+                try:
+                    result = await self.send_command(command["type"], command.get("params"))
+                    fetched.append({"status": "success", "result": result})
+                except Exception as e:
+                    fetched.append({"status": "error", "error": str(e)})
+
+        for index, response in zip(missing, fetched):
+            responses[index] = response
+        return responses
+
+    async def _send_multiplexed(self, command_type: str, params: Dict[str, Any] = None,
+                                sample: CommandSample = None) -> Dict[str, Any]:
+        """Send a tagged command; other tasks may have commands in flight at the same time."""
+        if command_type != "ping":
+            logger.info(f"Sending command: {command_type} with params: {params}")
+        try:
+            response = await self._request({"type": command_type, "params": params or {}}, config.connection_timeout, sample)
+        except Exception as e:
+            logger.error(f"Communication error with Unity: {str(e)}")
+            if command_type == "ping":
+                raise ConnectionError(f"Connection verification failed: {str(e)}")
+            raise Exception(f"Failed to communicate with Unity: {str(e)}")
+
+        if response.get("status") == "error":
+            error_message = response.get("error") or response.get("message", "Unknown Unity error")
+            logger.error(f"Unity error: {error_message}")
+            raise Exception(f"Failed to communicate with Unity: {error_message}")
+
+        self.last_heartbeat = time.monotonic()
+        return response.get("result", {})
+
+    async def _send_sequential(self, command_type: str, params: Dict[str, Any] = None,
+                               sample: CommandSample = None) -> Dict[str, Any]:
+        """Send one command and wait for its reply (legacy and non-multiplexed framed modes)."""
+        if command_type == "ping":
+            try:
+                logger.debug("Sending ping to verify connection")
+                await self.send_message(b"ping")
+                response_data = await self.receive_message()
+                if sample is not None:
+                    sample.request_bytes, sample.response_bytes = 4, len(response_data)
+                response = self.decode(response_data)
+                if response.get("status") != "success":
+                    raise ConnectionError("Connection verification failed")
+                return {"message": "pong"}
+            except Exception as e:
+                logger.error(f"Ping error: {str(e)}")
+                await self.disconnect()
+                raise ConnectionError(f"Connection verification failed: {str(e)}")
+
+        command = {"type": command_type, "params": params or {}}
+        try:
+            logger.info(f"Sending command: {command_type} with params: {params}")
+            payload = self.encode(command)
+            await self.send_message(payload)
+            response_data = await self.receive_message()
+            if sample is not None:
+                sample.request_bytes, sample.response_bytes = len(payload), len(response_data)
+            response = self.decode(response_data)
+
+            if response.get("status") == "error":
+                error_message = response.get("error") or response.get("message", "Unknown Unity error")
+                logger.error(f"Unity error: {error_message}")
+                raise Exception(error_message)
+
+            return response.get("result", {})
+        except Exception as e:
+            logger.error(f"Communication error with Unity: {str(e)}")
+            await self.disconnect()
+            raise Exception(f"Failed to communicate with Unity: {str(e)}")
+
+# Connection of the pooled editor the current job is pinned to, see editor_pool
+pinned_connection: ContextVar[AsyncUnityConnection] = ContextVar("pinned_connection", default=None)
+
+# Global async Unity connection, bound to the event loop that created it
+_async_unity_connection: AsyncUnityConnection = None
+_async_unity_connection_loop: asyncio.AbstractEventLoop = None
+_async_unity_connection_lock: asyncio.Lock = None
+
+async def get_async_unity_connection() -> AsyncUnityConnection:
+    """Retrieve or establish the persistent async Unity connection for the running loop.
+
+    Inside a job scheduled by editor_pool this is the connection of the editor the
+    job is pinned to, so tools route their commands there unchanged.
+    """
+    global _async_unity_connection, _async_unity_connection_loop, _async_unity_connection_lock
+    pinned = pinned_connection.get()
+    if pinned is not None:
+        return pinned
+    loop = asyncio.get_running_loop()
+    if _async_unity_connection_loop is not loop:
+        # Streams cannot be shared across event loops, so start over on a new loop
+        _async_unity_connection = None
+        _async_unity_connection_loop = loop
+        _async_unity_connection_lock = asyncio.Lock()
+
+    async with _async_unity_connection_lock:
+        if _async_unity_connection is not None:
+            if _async_unity_connection.is_alive():
+                logger.debug("Reusing existing Unity connection")
+                return _async_unity_connection
+            logger.warning("Existing connection lost heartbeat, reconnecting")
+            command_metrics.record_reconnect()
+            await _async_unity_connection.disconnect()
+            _async_unity_connection = None
+
+        logger.info("Creating new Unity connection")
+        connection = AsyncUnityConnection(host=config.unity_host, port=config.unity_port)
+        if not await connection.connect():
+            raise ConnectionError("Could not connect to Unity. Ensure the Unity Editor and MCP Bridge are running.")
+
+        try:
+            await connection.send_command("ping")
+            logger.info("Successfully established new Unity connection")
+            _async_unity_connection = connection
+            return _async_unity_connection
+        except Exception as e:
+            logger.error(f"Could not verify new connection: {str(e)}")
+            await connection.disconnect()
+            raise ConnectionError(f"Could not establish valid Unity connection: {str(e)}")
+
+async def send_unity_command(command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Shorthand for `(await get_async_unity_connection()).send_command(...)`."""
+    unity = await get_async_unity_connection()
+    return await unity.send_command(command_type, params)
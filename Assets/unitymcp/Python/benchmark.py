@@ -0,0 +1,284 @@
+"""
+Throughput benchmark for the Unity bridge clients against FakeUnityBridge.
+
+Each mode drives the same workload through one client configuration and reports
+commands/sec, MB/s on the wire and p50/p95/p99 latency:
+
+    legacy            UnityConnection, unframed JSON parsed by sniffing
+    framed            UnityConnection, length-prefixed frames, one request at a time
+    multiplexed       UnityConnection, tagged frames from `concurrency` threads
+    async             AsyncUnityConnection, awaited one at a time
+    async-concurrent  AsyncUnityConnection, `concurrency` commands in flight
+    batch             AsyncUnityConnection.send_batch with `batch_size` commands per BATCH
+
+Every framed mode runs once per wire encoding ("json" and the negotiated
+"packed" encoding; legacy connections are always JSON). The scene_objects
+workload returns every object with its transform and bounds, the numeric-heavy
+case the packed encoding targets.
+
+Results can be saved and later compared, failing with exit code 1 when a mode
+loses more than `tolerance` of its throughput:
+
+    python benchmark.py --save baseline.json
+    python benchmark.py --baseline baseline.json
+    python benchmark.py --modes framed --workloads scene_objects --encodings json packed
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Tuple, Iterator
+from config import config
+from scene_cache import scene_cache
+from scene_mirror import scene_mirror
+from command_metrics import command_metrics, percentile
+from unity_connection import UnityConnection
+from async_unity_connection import AsyncUnityConnection
+from fake_bridge import FakeUnityBridge, FakeScene
+from packed_encoding import PACKED_ENCODING
+
+logger = logging.getLogger("UnityMCP")
+
+MODES = ["legacy", "framed", "multiplexed", "async", "async-concurrent", "batch"]
+WORKLOADS = ["ping", "object_info", "hierarchy", "scene_objects"]
+ENCODINGS = ["json", PACKED_ENCODING]
+
+@dataclass
+class BenchmarkResult:
+    mode: str
+    workload: str
+    encoding: str
+    commands: int
+    errors: int
+    seconds: float
+    commands_per_sec: float
+    mb_per_sec: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+@contextmanager
+def override_config(**values) -> Iterator[None]:
+    """Temporarily change global config fields."""
+    previous = {key: getattr(config, key) for key in values}
+    for key, value in values.items():
+        setattr(config, key, value)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            setattr(config, key, value)
+
+def workload_commands(workload: str, count: int, scene: FakeScene) -> List[Tuple[str, Dict[str, Any]]]:
+    """The (command_type, params) pairs sent by one run."""
+    if workload == "ping":
+        return [("ping", None)] * count
+    if workload == "object_info":
+        names = scene.names
+        return [("GET_OBJECT_INFO", {"name": names[index % len(names)]}) for index in range(count)]
+    if workload == "hierarchy":
+        return [("GET_HIERARCHY", {})] * count
+    if workload == "scene_objects":
+        return [("GET_ALL_SCENE_OBJECTS", {"include_transforms": True})] * count
+    raise ValueError(f"Unknown workload: {workload}")
+
+def start_bridge(bridge: FakeUnityBridge) -> Tuple[asyncio.AbstractEventLoop, threading.Thread]:
+    """Serve `bridge` from its own event loop thread so that sync and async clients can share it."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="FakeUnityBridge", daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(bridge.start(), loop).result()
+    return loop, thread
+
+def stop_bridge(bridge: FakeUnityBridge, loop: asyncio.AbstractEventLoop, thread: threading.Thread):
+    asyncio.run_coroutine_threadsafe(bridge.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+def _timed(call) -> Tuple[float, bool]:
+    started = time.perf_counter()
+    try:
+        call()
+        return time.perf_counter() - started, True
+    except Exception:
+        return time.perf_counter() - started, False
+
+async def _timed_async(call) -> Tuple[float, bool]:
+    started = time.perf_counter()
+    try:
+        await call()
+        return time.perf_counter() - started, True
+    except Exception:
+        return time.perf_counter() - started, False
+
+def run_sync(mode: str, port: int, commands: List[Tuple[str, Dict[str, Any]]], concurrency: int) -> List[Tuple[float, bool]]:
+    framing, multiplexing = {"legacy": (False, False), "framed": (True, False), "multiplexed": (True, True)}[mode]
+    with override_config(enable_framing=framing, enable_multiplexing=multiplexing):
+        connection = UnityConnection(host="localhost", port=port)
+        if not connection.connect():
+            raise ConnectionError(f"Could not connect to the fake bridge on port {port}")
+        try:
+            connection.send_command("ping")
+            command_metrics.reset()
+            send = lambda command: _timed(lambda: connection.send_command(*command))
+            if mode == "multiplexed":
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    return list(pool.map(send, commands))
+            return [send(command) for command in commands]
+        finally:
+            connection.disconnect()
+
+async def run_async(mode: str, port: int, commands: List[Tuple[str, Dict[str, Any]]],
+                    concurrency: int, batch_size: int) -> List[Tuple[float, bool]]:
+    connection = AsyncUnityConnection(host="localhost", port=port)
+    if not await connection.connect():
+        raise ConnectionError(f"Could not connect to the fake bridge on port {port}")
+    try:
+        await connection.send_command("ping")
+        command_metrics.reset()
+        if mode == "async":
+            return [await _timed_async(lambda: connection.send_command(*command)) for command in commands]
+        if mode == "async-concurrent":
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def send(command):
+                async with semaphore:
+                    return await _timed_async(lambda: connection.send_command(*command))
+            return await asyncio.gather(*(send(command) for command in commands))
+
+        samples = []
+        for start in range(0, len(commands), batch_size):
+            chunk = [{"type": command_type, "params": params or {}} for command_type, params in commands[start:start + batch_size]]
+            started = time.perf_counter()
+            try:
+                responses = await connection.send_batch(chunk)
+                elapsed = time.perf_counter() - started
+                samples.extend((elapsed, response.get("status") == "success") for response in responses)
+            except Exception:
+                samples.extend((time.perf_counter() - started, False) for _ in chunk)
+        return samples
+    finally:
+        await connection.disconnect()
+
+def run_mode(mode: str, workload: str, port: int, scene: FakeScene, count: int,
+             concurrency: int = 8, batch_size: int = 50, encoding: str = "json") -> BenchmarkResult:
+    """Run one mode/workload pair with the given wire encoding and summarize it."""
+    commands = workload_commands(workload, count, scene)
+    started = time.perf_counter()
+    with override_config(wire_encoding=encoding):
+        if mode in ("legacy", "framed", "multiplexed"):
+            samples = run_sync(mode, port, commands, concurrency)
+        else:
+            samples = asyncio.run(run_async(mode, port, commands, concurrency, batch_size))
+    seconds = time.perf_counter() - started
+
+    totals = command_metrics.snapshot()["commands"].values()
+    wire_bytes = sum(stats["request_bytes"] + stats["response_bytes"] for stats in totals)
+    latencies = sorted(sample[0] for sample in samples)
+    return BenchmarkResult(
+        mode=mode,
+        workload=workload,
+        encoding=encoding,
+        commands=len(samples),
+        errors=sum(1 for sample in samples if not sample[1]),
+        seconds=round(seconds, 4),
+        commands_per_sec=round(len(samples) / seconds, 1) if seconds else 0.0,
+        mb_per_sec=round(wire_bytes / seconds / 1e6, 3) if seconds else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000.0, 3),
+        p95_ms=round(percentile(latencies, 95) * 1000.0, 3),
+        p99_ms=round(percentile(latencies, 99) * 1000.0, 3)
+    )
+
+def run_benchmarks(modes: List[str], workloads: List[str], objects: int = 1000, count: int = 2000,
+                   concurrency: int = 8, batch_size: int = 50, latency: float = 0.0,
+                   padding: int = 0, encodings: List[str] = None) -> List[BenchmarkResult]:
+    """Start a fake bridge and run every mode against every workload and encoding."""
+    scene = FakeScene(object_count=objects)
+    bridge = FakeUnityBridge(scene=scene, latency=latency, response_padding=padding)
+    loop, thread = start_bridge(bridge)
+    results = []
+    # Cached, mirrored or heartbeat traffic would hide the wire cost being measured
+    cache_enabled, scene_cache.enabled = scene_cache.enabled, False
+    mirror_enabled, scene_mirror.enabled = scene_mirror.enabled, False
+    try:
+        with override_config(heartbeat_interval=0.0):
+            for workload in workloads:
+                workload_count = max(count // 20, 10) if workload in ("hierarchy", "scene_objects") else count
+                for mode in modes:
+                    for encoding in encodings or ["json"]:
+                        # Only framed connections negotiate an encoding
+                        if mode == "legacy" and encoding != "json":
+                            continue
+                        results.append(run_mode(mode, workload, bridge.port, scene, workload_count,
+                                                concurrency, batch_size, encoding))
+    finally:
+        scene_cache.enabled = cache_enabled
+        scene_mirror.enabled = mirror_enabled
+        stop_bridge(bridge, loop, thread)
+    return results
+
+def compare(results: List[BenchmarkResult], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Describe every mode/workload/encoding whose throughput dropped by more than `tolerance`."""
+    previous = {(entry["mode"], entry["workload"], entry.get("encoding", "json")): entry for entry in baseline}
+    regressions = []
+    for result in results:
+        entry = previous.get((result.mode, result.workload, result.encoding))
+        if entry and result.commands_per_sec < entry["commands_per_sec"] * (1.0 - tolerance):
+            regressions.append(f"{result.mode}/{result.workload}/{result.encoding}: {result.commands_per_sec} commands/s, "
+                               f"baseline {entry['commands_per_sec']}")
+    return regressions
+
+def format_table(results: List[BenchmarkResult]) -> str:
+    header = f"{'mode':<17}{'workload':<15}{'encoding':<10}{'cmds':>7}{'err':>5}{'cmd/s':>11}{'MB/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    rows = [header, "-" * len(header)]
+    for r in results:
+        rows.append(f"{r.mode:<17}{r.workload:<15}{r.encoding:<10}{r.commands:>7}{r.errors:>5}{r.commands_per_sec:>11.1f}"
+                    f"{r.mb_per_sec:>9.2f}{r.p50_ms:>9.3f}{r.p95_ms:>9.3f}{r.p99_ms:>9.3f}")
+    return "\n".join(rows)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Unity bridge clients against a fake bridge")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument("--encodings", nargs="+", choices=ENCODINGS, default=["json"],
+                        help="Wire encodings to run every framed mode with")
+    parser.add_argument("--objects", type=int, default=1000, help="Objects in the synthetic scene")
+    parser.add_argument("--count", type=int, default=2000,
+                        help="Commands per run (hierarchy and scene_objects runs send 1/20 as many)")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight commands for the concurrent modes")
+    parser.add_argument("--batch-size", type=int, default=50, help="Commands per BATCH in batch mode")
+    parser.add_argument("--latency", type=float, default=0.0, help="Emulated Editor seconds per command")
+    parser.add_argument("--padding", type=int, default=0, help="Bytes added to every result")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput loss against the baseline")
+    parser.add_argument("--verbose", action="store_true", help="Keep per-command connection logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+    results = run_benchmarks(args.modes, args.workloads, args.objects, args.count, args.concurrency,
+                             args.batch_size, args.latency, args.padding, args.encodings)
+    print(format_table(results))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
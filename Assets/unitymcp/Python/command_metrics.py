@@ -0,0 +1,207 @@
+"""
+Per-command instrumentation for the Unity MCP bridge connections.
+
+Every command sent by UnityConnection or AsyncUnityConnection is timed and its
+request and response payload sizes are recorded per command type, together with
+errors, timeouts, scene cache hits and reconnects. The snapshot is exposed as the
+unity://metrics resource and the get_command_metrics tool; when
+config.metrics_trace_path is set, every command is also appended to that file as
+one JSON line so that a whole course build can be analysed afterwards.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Iterator, Optional, Deque
+from config import config
+
+logger = logging.getLogger("UnityMCP")
+
+PERCENTILES = (50, 95, 99)
+
+def is_timeout(error: BaseException) -> bool:
+    """Whether `error` is one of the connection's receive timeouts."""
+    return isinstance(error, TimeoutError) or "Timeout" in str(error)
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(-(-percent * len(sorted_values) // 100)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+@dataclass
+class CommandSample:
+    """Measurements of one command, filled in by the connection while it is in flight."""
+    command_type: str
+    started: float = field(default_factory=time.perf_counter)
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+@dataclass
+class CommandStats:
+    """Running totals for one command type."""
+    count: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    cached: int = 0  # Answered by the scene cache without a round trip
+    batched: int = 0  # Sent inside a BATCH command, so their time is counted under BATCH
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=config.metrics_window))
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        result = {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cached": self.cached,
+            "batched": self.batched,
+            "total_ms": round(self.total_seconds * 1000.0, 3),
+            "mean_ms": round(self.total_seconds * 1000.0 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_seconds * 1000.0, 3),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes
+        }
+        for percent in PERCENTILES:
+            result[f"p{percent}_ms"] = round(percentile(latencies, percent) * 1000.0, 3)
+        return result
+
+@dataclass
+class CommandMetrics:
+    """Thread-safe per-command counters shared by the sync and async connections."""
+    enabled: bool = config.enable_metrics
+    trace_path: str = config.metrics_trace_path  # JSONL trace file, empty disables tracing
+    reconnects: int = 0
+    started: float = field(default_factory=time.time)
+    _commands: Dict[str, CommandStats] = field(default_factory=dict, repr=False)
+    _trace_file: Any = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @contextmanager
+    def measure(self, command_type: str) -> Iterator[CommandSample]:
+        """Time the enclosed round trip; the connection fills in the payload sizes on the sample."""
+        sample = CommandSample(command_type)
+        try:
+            yield sample
+        except BaseException as e:
+            self.record(sample, e)
+            raise
+        self.record(sample)
+
+    def record(self, sample: CommandSample, error: Optional[BaseException] = None):
+        """Add a finished command to the totals and the trace."""
+        if not self.enabled:
+            return
+        seconds = time.perf_counter() - sample.started
+        timed_out = error is not None and is_timeout(error)
+        with self._lock:
+            stats = self._stats(sample.command_type)
+            stats.count += 1
+            stats.errors += error is not None
+            stats.timeouts += timed_out
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.request_bytes += sample.request_bytes
+            stats.response_bytes += sample.response_bytes
+            stats.latencies.append(seconds)
+            entry = {
+                "time": round(time.time(), 6),
+                "command": sample.command_type,
+                "ms": round(seconds * 1000.0, 3),
+                "request_bytes": sample.request_bytes,
+                "response_bytes": sample.response_bytes,
+                "status": "timeout" if timed_out else "error" if error is not None else "success"
+            }
+            if error is not None:
+                entry["error"] = str(error)
+            self._trace(entry)
+
+    def record_batch(self, commands: List[Dict[str, Any]], missing: List[int], batched: bool):
+        """Count the cache hits of a send_batch call and the commands that went out inside BATCH."""
+        if not self.enabled:
+            return
+        missing_set = set(missing)
+        with self._lock:
+            for index, command in enumerate(commands):
+                stats = self._stats(command.get("type"))
+                if index not in missing_set:
+                    stats.cached += 1
+                elif batched:
+                    stats.batched += 1
+
+    def record_cached(self, command_type: str):
+        """Count a command answered by the scene cache."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stats(command_type).cached += 1
+
+    def record_reconnect(self):
+        """Count a re-established Unity connection."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.reconnects += 1
+            self._trace({"time": round(time.time(), 6), "event": "reconnect"})
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-command summaries, slowest total time first."""
+        with self._lock:
+            commands = {name: stats.summary() for name, stats in self._commands.items()}
+            reconnects = self.reconnects
+        ordered = dict(sorted(commands.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+        return {
+            "since": self.started,
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "total_commands": sum(stats["count"] for stats in commands.values()),
+            "total_ms": round(sum(stats["total_ms"] for stats in commands.values()), 3),
+            "timeouts": sum(stats["timeouts"] for stats in commands.values()),
+            "reconnects": reconnects,
+            "trace_path": self.trace_path or None,
+            "commands": ordered
+        }
+
+    def reset(self):
+        """Clear all counters; the trace file keeps its history."""
+        with self._lock:
+            self._commands.clear()
+            self.reconnects = 0
+            self.started = time.time()
+
+    def set_trace_path(self, path: str):
+        """Start appending to `path`, or stop tracing when it is empty."""
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+            self.trace_path = path
+
+    def _stats(self, command_type: str) -> CommandStats:
+        stats = self._commands.get(command_type)
+        if stats is None:
+            stats = self._commands[command_type] = CommandStats()
+        return stats
+
+    def _trace(self, entry: Dict[str, Any]):
+        """Append one JSON line to the trace file; called with the lock held."""
+        if not self.trace_path:
+            return
+        try:
+            if self._trace_file is None:
+                self._trace_file = open(self.trace_path, "a", encoding="utf-8", buffering=1)
+            self._trace_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Disabling command trace {self.trace_path}: {str(e)}")
+            self.trace_path = ""
+            self._trace_file = None
+
+# Global command metrics shared by the sync and async connections
+command_metrics = CommandMetrics()
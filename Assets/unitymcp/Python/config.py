@@ -3,7 +3,8 @@ Configuration settings for the Unity MCP Server.
 This file contains all configurable parameters for the server.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 
 @dataclass
 class ServerConfig:
@@ -13,11 +14,44 @@ class ServerConfig:
     unity_host: str = "localhost"
     unity_port: int = 6400
     mcp_port: int = 6500
+    unity_endpoints: List[str] = field(default_factory=list)  # Extra "host:port" editors that sharded jobs may use
     
     # Connection settings
     connection_timeout: float = 300.0  # 5 minutes timeout
     buffer_size: int = 1024 * 1024  # 1MB buffer for localhost
-    
+    enable_framing: bool = True  # Negotiate length-prefixed framing, falls back to legacy parsing
+    enable_multiplexing: bool = True  # Allow several in-flight commands per socket when framing is active
+    wire_encoding: str = "json"  # "packed" asks the bridge for compact frames with float32 blocks, JSON stays the default
+    heartbeat_interval: float = 15.0  # Seconds between background liveness pings
+    heartbeat_timeout: float = 10.0  # Seconds to wait for a heartbeat pong
+
+    # Scene cache settings
+    enable_scene_cache: bool = True  # Serve repeated GET_OBJECT_INFO calls from a local snapshot
+    scene_cache_ttl: float = 10.0  # Seconds before a cached object expires, bounds staleness when Editor edits go unreported
+
+    # Instrumentation settings
+    enable_metrics: bool = True  # Record per-command latency, payload sizes, timeouts and reconnects
+    metrics_window: int = 4096  # Latest latencies kept per command type for percentiles
+    metrics_trace_path: str = ""  # Append every command to this JSONL file, empty disables the trace
+
+    # Hierarchy mirror settings
+    enable_scene_mirror: bool = True  # Answer name lookups and hierarchy queries from a revision-synced local mirror
+    scene_mirror_ttl: float = 1.0  # Seconds a mirror sync is trusted before asking Unity for changes again
+
+    # Offline asset access
+    unity_project_path: str = ""  # Unity project root for reading assets from disk, empty uses the project containing this server
+    enable_asset_index: bool = True  # Answer asset existence checks and listings from a local index of Assets/ and its .meta GUIDs
+    asset_index_poll_interval: float = 2.0  # Seconds between checks for changed asset directories, 0 disables the watcher
+    asset_page_size: int = 500  # Assets per GET_ASSET_LIST page when listings come from Unity
+
+    # Editor pool settings
+    editor_jobs_per_endpoint: int = 1  # Sharded jobs run at once on one editor, jobs on the same editor share its scene
+    editor_retry_delay: float = 5.0  # Seconds before a failed editor is tried again, doubled per consecutive failure
+    editor_max_retry_delay: float = 60.0
+
+    # Startup settings
+    lazy_tool_loading: bool = True  # List tools from tools/tool_manifest.json (or the rebuilt copy in the user cache dir) and import each tool module on its first call
+
     # Logging settings
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -0,0 +1,355 @@
+"""
+Pool of Unity Editors and a scheduler that shards independent jobs across them.
+
+The primary editor (config.unity_host/unity_port) serves every ordinary tool call.
+config.unity_endpoints adds more editors, such as the headless editors of a build
+farm, which EditorPool.map() uses for independent work: separate courses,
+NodeGraphs or timeline batches.
+
+Every job has a key, e.g. the course or NodeGraph path. The editor that first takes
+a key keeps it: the key is pinned, so later jobs with the same key, and code run
+inside `editor_pool.pinned(key)`, go to the editor that already holds that scene
+state. Inside a job get_async_unity_connection() returns the pinned editor's
+connection, so existing tools work unchanged. Each pooled editor has its own
+scene cache and hierarchy mirror.
+
+Editors are health-tracked. An editor that cannot be reached is marked down for
+config.editor_retry_delay seconds, doubled per consecutive failure, and the jobs
+it had not started yet go to the other editors. A job that fails after it started
+is reported instead of retried, since it may already have changed that editor's
+project, and jobs pinned to an editor that is down fail rather than move.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable, AsyncIterator
+from config import config
+from scene_cache import SceneCache
+from scene_mirror import SceneMirror
+from command_metrics import command_metrics
+from async_unity_connection import AsyncUnityConnection, get_async_unity_connection, pinned_connection
+
+logger = logging.getLogger("UnityMCP")
+
+# A sharded unit of work, awaited with get_async_unity_connection() routed to its editor
+Job = Callable[[], Awaitable[Any]]
+
+def parse_endpoint(address: str) -> Tuple[str, int]:
+    """Split "host:port" (or a bare port on config.unity_host) into its parts."""
+    host, _, port = address.strip().rpartition(":")
+    return host or config.unity_host, int(port)
+
+@dataclass(eq=False)
+class UnityEndpoint:
+    """One Unity Editor of the pool with its connection and health state."""
+    host: str
+    port: int
+    primary: bool = False  # The editor ordinary tool calls go to
+    healthy: bool = True
+    failures: int = 0  # Consecutive failed connects or lost connections
+    retry_at: float = 0.0  # time.monotonic() after which an editor that is down is tried again
+    last_error: str = ""
+    running: int = 0  # Jobs currently running on this editor
+    completed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    _connection: AsyncUnityConnection = field(default=None, repr=False)
+    _loop: asyncio.AbstractEventLoop = field(default=None, repr=False)
+    _connect_lock: asyncio.Lock = field(default=None, repr=False)
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def available(self) -> bool:
+        """Healthy, or down long enough to be tried again."""
+        return self.healthy or time.monotonic() >= self.retry_at
+
+    def mark_failed(self, error: str):
+        self.failures += 1
+        self.healthy = False
+        self.last_error = error
+        delay = min(config.editor_retry_delay * 2 ** (self.failures - 1), config.editor_max_retry_delay)
+        self.retry_at = time.monotonic() + delay
+        logger.warning(f"Unity editor {self.address} marked down for {delay:.1f}s: {error}")
+
+    def mark_healthy(self):
+        self.healthy = True
+        self.failures = 0
+        self.last_error = ""
+
+    async def connect(self) -> AsyncUnityConnection:
+        """This editor's connection on the running loop, connecting and pinging it when needed."""
+        try:
+            if self.primary:
+                token = pinned_connection.set(None)
+                try:
+                    connection = await get_async_unity_connection()
+                finally:
+                    pinned_connection.reset(token)
+            else:
+                connection = await self._connect_pooled()
+        except Exception as e:
+            self.mark_failed(str(e))
+            raise ConnectionError(f"Could not connect to Unity at {self.address}: {str(e)}")
+        self.mark_healthy()
+        return connection
+
+    async def _connect_pooled(self) -> AsyncUnityConnection:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Streams cannot be shared across event loops, so start over on a new loop
+            self._connection, self._loop, self._connect_lock = None, loop, asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._connection is not None:
+                if self._connection.is_alive():
+                    return self._connection
+                command_metrics.record_reconnect()
+                await self._connection.disconnect()
+                self._connection = None
+
+            connection = AsyncUnityConnection(host=self.host, port=self.port, cache=SceneCache(), mirror=SceneMirror())
+            if not await connection.connect():
+                raise ConnectionError("Unity Editor and MCP Bridge are not reachable")
+            try:
+                await connection.send_command("ping")
+            except Exception:
+                await connection.disconnect()
+                raise
+            self._connection = connection
+            return connection
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "primary": self.primary,
+            "healthy": self.healthy,
+            "failures": self.failures,
+            "retry_in": round(max(self.retry_at - time.monotonic(), 0.0), 1) if not self.healthy else 0.0,
+            "last_error": self.last_error or None,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3)
+        }
+
+@dataclass
+class EditorPool:
+    """The primary editor plus config.unity_endpoints, with jobs pinned to the editor holding their scene."""
+    endpoints: List[UnityEndpoint] = field(default_factory=list)
+    _pins: Dict[str, UnityEndpoint] = field(default_factory=dict, repr=False)  # Job key -> editor holding its scene
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def configure(self, addresses: List[str] = None) -> List[UnityEndpoint]:
+        """(Re)build the pool from the primary editor and `addresses`, default config.unity_endpoints.
+
+        Editors that stay in the pool keep their health state, connection and pins.
+        """
+        with self._lock:
+            previous = {endpoint.address: endpoint for endpoint in self.endpoints}
+            endpoints = [UnityEndpoint(config.unity_host, config.unity_port, primary=True)]
+            for address in config.unity_endpoints if addresses is None else addresses:
+                host, port = parse_endpoint(address)
+                if all((endpoint.host, endpoint.port) != (host, port) for endpoint in endpoints):
+                    endpoints.append(UnityEndpoint(host, port))
+            self.endpoints = [previous.get(endpoint.address, endpoint) for endpoint in endpoints]
+            self._pins = {key: endpoint for key, endpoint in self._pins.items() if endpoint in self.endpoints}
+            return list(self.endpoints)
+
+    def _ensure_configured(self):
+        if not self.endpoints:
+            self.configure()
+
+    def endpoint_for(self, key: str) -> Optional[UnityEndpoint]:
+        """The editor `key` is pinned to, if any."""
+        with self._lock:
+            return self._pins.get(key)
+
+    def pin(self, key: str) -> UnityEndpoint:
+        """The editor holding `key`, pinning it to the least busy available editor the first time."""
+        self._ensure_configured()
+        with self._lock:
+            endpoint = self._pins.get(key)
+            if endpoint is None:
+                candidates = [candidate for candidate in self.endpoints if candidate.available()] or self.endpoints
+                # The primary also serves interactive tool calls, so it takes sharded work last
+                endpoint = min(candidates, key=lambda candidate: (candidate.running, self._pin_count(candidate),
+                                                                  candidate.primary))
+                self._pins[key] = endpoint
+            return endpoint
+
+    def unpin(self, key: str = None):
+        """Release `key`, or every key, so later jobs may run on any editor."""
+        with self._lock:
+            if key is None:
+                self._pins.clear()
+            else:
+                self._pins.pop(key, None)
+
+    def _pin_count(self, endpoint: UnityEndpoint) -> int:
+        return sum(1 for pinned in self._pins.values() if pinned is endpoint)
+
+    @asynccontextmanager
+    async def pinned(self, key: str) -> AsyncIterator[AsyncUnityConnection]:
+        """Route get_async_unity_connection() to the editor holding `key` for the duration of the block."""
+        endpoint = self.pin(key)
+        connection = await endpoint.connect()
+        token = pinned_connection.set(connection)
+        try:
+            yield connection
+        finally:
+            pinned_connection.reset(token)
+
+    async def run(self, key: str, job: Job) -> Any:
+        """Run one job on the editor holding `key` and return its result."""
+        result = (await self.map({key: job}))[key]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def map(self, jobs: Dict[str, Job]) -> Dict[str, Any]:
+        """Shard independent jobs across the available editors.
+
+        Each editor runs config.editor_jobs_per_endpoint jobs at a time, taking the
+        jobs already pinned to it first and then unpinned ones in order, so faster
+        editors take more of the work. An unpinned job whose editor fails to connect
+        goes back to the queue, and idle workers wait until every job has settled so
+        a healthy editor picks it up. Returns each job's result, or the exception it
+        raised, by key.
+        """
+        self._ensure_configured()
+        results: Dict[str, Any] = {}
+        shared = deque()
+        own: Dict[str, deque] = {endpoint.address: deque() for endpoint in self.endpoints}
+        with self._lock:
+            for key in jobs:
+                endpoint = self._pins.get(key)
+                if endpoint is None:
+                    shared.append(key)
+                else:
+                    own[endpoint.address].append(key)
+
+        def fail_pinned(endpoint: UnityEndpoint):
+            queue = own[endpoint.address]
+            while queue:
+                key = queue.popleft()
+                results[key] = ConnectionError(f"Unity editor {endpoint.address} holding '{key}' is unavailable: "
+                                               f"{endpoint.last_error or 'marked down'}")
+
+        # Signalled whenever a job settles or is handed back, so idle workers can take re-queued jobs
+        changed = asyncio.Condition()
+
+        async def notify():
+            async with changed:
+                changed.notify_all()
+
+        async def next_job(endpoint: UnityEndpoint) -> Optional[Tuple[str, bool]]:
+            """The next key for `endpoint` and whether it was claimed from the shared queue, None when done.
+
+            Waits while jobs running elsewhere are unsettled, since a failing editor hands its claimed job back.
+            """
+            async with changed:
+                while True:
+                    if not endpoint.available():
+                        return None
+                    if own[endpoint.address]:
+                        return own[endpoint.address].popleft(), False
+                    if shared:
+                        key = shared.popleft()
+                        with self._lock:
+                            self._pins[key] = endpoint
+                        return key, True
+                    if len(results) == len(jobs):
+                        return None
+                    await changed.wait()
+
+        async def worker(endpoint: UnityEndpoint):
+            # A job's connection must come from its own editor, never from an outer pin
+            pinned_connection.set(None)
+            try:
+                while True:
+                    job = await next_job(endpoint)
+                    if job is None:
+                        fail_pinned(endpoint)
+                        return
+                    key, claimed = job
+
+                    try:
+                        connection = await endpoint.connect()
+                    except ConnectionError as e:
+                        if claimed:
+                            # Not started yet, so another editor can take it
+                            self.unpin(key)
+                            shared.appendleft(key)
+                        else:
+                            results[key] = e
+                        fail_pinned(endpoint)
+                        return
+
+                    endpoint.running += 1
+                    started = time.monotonic()
+                    token = pinned_connection.set(connection)
+                    try:
+                        results[key] = await jobs[key]()
+                        endpoint.completed += 1
+                    except Exception as e:
+                        logger.error(f"Job '{key}' failed on Unity editor {endpoint.address}: {str(e)}")
+                        results[key] = e
+                        endpoint.failed += 1
+                    finally:
+                        pinned_connection.reset(token)
+                        endpoint.running -= 1
+                        endpoint.busy_seconds += time.monotonic() - started
+                    await notify()
+
+                    if not connection.is_alive():
+                        endpoint.mark_failed(f"Connection lost while running '{key}'")
+                        fail_pinned(endpoint)
+                        return
+            finally:
+                await notify()
+
+        workers = [worker(endpoint) for endpoint in self.endpoints if endpoint.available()
+                   for _ in range(max(config.editor_jobs_per_endpoint, 1))]
+        for endpoint in self.endpoints:
+            if not endpoint.available():
+                fail_pinned(endpoint)
+        await asyncio.gather(*workers)
+
+        for key in jobs:
+            if key not in results:
+                results[key] = ConnectionError("No Unity editor in the pool is available")
+        return {key: results[key] for key in jobs}
+
+    async def check_health(self) -> List[Dict[str, Any]]:
+        """Ping every editor, including ones waiting for their retry delay, and return their status."""
+        self._ensure_configured()
+
+        async def probe(endpoint: UnityEndpoint):
+            try:
+                connection = await endpoint.connect()
+                await connection.send_command("ping")
+            except Exception as e:
+                if endpoint.healthy:
+                    endpoint.mark_failed(str(e))
+        await asyncio.gather(*(probe(endpoint) for endpoint in self.endpoints))
+        return self.status()["editors"]
+
+    def status(self) -> Dict[str, Any]:
+        """Health, load and pinned keys of every editor."""
+        self._ensure_configured()
+        with self._lock:
+            pins: Dict[str, List[str]] = {}
+            for key, endpoint in self._pins.items():
+                pins.setdefault(endpoint.address, []).append(key)
+            return {"editors": [{**endpoint.status(), "pinned": pins.get(endpoint.address, [])}
+                                for endpoint in self.endpoints]}
+
+# Global pool, configured from config on first use
+editor_pool = EditorPool()
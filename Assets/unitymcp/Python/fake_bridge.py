@@ -0,0 +1,357 @@
+"""
+Stand-in for the Unity MCP bridge, for testing and benchmarking without an Editor.
+
+FakeUnityBridge is an asyncio TCP server that speaks the same protocol as
+UnityMCPBridge.cs: legacy unframed JSON and raw "ping", the HANDSHAKE that switches
+a connection to length-prefixed framing, multiplexed frames tagged with an "id",
+the negotiated "packed" frame encoding, and BATCH. Commands are executed one at a
+time, like the Editor's update loop, after a configurable latency, and answer from
+a synthetic scene of N objects: ping, GET_OBJECT_INFO, GET_HIERARCHY,
+GET_ALL_SCENE_OBJECTS and GET_SCENE_CHANGES (the scene never changes, so only the
+first sync returns objects). Results can be padded to a fixed size to exercise
+large responses.
+
+Run it standalone to point the MCP server at it:
+
+    python fake_bridge.py --port 6400 --objects 2000 --latency 0.002
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Union
+import packed_encoding
+from unity_connection import FRAME_HEADER, FRAME_PROTOCOL_VERSION, MAX_FRAME_SIZE
+
+logger = logging.getLogger("UnityMCP")
+
+PONG_RESPONSE = {"status": "success", "result": {"message": "pong"}}
+
+def _bounds(center: List[float], size: List[float]) -> Dict[str, Any]:
+    return {
+        "exists": True,
+        "center": center,
+        "size": size,
+        "min": [c - s / 2 for c, s in zip(center, size)],
+        "max": [c + s / 2 for c, s in zip(center, size)]
+    }
+
+@dataclass
+class FakeScene:
+    """Deterministic synthetic scene: `roots` root objects, the rest attached `branching` per parent."""
+    object_count: int = 1000
+    roots: int = 10
+    branching: int = 4
+    seed: int = 0
+    objects: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    _by_name: Dict[str, Dict[str, Any]] = field(default_factory=dict, repr=False)
+    _children: List[List[int]] = field(default_factory=list, repr=False)
+
+    def __post_init__(self):
+        rng = random.Random(self.seed)
+        self._children = [[] for _ in range(self.object_count)]
+        for index in range(self.object_count):
+            parent = None if index < self.roots else (index - self.roots) // self.branching
+            name = f"Object_{index}"
+            path = name if parent is None else f"{self.objects[parent]['path']}/{name}"
+            position = [round(rng.uniform(-10.0, 10.0), 4), round(rng.uniform(0.0, 3.0), 4), round(rng.uniform(-10.0, 10.0), 4)]
+            size = [round(rng.uniform(0.05, 1.0), 4) for _ in range(3)]
+            obj = {
+                "name": name,
+                "path": path,
+                "position": position,
+                "rotation": [0.0, round(rng.uniform(0.0, 360.0), 3), 0.0],
+                "scale": [1.0, 1.0, 1.0],
+                "bounds": {"renderer": _bounds(position, size), "collider": _bounds(position, size)}
+            }
+            self.objects.append(obj)
+            self._by_name[name] = obj
+            if parent is not None:
+                self._children[parent].append(index)
+
+    @property
+    def names(self) -> List[str]:
+        return [obj["name"] for obj in self.objects]
+
+    def object_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        name = params.get("name") or ""
+        obj = self._by_name.get(name)
+        if obj is None:
+            raise Exception(f"Object '{name}' not found.")
+        return {"success": True, **{key: obj[key] for key in ("name", "position", "rotation", "scale", "bounds")}}
+
+    def hierarchy(self, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        def node(index: int) -> Dict[str, Any]:
+            return {"name": self.objects[index]["name"], "children": [node(child) for child in self._children[index]]}
+        return {"hierarchy": [node(index) for index in range(min(self.roots, self.object_count))]}
+
+    def all_objects(self, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        include_transforms = bool((params or {}).get("include_transforms"))
+        objects = []
+        for obj in self.objects:
+            entry = {"name": obj["name"], "path": obj["path"], "active": True, "tag": "Untagged", "layer": 0,
+                     "components": ["Transform", "MeshFilter", "MeshRenderer", "BoxCollider"]}
+            if include_transforms:
+                entry.update(activeInHierarchy=True, layerName="Default", position=obj["position"],
+                             rotation=obj["rotation"], scale=obj["scale"], bounds=obj["bounds"])
+            objects.append(entry)
+        return {"objects": objects, "count": len(objects)}
+
+    def scene_changes(self, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        params = params or {}
+        epoch = f"fake-{self.seed}"
+        full = params.get("epoch") != epoch or params.get("since_revision", -1) != 1
+        objects = []
+        if full:
+            for index, obj in enumerate(self.objects):
+                parent = None if index < self.roots else (index - self.roots) // self.branching
+                objects.append({
+                    "id": index + 1, "name": obj["name"], "parent": 0 if parent is None else parent + 1,
+                    "sibling": index if parent is None else (index - self.roots) % self.branching,
+                    "active": True, "activeInHierarchy": True, "tag": "Untagged", "layer": 0,
+                    "components": ["Transform", "MeshFilter", "MeshRenderer", "BoxCollider"], "scene": 1
+                })
+        return {"epoch": epoch, "revision": 1, "edit_revision": 0, "full": full, "active_scene": 1,
+                "objects": objects, "removed": []}
+
+@dataclass
+class FakeUnityBridge:
+    """Asyncio server emulating UnityMCPBridge for a FakeScene."""
+    scene: FakeScene = field(default_factory=FakeScene)
+    host: str = "localhost"
+    port: int = 0  # 0 picks a free port, read it back after start()
+    latency: float = 0.0  # Seconds each command spends on the emulated Editor main thread
+    jitter: float = 0.0  # Extra uniformly distributed latency in seconds
+    response_padding: int = 0  # Pad every successful result with this many bytes
+    framing: bool = True  # Accept the framing handshake, False behaves like an older bridge
+    batch: bool = True  # Advertise and execute BATCH
+    packed: bool = True  # Accept the packed frame encoding when a client asks for it
+    commands_executed: int = 0
+    _server: asyncio.AbstractServer = field(default=None, repr=False)
+    _writers: set = field(default_factory=set, repr=False)  # Open client connections
+    _editor: asyncio.Lock = field(default=None, repr=False)  # The Editor executes one command at a time
+    _rng: random.Random = field(default_factory=lambda: random.Random(0), repr=False)
+
+    async def start(self) -> int:
+        """Start listening and return the bound port."""
+        self._editor = asyncio.Lock()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Fake Unity bridge listening on {self.host}:{self.port} with {self.scene.object_count} objects")
+        return self.port
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "FakeUnityBridge":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        framed = False
+        multiplexed = False
+        packed = False
+        write_lock = asyncio.Lock()
+        tasks = set()
+        self._writers.add(writer)
+        try:
+            while True:
+                if framed:
+                    text = await self._read_frame(reader, packed)
+                    if text is None:
+                        break
+                    if multiplexed:
+                        task = asyncio.create_task(self._handle_multiplexed(writer, write_lock, text, packed))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                        continue
+                else:
+                    text = await self._read_legacy(reader)
+                    if text is None:
+                        break
+                    handshake = self._handshake(text)
+                    if handshake is not None:
+                        multiplexed = handshake["result"]["multiplex"]
+                        packed = handshake["result"]["encoding"] == packed_encoding.PACKED_ENCODING
+                        await self._write(writer, handshake, False)
+                        framed = True
+                        continue
+
+                if isinstance(text, str) and text.strip() == "ping":
+                    await self._write(writer, PONG_RESPONSE, framed, packed)
+                    continue
+                await self._write(writer, await self._execute_text(text), framed, packed)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _handle_multiplexed(self, writer: asyncio.StreamWriter, write_lock: asyncio.Lock,
+                                  text: Union[str, Dict[str, Any]], packed: bool):
+        request_id = None
+        try:
+            request = text if isinstance(text, dict) else json.loads(text)
+            request_id = request.get("id")
+            # Heartbeat pings are answered without waiting for the Editor
+            response = PONG_RESPONSE if request.get("type") == "ping" else await self._execute(request)
+        except Exception as e:
+            response = {"status": "error", "error": str(e)}
+        async with write_lock:
+            try:
+                await self._write(writer, {"id": request_id, **response}, True, packed)
+            except ConnectionError:
+                pass
+
+    def _handshake(self, text: str) -> Optional[Dict[str, Any]]:
+        if not self.framing or '"HANDSHAKE"' not in text:
+            return None
+        try:
+            request = json.loads(text)
+        except ValueError:
+            return None
+        params = request.get("params") or {}
+        if request.get("type") != "HANDSHAKE" or params.get("protocol") != "framed":
+            return None
+        return {"status": "success", "result": {
+            "protocol": "framed",
+            "version": FRAME_PROTOCOL_VERSION,
+            "header_bytes": FRAME_HEADER.size,
+            "multiplex": bool(params.get("multiplex")),
+            "batch": self.batch,
+            "encoding": packed_encoding.PACKED_ENCODING
+            if self.packed and params.get("encoding") == packed_encoding.PACKED_ENCODING else "json"
+        }}
+
+    async def _read_frame(self, reader: asyncio.StreamReader, packed: bool = False) -> Union[str, Dict[str, Any], None]:
+        try:
+            (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+            if length > MAX_FRAME_SIZE:
+                raise ConnectionError(f"Frame of {length} bytes exceeds limit of {MAX_FRAME_SIZE} bytes")
+            body = await reader.readexactly(length)
+            # Like the bridge, packed commands are dispatched as the decoded object; a bare "ping" is never packed
+            if packed and body != b"ping":
+                return packed_encoding.decode(body)
+            return body.decode("utf-8")
+        except asyncio.IncompleteReadError:
+            return None
+
+    async def _read_legacy(self, reader: asyncio.StreamReader) -> Optional[str]:
+        """Read until the buffer holds "ping" or a complete JSON document."""
+        data = bytearray()
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                return None
+            data.extend(chunk)
+            text = data.decode("utf-8", errors="replace")
+            if text.strip() == "ping":
+                return text
+            try:
+                json.loads(text)
+                return text
+            except ValueError:
+                continue
+
+    async def _write(self, writer: asyncio.StreamWriter, response: Dict[str, Any], framed: bool, packed: bool = False):
+        if packed:
+            payload = packed_encoding.encode(response)
+        else:
+            payload = json.dumps(response, separators=(",", ":")).encode("utf-8")
+        writer.write(FRAME_HEADER.pack(len(payload)) + payload if framed else payload)
+        await writer.drain()
+
+    async def _execute_text(self, text: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(text, dict):
+            return await self._execute(text)
+        try:
+            request = json.loads(text)
+        except ValueError as e:
+            return {"status": "error", "error": f"Invalid JSON format: {str(e)}"}
+        return await self._execute(request)
+
+    async def _execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one command on the emulated Editor main thread."""
+        async with self._editor:
+            delay = self.latency + (self._rng.uniform(0.0, self.jitter) if self.jitter else 0.0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if request.get("type") == "BATCH" and self.batch:
+                commands = (request.get("params") or {}).get("commands") or []
+                results = [self._run(command) if isinstance(command, dict) and command.get("type") != "BATCH"
+                           else {"status": "error", "error": "Invalid batch item"} for command in commands]
+                return {"status": "success", "result": {"results": results, "count": len(results)}}
+            return self._run(request)
+
+    def _run(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        command_type = command.get("type")
+        params = command.get("params") or {}
+        handlers = {
+            "ping": lambda _: {"message": "pong"},
+            "GET_OBJECT_INFO": self.scene.object_info,
+            "GET_HIERARCHY": self.scene.hierarchy,
+            "GET_ALL_SCENE_OBJECTS": self.scene.all_objects,
+            "GET_SCENE_CHANGES": self.scene.scene_changes
+        }
+        self.commands_executed += 1
+        try:
+            handler = handlers.get(command_type)
+            if handler is None:
+                raise Exception(f"Unknown command type: {command_type}")
+            result = handler(params)
+        except Exception as e:
+            return {"status": "error", "error": str(e), "command": command_type}
+        if self.response_padding and isinstance(result, dict):
+            result = {**result, "padding": "x" * self.response_padding}
+        return {"status": "success", "result": result}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stand-in Unity MCP bridge with a synthetic scene")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6400)
+    parser.add_argument("--objects", type=int, default=1000, help="Number of objects in the synthetic scene")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each command takes in the emulated Editor")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument("--padding", type=int, default=0, help="Bytes added to every successful result")
+    parser.add_argument("--legacy", action="store_true", help="Refuse the framing handshake like an older bridge")
+    parser.add_argument("--no-batch", action="store_true", help="Do not advertise BATCH support")
+    parser.add_argument("--no-packed", action="store_true", help="Refuse the packed frame encoding")
+    args = parser.parse_args()
+
+    bridge = FakeUnityBridge(
+        scene=FakeScene(object_count=args.objects),
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        response_padding=args.padding,
+        framing=not args.legacy,
+        batch=not args.no_batch,
+        packed=not args.no_packed
+    )
+    try:
+        asyncio.run(bridge.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compact "packed" frame encoding for the Unity bridge.
+
+Negotiated in the framing handshake (config.wire_encoding = "packed"); JSON stays
+the default. A packed frame body is a 4-byte little-endian JSON length, a JSON
+envelope, then float32 blocks. Inside the envelope
+
+- arrays of at least MIN_PACKED_FLOATS numbers (with at least one float) become
+  {"$f32": [offset, count]}, and lists of equal-length number vectors become
+  {"$f32": [offset, count, width]}, with offset and count in floats;
+- lists of at least MIN_TABLE_ROWS objects with identical keys become
+  {"$table": [keys, columns]}, each column encoded the same way.
+
+Positions, rotations, bounds and keyframe values therefore travel as raw float32
+instead of decimal text, and repeated keys of per-object records are sent once.
+The envelope is still parsed by the C JSON decoder, with float blocks converted by
+the array module. Packed floats come back as the float32 values Unity holds, e.g.
+0.10000000149011612 where JSON would print 0.1. Mirrors
+Editor/Helpers/PackedEncoding.cs.
+"""
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List
+
+PACKED_ENCODING = "packed"
+MIN_PACKED_FLOATS = 16
+MIN_TABLE_ROWS = 8
+JSON_LENGTH = struct.Struct("<I")
+
+def _is_number(value: Any) -> bool:
+    return type(value) in (int, float)
+
+def _is_float_vector(values: List[Any]) -> bool:
+    # Integer-only lists (instance IDs, indices) stay JSON so they keep their exact values
+    return bool(values) and all(map(_is_number, values)) and any(type(value) is float for value in values)
+
+# Blocks are little-endian float32 on the wire
+_SWAP = sys.byteorder != "little"
+
+def _reference(values: List[float], blocks: List[array], offset: List[int], count: int, width: int = 0) -> Dict[str, Any]:
+    reference = [offset[0], count] + ([width] if width else [])
+    blocks.append(array("f", [number for item in values for number in item] if width else values))
+    offset[0] += count
+    return {"$f32": reference}
+
+def _pack(value: Any, blocks: List[array], offset: List[int]) -> Any:
+    if isinstance(value, dict):
+        return {key: _pack(item, blocks, offset) for key, item in value.items()}
+    if not isinstance(value, (list, tuple)):
+        return value
+
+    if len(value) >= MIN_PACKED_FLOATS and _is_float_vector(value):
+        return _reference(value, blocks, offset, len(value))
+
+    if value and all(isinstance(item, (list, tuple)) for item in value):
+        width = len(value[0])
+        if (width and len(value) * width >= MIN_PACKED_FLOATS
+                and all(len(item) == width and all(map(_is_number, item)) for item in value)
+                and any(type(number) is float for item in value for number in item)):
+            return _reference(value, blocks, offset, len(value) * width, width)
+
+    if len(value) >= MIN_TABLE_ROWS and all(isinstance(item, dict) for item in value):
+        keys = list(value[0])
+        if keys and all(list(item) == keys for item in value):
+            columns = [_pack([item[key] for item in value], blocks, offset) for key in keys]
+            return {"$table": [keys, columns]}
+
+    return [_pack(item, blocks, offset) for item in value]
+
+def encode(value: Any) -> bytes:
+    """Encode a command as a packed frame body."""
+    blocks: List[array] = []
+    envelope = json.dumps(_pack(value, blocks, [0]), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if _SWAP:
+        for block in blocks:
+            block.byteswap()
+    return JSON_LENGTH.pack(len(envelope)) + envelope + b"".join(block.tobytes() for block in blocks)
+
+def decode(body: bytes) -> Any:
+    """Decode a packed frame body."""
+    if len(body) < JSON_LENGTH.size:
+        raise ValueError("Packed frame is too short")
+    (length,) = JSON_LENGTH.unpack_from(body)
+    start = JSON_LENGTH.size + length
+    if start > len(body):
+        raise ValueError(f"Invalid packed JSON length: {length}")
+    envelope = body[JSON_LENGTH.size:start]
+    # Small replies usually pack nothing and skip the object hook
+    if b'"$' not in envelope:
+        return json.loads(envelope)
+    floats = array("f", body[start:start + (len(body) - start) // 4 * 4])
+    if _SWAP:
+        floats.byteswap()
+
+    def unpack(obj: Dict[str, Any]) -> Any:
+        if len(obj) == 1:
+            reference = obj.get("$f32")
+            if reference is not None:
+                offset, count = reference[0], reference[1]
+                if offset < 0 or count < 0 or offset + count > len(floats):
+                    raise ValueError("Packed float block is out of range")
+                values = floats[offset:offset + count].tolist()
+                if len(reference) > 2:
+                    width = reference[2]
+                    return [values[index:index + width] for index in range(0, count, width)]
+                return values
+            table = obj.get("$table")
+            if table is not None:
+                keys, columns = table
+                return [dict(zip(keys, row)) for row in zip(*columns)]
+        return obj
+
+    return json.loads(envelope, object_hook=unpack)
@@ -0,0 +1,259 @@
+"""
+Client-side scene snapshot for the Unity MCP server.
+
+GET_OBJECT_INFO results (transforms, bounds and renderer info) are kept per object
+name, and side-effect free AUTO_POSITION_CAMERA_TO_OBJECTS solves are memoized per
+object set and camera parameters, so that the repeated lookups made while
+generating timelines are answered locally. Commands that can change the scene
+invalidate the snapshot, and every invalidation bumps `revision` so that replies to
+requests started before a mutation are never stored.
+
+Edits made in the Editor itself (objects moved by hand, Undo and Redo) are counted
+by the bridge and reported as `edit_revision` in GET_SCENE_CHANGES replies; before a
+cache hit the connection lets the hierarchy mirror sync (at most once per
+`config.scene_mirror_ttl`), and a changed count invalidates the snapshot. Entries
+also expire after `ttl` seconds, which bounds staleness on bridges that cannot
+report edits.
+"""
+
+import copy
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+from config import config
+
+logger = logging.getLogger("UnityMCP")
+
+# Commands that only affect the object named in params["name"]
+OBJECT_MUTATING_COMMANDS = {"CREATE_OBJECT"}
+
+# Commands that can move, re-parent, add or remove arbitrary objects
+SCENE_MUTATING_COMMANDS = {
+    "MODIFY_OBJECT",
+    "DELETE_OBJECT",
+    "CHANGE_SCENE",
+    "OPEN_SCENE",
+    "NEW_SCENE",
+    "SET_TRANSFORM_POSITION",
+    "SET_TRANSFORM_ROTATION",
+    "SET_TRANSFORM_SCALE",
+    "INSTANTIATE_PREFAB",
+    "APPLY_PREFAB",
+    "EXECUTE_CONTEXT_MENU_ITEM",
+    "EDITOR_CONTROL",
+    "POSITION_CAMERA_TO_FRAME_OBJECTS",
+    "ADD_EVENT_OBJECT",
+    "ADD_EVENT_OBJECT_NO_PARAM",
+    "CREATE_BASE",
+    "GLB_BATCH_CONVERT",
+}
+
+def camera_pose_key(params: Dict[str, Any], revision: int) -> Optional[Tuple]:
+    """Memo key for an AUTO_POSITION_CAMERA_TO_OBJECTS request, None when it moves the camera."""
+    if params.get("apply_to_camera", True):
+        return None
+    return (
+        tuple(sorted(params.get("object_names") or [])),
+        params.get("fov"),
+        params.get("pitch_angle"),
+        params.get("padding"),
+        params.get("camera_name"),
+        params.get("force_reset_rotation_y"),
+        revision
+    )
+
+@dataclass
+class SceneCache:
+    """Thread-safe cache of GET_OBJECT_INFO results and camera solves."""
+    ttl: float = config.scene_cache_ttl  # Seconds before an entry expires, 0 keeps it until invalidated
+    enabled: bool = config.enable_scene_cache
+    revision: int = 0  # Bumped on every invalidation
+    edit_epoch: Optional[str] = None  # Bridge epoch and edit count from the last GET_SCENE_CHANGES reply
+    edit_revision: int = -1
+    hits: int = 0
+    misses: int = 0
+    _entries: Dict[str, Tuple[float, Dict[str, Any]]] = field(default_factory=dict, repr=False)
+    _camera_poses: Dict[Tuple, Tuple[float, Dict[str, Any]]] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached info for `name`, or None when missing or expired."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[name]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def get_camera_pose(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the memoized AUTO_POSITION_CAMERA_TO_OBJECTS result for `params`."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            key = camera_pose_key(params, self.revision)
+            if key is None:
+                return None
+            entry = self._camera_poses.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._camera_poses[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put_camera_pose(self, params: Dict[str, Any], result: Dict[str, Any], revision: int) -> bool:
+        """Memoize a camera solve computed at scene `revision`."""
+        if not self.enabled or not result.get("success", False):
+            return False
+        key = camera_pose_key(params, revision)
+        with self._lock:
+            if key is None or revision != self.revision:
+                return False
+            self._camera_poses[key] = (time.monotonic(), copy.deepcopy(result))
+            return True
+
+    def put(self, name: str, info: Dict[str, Any], revision: int = None) -> bool:
+        """Store `info` for `name` unless the scene changed since `revision` was read."""
+        if not self.enabled or not info.get("success", False):
+            return False
+        with self._lock:
+            if revision is not None and revision != self.revision:
+                return False
+            self._entries[name] = (time.monotonic(), copy.deepcopy(info))
+            return True
+
+    def invalidate(self, name: str = None):
+        """Drop one object, or the whole snapshot when `name` is None."""
+        with self._lock:
+            self.revision += 1
+            self._camera_poses.clear()  # Poses depend on every object's bounds
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def prime(self, objects: List[Dict[str, Any]], revision: int = None) -> int:
+        """Replace the snapshot with GET_ALL_SCENE_OBJECTS(include_transforms=True) entries.
+
+        Only objects that GameObject.Find could return are stored: inactive objects are
+        skipped and names that occur more than once are left to the Editor.
+        """
+        candidates: Dict[str, Optional[Dict[str, Any]]] = {}
+        for obj in objects:
+            if "position" not in obj or not obj.get("activeInHierarchy", obj.get("active", True)):
+                continue
+            name = obj.get("name")
+            candidates[name] = None if name in candidates else obj
+
+        now = time.monotonic()
+        with self._lock:
+            if revision is not None and revision != self.revision:
+                return 0
+            self._entries.clear()
+            for name, obj in candidates.items():
+                if obj is None:
+                    continue
+                self._entries[name] = (now, {
+                    "success": True,
+                    "name": name,
+                    "position": obj["position"],
+                    "rotation": obj["rotation"],
+                    "scale": obj["scale"],
+                    "bounds": obj.get("bounds", {})
+                })
+            count = len(self._entries)
+        logger.info(f"Scene cache primed with {count} objects")
+        return count
+
+    def may_answer(self, command_type: str, params: Dict[str, Any] = None) -> bool:
+        """Whether lookup() could answer this command from a non-empty snapshot."""
+        if not self.enabled or not params:
+            return False
+        if command_type == "GET_OBJECT_INFO":
+            return bool(self._entries)
+        if command_type == "AUTO_POSITION_CAMERA_TO_OBJECTS":
+            return bool(self._camera_poses) and not params.get("apply_to_camera", True)
+        return False
+
+    def note_scene_changes(self, changes: Dict[str, Any]):
+        """Invalidate when a GET_SCENE_CHANGES reply reports Editor edits since the previous one."""
+        if "edit_revision" not in changes:
+            return
+        with self._lock:
+            edited = (changes.get("epoch"), changes["edit_revision"]) != (self.edit_epoch, self.edit_revision)
+            self.edit_epoch = changes.get("epoch")
+            self.edit_revision = changes["edit_revision"]
+        if edited:
+            logger.debug(f"Scene cache invalidated by Editor edits (edit revision {self.edit_revision})")
+            self.invalidate()
+
+    def lookup(self, command_type: str, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Answer a command from the snapshot when possible."""
+        if not params:
+            return None
+        if command_type == "GET_OBJECT_INFO":
+            return self.get(params.get("name"))
+        if command_type == "AUTO_POSITION_CAMERA_TO_OBJECTS":
+            return self.get_camera_pose(params)
+        return None
+
+    def lookup_batch(self, commands: List[Dict[str, Any]]) -> Tuple[List[Optional[Dict[str, Any]]], List[int]]:
+        """Fill BATCH responses from the snapshot; returns the responses and the indices still to send."""
+        responses: List[Optional[Dict[str, Any]]] = []
+        missing = []
+        for index, command in enumerate(commands):
+            cached = self.lookup(command.get("type"), command.get("params"))
+            if cached is None:
+                missing.append(index)
+                responses.append(None)
+            else:
+                responses.append({"status": "success", "result": cached})
+        return responses, missing
+
+    def before_command(self, command_type: str, params: Dict[str, Any] = None) -> int:
+        """Invalidate ahead of a mutating command; returns the revision to pass to after_command."""
+        self._invalidate_for(command_type, params)
+        return self.revision
+
+    def after_command(self, command_type: str, params: Dict[str, Any], result: Dict[str, Any], revision: int):
+        """Record a command's result, or invalidate again once a mutation has been applied."""
+        if command_type == "GET_OBJECT_INFO" and params and isinstance(result, dict):
+            self.put(params.get("name"), result, revision)
+        elif command_type == "AUTO_POSITION_CAMERA_TO_OBJECTS" and params and isinstance(result, dict):
+            if not self.put_camera_pose(params, result, revision):
+                self._invalidate_for(command_type, params)
+        else:
+            self._invalidate_for(command_type, params)
+
+    def before_batch(self, commands: List[Dict[str, Any]]) -> int:
+        for command in commands:
+            self._invalidate_for(command.get("type"), command.get("params"))
+        return self.revision
+
+    def after_batch(self, commands: List[Dict[str, Any]], responses: List[Dict[str, Any]], revision: int):
+        for command, response in zip(commands, responses):
+            if response.get("status") == "success":
+                self.after_command(command.get("type"), command.get("params"), response.get("result"), revision)
+            else:
+                self._invalidate_for(command.get("type"), command.get("params"))
+
+    def _invalidate_for(self, command_type: str, params: Dict[str, Any] = None):
+        if command_type in SCENE_MUTATING_COMMANDS:
+            self.invalidate()
+        elif command_type in OBJECT_MUTATING_COMMANDS:
+            self.invalidate((params or {}).get("name"))
+        elif command_type == "AUTO_POSITION_CAMERA_TO_OBJECTS" and (params or {}).get("apply_to_camera", True):
+            self.invalidate()
+
+# Global scene cache shared by the sync and async connections
+scene_cache = SceneCache()
@@ -0,0 +1,178 @@
+"""
+Client-side mirror of the Unity scene hierarchy, kept current by revision deltas.
+
+The bridge's GET_SCENE_CHANGES command returns only the GameObjects that changed
+since a given scene revision (plus the IDs of removed ones), so the mirror stays
+in sync without transferring the whole hierarchy again. FIND_OBJECTS_BY_NAME,
+GET_HIERARCHY and GET_ALL_SCENE_OBJECTS (without transforms) are then answered
+from the mirror, which turns the existence checks that precede most object tools
+into local dictionary lookups.
+
+The mirror is trusted for `config.scene_mirror_ttl` seconds after a sync, to
+bound how long edits made by hand in the Editor can go unseen. Any command sent
+by this client that may change the hierarchy marks it stale, so the next lookup
+syncs first. Bridges without GET_SCENE_CHANGES disable the mirror and every
+command goes to Unity as before.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Set, Tuple
+from config import config
+
+logger = logging.getLogger("UnityMCP")
+
+# Commands answered from the mirror
+MIRRORED_COMMANDS = {"FIND_OBJECTS_BY_NAME", "GET_HIERARCHY", "GET_ALL_SCENE_OBJECTS"}
+
+# Commands that never change the hierarchy, in addition to GET_* and FIND_* queries
+READ_ONLY_COMMANDS = {"ping", "HANDSHAKE", "VIEW_SCRIPT", "LIST_SCRIPTS", "SELECT_OBJECT"}
+
+def is_read_only(command_type: str, params: Dict[str, Any] = None) -> bool:
+    """Whether a command is known not to create, remove, rename or re-parent objects."""
+    if command_type == "BATCH":
+        return all(is_read_only(command.get("type"), command.get("params"))
+                   for command in (params or {}).get("commands", []))
+    return command_type in READ_ONLY_COMMANDS or command_type.startswith(("GET_", "FIND_"))
+
+@dataclass
+class SceneMirror:
+    """Thread-safe local copy of every GameObject's name, parent, activity, tag, layer and components."""
+    enabled: bool = config.enable_scene_mirror
+    ttl: float = config.scene_mirror_ttl  # Seconds a sync is trusted without asking Unity again
+    epoch: Optional[str] = None  # Identifies the bridge's revision history, changes on domain reload
+    revision: int = -1  # Scene revision the mirror reflects, -1 before the first sync
+    active_scene: int = 0
+    synced_at: float = 0.0
+    _generation: int = 0  # Bumped by every hierarchy-changing command this client sends
+    _synced_generation: int = -1
+    _objects: Dict[int, Dict[str, Any]] = field(default_factory=dict, repr=False)
+    _by_name: Dict[str, Set[int]] = field(default_factory=dict, repr=False)
+    _paths: Dict[int, str] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def handles(self, command_type: str, params: Dict[str, Any] = None) -> bool:
+        """Whether the mirror can answer this command."""
+        if not self.enabled or command_type not in MIRRORED_COMMANDS:
+            return False
+        if command_type == "GET_ALL_SCENE_OBJECTS":
+            return not (params or {}).get("include_transforms")
+        if command_type == "FIND_OBJECTS_BY_NAME":
+            return isinstance((params or {}).get("name"), str)
+        return True
+
+    def needs_sync(self) -> bool:
+        with self._lock:
+            return (self._synced_generation != self._generation
+                    or time.monotonic() - self.synced_at > self.ttl)
+
+    def sync_request(self) -> Tuple[Dict[str, Any], int]:
+        """GET_SCENE_CHANGES params and the token to pass to apply()."""
+        with self._lock:
+            return {"since_revision": self.revision, "epoch": self.epoch}, self._generation
+
+    def apply(self, changes: Dict[str, Any], token: int) -> bool:
+        """Merge a GET_SCENE_CHANGES reply; stale replies are ignored."""
+        with self._lock:
+            full = bool(changes.get("full"))
+            revision = int(changes.get("revision", -1))
+            if not full and (changes.get("epoch") != self.epoch or revision < self.revision):
+                return False
+            if full:
+                self._objects.clear()
+                self._by_name.clear()
+            for object_id in changes.get("removed", []):
+                self._remove(object_id)
+            for obj in changes.get("objects", []):
+                self._remove(obj["id"])
+                self._objects[obj["id"]] = obj
+                self._by_name.setdefault(obj["name"], set()).add(obj["id"])
+            self._paths.clear()
+            self.epoch = changes.get("epoch")
+            self.revision = revision
+            self.active_scene = changes.get("active_scene", self.active_scene)
+            self.synced_at = time.monotonic()
+            # A command sent while this sync was in flight may not be reflected yet
+            self._synced_generation = token
+        if full or changes.get("objects") or changes.get("removed"):
+            logger.debug(f"Scene mirror at revision {revision}: {len(changes.get('objects', []))} changed, "
+                         f"{len(changes.get('removed', []))} removed")
+        return True
+
+    def note_command(self, command_type: str, params: Dict[str, Any] = None):
+        """Mark the mirror stale ahead of a command that may change the hierarchy."""
+        if self.enabled and not is_read_only(command_type, params):
+            with self._lock:
+                self._generation += 1
+
+    def disable(self, reason: str):
+        logger.info(f"Scene mirror disabled: {reason}")
+        self.enabled = False
+
+    def answer(self, command_type: str, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Answer a mirrored command, or None when the mirror has never been synced."""
+        with self._lock:
+            if self.revision < 0:
+                return None
+            if command_type == "FIND_OBJECTS_BY_NAME":
+                return {"objects": self._find_by_name(params["name"])}
+            if command_type == "GET_HIERARCHY":
+                return {"hierarchy": self._hierarchy()}
+            if command_type == "GET_ALL_SCENE_OBJECTS":
+                objects = [{
+                    "name": obj["name"],
+                    "path": self._path(object_id),
+                    "active": obj["active"],
+                    "tag": obj["tag"],
+                    "layer": obj["layer"],
+                    "components": obj["components"]
+                } for object_id, obj in self._objects.items()]
+                return {"objects": objects, "count": len(objects)}
+        return None
+
+    def exists(self, name: str) -> bool:
+        """Whether an active object is named exactly `name` as of the last sync."""
+        with self._lock:
+            return any(self._objects[object_id]["activeInHierarchy"] for object_id in self._by_name.get(name, ()))
+
+    def _remove(self, object_id: int):
+        obj = self._objects.pop(object_id, None)
+        if obj is not None:
+            ids = self._by_name.get(obj["name"])
+            if ids is not None:
+                ids.discard(object_id)
+                if not ids:
+                    del self._by_name[obj["name"]]
+
+    def _path(self, object_id: int) -> str:
+        path = self._paths.get(object_id)
+        if path is None:
+            obj = self._objects[object_id]
+            parent = obj.get("parent") or 0
+            path = obj["name"] if parent not in self._objects else f"{self._path(parent)}/{obj['name']}"
+            self._paths[object_id] = path
+        return path
+
+    def _find_by_name(self, name: str) -> List[Dict[str, Any]]:
+        # Same semantics as the bridge: active objects whose name contains `name`
+        return [{"name": object_name, "path": self._path(object_id)}
+                for object_name, ids in self._by_name.items() if name in object_name
+                for object_id in ids if self._objects[object_id]["activeInHierarchy"]]
+
+    def _hierarchy(self) -> List[Dict[str, Any]]:
+        children: Dict[int, List[int]] = {}
+        for object_id, obj in self._objects.items():
+            if obj["scene"] == self.active_scene:
+                children.setdefault(obj.get("parent") or 0, []).append(object_id)
+        for ids in children.values():
+            ids.sort(key=lambda object_id: self._objects[object_id]["sibling"])
+
+        def node(object_id: int) -> Dict[str, Any]:
+            return {"name": self._objects[object_id]["name"],
+                    "children": [node(child) for child in children.get(object_id, [])]}
+        return [node(object_id) for object_id in children.get(0, [])]
+
+# Global hierarchy mirror shared by the sync and async connections
+scene_mirror = SceneMirror()
@@ -1,11 +1,17 @@
+import time
+_import_started = time.perf_counter()
 from mcp.server.fastmcp import FastMCP, Context, Image
+import asyncio
+import json
 import logging
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Dict, Any, List
 from config import config
-from tools import register_all_tools
-from unity_connection import get_unity_connection, UnityConnection
+from tools.lazy_tools import register_tools, startup_profile
+from async_unity_connection import get_async_unity_connection, AsyncUnityConnection
+from command_metrics import command_metrics
+startup_profile["server_imports_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
 
 # Configure logging using settings from config
 logging.basicConfig(
@@ -15,24 +21,38 @@ logging.basicConfig(
 logger = logging.getLogger("UnityMCP")
 
 # Global connection state
-_unity_connection: UnityConnection = None
+_unity_connection: AsyncUnityConnection = None
 
-@asynccontextmanager
-async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
-    """Handle server startup and shutdown."""
+async def _connect_on_startup():
+    """Connect to Unity without holding up the MCP handshake; tool calls made meanwhile wait for it."""
     global _unity_connection
-    logger.info("UnityMCP server starting up")
+    started = time.perf_counter()
     try:
-        _unity_connection = get_unity_connection()
+        _unity_connection = await get_async_unity_connection()
         logger.info("Connected to Unity on startup")
     except Exception as e:
         logger.warning(f"Could not connect to Unity on startup: {str(e)}")
         _unity_connection = None
+    startup_profile["unity_connect_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    startup_profile["unity_connected"] = _unity_connection is not None
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
+    """Handle server startup and shutdown."""
+    global _unity_connection
+    logger.info("UnityMCP server starting up")
+    connect_task = asyncio.create_task(_connect_on_startup())
     try:
         yield {}
     finally:
+        if not connect_task.done():
+            connect_task.cancel()
+            try:
+                await connect_task
+            except asyncio.CancelledError:
+                pass
         if _unity_connection:
-            _unity_connection.disconnect()
+            await _unity_connection.disconnect()
             _unity_connection = None
         logger.info("UnityMCP server shut down")
 
@@ -43,8 +63,19 @@ mcp = FastMCP(
     lifespan=server_lifespan
 )
 
-# Register all tools
-register_all_tools(mcp)
+# Register all tools, from the tool manifest when it is current so tool modules load on first call
+register_tools(mcp)
+startup_profile["startup_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
+
+@mcp.resource("unity://metrics", mime_type="application/json")
+def unity_metrics() -> str:
+    """Per-command latency, payload size, timeout and reconnect statistics for the Unity bridge."""
+    return json.dumps(command_metrics.snapshot(), ensure_ascii=False, indent=2)
+
+@mcp.resource("unity://startup", mime_type="application/json")
+def unity_startup() -> str:
+    """Server startup timings: imports, tool registration mode, tool modules loaded so far and the Unity connect."""
+    return json.dumps(startup_profile, ensure_ascii=False, indent=2)
 
 # Asset Creation Strategy
 
@@ -1,33 +1,37 @@
-from .scene_tools import register_scene_tools
-from .script_tools import register_script_tools
-from .material_tools import register_material_tools
-from .editor_tools import register_editor_tools
-from .asset_tools import register_asset_tools
-from .object_tools import register_object_tools
-from .generate_tools import register_generate_tools
-from .animation_tools import register_animation_tools
-from .nodegraph_tool import register_nodegraph_tools
-from .ui_tools import register_ui_tools
-from .node_tools import register_node_tools
-from .event_tools import register_event_tools
-from .eveo_tools import register_eveo_tools
-# from .generate_model_tools import generate_3d_model
-#from .ui_tools import register_ui_tools
+import importlib
+
+# Tool modules and their register functions, in registration order. Modules are
+# imported on demand so lazy registration (tools/lazy_tools.py) can skip them.
+TOOL_MODULES = [
+    ("scene_tools", "register_scene_tools"),
+    ("script_tools", "register_script_tools"),
+    ("material_tools", "register_material_tools"),
+    ("editor_tools", "register_editor_tools"),
+    ("asset_tools", "register_asset_tools"),
+    ("object_tools", "register_object_tools"),
+    ("generate_tools", "register_generate_tools"),
+    ("animation_tools", "register_animation_tools"),
+    ("nodegraph_tool", "register_nodegraph_tools"),
+    ("ui_tools", "register_ui_tools"),
+    ("node_tools", "register_node_tools"),
+    ("event_tools", "register_event_tools"),
+    ("eveo_tools", "register_eveo_tools"),
+    # ("generate_model_tools", "generate_3d_model"),
+]
+
+def get_registrar(module: str):
+    """Import a tool module and return its register function."""
+    function = dict(TOOL_MODULES)[module]
+    return getattr(importlib.import_module(f".{module}", __name__), function)
 
 def register_all_tools(mcp):
     """Register all tools with the MCP server."""
-    register_scene_tools(mcp)
-    register_script_tools(mcp)
-    register_material_tools(mcp)
-    register_editor_tools(mcp)
-    register_asset_tools(mcp)
-    register_object_tools(mcp)
-    register_generate_tools(mcp)
-    register_animation_tools(mcp)
-    register_nodegraph_tools(mcp)
-    register_ui_tools(mcp)
-    register_node_tools(mcp)
-    register_event_tools(mcp)
-    register_eveo_tools(mcp)
-    # generate_3d_model(mcp)
-    #register_ui_tools(mcp)  # Add this line
+    for module, _ in TOOL_MODULES:
+        get_registrar(module)(mcp)
+
+def __getattr__(name):
+    # Keeps `from tools import register_scene_tools` working without importing every module up front
+    for module, function in TOOL_MODULES:
+        if function == name:
+            return get_registrar(module)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
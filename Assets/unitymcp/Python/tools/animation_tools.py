@@ -1,10 +1,31 @@
 from mcp.server.fastmcp import FastMCP, Context
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
 import re
-from unity_connection import get_unity_connection
+import copy
+import time
+import asyncio
+import inspect
+import logging
+import numpy as np
+from async_unity_connection import get_async_unity_connection, send_unity_command
+from editor_pool import editor_pool
+from scene_cache import SceneCache
+from .nodegraph_tool import get_flow_event_nodes, NodeGraphEditSession, clean_path
+from .camera_solver import solve_camera_poses
+from .keyframe_engine import (
+    PATH_TYPES, keyframes_to_array, fill_missing_times, validate_keyframes,
+    sample_path, resample_by_arc_length, reduce_keyframes, encode_keyframe_buffer
+)
+from .clip2_templates import CLIP2_TEMPLATES, evaluate_template
+from .obstacle_planner import ObstacleIndex, plan_avoidance, check_track_clearance
+from .timeline_parser import parse_description, parse_timeline_parameters
+from .timeline_writer import combined_timeline_spec, write_combined_timelines
+from .unity_yaml import resolve_asset_path
 import math
 
+logger = logging.getLogger("UnityMCP")
+
 # CLIP2函数注册字典
 CLIP2_FUNCTIONS = {
     "pour_liquid": None,
@@ -16,6 +37,193 @@ CLIP2_FUNCTIONS = {
     "camera_focus_only": None  # 新增：纯相机聚焦，无物体动画
 }
 
+async def get_objects_info(object_names: List[str]) -> List[Dict[str, Any]]:
+    """
+    通过一次BATCH请求获取多个物体的信息
+    
+    参数：
+        object_names: 物体名称列表
+        
+    返回值：
+        List[Dict]: 与object_names一一对应的GET_OBJECT_INFO结果，获取失败的项为{"success": False, "message": 错误信息}
+    """
+    unity = await get_async_unity_connection()
+    responses = await unity.send_batch(
+        [{"type": "GET_OBJECT_INFO", "params": {"name": name}} for name in object_names]
+    )
+    return [
+        response.get("result", {}) if response.get("status") == "success"
+        else {"success": False, "message": response.get("error", "未知错误")}
+        for response in responses
+    ]
+
+async def auto_position_cameras(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    在本地批量求解AUTO_POSITION_CAMERA_TO_OBJECTS请求（只计算，不应用到相机）
+    
+    所有请求涉及的物体信息通过一次BATCH请求获取（通常由场景缓存直接返回），
+    然后由camera_solver一次计算全部相机位置
+    
+    参数：
+        requests: AUTO_POSITION_CAMERA_TO_OBJECTS参数列表（object_names、fov、pitch_angle、padding）
+        
+    返回值：
+        List[Dict]: 与requests一一对应、与Unity返回格式相同的结果
+    """
+    object_names = list(dict.fromkeys(name for request in requests for name in request.get("object_names") or []))
+    object_infos = dict(zip(object_names, await get_objects_info(object_names)))
+    return solve_camera_poses(requests, object_infos)
+
+# 障碍物索引，按场景缓存（每个Unity编辑器一个）及其场景版本缓存: {id(cache): (cache, revision, ObstacleIndex)}
+_obstacle_indexes: Dict[int, Tuple[SceneCache, int, ObstacleIndex]] = {}
+
+async def get_obstacle_index() -> ObstacleIndex:
+    """
+    获取当前Unity编辑器（编辑器池任务中为固定的编辑器）场景碰撞体的障碍物索引，场景未修改时直接复用
+    
+    返回值：
+        ObstacleIndex: 障碍物索引
+    """
+    unity = await get_async_unity_connection()
+    cache = unity.cache
+    entry = _obstacle_indexes.get(id(cache))
+    if entry is not None and entry[0] is cache and entry[1] == cache.revision:
+        return entry[2]
+    revision = cache.revision
+    response = await unity.send_command("GET_ALL_SCENE_OBJECTS", {"include_transforms": True})
+    objects = response.get("objects", [])
+    index = ObstacleIndex.from_scene_objects(objects)
+    cache.prime(objects, revision)  # 同一份数据顺便预热该编辑器的物体信息缓存
+    _obstacle_indexes[id(cache)] = (cache, revision, index)
+    return index
+
+# 按场景计算抬升高度时的最低抬升（米），避免物体贴着桌面滑动
+MIN_SCENE_LIFT = 0.1
+
+def _lift_keyframes(keyframes: List[Dict[str, Any]], lift_rows: List[int], offset: float) -> List[Dict[str, Any]]:
+    return [
+        {**keyframe, "position": {**keyframe["position"], "y": keyframe["position"]["y"] + offset}} if row in lift_rows else keyframe
+        for row, keyframe in enumerate(keyframes)
+    ]
+
+async def fit_keyframe_lift(
+    keyframes: List[Dict[str, Any]],
+    object_name: str,
+    object_info: Dict[str, Any],
+    lift_rows: List[int],
+    current_lift: float,
+    ignore_objects: Optional[List[str]] = None,
+    min_lift: float = MIN_SCENE_LIFT
+) -> List[Dict[str, Any]]:
+    """
+    将关键帧中固定的防穿模抬升高度替换为按场景计算的最小抬升高度
+
+    lift_rows中的关键帧当前按current_lift抬升：先降到min_lift，用check_track_clearance检测轨道，
+    再加上避开所有障碍物所需的最小抬升。物体包围盒或障碍物索引不可用、或抬升无法避开障碍物时保留原关键帧。
+
+    参数：
+        keyframes: 关键帧列表（第一个关键帧为物体当前姿态）
+        object_name: 移动物体名称
+        object_info: 移动物体的GET_OBJECT_INFO结果
+        lift_rows: 抬升关键帧的序号
+        current_lift: 关键帧中当前使用的抬升高度
+        ignore_objects: 不参与检测的物体（如目标容器）
+        min_lift: 最低抬升高度
+
+    返回值：
+        List[Dict]: 调整后的关键帧
+    """
+    bounds = object_info.get("bounds") or {}
+    box = next((item for item in (bounds.get("collider"), bounds.get("renderer")) if item and item.get("exists")), None)
+    if box is None or not keyframes:
+        return keyframes
+    try:
+        obstacle_index = await get_obstacle_index()
+    except Exception as e:
+        logger.warning(f"障碍物索引不可用，使用默认抬升高度{current_lift}米: {str(e)}")
+        return keyframes
+
+    baseline = _lift_keyframes(keyframes, lift_rows, min_lift - current_lift)
+    result = check_track_clearance(
+        keyframes_to_array(baseline), box["min"], box["max"], obstacle_index,
+        obstacle_index.select(exclude=[object_name, *(ignore_objects or [])]), lift_rows
+    )
+    if result["lift"] is None:
+        logger.warning(f"抬升无法避开障碍物，使用默认抬升高度{current_lift}米")
+        return keyframes
+    logger.debug(f"按场景计算的抬升高度: {min_lift + result['lift']:.3f}米（默认{current_lift}米）")
+    return _lift_keyframes(baseline, lift_rows, result["lift"])
+
+async def check_animation_clearance(
+    ctx: Context,
+    object_name: str,
+    keyframes: List[Dict[str, Any]],
+    lift_keyframe_indices: Optional[List[int]] = None,
+    ignore_objects: Optional[List[str]] = None,
+    sample_rate: float = 60.0,
+    clearance: float = 0.02
+) -> Dict[str, Any]:
+    """
+    检测物体沿关键帧轨道运动时与场景碰撞体的碰撞，并计算避开碰撞所需的最小抬升高度
+
+    物体包围盒按轨道曲线采样后扫掠，与场景障碍物的AABB批量求交；起点和终点已接触的物体（如桌面）不计为碰撞。
+
+    参数：
+        ctx: MCP上下文
+        object_name: 移动物体名称，第一个关键帧应为物体当前姿态
+        keyframes: 关键帧列表，每项包含time、position和可选的rotation
+        lift_keyframe_indices: 可以抬升的关键帧序号，默认除首尾外全部关键帧
+        ignore_objects: 不参与检测的物体（如目标容器）
+        sample_rate: 每秒采样次数
+        clearance: 安全间隙（米）
+
+    返回值：
+        Dict[str, Any]: 碰撞列表（物体及起止时间）、最小抬升高度（无法避开时为None）
+    """
+    try:
+        if len(keyframes) < 2:
+            return {"success": False, "error": "至少需要2个关键帧"}
+        (object_info,) = await get_objects_info([object_name])
+        if not object_info.get("success", False):
+            return {"success": False, "error": f"获取物体信息失败: {object_info.get('message', '未知错误')}"}
+        bounds = object_info.get("bounds") or {}
+        box = next((item for item in (bounds.get("collider"), bounds.get("renderer")) if item and item.get("exists")), None)
+        if box is None:
+            return {"success": False, "error": f"物体'{object_name}'没有可用的包围盒"}
+
+        obstacle_index = await get_obstacle_index()
+        if lift_keyframe_indices is None:
+            lift_keyframe_indices = list(range(1, len(keyframes) - 1))
+        result = check_track_clearance(
+            keyframes_to_array(keyframes), box["min"], box["max"], obstacle_index,
+            obstacle_index.select(exclude=[object_name, *(ignore_objects or [])]), lift_keyframe_indices,
+            sample_rate=sample_rate, clearance=clearance
+        )
+        return {"success": True, "clear": not result["collisions"], **result}
+    except Exception as e:
+        return {"success": False, "error": f"检测轨道碰撞时出错: {str(e)}"}
+
+def format_keyframe_reduction(original: int, kept: int) -> str:
+    """关键帧精简结果说明"""
+    return f"关键帧精简: {original} -> {kept}，减少{original - kept}个关键帧"
+
+def reduce_clip_keyframes(keyframes: List[Dict[str, Any]], position_tolerance: float = 0.001, rotation_tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    精简clip2关键帧列表，保留的关键帧保持原样（不经过float32转换）
+
+    参数：
+        keyframes: CLIP2_FUNCTIONS返回的关键帧列表
+        position_tolerance: 位置容差（米）
+        rotation_tolerance: 旋转容差（度）
+
+    返回值：
+        List[Dict]: 保留的关键帧
+    """
+    if not keyframes or len(keyframes) < 3:
+        return keyframes
+    keep = reduce_keyframes(keyframes_to_array(keyframes), position_tolerance, rotation_tolerance)
+    return [keyframe for keyframe, kept in zip(keyframes, keep) if kept]
+
 def register_animation_tools(mcp):
     """注册动画相关工具"""
     
@@ -33,17 +241,21 @@ def register_animation_tools(mcp):
     # 新增复合timeline生成函数
     mcp.tool()(generate_separate_timelines)
     mcp.tool()(generate_combined_timeline)
+    mcp.tool()(generate_course_timelines)
+    mcp.tool()(generate_courses_timelines)
+    mcp.tool()(precompute_camera_poses)
     mcp.tool()(parse_timeline_description)
     
     # 新增智能避障便捷函数
     mcp.tool()(create_smart_movement_animation)
     mcp.tool()(create_safe_camera_movement)
+    mcp.tool()(check_animation_clearance)
     # mcp.tool()(create_movement_clip)
     # mcp.tool()(create_multipoint_clip)
     # mcp.tool()(rotate_around_target_clip)
     # mcp.tool()(create_timeline_with_clips)
 
-def create_movement_animation(
+async def create_movement_animation(
     ctx: Context,
     name: str,
     points: Optional[List[Dict[str, Any]]] = None,
@@ -64,7 +276,11 @@ def create_movement_animation(
     avoidance_height: float = 2.0,  # 避障时的额外高度
     obstacle_layers: Optional[List[str]] = None,  # 要检测的障碍物层级
     max_avoidance_attempts: int = 3,  # 最大避障尝试次数
-    timeline_folder: str = "Assets/Timeline"  # 新增：timeline保存路径，默认为"Assets/Timeline"
+    timeline_folder: str = "Assets/Timeline",  # 新增：timeline保存路径，默认为"Assets/Timeline"
+    arc_length_samples: int = 0,  # 按弧长重采样的关键帧数量，0表示不重采样
+    constant_speed: bool = False,  # 重采样时是否按弧长均匀分配时间
+    position_tolerance: float = 0.001,  # 关键帧精简的位置容差（米）
+    rotation_tolerance: float = 0.1  # 关键帧精简的旋转容差（度）
 ) -> str:
     """⚠️ 重要提醒：timeline_folder参数必须进行配置！
     请根据课程名称设置自定义路径，如"Assets/{课程名称}/Timeline"。
@@ -107,15 +323,19 @@ def create_movement_animation(
         timeline_asset_name: Timeline资产名称
         include_rotation: 是否包含旋转动画
         keyframes: 多点关键帧数组，每个关键帧包含time和position/rotation（向后兼容）
-        path_type: 路径类型，可选值："linear"（线性）, "curve"（曲线）, "bezier"（贝塞尔曲线）
+        path_type: 路径类型，可选值："linear"（线性）, "curve"（曲线）, "bezier"（贝塞尔曲线）, "catmull_rom"（经过所有点的平滑曲线）
         move_to_start: 是否在timeline开始前将物体从当前位置移动到动画起始位置
         return_to_origin: 是否在timeline结束后将物体从结束位置移回原始位置
-        enable_obstacle_avoidance: 是否启用避障功能
+        enable_obstacle_avoidance: 是否启用避障功能（在本地按场景碰撞体规划避障后再进行路径插值）
         obstacle_detection_radius: 障碍物检测半径（米）
         avoidance_height: 避障时的额外高度（米）
         obstacle_layers: 要检测的障碍物层级名称列表，如["Default", "Obstacle"]
         max_avoidance_attempts: 最大避障尝试次数
         timeline_folder: 【必须配置】timeline保存路径，必须根据课程名称设置，如"Assets/课程名称/Timeline"
+        arc_length_samples: 路径采样后按弧长等距重采样的关键帧数量，0表示不重采样
+        constant_speed: 重采样时是否按弧长均匀分配时间（匀速运动）
+        position_tolerance: 关键帧精简的位置容差（米），去掉在容差内可由相邻关键帧重建的关键帧
+        rotation_tolerance: 关键帧精简的旋转容差（度）
 
     返回值：
         str: 成功消息或错误详情
@@ -228,17 +448,52 @@ def create_movement_animation(
                 "z": float(end_rotation.get("z", 0.0))
             }
 
+        local_avoidance = None
+        reduction = None
         if processed_keyframes is not None:
-            command_params["keyframes"] = processed_keyframes
+            # 关键帧在本地转换为数组，完成路径采样后以keyframe_buffer发送
+            keyframe_array = keyframes_to_array(processed_keyframes)
+            problems = validate_keyframes(keyframe_array)
+            if problems:
+                return f"关键帧数据无效: {'; '.join(problems)}"
+            if path_type not in PATH_TYPES:
+                return f"不支持的路径类型: {path_type}，可选值: {', '.join(PATH_TYPES)}"
+            if enable_obstacle_avoidance:
+                # 在本地按障碍物索引规划避障，索引不可用时仍由Unity执行避障
+                try:
+                    obstacle_index = await get_obstacle_index()
+                except Exception as e:
+                    logger.warning(f"本地障碍物索引不可用，由Unity执行避障: {str(e)}")
+                else:
+                    keyframe_array, *local_avoidance = plan_avoidance(
+                        keyframe_array,
+                        obstacle_index,
+                        obstacle_index.select(command_params["obstacle_layers"], exclude=name),
+                        obstacle_detection_radius,
+                        avoidance_height,
+                        max_avoidance_attempts
+                    )
+                    command_params["enable_obstacle_avoidance"] = False
+            if not command_params["enable_obstacle_avoidance"]:
+                keyframe_array = sample_path(keyframe_array, path_type)
+                if arc_length_samples > 0:
+                    keyframe_array = resample_by_arc_length(keyframe_array, arc_length_samples, constant_speed)
+                keep = reduce_keyframes(keyframe_array, position_tolerance, rotation_tolerance)
+                reduction = (len(keyframe_array), int(keep.sum()))
+                keyframe_array = keyframe_array[keep]
+                command_params["path_type"] = "linear"  # 已在本地完成插值
+            command_params["keyframe_buffer"] = encode_keyframe_buffer(keyframe_array)
 
         # 发送命令到Unity
-        response = get_unity_connection().send_command("CREATE_MOVEMENT_ANIMATION", command_params)
+        response = await send_unity_command("CREATE_MOVEMENT_ANIMATION", command_params)
 
         # 处理返回结果
         success = response.get("success", False)
         message = response.get("message", "未知状态")
         obstacles_detected = response.get("obstacles_detected", 0)
         avoidance_applied = response.get("avoidance_applied", False)
+        if local_avoidance is not None:
+            obstacles_detected, avoidance_applied = local_avoidance
 
         if success:
             result_message = message
@@ -248,6 +503,8 @@ def create_movement_animation(
                     result_message += "，已应用避障路径"
                 else:
                     result_message += "，未需要避障"
+            if reduction is not None:
+                result_message += f"\n{format_keyframe_reduction(*reduction)}"
             return result_message
         else:
             return f"创建动画失败: {message}"
@@ -258,7 +515,7 @@ def create_movement_animation(
 
 
 
-def create_multipoint_animation(
+async def create_multipoint_animation(
         ctx: Context,
         name: str,
         points: List[Dict[str, Any]],
@@ -274,7 +531,11 @@ def create_multipoint_animation(
         avoidance_height: float = 2.0,
         obstacle_layers: Optional[List[str]] = None,
         max_avoidance_attempts: int = 3,
-        timeline_folder: str = "Assets/Timeline"  # 新增：timeline保存路径，默认为"Assets/Timeline"
+        timeline_folder: str = "Assets/Timeline",  # 新增：timeline保存路径，默认为"Assets/Timeline"
+        arc_length_samples: int = 0,  # 按弧长重采样的关键帧数量，0表示不重采样
+        constant_speed: bool = False,  # 重采样时是否按弧长均匀分配时间
+        position_tolerance: float = 0.001,  # 关键帧精简的位置容差（米）
+        rotation_tolerance: float = 0.1  # 关键帧精简的旋转容差（度）
 ) -> str:
     """创建多点路径动画，可以指定多个路径点。
 
@@ -293,7 +554,7 @@ def create_multipoint_animation(
         duration: 整个动画的持续时间（秒）
         timeline_asset_name: Timeline资产名称
         include_rotation: 是否包含旋转动画
-        path_type: 路径类型，可选值："linear", "curve", "bezier"
+        path_type: 路径类型，可选值："linear", "curve", "bezier", "catmull_rom"
         move_to_start: 是否在timeline开始前将物体从当前位置移动到动画起始位置
         return_to_origin: 是否在timeline结束后将物体从结束位置移回原始位置
         enable_obstacle_avoidance: 是否启用避障功能
@@ -302,6 +563,10 @@ def create_multipoint_animation(
         obstacle_layers: 要检测的障碍物层级名称列表
         max_avoidance_attempts: 最大避障尝试次数
         timeline_folder: timeline保存路径，默认为"Assets/Timeline"，必须配置！
+        arc_length_samples: 按弧长等距重采样的关键帧数量（适合长距离相机飞行），0表示不重采样
+        constant_speed: 重采样时是否按弧长均匀分配时间（匀速运动）
+        position_tolerance: 关键帧精简的位置容差（米），去掉在容差内可由相邻关键帧重建的关键帧
+        rotation_tolerance: 关键帧精简的旋转容差（度）
 
     返回值：
         str: 成功消息或错误详情
@@ -311,95 +576,14 @@ def create_multipoint_animation(
         if not points or len(points) < 2:
             return "创建多点动画需要至少两个路径点"
         
-        # 对没有指定时间的点进行时间分配
-        points_with_time = []
-        points_without_time = []
-        
-        # 首先收集有时间和没时间的点
-        for point in points:
-            if "time" in point:
-                points_with_time.append(point)
-            else:
-                points_without_time.append(point)
-        
-        # 如果没有任何点有时间，均匀分配时间
-        if not points_with_time:
-            for i, point in enumerate(points):
-                point_copy = point.copy()
-                point_copy["time"] = duration * i / (len(points) - 1)
-                points_with_time.append(point_copy)
-        else:
-            # 如果有些点有时间，需要为其他点插值时间
-            # 首先排序已有时间的点
-            points_with_time.sort(key=lambda p: p["time"])
-            
-            # 确保第一个和最后一个点有时间
-            if points[0] not in points_with_time:
-                points[0]["time"] = 0.0
-                points_with_time.insert(0, points[0])
-            
-            if points[-1] not in points_with_time:
-                points[-1]["time"] = duration
-                points_with_time.append(points[-1])
-            
-            # 为中间没有时间的点插值时间
-            final_points = points_with_time.copy()
-            for point in points_without_time:
-                if point in points_with_time:
-                    continue
-                    
-                # 找到此点在原始点列表中的位置
-                original_index = points.index(point)
-                
-                # 找到前后有时间的点
-                prev_time_point = None
-                next_time_point = None
-                prev_idx = original_index - 1
-                next_idx = original_index + 1
-                
-                while prev_idx >= 0 and prev_time_point is None:
-                    if points[prev_idx] in points_with_time:
-                        for p in points_with_time:
-                            if p == points[prev_idx]:
-                                prev_time_point = p
-                                break
-                    prev_idx -= 1
-                    
-                while next_idx < len(points) and next_time_point is None:
-                    if points[next_idx] in points_with_time:
-                        for p in points_with_time:
-                            if p == points[next_idx]:
-                                next_time_point = p
-                                break
-                    next_idx += 1
-                
-                # 根据前后点的时间插值
-                if prev_time_point and next_time_point:
-                    prev_time = prev_time_point["time"]
-                    next_time = next_time_point["time"]
-                    prev_index = points.index(prev_time_point)
-                    next_index = points.index(next_time_point)
-                    
-                    # 计算当前点在前后两点之间的相对位置
-                    if next_index > prev_index:
-                        ratio = (original_index - prev_index) / (next_index - prev_index)
-                        point_copy = point.copy()
-                        point_copy["time"] = prev_time + ratio * (next_time - prev_time)
-                        final_points.append(point_copy)
-                
-            # 确保所有点时间在0到duration之间
-            for point in final_points:
-                if point["time"] < 0:
-                    point["time"] = 0
-                elif point["time"] > duration:
-                    point["time"] = duration
-            
-            # 按时间排序
-            final_points.sort(key=lambda p: p["time"])
-            points_with_time = final_points
+        # 对没有指定时间的点按序号在前后有时间的点之间插值，并按时间排序
+        times = fill_missing_times(
+            [point["time"] if point.get("time") is not None else np.nan for point in points], duration
+        )
+        points_with_time = [{**points[i], "time": float(times[i])} for i in np.argsort(times, kind="stable")]
         
         # 调用修改后的create_movement_animation
-        return create_movement_animation(
+        return await create_movement_animation(
             ctx=ctx,
             name=name,
             points=points_with_time,
@@ -414,7 +598,11 @@ def create_multipoint_animation(
             avoidance_height=avoidance_height,
             obstacle_layers=obstacle_layers,
             max_avoidance_attempts=max_avoidance_attempts,
-            timeline_folder=timeline_folder
+            timeline_folder=timeline_folder,
+            arc_length_samples=arc_length_samples,
+            constant_speed=constant_speed,
+            position_tolerance=position_tolerance,
+            rotation_tolerance=rotation_tolerance
         )
 
     except Exception as e:
@@ -422,7 +610,7 @@ def create_multipoint_animation(
 
 
 
-def rotate_around_target_animation(
+async def rotate_around_target_animation(
         ctx: Context,
         moving_object_name: str,
         target_object_name: str,
@@ -458,8 +646,11 @@ def rotate_around_target_animation(
         str: 成功消息或错误详情
     """
     try:
-        # 获取目标物体的信息
-        target_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": target_object_name})
+        # 并发获取目标物体和移动物体的信息
+        target_info, moving_object_info = await asyncio.gather(
+            send_unity_command("GET_OBJECT_INFO", {"name": target_object_name}),
+            send_unity_command("GET_OBJECT_INFO", {"name": moving_object_name})
+        )
         if not target_info.get("success", False):
             return f"获取目标物体信息失败: {target_info.get('message', '未知错误')}"
 
@@ -470,8 +661,7 @@ def rotate_around_target_animation(
             "z": target_info["position"][2]
         }
 
-        # 获取移动物体的信息（仅用于获取初始旋转）
-        moving_object_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": moving_object_name})
+        # 移动物体的信息仅用于获取初始旋转
         if not moving_object_info.get("success", False):
             return f"获取移动物体信息失败: {moving_object_info.get('message', '未知错误')}"
         
@@ -504,7 +694,7 @@ def rotate_around_target_animation(
             points.append(point)
 
         # 调用 create_movement_animation 创建动画
-        return create_movement_animation(
+        return await create_movement_animation(
             ctx=ctx,
             name=moving_object_name,
             points=points,
@@ -522,7 +712,7 @@ def rotate_around_target_animation(
     
 
 # 创建相机360度环视动画，相机将在原地旋转一周，可调整俯仰角。
-def camera_panorama_animation(
+async def camera_panorama_animation(
         ctx: Context,
         camera_name: str = "Main Camera",
         pitch_angle: float = -20.0,  # 俯仰角度，正值向上，负值向下
@@ -552,7 +742,7 @@ def camera_panorama_animation(
     """
     try:
         # 获取相机信息
-        camera_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": camera_name})
+        camera_info = await send_unity_command("GET_OBJECT_INFO", {"name": camera_name})
         if not camera_info.get("success", False):
             return f"获取相机信息失败: {camera_info.get('message', '未知错误')}"
 
@@ -590,7 +780,7 @@ def camera_panorama_animation(
             points.append(point)
 
         # 调用create_movement_animation创建动画
-        return create_movement_animation(
+        return await create_movement_animation(
             ctx=ctx,
             name=camera_name,
             points=points,
@@ -608,7 +798,7 @@ def camera_panorama_animation(
 
 
 # 创建相机扫视动画，相机将从左前方扫视到右前方，然后回到正前方，可调整俯仰角和扫视角度。
-def camera_sweep_animation(
+async def camera_sweep_animation(
         ctx: Context,
         camera_name: str = "Main Camera",
         pitch_angle: float = 0.0,  # 俯仰角度，正值向上看，负值向下看
@@ -618,7 +808,8 @@ def camera_sweep_animation(
         steps: int = 18,  # 每段路径的分段数量，值越大越平滑
         move_to_start: bool = True,  # 是否在timeline开始前将相机从当前位置移动到动画起始位置
         return_to_origin: bool = False,  # 是否在timeline结束后将相机从结束位置移回原始位置
-        timeline_folder: str = "Assets/Timeline"  # 新增：timeline保存路径，默认为"Assets/Timeline"
+        timeline_folder: str = "Assets/Timeline",  # 新增：timeline保存路径，默认为"Assets/Timeline"
+        target_object_name: str = None  # 新增：扫视前先取景的物体（支持逗号分隔的多个物体）
 ) -> str:
     """
     创建相机扫视动画，相机将从左前方扫视到右前方，然后回到正前方，可调整俯仰角和扫视角度。
@@ -633,16 +824,28 @@ def camera_sweep_animation(
         steps: 每段路径的分段数量，值越大动画越平滑
         move_to_start: 是否在timeline开始前将相机从当前位置移动到动画起始位置
         return_to_origin: 是否在timeline结束后将相机从结束位置移回原始位置
+        target_object_name: 扫视位置的取景物体（可选），提供时相机在本地按AutoPositionCameraToObjects算法
+                            计算的取景位置扫视，俯仰角使用取景结果（30-40度）
 
     返回值：
         str: 成功消息或错误详情
     """
     try:
         # 获取相机信息
-        camera_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": camera_name})
+        camera_info = await send_unity_command("GET_OBJECT_INFO", {"name": camera_name})
         if not camera_info.get("success", False):
             return f"获取相机信息失败: {camera_info.get('message', '未知错误')}"
 
+        if target_object_name:
+            focus_pose, = await auto_position_cameras([{
+                "object_names": get_focus_object_list(target_object_name)
+            }])
+            if not focus_pose.get("success", False):
+                return f"计算取景位置失败: {focus_pose.get('message', '未知错误')}"
+            camera_info["position"] = focus_pose["adjustedCamera"]["position"]
+            camera_info["rotation"] = focus_pose["adjustedCamera"]["rotation"]
+            pitch_angle = camera_info["rotation"][0]
+
         # 提取相机当前位置和旋转信息
         camera_position = {
             "x": camera_info["position"][0],
@@ -726,7 +929,7 @@ def camera_sweep_animation(
             points.append(point)
 
         # 调用create_movement_animation创建动画
-        return create_movement_animation(
+        return await create_movement_animation(
             ctx=ctx,
             name=camera_name,
             points=points,
@@ -744,7 +947,7 @@ def camera_sweep_animation(
 
 
 # 创建相机特写动画，镜头从原位置移动到目标物体周围进行特写，然后回到原始位置。
-def camera_closeup_animation(
+async def camera_closeup_animation(
     ctx: Context,
     camera_name: str = "Main Camera",
     target_object_name: str = None,  # 支持单个物体名称或逗号分隔的多个物体名称
@@ -833,8 +1036,8 @@ def camera_closeup_animation(
         if filtered_objects:
             print(f"已过滤的桌子类物体: {filtered_objects}")
         
-        # 获取相机当前信息
-        camera_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": camera_name})
+        # 一次BATCH请求获取相机和所有目标物体的信息
+        camera_info, *target_infos = await get_objects_info([camera_name] + target_objects)
         if not camera_info.get("success", False):
             return f"获取相机信息失败: {camera_info.get('message', '未知错误')}"
 
@@ -857,25 +1060,30 @@ def camera_closeup_animation(
         object_positions = []
         valid_objects = []
         
-        for obj_name in target_objects:
-            print(f"\n计算物体 '{obj_name}' 的最佳观察位置...")
-            
-            # 获取当前物体的详细信息（包含bounds）
-            object_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": obj_name})
+        # 跳过无法获取信息的物体
+        located_objects = []
+        for obj_name, object_info in zip(target_objects, target_infos):
             if not object_info.get("success", False):
                 print(f"警告：无法获取物体 '{obj_name}' 的信息，跳过")
                 continue
-            
-            # 使用AutoPositionCameraToObjects算法计算最佳聚焦位置
-            auto_position_response = get_unity_connection().send_command("AUTO_POSITION_CAMERA_TO_OBJECTS", {
-                "object_names": [obj_name],  # 转换为数组格式
-                "camera_name": camera_name,
-                "fov": 45.0,  # 使用45度FOV
-                "pitch_angle": 35.0,  # 使用35度俯视角
-                "padding": 1.2,  # 使用适中的边距
-                "force_reset_rotation_y": True,
-                "apply_to_camera": False  # 只计算，不应用到相机
-            })
+            located_objects.append(obj_name)
+        
+        # 使用AutoPositionCameraToObjects算法在本地一次计算每个物体的最佳聚焦位置
+        auto_position_responses = solve_camera_poses(
+            [
+                {
+                    "object_names": [obj_name],  # 转换为数组格式
+                    "fov": 45.0,  # 使用45度FOV
+                    "pitch_angle": 35.0,  # 使用35度俯视角
+                    "padding": 1.2  # 使用适中的边距
+                }
+                for obj_name in located_objects
+            ],
+            dict(zip(target_objects, target_infos))
+        )
+        
+        for obj_name, auto_position_response in zip(located_objects, auto_position_responses):
+            print(f"\n计算物体 '{obj_name}' 的最佳观察位置...")
             
             if not auto_position_response.get("success", False):
                 print(f"警告：无法计算物体 '{obj_name}' 的最佳相机位置，跳过")
@@ -1044,7 +1252,7 @@ def camera_closeup_animation(
             print(f"  {i+1}. 位置: ({point['position']['x']:.2f}, {point['position']['y']:.2f}, {point['position']['z']:.2f}) 时间: {point['time']:.2f}s")
         
         # 使用create_multipoint_animation创建动画
-        result = create_multipoint_animation(
+        result = await create_multipoint_animation(
             ctx=ctx,
             name=camera_name,
             points=all_points,
@@ -1066,7 +1274,7 @@ def camera_closeup_animation(
                 timeline_asset_path = f"{timeline_folder}/{timeline_asset_name}.playable"
                 
                 # 调用导入函数
-                import_result = update_flow_event_node_timeline_assets(
+                import_result = await update_flow_event_node_timeline_assets(
                     ctx=ctx,
                     name=nodegraph_name,
                     event_name=flow_event_node_name,
@@ -1088,7 +1296,7 @@ def camera_closeup_animation(
         return f"创建相机特写动画时出错：{str(e)}"
 
 
-def get_timeline_asset_path(
+async def get_timeline_asset_path(
     ctx: Context,
     timeline_name: str,
     search_folder: str = "Assets"
@@ -1105,10 +1313,10 @@ def get_timeline_asset_path(
         str: Timeline资产路径信息或错误详情
     """
     try:
-        unity = get_unity_connection()
+        unity = await get_async_unity_connection()
         
         # 发送命令到Unity
-        response = unity.send_command("GET_TIMELINE_ASSET_PATH", {
+        response = await unity.send_command("GET_TIMELINE_ASSET_PATH", {
             "timeline_name": timeline_name,
             "search_folder": search_folder
         })
@@ -1136,7 +1344,7 @@ def get_timeline_asset_path(
         return f"获取Timeline资产路径时出错：{str(e)}"
 
 
-def verify_timeline_asset_exists(
+async def verify_timeline_asset_exists(
     ctx: Context,
     asset_path: str
 ) -> str:
@@ -1151,10 +1359,10 @@ def verify_timeline_asset_exists(
         str: 验证结果信息或错误详情
     """
     try:
-        unity = get_unity_connection()
+        unity = await get_async_unity_connection()
 
         # 发送命令到Unity
-        response = unity.send_command("VERIFY_TIMELINE_ASSET_EXISTS", {
+        response = await unity.send_command("VERIFY_TIMELINE_ASSET_EXISTS", {
             "asset_path": asset_path
         })
 
@@ -1190,7 +1398,7 @@ def verify_timeline_asset_exists(
         return f"验证Timeline资产时出错：{str(e)}"
 
 
-def generate_separate_timelines(
+async def generate_separate_timelines(
     ctx: Context,
     camera_timeline_name: str,
     camera_timeline_content: str,
@@ -1227,14 +1435,14 @@ def generate_separate_timelines(
         
         # 生成镜头timeline
         camera_params['timeline_asset_name'] = camera_timeline_name
-        camera_result = execute_animation_function(ctx, camera_params)
+        camera_result = await execute_animation_function(ctx, camera_params)
         
         if "失败" in camera_result or "错误" in camera_result:
             return f"生成镜头timeline失败: {camera_result}"
             
         # 生成物体timeline
         object_params['timeline_asset_name'] = object_timeline_name
-        object_result = execute_animation_function(ctx, object_params)
+        object_result = await execute_animation_function(ctx, object_params)
         
         if "失败" in object_result or "错误" in object_result:
             return f"生成物体timeline失败: {object_result}"
@@ -1245,7 +1453,218 @@ def generate_separate_timelines(
         return f"生成分离timelines时出错：{str(e)}"
 
 
-def generate_combined_timeline(
+def get_desk_camera_params(fov: float, pitch_angle: float, padding: float) -> Dict[str, float]:
+    """
+    计算实验桌标准观察位置使用的相机参数
+    
+    参数：
+        fov: 基础视野角度
+        pitch_angle: 基础俯视角度
+        padding: 基础边距系数
+        
+    返回值：
+        Dict: AUTO_POSITION_CAMERA_TO_OBJECTS的fov、pitch_angle和padding参数
+    """
+    return {
+        "fov": min(70, fov + 5),                 # 稍大FOV，确保全景观察
+        "pitch_angle": min(40, pitch_angle + 5), # 稍高俯视角度，便于整体观察
+        "padding": max(1.5, padding * 1.2)       # 增大边距，确保全面观察
+    }
+
+def get_operation_camera_params(object_count: int, fov: float, pitch_angle: float, padding: float) -> Dict[str, float]:
+    """
+    根据聚焦物体数量计算操作观察位置使用的相机参数
+    
+    参数：
+        object_count: 聚焦物体数量
+        fov: 基础视野角度
+        pitch_angle: 基础俯视角度
+        padding: 基础边距系数
+        
+    返回值：
+        Dict: AUTO_POSITION_CAMERA_TO_OBJECTS的fov、pitch_angle和padding参数
+    """
+    if object_count == 1:
+        # 单物体：优化特写观察
+        return {
+            "fov": max(40, fov - 8),                                     # 减小FOV，更聚焦于单个物体
+            "pitch_angle": max(30, min(40, max(15, pitch_angle - 10))),  # 限制俯视角度在30-40度范围内
+            "padding": padding * 1.1                                     # 减小边距，但保持合理距离
+        }
+    # 多物体：确保全部物体都在视野内
+    return {
+        "fov": min(65, fov + 8),                                     # 增大FOV，确保都在视野内
+        "pitch_angle": max(30, min(40, max(20, pitch_angle - 5))),   # 限制俯视角度在30-40度范围内
+        "padding": padding * 1.5                                     # 保持或增加边距
+    }
+
+def get_focus_object_list(target_object_name: str, operation_object_name: str = None) -> List[str]:
+    """
+    确定操作观察位置需要聚焦的物体列表
+    
+    参数：
+        target_object_name: 目标物体名称，支持逗号分隔的多个物体
+        operation_object_name: 操作物体名称（与目标物体不同时排在最前）
+        
+    返回值：
+        List[str]: 去重并保持顺序的物体名称列表
+    """
+    # 解析目标物体名称，支持逗号分隔的多个物体
+    target_object_list = []
+    if target_object_name:
+        target_object_list = [name.strip() for name in target_object_name.split(',') if name.strip()]
+    
+    # 添加操作物体（如果与目标物体不同）
+    target_objects = []
+    if operation_object_name and operation_object_name not in target_object_list:
+        target_objects.append(operation_object_name)
+    
+    # 添加所有目标物体
+    target_objects.extend(target_object_list)
+    
+    # 去重，保持顺序
+    seen = set()
+    return [obj for obj in target_objects if not (obj in seen or seen.add(obj))]
+
+def compose_smart_camera(
+    standard_pose: Dict[str, Any],
+    operation_pose: Dict[str, Any],
+    target_objects: List[str],
+    smart_params: Dict[str, float],
+    operation_object_name: str,
+    target_object_name: str
+) -> Dict[str, Any]:
+    """
+    根据标准观察位置和操作观察位置生成三段式相机内容（不修改传入的定位结果）
+
+    参数：
+        standard_pose: 实验桌标准观察位置的定位结果
+        operation_pose: 操作观察位置的定位结果
+        target_objects: 操作观察位置聚焦的物体列表
+        smart_params: 操作观察位置使用的fov、pitch_angle、padding
+        operation_object_name: 操作物体名称
+        target_object_name: 目标物体名称
+
+    返回值：
+        Dict[str, Any]: content（相机timeline内容）、info（定位信息）、smart_positioning（发送给Unity的定位数据）
+    """
+    standard_position = copy.deepcopy(standard_pose.get("adjustedCamera", {}))
+    dual_position = copy.deepcopy(operation_pose.get("adjustedCamera", {}))
+    standard_distance = standard_pose.get("calculatedDistance", 0)
+    calculated_distance = operation_pose.get("calculatedDistance", 0)
+
+    # 确定定位类型
+    if len(target_objects) == 1:
+        positioning_type = "单物体聚焦"
+    elif len(target_objects) == 2:
+        positioning_type = "双物体聚焦"
+    else:
+        positioning_type = f"多物体聚焦({len(target_objects)}个物体)"
+    positioning_detail = (
+        f"{positioning_type}(物体数:{len(target_objects)}, FOV:{smart_params['fov']:.1f}, "
+        f"俯视:{smart_params['pitch_angle']:.1f}°, 边距:{smart_params['padding']:.1f}, 计算距离:{calculated_distance:.2f}m)"
+    )
+
+    std_pos = standard_position.get("position", [0, 2, -3])
+    std_rot = standard_position.get("rotation", [35, 0, 0])  # 确保标准旋转在30-40度范围内
+    dual_pos = dual_position.get("position", [0, 1.5, -2])
+    dual_rot = dual_position.get("rotation", [35, 0, 0])  # 确保操作旋转在30-40度范围内
+
+    # 应用rotation.x限制到获取的旋转值
+    if len(std_rot) >= 1:
+        std_rot[0] = max(30, min(40, std_rot[0]))  # 限制在30-40度范围内
+    if len(dual_rot) >= 1:
+        dual_rot[0] = max(30, min(40, dual_rot[0]))  # 限制在30-40度范围内
+
+    # 用户要求：额外抬高操作位置的Y轴2个单位
+    dual_pos[1] += 2.0  # Y轴位置抬高2个单位防止穿模
+    # 同时更新dual_position字典中的position，确保传递给Unity的数据一致
+    dual_position["position"] = dual_pos
+
+    return {
+        "content": (
+            f"相机从标准观察位置{std_pos}(旋转{std_rot})平滑移动到操作观察位置{dual_pos}(旋转{dual_rot})，"
+            f"停留观察操作过程，然后平滑回到标准观察位置{std_pos}(旋转{std_rot})"
+        ),
+        "info": (
+            f"\n智能定位信息:\n"
+            f"   标准观察位置: {std_pos}, 旋转: {std_rot}, 距离: {standard_distance:.2f}m\n"
+            f"   操作观察位置: {dual_pos}, 旋转: {dual_rot}, 距离: {calculated_distance:.2f}m (+2.0 Y轴抬高)\n"
+            f"   定位模式: {positioning_detail}\n"
+            f"   聚焦物体列表: {target_objects}\n"
+            f"   操作物体: {operation_object_name}, 目标物体: {target_object_name}"
+        ),
+        "smart_positioning": {
+            "standard_position": standard_position,
+            "dual_position": dual_position,
+            "operation_object": operation_object_name,
+            "target_object": target_object_name
+        }
+    }
+
+def build_combined_timeline_params(
+    timeline_name: str,
+    camera_name: str,
+    target_object_name: str,
+    camera_content: str,
+    smart_positioning: Optional[Dict[str, Any]],
+    clip2_function_name: str,
+    interaction_objects: List[str],
+    operation_object_name: Optional[str],
+    clip2_keyframes: List[Dict[str, Any]],
+    clip2_duration: float,
+    clip_duration: float,
+    fov: float,
+    pitch_angle: float,
+    padding: float,
+    force_reset_rotation_y: bool,
+    timeline_folder: str
+) -> Dict[str, Any]:
+    """
+    构建CREATE_COMBINED_TIMELINE命令参数
+
+    参数：
+        smart_positioning: compose_smart_camera生成的定位数据，为None表示未启用智能定位
+        其余参数同generate_combined_timeline
+
+    返回值：
+        Dict[str, Any]: CREATE_COMBINED_TIMELINE参数
+    """
+    camera_params = {
+        "content": camera_content,
+        "object_name": camera_name,
+        "target_object_name": target_object_name
+    }
+    if smart_positioning is not None:
+        camera_params["smart_positioning"] = smart_positioning
+    object_params = {
+        "keyframes": clip2_keyframes,  # 使用生成的关键帧数据
+        "object_name": interaction_objects[0] if interaction_objects else operation_object_name,
+        "target_object_name": target_object_name,
+        "function_name": clip2_function_name  # 记录使用的函数名
+    }
+    return {
+        "timeline_name": timeline_name,
+        "camera_name": camera_name,
+        "target_object_name": target_object_name,
+        "camera_params": camera_params,
+        "object_params": object_params,
+        "clip_duration": clip_duration,  # clip1和clip3使用原clip_duration
+        "clip2_duration": clip2_duration,  # clip2使用计算出的实际时长
+        "enable_smart_positioning": smart_positioning is not None,
+        # clip2函数相关参数
+        "clip2_function_name": clip2_function_name,
+        "interaction_objects": interaction_objects,
+        # AutoPositionCameraToObjects参数
+        "fov": fov,
+        "pitch_angle": pitch_angle,
+        "padding": padding,
+        "force_reset_rotation_y": force_reset_rotation_y,
+        # timeline保存路径参数
+        "timeline_folder": timeline_folder
+    }
+
+async def generate_combined_timeline(
     ctx: Context,
     timeline_name: str,
     target_object_name: str,  # 支持单个物体名称或逗号分隔的多个物体名称
@@ -1264,7 +1683,9 @@ def generate_combined_timeline(
     # NodeGraph自动导入相关参数
     nodegraph_name: str = None,  # NodeGraph的名称
     nodegraph_path: str = None,  # NodeGraph的路径 
-    flow_event_node_name: str = None  # 当前FlowEventNode节点的名称
+    flow_event_node_name: str = None,  # 当前FlowEventNode节点的名称
+    position_tolerance: float = 0.001,  # clip2关键帧精简的位置容差（米）
+    rotation_tolerance: float = 0.1  # clip2关键帧精简的旋转容差（度）
 ) -> str:
     """
     生成智能三段式timeline：标准观察位置 -> 多物体操作位置 -> 返回标准位置
@@ -1372,6 +1793,8 @@ def generate_combined_timeline(
         padding: 边距系数（倍数），默认3倍间距
         force_reset_rotation_y: 是否强制重置Y轴旋转为0
         timeline_folder: timeline保存路径，默认为"Assets/Timeline"，支持自定义路径如"Assets/{课程名称}/Timeline"
+        position_tolerance: clip2关键帧精简的位置容差（米）
+        rotation_tolerance: clip2关键帧精简的旋转容差（度）
         
     返回值：
         str: 生成结果信息，包含bounds分析和相机计算详情
@@ -1405,25 +1828,15 @@ def generate_combined_timeline(
         if enable_smart_positioning:
             # 1. 计算标准实验桌观察位置（使用AutoPositionCameraToObjects的自适应距离计算）
             try:
-                # 实验桌观察位置的优化参数
-                desk_fov = min(70, fov + 5)           # 稍大FOV，确保全景观察
-                desk_pitch = min(40, pitch_angle + 5) # 稍高俯视角度，便于整体观察
-                desk_padding = max(1.5, padding * 1.2) # 增大边距，确保全面观察
-                
-                standard_pos_response = get_unity_connection().send_command("AUTO_POSITION_CAMERA_TO_OBJECTS", {
+                # 实验桌观察位置的优化参数（每个步骤相同，结果由场景缓存记忆）
+                standard_pos_response, = await auto_position_cameras([{
                     "object_names": [desk_object_name],
-                    "apply_to_camera": False,  # 只计算，不应用
-                    "fov": desk_fov,
-                    "pitch_angle": desk_pitch,
-                    "padding": desk_padding 
-                })
+                    **get_desk_camera_params(fov, pitch_angle, padding)
+                }])
                 
                 if not standard_pos_response.get("success", False):
                     return f"计算标准观察位置失败: {standard_pos_response.get('message', '未知错误')}"
                 
-                standard_position = standard_pos_response.get("adjustedCamera", {})
-                standard_distance = standard_pos_response.get("calculatedDistance", 0)
-                
             except Exception as e:
                 return f"计算标准观察位置时出错: {str(e)}"
             
@@ -1433,166 +1846,68 @@ def generate_combined_timeline(
                 operation_object_name = target_object_name  # 简化处理，后续可以增强解析
             
             # 3. 智能计算操作观察位置（使用AutoPositionCameraToObjects的自适应距离计算）
-            positioning_detail = "标准定位"  # 默认值，确保变量总是被定义
             try:
-                # 解析目标物体名称，支持逗号分隔的多个物体
-                target_object_list = []
-                if target_object_name:
-                    if ',' in target_object_name:
-                        # 多个物体，按逗号分隔
-                        target_object_list = [name.strip() for name in target_object_name.split(',') if name.strip()]
-                    else:
-                        # 单个物体
-                        target_object_list = [target_object_name.strip()]
-                
                 # 确定要观察的物体列表
-                target_objects = []
-                
-                # 添加操作物体（如果与目标物体不同）
-                if operation_object_name and operation_object_name not in target_object_list:
-                    target_objects.append(operation_object_name)
-                
-                # 添加所有目标物体
-                target_objects.extend(target_object_list)
-                
-                # 去重，保持顺序
-                seen = set()
-                target_objects = [obj for obj in target_objects if not (obj in seen or seen.add(obj))]
-                
-                # 确定定位类型
-                if len(target_objects) == 1:
-                    positioning_type = "单物体聚焦"
-                elif len(target_objects) == 2:
-                    positioning_type = "双物体聚焦"
-                else:
-                    positioning_type = f"多物体聚焦({len(target_objects)}个物体)"
+                target_objects = get_focus_object_list(target_object_name, operation_object_name)
                 
                 # 智能参数计算 - 基于物体数量和类型优化
-                if len(target_objects) == 1:
-                    # 单物体：优化特写观察
-                    smart_padding = padding * 1.1   # 减小边距，但保持合理距离
-                    smart_pitch = max(30, min(40, max(15, pitch_angle - 10)))   # 限制俯视角度在30-40度范围内
-                    smart_fov = max(40, fov - 8)              # 减小FOV，更聚焦于单个物体
-                else:
-                    # 多物体：确保全部物体都在视野内
-                    smart_padding = padding * 1.5# 保持或增加边距
-                    smart_pitch = max(30, min(40, max(20, pitch_angle - 5)))    # 限制俯视角度在30-40度范围内
-                    smart_fov = min(65, fov + 8)              # 增大FOV，确保都在视野内
+                smart_params = get_operation_camera_params(len(target_objects), fov, pitch_angle, padding)
                 
-                # 调用AutoPositionCameraToObjects获取基于物体bounds的最佳相机位置
-                dual_pos_response = get_unity_connection().send_command("AUTO_POSITION_CAMERA_TO_OBJECTS", {
+                # 按AutoPositionCameraToObjects算法在本地计算基于物体bounds的最佳相机位置
+                dual_pos_response, = await auto_position_cameras([{
                     "object_names": target_objects,
-                    "apply_to_camera": False,  # 只计算，不应用
-                    "fov": smart_fov,
-                    "pitch_angle": smart_pitch,
-                    "padding": smart_padding
-                })
+                    **smart_params
+                }])
                 
                 if not dual_pos_response.get("success", False):
                     return f"计算操作观察位置失败: {dual_pos_response.get('message', '未知错误')}"
                 
-                dual_position = dual_pos_response.get("adjustedCamera", {})
-                calculated_distance = dual_pos_response.get("calculatedDistance", 0)
-                
-                # 添加详细的positioning信息，包含计算距离
-                positioning_detail = f"{positioning_type}(物体数:{len(target_objects)}, FOV:{smart_fov:.1f}, 俯视:{smart_pitch:.1f}°, 边距:{smart_padding:.1f}, 计算距离:{calculated_distance:.2f}m)"
-                
             except Exception as e:
                 return f"计算操作观察位置时出错: {str(e)}"
             
             # 4. 生成智能相机timeline内容
-            std_pos = standard_position.get("position", [0, 2, -3])
-            std_rot = standard_position.get("rotation", [35, 0, 0])  # 确保标准旋转在30-40度范围内
-            dual_pos = dual_position.get("position", [0, 1.5, -2])
-            dual_rot = dual_position.get("rotation", [35, 0, 0])  # 确保操作旋转在30-40度范围内
-            
-            # 应用rotation.x限制到获取的旋转值
-            if len(std_rot) >= 1:
-                std_rot[0] = max(30, min(40, std_rot[0]))  # 限制在30-40度范围内
-            if len(dual_rot) >= 1:
-                dual_rot[0] = max(30, min(40, dual_rot[0]))  # 限制在30-40度范围内
-            
-            # 用户要求：额外抬高操作位置的Y轴2个单位
-            # if len(dual_pos) >= 2:
-            original_y = dual_pos[1]
-            dual_pos[1] += 2.0  # Y轴位置抬高2个单位防止穿模
-            # 同时更新dual_position字典中的position，确保传递给Unity的数据一致
-            dual_position["position"] = dual_pos
-            # print(f"调试信息: Y轴抬高 {original_y:.3f} -> {dual_pos[1]:.3f} (+2.0)")
-            
-            smart_camera_content = (
-                f"相机从标准观察位置{std_pos}(旋转{std_rot})平滑移动到操作观察位置{dual_pos}(旋转{dual_rot})，"
-                f"停留观察操作过程，然后平滑回到标准观察位置{std_pos}(旋转{std_rot})"
-            )
-            
-            # 使用智能生成的相机内容
-            final_camera_content = smart_camera_content
-            
-            # 添加智能定位信息到返回消息
-            positioning_info = (
-                f"\n智能定位信息:\n"
-                f"   标准观察位置: {std_pos}, 旋转: {std_rot}, 距离: {standard_distance:.2f}m\n"
-                f"   操作观察位置: {dual_pos}, 旋转: {dual_rot}, 距离: {calculated_distance:.2f}m (+2.0 Y轴抬高)\n"
-                f"   定位模式: {positioning_detail}\n"
-                f"   聚焦物体列表: {target_objects}\n"
-                f"   操作物体: {operation_object_name}, 目标物体: {target_object_name}"
+            smart_camera = compose_smart_camera(
+                standard_pos_response, dual_pos_response, target_objects, smart_params,
+                operation_object_name, target_object_name
             )
+            final_camera_content = smart_camera["content"]
+            positioning_info = smart_camera["info"]
+            smart_positioning = smart_camera["smart_positioning"]
             
         else:
             # 使用默认的相机内容（因为取消了用户提供的参数）
             final_camera_content = f"相机从标准位置移动到{target_object_name}观察位置，然后返回标准位置"
             positioning_info = ""
+            smart_positioning = None
         
         # === 使用新的clip2函数生成方式 ===
         # 调用指定的clip2生成函数获取关键帧数据
-        clip2_keyframes = safe_call_clip2_function(clip2_function_name, interaction_objects)
+        clip2_keyframes = await safe_call_clip2_function(clip2_function_name, interaction_objects)
         
         # 计算clip2的实际时长
         clip2_duration = calculate_clip2_duration(clip2_function_name, interaction_objects, clip2_keyframes)
-        
-        # 直接使用计算出的数据，不进行解析
-        camera_params = {
-            "content": final_camera_content,
-            "object_name": camera_name,
-            "target_object_name": target_object_name
-        }
-        object_params = {
-            "keyframes": clip2_keyframes,  # 使用生成的关键帧数据
-            "object_name": interaction_objects[0] if interaction_objects else operation_object_name,
-            "target_object_name": target_object_name,
-            "function_name": clip2_function_name  # 记录使用的函数名
-        }
-        
-        # 添加智能定位数据到参数
-        if enable_smart_positioning:
-            camera_params["smart_positioning"] = {
-                "standard_position": standard_position,
-                "dual_position": dual_position,
-                "operation_object": operation_object_name,
-                "target_object": target_object_name
-            }
+        original_keyframe_count = len(clip2_keyframes)
+        clip2_keyframes = reduce_clip_keyframes(clip2_keyframes, position_tolerance, rotation_tolerance)
         
         # 发送命令到Unity创建组合timeline
-        response = get_unity_connection().send_command("CREATE_COMBINED_TIMELINE", {
-            "timeline_name": timeline_name,
-            "camera_name": camera_name,
-            "target_object_name": target_object_name,
-            "camera_params": camera_params,
-            "object_params": object_params,
-            "clip_duration": clip_duration,  # clip1和clip3使用原clip_duration
-            "clip2_duration": clip2_duration,  # clip2使用计算出的实际时长
-            "enable_smart_positioning": enable_smart_positioning,
-            # 新增clip2函数相关参数
-            "clip2_function_name": clip2_function_name,
-            "interaction_objects": interaction_objects,
-            # 新增AutoPositionCameraToObjects参数
-            "fov": fov,
-            "pitch_angle": pitch_angle,
-            "padding": padding,
-            "force_reset_rotation_y": force_reset_rotation_y,
-            # 新增timeline保存路径参数
-            "timeline_folder": timeline_folder
-        })
+        response = await send_unity_command("CREATE_COMBINED_TIMELINE", build_combined_timeline_params(
+            timeline_name=timeline_name,
+            camera_name=camera_name,
+            target_object_name=target_object_name,
+            camera_content=final_camera_content,
+            smart_positioning=smart_positioning,
+            clip2_function_name=clip2_function_name,
+            interaction_objects=interaction_objects,
+            operation_object_name=operation_object_name,
+            clip2_keyframes=clip2_keyframes,
+            clip2_duration=clip2_duration,
+            clip_duration=clip_duration,
+            fov=fov,
+            pitch_angle=pitch_angle,
+            padding=padding,
+            force_reset_rotation_y=force_reset_rotation_y,
+            timeline_folder=timeline_folder
+        ))
         
         success = response.get("success", False)
         message = response.get("message", "未知状态")
@@ -1600,6 +1915,7 @@ def generate_combined_timeline(
         if success:
             # 添加clip2时长信息到返回消息
             clip_info = f"\nClip时长分配: Clip1={clip_duration}s, Clip2={clip2_duration}s ({clip2_function_name}), Clip3={clip_duration}s"
+            clip_info += f"\n{format_keyframe_reduction(original_keyframe_count, len(clip2_keyframes))}"
             result = f"成功生成智能三段式timeline: {message}{positioning_info}{clip_info}"
             
             # 自动导入到NodeGraph（如果提供了相关参数）
@@ -1611,7 +1927,7 @@ def generate_combined_timeline(
                     timeline_asset_path = f"{timeline_folder}/{timeline_name}.playable"
                     
                     # 调用导入函数
-                    import_result = update_flow_event_node_timeline_assets(
+                    import_result = await update_flow_event_node_timeline_assets(
                         ctx=ctx,
                         name=nodegraph_name,
                         event_name=flow_event_node_name,
@@ -1635,155 +1951,587 @@ def generate_combined_timeline(
         return f"生成智能timeline时出错：{str(e)}"
 
 
-def parse_timeline_description(
-        ctx: Context,
-    description: str,
-    object_name: str,
-    target_object_name: str = None
-) -> Dict[str, Any]:
+async def write_combined_timelines_headless(timeline_params: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
     """
-    解析自然语言描述的timeline内容，转换为具体的动画参数
+    在Python端执行一组CREATE_COMBINED_TIMELINE：多个进程并行写入.playable/.anim文件，
+    然后通过一次IMPORT_TIMELINE_ASSETS刷新AssetDatabase并注册轨道绑定
+
+    相机初始状态、目标物体初始状态和相机目标位置与Unity端的取值方式相同
+    （相机/物体当前Transform，目标物体的AutoPositionCameraToObjects结果）
 
     参数：
-        ctx: MCP 上下文
-        description: 自然语言描述
-        object_name: 要操作的物体名称
-        target_object_name: 目标物体名称（可选）
-        
+        timeline_params: build_combined_timeline_params生成的参数列表
+        max_workers: 写入文件的进程数
+
     返回值：
-        Dict[str, Any]: 解析后的动画参数
+        List[Dict]: 与timeline_params一一对应、与send_batch相同格式的响应
     """
-    try:
-        description = description.lower().strip()
-        
-        # 围绕目标旋转 - 移到相机判断外面，适用于所有物体
-        if any(keyword in description for keyword in ['围绕', '绕着', '环绕']) and target_object_name:
-            return {
-                'function': 'rotate_around_target_animation',
-                'moving_object_name': object_name,
-                'target_object_name': target_object_name,
-                'radius': extract_distance(description, default=5.0),
-                'height': extract_height(description, default=2.0),
-                'duration': extract_duration(description, default=8.0)
-            }
-        
-        # 相机动画模式识别
-        if any(keyword in description for keyword in ['镜头', '相机', '摄像', 'camera']):
-            # 环视动画
-            if any(keyword in description for keyword in ['环视', '360', '旋转一圈', '转圈', '环绕']):
-                return {
-                    'function': 'camera_panorama_animation',
-                    'name': object_name,
-                    'pitch_angle': extract_angle(description, default=-20.0),
-                    'duration': extract_duration(description, default=10.0)
-                }
-            
-            # 扫视动画 
-            elif any(keyword in description for keyword in ['扫视', '左右', '扫射', '摆动']):
-                return {
-                    'function': 'camera_sweep_animation',
-                    'name': object_name,
-                    'pitch_angle': extract_angle(description, default=0.0),
-                    'sweep_angle': extract_sweep_angle(description, default=45.0),
-                    'duration': extract_duration(description, default=8.0)
-                }
-            
-            # 特写动画
-            elif any(keyword in description for keyword in ['特写', '靠近', '接近', '拉近']):
-                if target_object_name is None:
-                    return {'error': '特写动画需要指定目标物体'}
-                return {
-                    'function': 'camera_closeup_animation',
-                    'name': object_name,
-                    'target_object_name': target_object_name,
-                    'closeup_distance': extract_distance(description, default=3.0),
-                    'duration': extract_duration(description, default=10.0)
-                }
-
-        # 物体移动动画
-        if any(keyword in description for keyword in ['移动', '运动', '位移', '移到']):
-            # 解析移动目标位置
-            target_position = extract_position(description)
-            if target_position:
-                # 创建起点和终点，确保至少有两个点
-                return {
-                    'function': 'create_multipoint_animation',
-                    'name': object_name,
-                    'points': [
-                        {'position': {'x': 0, 'y': 0, 'z': 0}},  # 起点
-                        {'position': target_position}  # 终点
-                    ],
-                    'duration': extract_duration(description, default=3.0)
-                }
-        
-        # 旋转动画
-        if any(keyword in description for keyword in ['旋转', '转动', '转向']):
-            rotation = extract_rotation(description)
-            if rotation:
-                return {
-                    'function': 'create_multipoint_animation',
-                    'name': object_name,
-                    'points': [
-                        {'rotation': {'x': 0, 'y': 0, 'z': 0}},  # 起始旋转
-                        {'rotation': rotation}  # 目标旋转
-                    ],
-                    'include_rotation': True,
-                    'duration': extract_duration(description, default=2.0)
-                }
-        
-        # 弹跳或简单动画
-        if any(keyword in description for keyword in ['弹跳', '上下', '震动', '摆动']):
-            return {
-                'function': 'create_multipoint_animation',
-                'name': object_name,
-                'points': [
-                    {'position': {'x': 0, 'y': 0, 'z': 0}},     # 起点
-                    {'position': {'x': 0, 'y': 1, 'z': 0}},     # 中间点（上升）
-                    {'position': {'x': 0, 'y': 0, 'z': 0}}      # 回到起点
-                ],
-                'duration': extract_duration(description, default=2.0)
-            }
-        
-        # 如果无法识别，创建简单的默认动画（添加起点确保至少两个点）
-        return {
-            'function': 'create_multipoint_animation',
-            'name': object_name,
-            'points': [
-                {'position': {'x': 0, 'y': 0, 'z': 0}},      # 起点
-                {'position': {'x': 0, 'y': 0.5, 'z': 0}}     # 轻微上移
-            ],
-            'duration': extract_duration(description, default=3.0)
+    target_names = [
+        [name.strip() for name in (params.get("target_object_name") or "").split(",") if name.strip()]
+        for params in timeline_params
+    ]
+    object_names = []
+    for params, names in zip(timeline_params, target_names):
+        object_names.append(params.get("camera_name") or "Main Camera")
+        object_names.extend(names[:1])
+    object_names = list(dict.fromkeys(object_names))
+    object_infos = dict(zip(object_names, await get_objects_info(object_names)))
+    poses = await auto_position_cameras([
+        {
+            "object_names": names,
+            "fov": params.get("fov", 45.0),
+            "pitch_angle": params.get("pitch_angle", 35.0),
+            "padding": params.get("padding", 3.0)
         }
-        
-    except Exception as e:
-        return {'error': f"解析描述时出错: {str(e)}"}
+        for params, names in zip(timeline_params, target_names)
+    ])
+
+    responses: List[Optional[Dict[str, Any]]] = [None] * len(timeline_params)
+    specs = []
+    spec_indices = []
+    for index, (params, names, pose) in enumerate(zip(timeline_params, target_names, poses)):
+        try:
+            specs.append(combined_timeline_spec(
+                params,
+                str(resolve_asset_path(params.get("timeline_folder") or "Assets/Timeline")),
+                object_infos.get(params.get("camera_name") or "Main Camera"),
+                object_infos.get(names[0]) if names else None,
+                pose
+            ))
+            spec_indices.append(index)
+        except ValueError as e:
+            responses[index] = {"status": "success", "result": {"success": False, "message": str(e)}}
+
+    written = await asyncio.get_running_loop().run_in_executor(None, write_combined_timelines, specs, max_workers)
+    imported = [result for result in written if result.get("success", False)]
+    import_results = {}
+    import_error = None
+    if imported:
+        try:
+            import_response = await send_unity_command("IMPORT_TIMELINE_ASSETS", {"timelines": [
+                {"timeline_path": result["timeline_path"], "bindings": result["bindings"]} for result in imported
+            ]})
+            import_results = {item.get("timeline_path"): item for item in import_response.get("results", [])}
+            if not import_results:
+                import_error = import_response.get("message", "未知错误")
+        except Exception as e:
+            import_error = str(e)
+
+    for index, result in zip(spec_indices, written):
+        if result.get("success", False):
+            import_result = import_results.get(result["timeline_path"], {})
+            if not import_result.get("success", False):
+                result = {
+                    "success": False,
+                    "message": f"Timeline资产已写入但导入失败: {import_result.get('message') or import_error or '未知错误'}"
+                }
+        responses[index] = {"status": "success", "result": result}
+    return responses
 
+async def report_course_progress(ctx: Context, done: int, total: int, message: str):
+    """向客户端报告进度（客户端未请求进度通知或不在请求上下文中时忽略）"""
+    # stdio传输时标准输出就是JSON-RPC通道，进度只能写日志
+    logger.info(f"[{done}/{total}] {message}")
+    try:
+        await ctx.report_progress(done, total)
+    except Exception:
+        pass
 
-def execute_animation_function(ctx: Context, params: Dict[str, Any]) -> str:
+async def generate_course_timelines(
+    ctx: Context,
+    nodegraph_name: str,
+    nodegraph_path: str,
+    plan: List[Dict[str, Any]],
+    camera_name: str = "Main Camera",
+    clip_duration: float = 5.0,
+    enable_smart_positioning: bool = True,
+    desk_object_name: str = "实验桌",
+    fov: float = 45.0,
+    pitch_angle: float = 35.0,
+    padding: float = 1.0,
+    force_reset_rotation_y: bool = True,
+    timeline_folder: str = "Assets/Timeline",
+    update_nodegraph: bool = True,
+    batch_size: int = 8,
+    max_concurrency: int = 2,
+    headless: bool = False,
+    max_workers: int = 4,
+    position_tolerance: float = 0.001,
+    rotation_tolerance: float = 0.1
+) -> Dict[str, Any]:
     """
-    根据解析的参数执行相应的动画函数
-    
+    批量生成整个课程的智能三段式timeline，相当于对plan中的每个节点调用generate_combined_timeline
+
+    处理流程：
+    1. 一次获取NodeGraph的全部FlowEventNode，并通过一次BATCH请求获取所有相关物体信息
+    2. 在本地一次求解实验桌标准观察位置和所有节点的操作观察位置，并生成所有clip2关键帧
+    3. 将CREATE_COMBINED_TIMELINE按batch_size打包成BATCH请求，最多max_concurrency个批次同时进行；
+       headless模式下改为由max_workers个进程直接写入timeline资产文件，再一次导入Unity并注册绑定
+    4. 成功的timeline在一个NodeGraph编辑会话中排队，最后一次批量导入并只保存一次NodeGraph
+    单个节点失败不影响其他节点，失败原因记录在返回结果中。
+
     参数：
-        ctx: MCP 上下文
-        params: 动画参数字典
-        
+        ctx: MCP上下文
+        nodegraph_name: 节点图文件名(不含扩展名)
+        nodegraph_path: 资产路径，例如"Assets/紫外可见光光度计测量实验"
+        plan: 每个节点的生成参数列表，每项包含：
+            - flow_event_node_name: FlowEventNode的事件名称（必填）
+            - target_object_name: 目标物体名称，需要移动/操作的物体在第一位（必填）
+            - clip2_function_name: CLIP2_FUNCTIONS中的函数名（必填）
+            - interaction_objects: 交互物体列表（默认按target_object_name拆分）
+            - timeline_name: timeline名称（默认使用flow_event_node_name）
+            - operation_object_name: 操作物体名称（可选）
+            - clip_duration: 该节点clip1/clip3的时长（可选）
+        camera_name: 相机名称
+        clip_duration: 每个clip的基础持续时间
+        enable_smart_positioning: 是否启用智能相机定位
+        desk_object_name: 实验桌名称
+        fov: 相机FOV
+        pitch_angle: 俯视角度（自动限制在30-40度范围内）
+        padding: 边距系数
+        force_reset_rotation_y: 是否强制重置Y轴旋转为0
+        timeline_folder: timeline保存路径
+        update_nodegraph: 是否将生成的timeline导入NodeGraph
+        batch_size: 每个BATCH请求包含的timeline数量
+        max_concurrency: 同时进行的BATCH请求数量
+        headless: 是否在Python端直接写入.playable/.anim文件（不经过Unity逐个创建资产）
+        max_workers: headless模式下写入文件的进程数
+        position_tolerance: clip2关键帧精简的位置容差（米）
+        rotation_tolerance: clip2关键帧精简的旋转容差（度）
+
     返回值：
-        str: 执行结果
+        Dict[str, Any]: 成功/失败数量、耗时以及每个节点的结果
     """
-    function_name = params.get('function')
-    
-    if function_name == 'camera_panorama_animation':
-        return camera_panorama_animation(
-            ctx=ctx,
-            camera_name=params.get('name', 'Main Camera'),
-            pitch_angle=params.get('pitch_angle', -20.0),
-            duration=params.get('duration', 10.0),
-            timeline_asset_name=params.get('timeline_asset_name', 'CameraPanorama'),
-            timeline_folder=params.get('timeline_folder', 'Assets/Timeline')
-        )
-    
+    started = time.perf_counter()
+    try:
+        nodes_response = await get_flow_event_nodes(ctx, nodegraph_name, nodegraph_path)
+        if not nodes_response.get("success", False):
+            return {"success": False, "error": nodes_response.get("error", "获取FlowEventNode节点信息失败")}
+        # 与generate_combined_timeline和BULK_UPDATE_FLOW_EVENT_NODES一致按eventName匹配，nodeName都是类型名"FlowEventNode"
+        node_names = {node["eventName"] for node in nodes_response.get("flowEventNodes", []) if node.get("eventName")}
+    except Exception as e:
+        return {"success": False, "error": f"获取FlowEventNode节点信息时出错: {str(e)}"}
+
+    total = len(plan)
+    results: Dict[str, Dict[str, Any]] = {}
+    order = []
+    jobs = []
+
+    # 1. 校验计划并整理每个节点的输入
+    for index, entry in enumerate(plan):
+        node_name = entry.get("flow_event_node_name")
+        target_object_name = entry.get("target_object_name")
+        clip2_function_name = entry.get("clip2_function_name")
+        error = None
+        if not node_name:
+            error = "缺少flow_event_node_name"
+        elif node_name in order:
+            error = f"节点 '{node_name}' 在计划中重复"
+        elif node_name not in node_names:
+            error = f"NodeGraph中不存在节点 '{node_name}'"
+        elif not target_object_name:
+            error = "缺少target_object_name"
+        elif clip2_function_name not in CLIP2_FUNCTIONS:
+            error = f"clip2_function_name '{clip2_function_name}' 不在CLIP2_FUNCTIONS中，可用的函数: {list(CLIP2_FUNCTIONS.keys())}"
+        if error:
+            key = f"plan[{index}]" if not node_name or node_name in order else node_name
+            order.append(key)
+            results[key] = {"success": False, "stage": "validate", "error": error}
+            continue
+        order.append(node_name)
+
+        interaction_objects = entry.get("interaction_objects") or get_focus_object_list(target_object_name)
+        # 与generate_combined_timeline一致：未指定操作物体时使用target_object_name
+        operation_object_name = entry.get("operation_object_name") or target_object_name
+        jobs.append({
+            "node": node_name,
+            "timeline_name": entry.get("timeline_name") or node_name,
+            "target_object_name": target_object_name,
+            "clip2_function_name": clip2_function_name,
+            "interaction_objects": interaction_objects,
+            "operation_object_name": operation_object_name,
+            "clip_duration": entry.get("clip_duration", clip_duration),
+            "focus_objects": get_focus_object_list(target_object_name, operation_object_name)
+        })
+
+    def fail(job, stage, error):
+        results[job["node"]] = {"success": False, "stage": stage, "timeline_name": job["timeline_name"], "error": error}
+
+    try:
+        # 2. 一次BATCH请求获取所有物体信息，之后的定位和关键帧生成都由场景缓存提供
+        all_objects = [desk_object_name] if enable_smart_positioning else []
+        for job in jobs:
+            all_objects.extend(job["focus_objects"] if enable_smart_positioning else [])
+            all_objects.extend(job["interaction_objects"])
+        await get_objects_info(list(dict.fromkeys(all_objects)))
+
+        # 3. 一次求解所有相机位置（相同的聚焦物体和参数只计算一次）
+        if enable_smart_positioning:
+            requests = [{"object_names": [desk_object_name], **get_desk_camera_params(fov, pitch_angle, padding)}]
+            request_index = {}
+            for job in jobs:
+                job["smart_params"] = get_operation_camera_params(len(job["focus_objects"]), fov, pitch_angle, padding)
+                key = tuple(job["focus_objects"]) + tuple(job["smart_params"].values())
+                if key not in request_index:
+                    request_index[key] = len(requests)
+                    requests.append({"object_names": job["focus_objects"], **job["smart_params"]})
+                job["pose_index"] = request_index[key]
+            poses = await auto_position_cameras(requests)
+            if not poses[0].get("success", False):
+                for job in jobs:
+                    fail(job, "camera", f"计算标准观察位置失败: {poses[0].get('message', '未知错误')}")
+                jobs = []
+            for job in jobs:
+                pose = poses[job["pose_index"]]
+                if not pose.get("success", False):
+                    fail(job, "camera", f"计算操作观察位置失败: {pose.get('message', '未知错误')}")
+                    continue
+                smart_camera = compose_smart_camera(
+                    poses[0], pose, job["focus_objects"], job["smart_params"],
+                    job["operation_object_name"], job["target_object_name"]
+                )
+                job["camera_content"] = smart_camera["content"]
+                job["smart_positioning"] = smart_camera["smart_positioning"]
+            jobs = [job for job in jobs if job["node"] not in results]
+        else:
+            for job in jobs:
+                job["camera_content"] = f"相机从标准位置移动到{job['target_object_name']}观察位置，然后返回标准位置"
+                job["smart_positioning"] = None
+
+        # 4. 按关键帧模板一次生成所有clip2关键帧
+        keyframes = await generate_clip2_keyframes(
+            [(job["clip2_function_name"], job["interaction_objects"]) for job in jobs]
+        )
+    except Exception as e:
+        for job in jobs:
+            if job["node"] not in results:
+                fail(job, "prepare", f"准备timeline参数时出错: {str(e)}")
+        jobs = []
+        keyframes = []
+
+    commands = []
+    for job, clip2_keyframes in zip(jobs, keyframes):
+        job["clip2_duration"] = calculate_clip2_duration(job["clip2_function_name"], job["interaction_objects"], clip2_keyframes)
+        reduced_keyframes = reduce_clip_keyframes(clip2_keyframes, position_tolerance, rotation_tolerance)
+        job["keyframes_saved"] = len(clip2_keyframes) - len(reduced_keyframes)
+        clip2_keyframes = reduced_keyframes
+        commands.append((job, {"type": "CREATE_COMBINED_TIMELINE", "params": build_combined_timeline_params(
+            timeline_name=job["timeline_name"],
+            camera_name=camera_name,
+            target_object_name=job["target_object_name"],
+            camera_content=job["camera_content"],
+            smart_positioning=job["smart_positioning"],
+            clip2_function_name=job["clip2_function_name"],
+            interaction_objects=job["interaction_objects"],
+            operation_object_name=job["operation_object_name"],
+            clip2_keyframes=clip2_keyframes,
+            clip2_duration=job["clip2_duration"],
+            clip_duration=job["clip_duration"],
+            fov=fov,
+            pitch_angle=pitch_angle,
+            padding=padding,
+            force_reset_rotation_y=force_reset_rotation_y,
+            timeline_folder=timeline_folder
+        )}))
+
+    done = len(results)
+    await report_course_progress(ctx, done, total, f"已准备{len(commands)}个timeline，{done}个节点失败")
+
+    # 5. 分批创建timeline；生成的timeline在同一个编辑会话中排队，最后一次写入NodeGraph
+    semaphore = asyncio.Semaphore(max(int(max_concurrency), 1))
+    batch_size = max(int(batch_size), 1)
+    session = NodeGraphEditSession(nodegraph_name, nodegraph_path if nodegraph_path else "Assets/NodeGraphTool/Test", atomic=False)
+
+    def record_timelines(batch, responses):
+        nonlocal done
+        for (job, _), response in zip(batch, responses):
+            result = response.get("result", {}) if response.get("status") == "success" else {}
+            if not result.get("success", False):
+                fail(job, "timeline", f"生成智能timeline失败: {result.get('message') or response.get('error', '未知错误')}")
+                continue
+            timeline_asset_path = f"{timeline_folder}/{job['timeline_name']}.playable"
+            results[job["node"]] = {
+                "success": True,
+                "timeline_name": job["timeline_name"],
+                "timeline_asset": timeline_asset_path,
+                "clip2_duration": job["clip2_duration"],
+                "keyframes_saved": job["keyframes_saved"],
+                "message": result.get("message", "")
+            }
+            if update_nodegraph:
+                session.add_timeline_assets(job["node"], timeline_asset_path)
+
+        done += len(batch)
+
+    async def run_batch(batch):
+        async with semaphore:
+            try:
+                unity = await get_async_unity_connection()
+                responses = await unity.send_batch([command for _, command in batch])
+            except Exception as e:
+                responses = [{"status": "error", "error": str(e)}] * len(batch)
+        record_timelines(batch, responses)
+        await report_course_progress(ctx, done, total, f"已完成{done}/{total}个节点")
+
+    if headless and commands:
+        try:
+            responses = await write_combined_timelines_headless([command["params"] for _, command in commands], max_workers)
+        except Exception as e:
+            responses = [{"status": "error", "error": str(e)}] * len(commands)
+        record_timelines(commands, responses)
+        await report_course_progress(ctx, done, total, f"已完成{done}/{total}个节点")
+    else:
+        await asyncio.gather(*(run_batch(commands[i:i + batch_size]) for i in range(0, len(commands), batch_size)))
+
+    # 6. 一次批量更新导入全部timeline并保存NodeGraph
+    if len(session):
+        commit_result = await session.commit()
+        node_results = {item.get("eventName"): item for item in commit_result.get("results", [])}
+        for event_name, update in session.updates.items():
+            node_result = node_results.get(event_name, {})
+            if not node_result.get("success", False):
+                error = node_result.get("message") or commit_result.get("error", "未知错误")
+                timeline_asset_path = results[event_name]["timeline_asset"]
+                results[event_name] = {
+                    "success": False,
+                    "stage": "nodegraph",
+                    "timeline_name": results[event_name]["timeline_name"],
+                    "timeline_asset": timeline_asset_path,
+                    "error": f"timeline已生成，但NodeGraph导入失败: {error}"
+                }
+
+    failed = [name for name in order if not results[name].get("success", False)]
+    return {
+        "success": not failed,
+        "total": total,
+        "succeeded": total - len(failed),
+        "failed": len(failed),
+        "failed_nodes": failed,
+        "keyframes_saved": sum(result.get("keyframes_saved", 0) for result in results.values()),
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+        "nodes": {name: results[name] for name in order}
+    }
+
+async def generate_courses_timelines(
+    ctx: Context,
+    courses: List[Dict[str, Any]],
+    defaults: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    批量生成多个课程的timeline，按NodeGraph分散到编辑器池中的多个Unity编辑器并行执行，
+    每个课程相当于调用一次generate_course_timelines
+
+    每个NodeGraph固定在第一次处理它的编辑器上（与import_excels_to_nodegraphs使用相同的NodeGraph路径，
+    先导入Excel再生成timeline时仍在同一个编辑器上）；只有主编辑器时按顺序执行。各编辑器需要打开相同的场景。
+
+    参数：
+        ctx: MCP上下文
+        courses: 课程列表，每项包含nodegraph_name、nodegraph_path和plan，
+            也可以包含generate_course_timelines的其他参数，覆盖defaults中的同名参数
+        defaults: 所有课程共用的generate_course_timelines参数，例如camera_name、timeline_folder、headless
+
+    返回值：
+        Dict[str, Any]: 按NodeGraph路径给出执行的编辑器和generate_course_timelines的结果，以及各编辑器状态
+    """
+    options = set(inspect.signature(generate_course_timelines).parameters) - {"ctx"}
+    unknown = set(defaults or {}) - options
+    if unknown:
+        return {"success": False, "error": f"defaults中有未知参数: {sorted(unknown)}"}
+
+    jobs = {}
+    for course in courses:
+        kwargs = {**(defaults or {}), **course}
+        unknown = set(course) - options
+        if unknown:
+            return {"success": False, "error": f"课程中有未知参数 {sorted(unknown)}: {course.get('nodegraph_name')}"}
+        if not kwargs.get("nodegraph_name") or not kwargs.get("nodegraph_path") or not isinstance(kwargs.get("plan"), list):
+            return {"success": False, "error": f"每个课程都需要nodegraph_name、nodegraph_path和plan: {course}"}
+        key = f"{clean_path(kwargs['nodegraph_path']).rstrip('/')}/{kwargs['nodegraph_name']}.asset"
+        if key in jobs:
+            return {"success": False, "error": f"NodeGraph在课程列表中重复: {key}"}
+        jobs[key] = lambda kwargs=kwargs: generate_course_timelines(ctx, **kwargs)
+
+    results = await editor_pool.map(jobs)
+    report = {}
+    for key, result in results.items():
+        endpoint = editor_pool.endpoint_for(key)
+        if isinstance(result, Exception):
+            result = {"success": False, "error": f"执行操作时出错: {str(result)}"}
+        report[key] = {"editor": endpoint.address if endpoint else None, "result": result}
+    failed = [key for key, item in report.items() if not item["result"].get("success", False)]
+    return {
+        "success": not failed,
+        "total": len(report),
+        "failed_courses": failed,
+        "courses": report,
+        "editors": editor_pool.status()["editors"]
+    }
+
+
+def find_node_focus_objects(node: Dict[str, Any], scene_object_names: List[str]) -> List[str]:
+    """
+    推断FlowEventNode需要聚焦的场景物体
+    
+    优先使用节点的selectableObectsID，否则按出现顺序匹配镜头/物体timeline内容和事件内容中的场景物体名称
+    
+    参数：
+        node: GET_FLOW_EVENT_NODES返回的单个节点
+        scene_object_names: 场景中的物体名称列表
+        
+    返回值：
+        List[str]: 聚焦物体名称列表，未找到时为空列表
+    """
+    scene_names = set(scene_object_names)
+    selectable = [
+        item.get("name") for item in node.get("selectableObectsID") or []
+        if item.get("name") in scene_names
+    ]
+    if selectable:
+        return get_focus_object_list(",".join(selectable))
+    
+    text = " ".join(
+        node.get(key) or "" for key in ("objectTimelineContent", "cameraTimelineContent", "eventContent")
+    )
+    # 长名称优先匹配，避免"比色皿1"同时命中"比色皿"
+    matches = []
+    for name in sorted(scene_names, key=len, reverse=True):
+        index = text.find(name)
+        if name and index >= 0 and not any(name in longer for _, longer in matches):
+            matches.append((index, name))
+    return [name for _, name in sorted(matches)]
+
+async def precompute_camera_poses(
+    ctx: Context,
+    nodegraph_name: str,
+    nodegraph_path: str,
+    desk_object_name: str = "实验桌",
+    fov: float = 45.0,
+    pitch_angle: float = 35.0,
+    padding: float = 1.0
+) -> Dict[str, Any]:
+    """
+    预计算NodeGraph中所有FlowEventNode的相机观察位置
+    
+    一次BATCH请求获取所有相关物体的bounds，然后在本地一次求解实验桌标准观察位置和每个节点的
+    操作观察位置。物体信息留在场景缓存中，之后调用generate_combined_timeline时无需再请求Unity。
+    
+    参数：
+        ctx: MCP上下文
+        nodegraph_name: 节点图文件名(不含扩展名)
+        nodegraph_path: 资产路径，例如"Assets/紫外可见光光度计测量实验"
+        desk_object_name: 实验桌名称
+        fov: 相机FOV，需与generate_combined_timeline使用的值一致
+        pitch_angle: 俯视角度，需与generate_combined_timeline使用的值一致
+        padding: 边距系数，需与generate_combined_timeline使用的值一致
+        
+    返回值：
+        Dict[str, Any]: 实验桌标准观察位置、每个节点的聚焦物体和操作观察位置及失败信息
+    """
+    try:
+        nodes_response = await get_flow_event_nodes(ctx, nodegraph_name, nodegraph_path)
+        if not nodes_response.get("success", False):
+            return {"success": False, "error": nodes_response.get("error", "获取FlowEventNode节点信息失败")}
+        
+        scene_response = await send_unity_command("GET_ALL_SCENE_OBJECTS")
+        scene_object_names = [obj.get("name") for obj in scene_response.get("objects", [])]
+        
+        # 收集不重复的定位请求，第一项为实验桌标准观察位置
+        requests = [{"object_names": [desk_object_name], **get_desk_camera_params(fov, pitch_angle, padding)}]
+        request_index = {}
+        node_requests = {}
+        for node in nodes_response.get("flowEventNodes", []):
+            node_name = node.get("eventName") or node.get("nodeName", "")
+            focus_objects = find_node_focus_objects(node, scene_object_names)
+            if not focus_objects:
+                node_requests[node_name] = (focus_objects, None)
+                continue
+            smart_params = get_operation_camera_params(len(focus_objects), fov, pitch_angle, padding)
+            key = tuple(sorted(focus_objects)) + tuple(smart_params.values())
+            if key not in request_index:
+                request_index[key] = len(requests)
+                requests.append({"object_names": focus_objects, **smart_params})
+            node_requests[node_name] = (focus_objects, request_index[key])
+        
+        poses = await auto_position_cameras(requests)
+        
+        def pose_summary(pose):
+            if not pose.get("success", False):
+                return {"success": False, "error": pose.get("message", "未知错误")}
+            return {
+                "success": True,
+                "position": pose["adjustedCamera"]["position"],
+                "rotation": pose["adjustedCamera"]["rotation"],
+                "distance": pose["calculatedDistance"]
+            }
+        
+        nodes = {}
+        for node_name, (focus_objects, index) in node_requests.items():
+            nodes[node_name] = {"focus_objects": focus_objects}
+            if index is None:
+                nodes[node_name].update({"success": False, "error": "未找到节点涉及的场景物体"})
+            else:
+                nodes[node_name].update(pose_summary(poses[index]))
+        
+        failed = sum(1 for pose in poses if not pose.get("success", False))
+        return {
+            "success": failed == 0,
+            "precomputed_poses": len(poses) - failed,
+            "desk_pose": pose_summary(poses[0]),
+            "nodes": nodes,
+            "scene_revision": (await get_async_unity_connection()).cache.revision
+        }
+    except Exception as e:
+        return {"success": False, "error": f"预计算相机位置时出错: {str(e)}"}
+
+def parse_timeline_description(
+        ctx: Context,
+    description: str,
+    object_name: str,
+    target_object_name: str = None
+) -> Dict[str, Any]:
+    """
+    解析自然语言描述的timeline内容，转换为具体的动画参数
+
+    参数：
+        ctx: MCP 上下文
+        description: 自然语言描述
+        object_name: 要操作的物体名称
+        target_object_name: 目标物体名称（可选）
+        
+    返回值：
+        Dict[str, Any]: 解析后的动画参数
+    """
+    try:
+        return parse_timeline_parameters(description, object_name, target_object_name)
+    except Exception as e:
+        return {'error': f"解析描述时出错: {str(e)}"}
+
+
+async def execute_animation_function(ctx: Context, params: Dict[str, Any]) -> str:
+    """
+    根据解析的参数执行相应的动画函数
+    
+    参数：
+        ctx: MCP 上下文
+        params: 动画参数字典
+        
+    返回值：
+        str: 执行结果
+    """
+    function_name = params.get('function')
+    
+    if function_name == 'camera_panorama_animation':
+        return await camera_panorama_animation(
+            ctx=ctx,
+            camera_name=params.get('name', 'Main Camera'),
+            pitch_angle=params.get('pitch_angle', -20.0),
+            duration=params.get('duration', 10.0),
+            timeline_asset_name=params.get('timeline_asset_name', 'CameraPanorama'),
+            timeline_folder=params.get('timeline_folder', 'Assets/Timeline')
+        )
+    
     elif function_name == 'camera_sweep_animation':
-        return camera_sweep_animation(
+        return await camera_sweep_animation(
             ctx=ctx,
             camera_name=params.get('name', 'Main Camera'),
             pitch_angle=params.get('pitch_angle', 0.0),
@@ -1794,7 +2542,7 @@ def execute_animation_function(ctx: Context, params: Dict[str, Any]) -> str:
         )
     
     elif function_name == 'camera_closeup_animation':
-        return camera_closeup_animation(
+        return await camera_closeup_animation(
             ctx=ctx,
             camera_name=params.get('name', 'Main Camera'),
             target_object_name=params.get('target_object_name'),
@@ -1805,7 +2553,7 @@ def execute_animation_function(ctx: Context, params: Dict[str, Any]) -> str:
         )
     
     elif function_name == 'rotate_around_target_animation':
-        return rotate_around_target_animation(
+        return await rotate_around_target_animation(
             ctx=ctx,
             moving_object_name=params.get('moving_object_name'),
             target_object_name=params.get('target_object_name'),
@@ -1817,7 +2565,7 @@ def execute_animation_function(ctx: Context, params: Dict[str, Any]) -> str:
         )
     
     elif function_name == 'create_multipoint_animation':
-        return create_multipoint_animation(
+        return await create_multipoint_animation(
             ctx=ctx,
             name=params.get('name'),
             points=params.get('points', []),
@@ -1836,163 +2584,43 @@ def execute_animation_function(ctx: Context, params: Dict[str, Any]) -> str:
         return f"未知的动画函数: {function_name}"
 
 
-# 辅助函数：从描述中提取数值
+# 辅助函数：从描述中提取数值（解析结果按描述缓存，见timeline_parser）
 def extract_duration(description: str, default: float = 3.0) -> float:
     """从描述中提取持续时间"""
-    import re
-    
-    # 匹配 "X秒" 或 "X s" 格式
-    duration_match = re.search(r'(\d+(?:\.\d+)?)\s*[秒s]', description)
-    if duration_match:
-        return float(duration_match.group(1))
-    
-    # 匹配 "持续X" 格式
-    duration_match = re.search(r'持续\s*(\d+(?:\.\d+)?)', description)
-    if duration_match:
-        return float(duration_match.group(1))
-    
-    return default
+    return parse_description(description).duration(default)
 
 
 def extract_angle(description: str, default: float = 0.0) -> float:
     """从描述中提取角度"""
-    import re
-    
-    # 俯视/仰视角度
-    if '俯视' in description or '向下' in description:
-        angle_match = re.search(r'俯视?\s*(\d+(?:\.\d+)?)', description)
-        if angle_match:
-            return float(angle_match.group(1))
-        return 20.0  # 默认俯视角度
-    
-    if '仰视' in description or '向上' in description:
-        angle_match = re.search(r'仰视?\s*(\d+(?:\.\d+)?)', description)
-        if angle_match:
-            return -float(angle_match.group(1))
-        return -20.0  # 默认仰视角度
-    
-    # 匹配 "X度" 格式
-    angle_match = re.search(r'(\d+(?:\.\d+)?)\s*度', description)
-    if angle_match:
-        return float(angle_match.group(1))
-    
-    return default
+    return parse_description(description).angle(default)
 
 
 def extract_sweep_angle(description: str, default: float = 45.0) -> float:
     """从描述中提取扫视角度"""
-    import re
-    
-    # 匹配扫视范围
-    angle_match = re.search(r'扫视?\s*(\d+(?:\.\d+)?)\s*度', description)
-    if angle_match:
-        return float(angle_match.group(1))
-    
-    # 根据描述词推断
-    if '大幅' in description or '宽' in description:
-        return 60.0
-    elif '小幅' in description or '窄' in description:
-        return 30.0
-    
-    return default
+    return parse_description(description).sweep_angle(default)
 
 
 def extract_distance(description: str, default: float = 5.0) -> float:
     """从描述中提取距离"""
-    import re
-    
-    # 匹配 "X米" 或 "X单位" 格式
-    distance_match = re.search(r'(\d+(?:\.\d+)?)\s*[米单位m]', description)
-    if distance_match:
-        return float(distance_match.group(1))
-    
-    # 根据描述词推断
-    if '很近' in description or '紧' in description:
-        return 2.0
-    elif '很远' in description or '远' in description:
-        return 10.0
-    elif '适中' in description or '中等' in description:
-        return 5.0
-    
-    return default
+    return parse_description(description).distance(default)
 
 
 def extract_height(description: str, default: float = 2.0) -> float:
     """从描述中提取高度"""
-    import re
-    
-    # 匹配高度描述
-    height_match = re.search(r'高度?\s*(\d+(?:\.\d+)?)', description)
-    if height_match:
-        return float(height_match.group(1))
-    
-    # 根据描述词推断
-    if '高' in description:
-        return 5.0
-    elif '低' in description:
-        return 1.0
-    
-    return default
+    return parse_description(description).height(default)
 
 
 def extract_position(description: str) -> Dict[str, float]:
     """从描述中提取位置坐标"""
-    import re
-    
-    # 解析方向词
-    position = {'x': 0.0, 'y': 0.0, 'z': 0.0}
-    
-    # 前后移动
-    if '前' in description:
-        position['z'] = 5.0
-    elif '后' in description:
-        position['z'] = -5.0
-    
-    # 左右移动
-    if '左' in description:
-        position['x'] = -5.0
-    elif '右' in description:
-        position['x'] = 5.0
-    
-    # 上下移动  
-    if '上' in description:
-        position['y'] = 5.0
-    elif '下' in description:
-        position['y'] = -5.0
-    
-    # 解析具体坐标
-    coord_match = re.search(r'(\d+(?:\.\d+)?)[,，]\s*(\d+(?:\.\d+)?)[,，]\s*(\d+(?:\.\d+)?)', description)
-    if coord_match:
-        position['x'] = float(coord_match.group(1))
-        position['y'] = float(coord_match.group(2))
-        position['z'] = float(coord_match.group(3))
-    
-    return position if any(v != 0.0 for v in position.values()) else None
+    return parse_description(description).position()
 
 
 def extract_rotation(description: str) -> Dict[str, float]:
     """从描述中提取旋转角度"""
-    import re
-    
-    rotation = {'x': 0.0, 'y': 0.0, 'z': 0.0}
-    
-    # 水平旋转（Y轴）
-    if '左转' in description:
-        rotation['y'] = -90.0
-    elif '右转' in description:
-        rotation['y'] = 90.0
-    elif '转身' in description or '掉头' in description:
-        rotation['y'] = 180.0
-    
-    # 匹配具体旋转角度
-    angle_match = re.search(r'旋转\s*(\d+(?:\.\d+)?)\s*度', description)
-    if angle_match:
-        rotation['y'] = float(angle_match.group(1))
-    
-    return rotation if any(v != 0.0 for v in rotation.values()) else None
+    return parse_description(description).rotation()
 
 
-def create_smart_movement_animation(
+async def create_smart_movement_animation(
     ctx: Context,
     name: str,
     target_position: Dict[str, float],
@@ -2042,7 +2670,7 @@ def create_smart_movement_animation(
         {"position": target_position}  # 终点
     ]
     
-    return create_multipoint_animation(
+    return await create_multipoint_animation(
         ctx=ctx,
         name=name,
         points=points,
@@ -2056,7 +2684,7 @@ def create_smart_movement_animation(
     )
 
 
-def create_safe_camera_movement(
+async def create_safe_camera_movement(
     ctx: Context,
     camera_name: str = "Main Camera",
     target_object_name: str = None,
@@ -2082,7 +2710,7 @@ def create_safe_camera_movement(
         str: 创建结果消息
     """
     if movement_type == "orbit" and target_object_name:
-        return rotate_around_target_animation(
+        return await rotate_around_target_animation(
             ctx=ctx,
             moving_object_name=camera_name,
             target_object_name=target_object_name,
@@ -2092,7 +2720,7 @@ def create_safe_camera_movement(
             timeline_asset_name="SafeCameraOrbit"
         )
     elif movement_type == "approach" and target_object_name:
-        return camera_closeup_animation(
+        return await camera_closeup_animation(
             ctx=ctx,
             camera_name=camera_name,
             target_object_name=target_object_name,
@@ -2101,7 +2729,7 @@ def create_safe_camera_movement(
             timeline_asset_name="SafeCameraApproach"
         )
     elif movement_type == "sweep":
-        return camera_sweep_animation(
+        return await camera_sweep_animation(
             ctx=ctx,
             camera_name=camera_name,
             pitch_angle=0.0,
@@ -2118,7 +2746,77 @@ def create_safe_camera_movement(
 
 
 
-def generate_pour_animation(objects: List[str], pour_duration: float = 3.0, pour_height: float = 0.2) -> List[Dict[str, Any]]:
+async def generate_clip2_keyframes(
+    requests: List[Tuple[str, List[str]]],
+    params: Optional[Dict[str, Any]] = None,
+    fit_lift_to_scene: bool = True,
+    fallback: bool = True
+) -> List[List[Dict[str, Any]]]:
+    """
+    批量生成clip2关键帧
+
+    所有请求涉及的物体信息通过一次BATCH请求获取，同一种clip2函数的请求由CLIP2_TEMPLATES中的
+    关键帧模板一次向量化求值，带抬升关键帧的模板再按场景障碍物调整抬升高度。
+
+    参数：
+        requests: (clip2函数名, 物体列表)的列表，物体列表的第一项为移动/操作的物体
+        params: 覆盖模板默认参数（如pour_duration），对所有请求生效
+        fit_lift_to_scene: 是否按场景障碍物计算抬升关键帧的高度
+        fallback: 函数未知或物体不存在时是否改用默认弹跳动画
+
+    返回值：
+        List[List[Dict]]: 与requests一一对应的关键帧列表，无法生成时为空列表
+    """
+    object_names = list(dict.fromkeys(name for _, objects in requests for name in objects or ["DefaultObject"]))
+    object_infos = dict(zip(object_names, await get_objects_info(object_names))) if object_names else {}
+
+    def exists(name: str) -> bool:
+        return object_infos.get(name, {}).get("success", False)
+
+    results: List[List[Dict[str, Any]]] = [[] for _ in requests]
+    groups: Dict[str, List[Tuple[int, List[str]]]] = {}
+    for index, (function_name, objects) in enumerate(requests):
+        objects = list(objects or [])
+        if fallback:
+            if function_name not in CLIP2_TEMPLATES:
+                logger.warning(f"未知的clip2函数 '{function_name}'，使用默认弹跳动画")
+                function_name = "default_bounce_animation"
+            elif not all(exists(name) for name in objects):
+                logger.error(f"物体 '{next(name for name in objects if not exists(name))}' 不存在")
+                function_name = "default_bounce_animation"
+            if function_name == "default_bounce_animation":
+                objects = objects[:1] or ["DefaultObject"]
+        template = CLIP2_TEMPLATES[function_name]
+        used = objects[:template.min_objects]
+        if len(used) < template.min_objects or not all(exists(name) for name in used):
+            continue
+        groups.setdefault(function_name, []).append((index, objects))
+
+    for function_name, members in groups.items():
+        template = CLIP2_TEMPLATES[function_name]
+        try:
+            pairs = [(object_infos[objects[0]], object_infos[objects[1]] if template.min_objects > 1 else None)
+                     for _, objects in members]
+            for (index, _), keyframes in zip(members, evaluate_template(function_name, pairs, params)):
+                results[index] = keyframes
+        except Exception as e:
+            logger.error(f"生成{function_name}关键帧时出错: {str(e)}")
+            continue
+
+        if fit_lift_to_scene and template.lift_rows:
+            lift_height = template.resolve(params)["lift_height"]
+            for index, objects in members:
+                results[index] = await fit_keyframe_lift(
+                    results[index], objects[0], object_infos[objects[0]], template.lift_rows, lift_height, objects[1:]
+                )
+    return results
+
+async def _generate_clip2(function_name: str, objects: List[str], params: Dict[str, Any] = None,
+                          fit_lift_to_scene: bool = True) -> List[Dict[str, Any]]:
+    (keyframes,) = await generate_clip2_keyframes([(function_name, objects)], params, fit_lift_to_scene, fallback=False)
+    return keyframes
+
+async def generate_pour_animation(objects: List[str], pour_duration: float = 3.0, pour_height: float = 0.2, fit_lift_to_scene: bool = True) -> List[Dict[str, Any]]:
     """
     生成倾倒液体的动画关键帧
     根据目标容器的bounds计算倒液体高度，使用X轴旋转进行倾倒
@@ -2127,108 +2825,16 @@ def generate_pour_animation(objects: List[str], pour_duration: float = 3.0, pour
         objects: 物体名称列表，objects[0]为容器，objects[1]为目标容器
         pour_duration: 倾倒持续时间
         pour_height: 倾倒时的高度（备用参数，优先使用bounds计算）
+        fit_lift_to_scene: 是否按场景障碍物计算防穿模抬升高度（否则固定抬升2米）
         
     返回值：
         List[Dict]: 关键帧数据列表
     """
-    if len(objects) < 2:
-        return []
-    
-    try:
-        # 获取源容器信息
-        source_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[0]})
-        if not source_info.get("success", False):
-            return []
-        
-        # 获取目标容器信息
-        target_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[1]})
-        if not target_info.get("success", False):
-            return []
-        
-        source_pos = {
-            "x": source_info["position"][0],
-            "y": source_info["position"][1],
-            "z": source_info["position"][2]
-        }
-        
-        # 获取当前旋转信息作为基础旋转
-        current_rot = {
-            "x": source_info["rotation"][0],
-            "y": source_info["rotation"][1],
-            "z": source_info["rotation"][2]
-        }
-        
-        # 获取目标容器的bounds信息来计算倒液体高度
-        target_bounds = target_info.get("bounds", {}).get("renderer", {})
-        source_bounds = source_info.get("bounds", {}).get("renderer", {})
-        
-        if target_bounds.get("exists", False):
-            # 使用目标容器bounds在Y方向上的长度作为倾倒高度基准
-            target_height = target_bounds["size"][1]
-            print(f"[generate_pour_animation] 目标容器bounds高度: {target_height}米")
-            
-            # 如果源容器也有bounds信息，计算更精确的倾倒高度
-            if source_bounds.get("exists", False):
-                source_height = source_bounds["size"][1]
-                print(f"[generate_pour_animation] 源容器bounds高度: {source_height}米")
-                # 计算精确倾倒高度：目标高度 + 源容器高度的一半 + 安全距离
-                calculated_pour_height = target_height + source_height * 0.5 + 0.2
-            else:
-                calculated_pour_height = target_height + 0.3  # 默认安全距离
-            
-            pour_height = calculated_pour_height
-            print(f"[generate_pour_animation] 最终计算的倾倒高度: {pour_height}米")
-        else:
-            print(f"[generate_pour_animation] 无法获取目标容器bounds，使用默认高度: {pour_height}米")
-        
-        # 计算倾倒位置：目标容器位置上方pour_height的距离
-        target_pos = {
-            "x": target_info["position"][0],
-            "y": target_info["position"][1] + pour_height,
-            "z": target_info["position"][2]
-        }
-        
-        # 计算防穿模的提升位置：在原始位置基础上Y轴+2
-        lift_pos = {
-            "x": source_pos["x"],
-            "y": source_pos["y"] + 2.0,  # Y轴提高2个单位防止穿模
-            "z": source_pos["z"]
-        }
-        
-        lifted_target_pos = {
-            "x": target_pos["x"],
-            "y": target_pos["y"], 
-            "z": target_pos["z"]
-        }
-        
-        print(f"[generate_pour_animation] 原始位置: ({source_pos['x']:.3f}, {source_pos['y']:.3f}, {source_pos['z']:.3f})")
-        print(f"[generate_pour_animation] 防穿模提升位置: ({lift_pos['x']:.3f}, {lift_pos['y']:.3f}, {lift_pos['z']:.3f})")
-        print(f"[generate_pour_animation] 目标位置: ({target_pos['x']:.3f}, {target_pos['y']:.3f}, {target_pos['z']:.3f})")
-        print(f"[generate_pour_animation] 提升后目标位置: ({lifted_target_pos['x']:.3f}, {lifted_target_pos['y']:.3f}, {lifted_target_pos['z']:.3f})")
-        
-        # 倾倒动画：先提升防穿模，移动到目标容器上方，X轴旋转倾倒，复位，返回
-        keyframes = [
-            {"position": source_pos, "rotation": current_rot, "time": 0.0},
-            {"position": lift_pos, "rotation": current_rot, "time": 0.3},  # 先提升2个单位防穿模
-            {"position": lifted_target_pos, "rotation": current_rot, "time": 1.3},  # 移动到提升后的目标上方
-            # X轴旋转-90度开始倾倒
-            {"position": lifted_target_pos, "rotation": {"x": current_rot["x"] - 90, "y": current_rot["y"], "z": current_rot["z"]}, "time": 1.8},  
-            # 保持倾斜状态倒液体
-            {"position": lifted_target_pos, "rotation": {"x": current_rot["x"] - 90, "y": current_rot["y"], "z": current_rot["z"]}, "time": 1.8 + pour_duration},  
-            # X轴旋转+90度复位（回到原始旋转）
-            {"position": lifted_target_pos, "rotation": current_rot, "time": 2.8 + pour_duration},  
-            {"position": lift_pos, "rotation": current_rot, "time": 3.8 + pour_duration},  # 先回到提升位置
-            {"position": source_pos, "rotation": current_rot, "time": 4.1 + pour_duration}  # 最后回到原位
-        ]
-        
-        return keyframes
-        
-    except Exception as e:
-        print(f"生成倾倒动画关键帧时出错: {str(e)}")
-        return []
+    return await _generate_clip2("pour_liquid", objects, {"pour_duration": pour_duration, "pour_height": pour_height},
+                                 fit_lift_to_scene)
 
 
-def generate_insert_power_cable_animation(objects: List[str], insert_duration: float = 2.0) -> List[Dict[str, Any]]:
+async def generate_insert_power_cable_animation(objects: List[str], insert_duration: float = 2.0) -> List[Dict[str, Any]]:
     """
     生成插入电源线的动画关键帧
     电源线先向后移动，再移动到电器后面，然后从后方向前插入电器，插入后保持在插好的位置
@@ -2240,139 +2846,13 @@ def generate_insert_power_cable_animation(objects: List[str], insert_duration: f
     返回值：
         List[Dict]: 关键帧数据列表
     """
-    if len(objects) < 2:
-        return []
-    
-    try:
-        # 获取电源线信息
-        cable_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[0]})
-        if not cable_info.get("success", False):
-            print(f"[generate_insert_power_cable_animation] 无法获取电源线信息: {objects[0]}")
-            return []
-        
-        # 获取电器设备信息
-        device_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[1]})
-        if not device_info.get("success", False):
-            print(f"[generate_insert_power_cable_animation] 无法获取电器设备信息: {objects[1]}")
-            return []
-        
-        # 提取电源线的初始位置和旋转
-        cable_original_pos = {
-            "x": cable_info["position"][0],
-            "y": cable_info["position"][1],
-            "z": cable_info["position"][2]
-        }
-        
-        cable_original_rot = {
-            "x": cable_info["rotation"][0],
-            "y": cable_info["rotation"][1],
-            "z": cable_info["rotation"][2]
-        }
-        
-        # 提取电器设备的位置和bounds
-        device_pos = {
-            "x": device_info["position"][0],
-            "y": device_info["position"][1],
-            "z": device_info["position"][2]
-        }
-        
-        # 获取电器设备的bounds信息用于计算插入位置
-        device_bounds = device_info.get("bounds", {}).get("renderer", {})
-        cable_bounds = cable_info.get("bounds", {}).get("renderer", {})
-        
-        # 计算插入位置：电器设备的后侧偏下位置
-        insert_offset_x = 0.0  # X轴保持与设备中心对齐
-        insert_offset_y = -0.1  # Y轴稍微向下偏移
-        insert_offset_z = 0.5   # Z轴向后偏移，模拟插入到设备后面
-        
-        # 如果有bounds信息，使用更精确的计算
-        if device_bounds.get("exists", False):
-            device_width = device_bounds["size"][0]   # X轴宽度
-            device_height = device_bounds["size"][1]  # Y轴高度
-            device_depth = device_bounds["size"][2]   # Z轴深度
-            
-            print(f"[generate_insert_power_cable_animation] 电器设备bounds尺寸: {device_width:.3f} x {device_height:.3f} x {device_depth:.3f}")
-            
-            # 更精确的插入位置计算：设备后侧中下部
-            insert_offset_x = 0.0  # 保持X轴中心对齐
-            insert_offset_y = -device_height * 0.3  # Y轴向下偏移30%设备高度
-            insert_offset_z = device_depth * 0.6     # Z轴向后偏移60%设备深度
-            
-        # 计算关键位置点
-        # 1. 后退位置：电源线先向Z轴正方向移动5米，到达设备远后方
-        backward_pos = {
-            "x": cable_original_pos["x"],
-            "y": cable_original_pos["y"],  # 保持原始Y值不变
-            "z": cable_original_pos["z"] + 5.0  # 向Z轴正方向移动5米，到达设备远后方
-        }
-        
-        # 2. 设备后方准备位置：移动到设备后方，准备插入
-        behind_device_pos = {
-            "x": device_pos["x"] + insert_offset_x,
-            "y": cable_original_pos["y"],  # 保持原始Y值不变
-            "z": device_pos["z"] + insert_offset_z + 3.0  # 在设备后方1米作为准备位置（Z轴正方向）
-        }
-        
-        # 3. 最终插入位置：电器设备的插口位置
-        final_insert_pos = {
-            "x": device_pos["x"] + insert_offset_x,
-            "y": cable_original_pos["y"],  # 保持原始Y值不变
-            "z": device_pos["z"] + insert_offset_z + 1.5  # 插入到设备的插口位置
-        }
-        
-        # 保持原始旋转角度不变
-        insert_rot = {
-            "x": cable_original_rot["x"],  # 保持原始X旋转
-            "y": cable_original_rot["y"],  # 保持原始Y旋转
-            "z": cable_original_rot["z"]   # 保持原始Z旋转
-        }
-        
-        print(f"[generate_insert_power_cable_animation] 电源线原位置: ({cable_original_pos['x']:.3f}, {cable_original_pos['y']:.3f}, {cable_original_pos['z']:.3f})")
-        print(f"[generate_insert_power_cable_animation] 电源线原旋转: ({cable_original_rot['x']:.1f}, {cable_original_rot['y']:.1f}, {cable_original_rot['z']:.1f})")
-        print(f"[generate_insert_power_cable_animation] 设备位置: ({device_pos['x']:.3f}, {device_pos['y']:.3f}, {device_pos['z']:.3f})")
-        print(f"[generate_insert_power_cable_animation] 远后方位置(Z+5): ({backward_pos['x']:.3f}, {backward_pos['y']:.3f}, {backward_pos['z']:.3f})")
-        print(f"[generate_insert_power_cable_animation] 设备后方位置: ({behind_device_pos['x']:.3f}, {behind_device_pos['y']:.3f}, {behind_device_pos['z']:.3f})")
-        print(f"[generate_insert_power_cable_animation] 最终插入位置: ({final_insert_pos['x']:.3f}, {final_insert_pos['y']:.3f}, {final_insert_pos['z']:.3f})")
-        print(f"[generate_insert_power_cable_animation] 注意：整个过程中rotation和Y轴位置保持不变")
-        
-        # 生成插入电源线的动画关键帧
-        # 动画流程：原位置 -> 向Z轴正方向移动5米 -> 移动到设备后方 -> 从后方向前插入 -> 完全插入并保持
-        # 注意：整个过程中rotation和Y轴位置保持不变
-        keyframes = [
-            # 1. 起始位置
-            {"position": cable_original_pos, "rotation": cable_original_rot, "time": 0.0},
-            
-            # 2. 向Z轴正方向移动5米，到达设备远后方（保持原始rotation和Y值）
-            {"position": backward_pos, "rotation": cable_original_rot, "time": 0.8},
-            
-            # 3. 移动到设备正后方准备位置（保持原始rotation和Y值）
-            {"position": behind_device_pos, "rotation": cable_original_rot, "time": 1.8},
-            
-            # 4. 从后方向前移动开始插入（保持原始rotation和Y值）
-            {"position": {
-                "x": final_insert_pos["x"],
-                "y": cable_original_pos["y"],  # 保持原始Y值
-                "z": final_insert_pos["z"] + 0.3  # 在插口后方0.3米，准备插入
-            }, "rotation": cable_original_rot, "time": 2.3},
-            
-            # 5. 完全插入到位（保持原始rotation和Y值）
-            {"position": final_insert_pos, "rotation": cable_original_rot, "time": 2.3 + insert_duration},
-            
-            # 6. 保持插好的位置（保持原始rotation和Y值）
-            {"position": final_insert_pos, "rotation": cable_original_rot, "time": 3.0 + insert_duration}
-        ]
-        
-        return keyframes
-        
-    except Exception as e:
-        print(f"生成插入电源线动画关键帧时出错: {str(e)}")
-        return []
+    return await _generate_clip2("insert_power_cable", objects, {"insert_duration": insert_duration})
 
 
-def generate_wear_gloves_animation(objects: List[str], bounce_duration: float = 1.0, disappear_duration: float = 1.0) -> List[Dict[str, Any]]:
+async def generate_wear_gloves_animation(objects: List[str], bounce_duration: float = 1.0, disappear_duration: float = 1.0) -> List[Dict[str, Any]]:
     """
     生成戴手套的动画关键帧
-    手套先简单弹跳，然后将position.z减30，确保不会出现在相机视线范围内
+    手套先简单弹跳，然后向Z轴负方向移动，确保不会出现在相机视线范围内
     
     参数：
         objects: 物体名称列表，objects[0]为手套
@@ -2382,84 +2862,11 @@ def generate_wear_gloves_animation(objects: List[str], bounce_duration: float =
     返回值：
         List[Dict]: 关键帧数据列表
     """
-    if len(objects) < 1:
-        return []
-    
-    try:
-        # 获取手套信息
-        gloves_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[0]})
-        if not gloves_info.get("success", False):
-            print(f"[generate_wear_gloves_animation] 无法获取手套信息: {objects[0]}")
-            return []
-        
-        # 提取手套的初始位置和旋转
-        gloves_original_pos = {
-            "x": gloves_info["position"][0],
-            "y": gloves_info["position"][1],
-            "z": gloves_info["position"][2]
-        }
-        
-        gloves_original_rot = {
-            "x": gloves_info["rotation"][0],
-            "y": gloves_info["rotation"][1],
-            "z": gloves_info["rotation"][2]
-        }
-        
-        # 计算弹跳位置：Y轴向上偏移0.5米
-        bounce_pos = {
-            "x": gloves_original_pos["x"],
-            "y": gloves_original_pos["y"] + 0.5,
-            "z": gloves_original_pos["z"]
-        }
-        
-        # 计算最终消失位置：Z轴减30
-        final_pos = {
-            "x": gloves_original_pos["x"],
-            "y": gloves_original_pos["y"] + 5.0,
-            "z": gloves_original_pos["z"] - 15.0  # Z轴减20，确保不在相机视线范围内
-        }
-
-        # 计算最终消失位置：Z轴减30
-        final_pos1 = {
-            "x": gloves_original_pos["x"],
-            "y": gloves_original_pos["y"] + 10.0,  # 回到原始Y位置
-            "z": gloves_original_pos["z"] - 20.0  # Z轴减50，确保不在相机视线范围内
-        }
-        
-        print(f"[generate_wear_gloves_animation] 手套原位置: ({gloves_original_pos['x']:.3f}, {gloves_original_pos['y']:.3f}, {gloves_original_pos['z']:.3f})")
-        print(f"[generate_wear_gloves_animation] 手套原旋转: ({gloves_original_rot['x']:.1f}, {gloves_original_rot['y']:.1f}, {gloves_original_rot['z']:.1f})")
-        print(f"[generate_wear_gloves_animation] 弹跳位置: ({bounce_pos['x']:.3f}, {bounce_pos['y']:.3f}, {bounce_pos['z']:.3f})")
-        print(f"[generate_wear_gloves_animation] 最终消失位置: ({final_pos['x']:.3f}, {final_pos['y']:.3f}, {final_pos['z']:.3f})")
-        print(f"[generate_wear_gloves_animation] 注意：整个过程中rotation保持不变")
-        
-        # 生成戴手套的动画关键帧
-        # 动画流程：原位置 -> 弹跳上升 -> 回到原位置 -> 向Z轴负方向移动30米消失
-        # 注意：整个过程中rotation保持不变
-        keyframes = [
-            # 1. 起始位置
-            {"position": gloves_original_pos, "rotation": gloves_original_rot, "time": 0.0},
-            
-            # 2. 弹跳上升（保持原始rotation）
-            {"position": bounce_pos, "rotation": gloves_original_rot, "time": bounce_duration / 2},
-            
-            # 3. 弹跳回到原位置（保持原始rotation）
-            {"position": gloves_original_pos, "rotation": gloves_original_rot, "time": bounce_duration},
-            
-            # 4. 向Z轴负方向移动20米，消失在相机视线外（保持原始rotation）
-            {"position": final_pos, "rotation": gloves_original_rot, "time": bounce_duration + disappear_duration - 0.1},
-
-            # 5. 向Z轴负方向移动50米，消失在相机视线外（保持原始rotation）
-            {"position": final_pos1, "rotation": gloves_original_rot, "time": bounce_duration + disappear_duration}
-        ]
-        
-        return keyframes
-        
-    except Exception as e:
-        print(f"生成戴手套动画关键帧时出错: {str(e)}")
-        return []
+    return await _generate_clip2("wear_gloves", objects,
+                                 {"bounce_duration": bounce_duration, "disappear_duration": disappear_duration})
 
 
-def default_bounce_animation(object_name: str) -> List[Dict[str, Any]]:
+async def default_bounce_animation(object_name: str) -> List[Dict[str, Any]]:
     """
     默认的弹跳动画（降级方案）
     
@@ -2469,41 +2876,12 @@ def default_bounce_animation(object_name: str) -> List[Dict[str, Any]]:
     返回值：
         List[Dict]: 关键帧数据列表
     """
-    try:
-        object_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": object_name})
-        if not object_info.get("success", False):
-            return []
-        
-        current_pos = {
-            "x": object_info["position"][0],
-            "y": object_info["position"][1],
-            "z": object_info["position"][2]
-        }
-        
-        # 获取当前旋转信息，保持原有旋转
-        current_rot = {
-            "x": object_info["rotation"][0],
-            "y": object_info["rotation"][1],
-            "z": object_info["rotation"][2]
-        }
-        
-        # 简单弹跳动画，保持原有旋转
-        keyframes = [
-            {"position": current_pos, "rotation": current_rot, "time": 0.0},
-            {"position": {"x": current_pos["x"], "y": current_pos["y"] + 0.5, "z": current_pos["z"]}, "rotation": current_rot, "time": 1.0},
-            {"position": current_pos, "rotation": current_rot, "time": 2.0}
-        ]
-        
-        return keyframes
-        
-    except Exception as e:
-        print(f"生成默认弹跳动画关键帧时出错: {str(e)}")
-        return []
+    return await _generate_clip2("default_bounce_animation", [object_name])
 
 
-def safe_call_clip2_function(function_name: str, objects: List[str]) -> List[Dict[str, Any]]:
+async def safe_call_clip2_function(function_name: str, objects: List[str]) -> List[Dict[str, Any]]:
     """
-    安全调用clip2生成函数
+    安全调用clip2生成函数，函数未知或物体不存在时使用默认弹跳动画
     
     参数：
         function_name: 函数名称
@@ -2512,43 +2890,11 @@ def safe_call_clip2_function(function_name: str, objects: List[str]) -> List[Dic
     返回值：
         List[Dict]: 关键帧数据列表
     """
-    try:
-        if function_name not in CLIP2_FUNCTIONS:
-            print(f"警告：未知的clip2函数 '{function_name}'，使用默认弹跳动画")
-            return default_bounce_animation(objects[0] if objects else "DefaultObject")
-        
-        # 验证所有物体存在
-        for obj_name in objects:
-            obj_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": obj_name})
-            if not obj_info.get("success", False):
-                print(f"错误：物体 '{obj_name}' 不存在")
-                return default_bounce_animation(objects[0] if objects else "DefaultObject")
-        
-        # 调用对应的生成函数
-        if function_name == "pour_liquid":
-            return generate_pour_animation(objects)
-        elif function_name == "default_bounce_animation":
-            return default_bounce_animation(objects[0] if objects else "DefaultObject")
-        elif function_name == "insert_power_cable":
-            return generate_insert_power_cable_animation(objects)
-        elif function_name == "wear_gloves":
-            return generate_wear_gloves_animation(objects)
-        elif function_name == "notebook_writing":
-            return generate_notebook_writing_animation(objects)
-        elif function_name == "move_object_into":
-            return generate_move_object_into_animation(objects)
-        elif function_name == "camera_focus_only":
-            return generate_camera_focus_only_animation(objects)
-        else:
-            return default_bounce_animation(objects[0] if objects else "DefaultObject")
-            
-    except Exception as e:
-        print(f"Clip2生成失败: {e}")
-        return default_bounce_animation(objects[0] if objects else "DefaultObject")
-
+    (keyframes,) = await generate_clip2_keyframes([(function_name, objects)])
+    return keyframes
 
 
-def generate_notebook_writing_animation(objects: List[str], shake_duration: float = 0.5, shake_count: int = 2) -> List[Dict[str, Any]]:
+async def generate_notebook_writing_animation(objects: List[str], shake_duration: float = 0.5, shake_count: int = 2) -> List[Dict[str, Any]]:
     """
     生成在笔记本上做笔记的动画关键帧
     笔记本在position.z方向进行抖动，抖动距离为bounds大小的0.1倍，抖动2次
@@ -2561,91 +2907,11 @@ def generate_notebook_writing_animation(objects: List[str], shake_duration: floa
     返回值：
         List[Dict]: 关键帧数据列表
     """
-    if len(objects) < 1:
-        return []
-    
-    try:
-        # 获取笔记本信息
-        notebook_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[0]})
-        if not notebook_info.get("success", False):
-            print(f"[generate_notebook_writing_animation] 无法获取笔记本信息: {objects[0]}")
-            return []
-        
-        # 提取笔记本的初始位置和旋转
-        notebook_original_pos = {
-            "x": notebook_info["position"][0],
-            "y": notebook_info["position"][1],
-            "z": notebook_info["position"][2]
-        }
-        
-        notebook_original_rot = {
-            "x": notebook_info["rotation"][0],
-            "y": notebook_info["rotation"][1],
-            "z": notebook_info["rotation"][2]
-        }
-        
-        # 获取笔记本的bounds信息来计算抖动距离
-        notebook_bounds = notebook_info.get("bounds", {}).get("renderer", {})
-        
-        # 计算抖动距离：bounds在Z轴方向的0.1倍
-        shake_distance = 0.1  # 默认抖动距离
-        if notebook_bounds.get("exists", False):
-            bounds_z_size = notebook_bounds["size"][2]  # Z轴方向的bounds大小
-            shake_distance = bounds_z_size * 0.1  # 抖动距离为bounds的0.1倍
-            print(f"[generate_notebook_writing_animation] 笔记本Z轴bounds大小: {bounds_z_size:.3f}米")
-            print(f"[generate_notebook_writing_animation] 计算的抖动距离: {shake_distance:.3f}米")
-        else:
-            print(f"[generate_notebook_writing_animation] 无法获取笔记本bounds，使用默认抖动距离: {shake_distance:.3f}米")
-        
-        print(f"[generate_notebook_writing_animation] 笔记本原位置: ({notebook_original_pos['x']:.3f}, {notebook_original_pos['y']:.3f}, {notebook_original_pos['z']:.3f})")
-        print(f"[generate_notebook_writing_animation] 笔记本原旋转: ({notebook_original_rot['x']:.1f}, {notebook_original_rot['y']:.1f}, {notebook_original_rot['z']:.1f})")
-        print(f"[generate_notebook_writing_animation] 抖动次数: {shake_count}, 单次抖动时长: {shake_duration:.1f}秒")
-        print(f"[generate_notebook_writing_animation] 注意：整个过程中rotation保持不变，只在Z轴方向抖动")
-        
-        # 生成做笔记的动画关键帧
-        # 动画流程：原位置 -> 抖动1 -> 回原位 -> 抖动2 -> 回原位
-        # 注意：整个过程中rotation保持不变，只在Z轴方向抖动
-        keyframes = []
-        
-        # 1. 起始位置
-        keyframes.append({"position": notebook_original_pos, "rotation": notebook_original_rot, "time": 0.0})
-        
-        current_time = 0.0
-        
-        # 生成指定次数的抖动
-        for i in range(shake_count):
-            # 每次抖动：向前 -> 向后 -> 回原位
-            current_time += shake_duration / 3  # 向前移动
-            shake_forward_pos = {
-                "x": notebook_original_pos["x"],
-                "y": notebook_original_pos["y"],
-                "z": notebook_original_pos["z"] + shake_distance
-            }
-            keyframes.append({"position": shake_forward_pos, "rotation": notebook_original_rot, "time": current_time})
-            
-            current_time += shake_duration / 3  # 向后移动
-            shake_backward_pos = {
-                "x": notebook_original_pos["x"],
-                "y": notebook_original_pos["y"],
-                "z": notebook_original_pos["z"] - shake_distance
-            }
-            keyframes.append({"position": shake_backward_pos, "rotation": notebook_original_rot, "time": current_time})
-            
-            current_time += shake_duration / 3  # 回到原位
-            keyframes.append({"position": notebook_original_pos, "rotation": notebook_original_rot, "time": current_time})
-        
-        # 最后保持在原位置一小段时间
-        current_time += 0.2
-        keyframes.append({"position": notebook_original_pos, "rotation": notebook_original_rot, "time": current_time})
-        
-        return keyframes
-        
-    except Exception as e:
-        print(f"生成笔记本做笔记动画关键帧时出错: {str(e)}")
-        return []
+    return await _generate_clip2("notebook_writing", objects,
+                                 {"shake_duration": shake_duration, "shake_count": shake_count})
 
 
-def generate_move_object_into_animation(objects: List[str], move_duration: float = 3.0, lift_height: float = 1.0) -> List[Dict[str, Any]]:
+async def generate_move_object_into_animation(objects: List[str], move_duration: float = 3.0, lift_height: float = 1.0, fit_lift_to_scene: bool = True) -> List[Dict[str, Any]]:
     """
     生成将一个物体移动到另一个物体中的动画关键帧
     物体先提升，移动到目标物体上方，然后下降进入目标物体内部
@@ -2653,142 +2919,17 @@ def generate_move_object_into_animation(objects: List[str], move_duration: float
     参数：
         objects: 物体名称列表，objects[0]为要移动的物体，objects[1]为目标容器
         move_duration: 移动操作持续时间
-        lift_height: 提升高度（米）
+        lift_height: 提升高度（米），按场景计算抬升时作为无法避开障碍物时的默认值
+        fit_lift_to_scene: 是否按场景障碍物计算提升高度
         
     返回值：
         List[Dict]: 关键帧数据列表
     """
-    if len(objects) < 2:
-        return []
-    
-    try:
-        # 获取移动物体信息
-        moving_object_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[0]})
-        if not moving_object_info.get("success", False):
-            print(f"[generate_move_object_into_animation] 无法获取移动物体信息: {objects[0]}")
-            return []
-        
-        # 获取目标容器信息
-        target_container_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[1]})
-        if not target_container_info.get("success", False):
-            print(f"[generate_move_object_into_animation] 无法获取目标容器信息: {objects[1]}")
-            return []
-        
-        # 提取移动物体的初始位置和旋转
-        moving_object_original_pos = {
-            "x": moving_object_info["position"][0],
-            "y": moving_object_info["position"][1],
-            "z": moving_object_info["position"][2]
-        }
-        
-        moving_object_original_rot = {
-            "x": moving_object_info["rotation"][0],
-            "y": moving_object_info["rotation"][1],
-            "z": moving_object_info["rotation"][2]
-        }
-        
-        # 提取目标容器的位置
-        target_container_pos = {
-            "x": target_container_info["position"][0],
-            "y": target_container_info["position"][1],
-            "z": target_container_info["position"][2]
-        }
-        
-        # 获取目标容器的bounds信息用于计算插入位置
-        target_bounds = target_container_info.get("bounds", {}).get("renderer", {})
-        moving_bounds = moving_object_info.get("bounds", {}).get("renderer", {})
-        
-        # 计算插入位置：目标容器的中心位置
-        insert_position = {
-            "x": target_container_pos["x"],
-            "y": target_container_pos["y"],
-            "z": target_container_pos["z"]
-        }
-        
-        # 如果有bounds信息，进行更精确的计算
-        if target_bounds.get("exists", False) and moving_bounds.get("exists", False):
-            target_height = target_bounds["size"][1]  # 目标容器高度
-            moving_height = moving_bounds["size"][1]  # 移动物体高度
-            
-            print(f"[generate_move_object_into_animation] 目标容器bounds高度: {target_height:.3f}米")
-            print(f"[generate_move_object_into_animation] 移动物体bounds高度: {moving_height:.3f}米")
-            
-            # 计算最终插入位置：目标容器底部稍微向上一点
-            insert_position["y"] = target_container_pos["y"] - target_height * 0.3  # 插入到容器下部
-            
-        else:
-            print(f"[generate_move_object_into_animation] 无法获取bounds信息，使用默认插入位置")
-            # 默认插入位置：目标容器位置稍微向下
-            insert_position["y"] = target_container_pos["y"] - 0.2
-        
-        # 计算关键位置点
-        # 1. 提升位置：在原位置基础上Y轴提升
-        lift_pos = {
-            "x": moving_object_original_pos["x"],
-            "y": moving_object_original_pos["y"] + lift_height,
-            "z": moving_object_original_pos["z"]
-        }
-        
-        # 2. 目标上方位置：在目标容器上方准备下降
-        above_target_pos = {
-            "x": target_container_pos["x"],
-            "y": target_container_pos["y"] + lift_height,
-            "z": target_container_pos["z"]
-        }
-        
-        # 3. 最终插入位置
-        final_insert_pos = insert_position
-        
-        # 保持原始旋转角度不变
-        insert_rot = {
-            "x": moving_object_original_rot["x"],
-            "y": moving_object_original_rot["y"],
-            "z": moving_object_original_rot["z"]
-        }
-        
-        print(f"[generate_move_object_into_animation] 移动物体原位置: ({moving_object_original_pos['x']:.3f}, {moving_object_original_pos['y']:.3f}, {moving_object_original_pos['z']:.3f})")
-        print(f"[generate_move_object_into_animation] 移动物体原旋转: ({moving_object_original_rot['x']:.1f}, {moving_object_original_rot['y']:.1f}, {moving_object_original_rot['z']:.1f})")
-        print(f"[generate_move_object_into_animation] 目标容器位置: ({target_container_pos['x']:.3f}, {target_container_pos['y']:.3f}, {target_container_pos['z']:.3f})")
-        print(f"[generate_move_object_into_animation] 提升位置: ({lift_pos['x']:.3f}, {lift_pos['y']:.3f}, {lift_pos['z']:.3f})")
-        print(f"[generate_move_object_into_animation] 目标上方位置: ({above_target_pos['x']:.3f}, {above_target_pos['y']:.3f}, {above_target_pos['z']:.3f})")
-        print(f"[generate_move_object_into_animation] 最终插入位置: ({final_insert_pos['x']:.3f}, {final_insert_pos['y']:.3f}, {final_insert_pos['z']:.3f})")
-        print(f"[generate_move_object_into_animation] 注意：整个过程中rotation保持不变")
-        
-        # 生成将物体移动到另一个物体中的动画关键帧
-        # 动画流程：原位置 -> 提升 -> 移动到目标上方 -> 下降插入 -> 完全插入并保持
-        # 注意：整个过程中rotation保持不变
-        keyframes = [
-            # 1. 起始位置
-            {"position": moving_object_original_pos, "rotation": moving_object_original_rot, "time": 0.0},
-            
-            # 2. 提升到指定高度（保持原始rotation）
-            {"position": lift_pos, "rotation": moving_object_original_rot, "time": 0.8},
-            
-            # 3. 水平移动到目标容器上方（保持原始rotation）
-            {"position": above_target_pos, "rotation": moving_object_original_rot, "time": 1.8},
-            
-            # 4. 开始下降，准备插入（保持原始rotation）
-            {"position": {
-                "x": final_insert_pos["x"],
-                "y": final_insert_pos["y"] + 0.3,  # 在插入位置上方0.3米，准备最后插入
-                "z": final_insert_pos["z"]
-            }, "rotation": moving_object_original_rot, "time": 2.3},
-            
-            # 5. 完全插入到位（保持原始rotation）
-            {"position": final_insert_pos, "rotation": moving_object_original_rot, "time": 2.3 + move_duration},
-            
-            # 6. 保持插入位置（保持原始rotation）
-            {"position": final_insert_pos, "rotation": moving_object_original_rot, "time": 3.0 + move_duration}
-        ]
-        
-        return keyframes
-        
-    except Exception as e:
-        print(f"生成物体移动到容器动画关键帧时出错: {str(e)}")
-        return []
+    return await _generate_clip2("move_object_into", objects, {"move_duration": move_duration, "lift_height": lift_height},
+                                 fit_lift_to_scene)
 
 
-def generate_camera_focus_only_animation(objects: List[str], focus_duration: float = 3.0) -> List[Dict[str, Any]]:
+async def generate_camera_focus_only_animation(objects: List[str], focus_duration: float = 3.0) -> List[Dict[str, Any]]:
     """
     生成纯相机聚焦的动画关键帧
     相机聚焦在目标物体上停留指定时间，目标物体保持完全静止
@@ -2800,50 +2941,7 @@ def generate_camera_focus_only_animation(objects: List[str], focus_duration: flo
     返回值：
         List[Dict]: 关键帧数据列表（物体保持静止的关键帧）
     """
-    if len(objects) < 1:
-        return []
-    
-    try:
-        # 获取目标物体信息，确保物体存在
-        target_info = get_unity_connection().send_command("GET_OBJECT_INFO", {"name": objects[0]})
-        if not target_info.get("success", False):
-            print(f"[generate_camera_focus_only_animation] 无法获取目标物体信息: {objects[0]}")
-            return []
-        
-        # 提取目标物体的当前位置和旋转信息
-        target_pos = {
-            "x": target_info["position"][0],
-            "y": target_info["position"][1],
-            "z": target_info["position"][2]
-        }
-        
-        target_rot = {
-            "x": target_info["rotation"][0],
-            "y": target_info["rotation"][1],
-            "z": target_info["rotation"][2]
-        }
-        
-        print(f"[generate_camera_focus_only_animation] 目标物体: {objects[0]}")
-        print(f"[generate_camera_focus_only_animation] 目标位置: ({target_pos['x']:.3f}, {target_pos['y']:.3f}, {target_pos['z']:.3f})")
-        print(f"[generate_camera_focus_only_animation] 目标旋转: ({target_rot['x']:.1f}, {target_rot['y']:.1f}, {target_rot['z']:.1f})")
-        print(f"[generate_camera_focus_only_animation] 聚焦停留时间: {focus_duration:.1f}秒")
-        print(f"[generate_camera_focus_only_animation] 注意：物体在整个时间内保持完全静止")
-        
-        # 生成物体保持静止的关键帧序列
-        # 物体在整个focus_duration时间内保持在当前位置和旋转不变
-        keyframes = [
-            # 起始位置：物体保持当前位置和旋转
-            {"position": target_pos, "rotation": target_rot, "time": 0.0},
-            
-            # 结束位置：物体保持完全相同的位置和旋转
-            {"position": target_pos, "rotation": target_rot, "time": focus_duration}
-        ]
-        
-        return keyframes
-        
-    except Exception as e:
-        print(f"生成纯相机聚焦动画关键帧时出错: {str(e)}")
-        return []
+    return await _generate_clip2("camera_focus_only", objects, {"focus_duration": focus_duration})
 
 
 # 更新CLIP2_FUNCTIONS字典
@@ -2861,27 +2959,20 @@ def calculate_clip2_duration(function_name: str, objects: List[str], keyframes:
     """
     根据clip2函数类型和物体数量计算动画时长
     
+    基础时长和关键帧数量直接取自CLIP2_TEMPLATES中的模板，不需要先生成关键帧
+    
     参数：
         function_name: clip2函数名称
         objects: 物体列表
-        keyframes: 关键帧数据（如果有的话）
+        keyframes: 关键帧数据（如果有的话，按其数量调整时长，否则使用模板的关键帧数量）
     
     返回值：
         float: 计算出的动画时长（秒）
     """
-    # 根据函数名称返回预设的时长
-    duration_map = {
-        "pour_liquid": 7.1,
-        "default_bounce_animation": 2.0,
-        "insert_power_cable": 5.0,
-        "wear_gloves": 2.0,
-        "notebook_writing": 1.2,
-        "move_object_into": 6.0,
-        "camera_focus_only": 3.0
-    }
+    template = CLIP2_TEMPLATES.get(function_name)
     
     # 获取基础时长
-    base_duration = duration_map.get(function_name, 4.0)
+    base_duration = template.duration if template else 4.0
     
     # 根据物体数量适当调整时长
     if len(objects) > 2:
@@ -2889,11 +2980,10 @@ def calculate_clip2_duration(function_name: str, objects: List[str], keyframes:
     elif len(objects) == 1:
         base_duration *= 0.9  # 单物体操作时间稍短
     
-    # 如果有关键帧数据，可以根据关键帧数量调整
-    if keyframes:
-        keyframe_count = len(keyframes)
-        if keyframe_count > 5:
-            base_duration *= 1.2
+    # 关键帧较多的动画时间稍长
+    keyframe_count = len(keyframes) if keyframes is not None else (template.key_count if template else 0)
+    if keyframe_count > 5:
+        base_duration *= 1.2
     
     return round(base_duration, 1)
 
@@ -2910,18 +3000,8 @@ def get_clip2_functions_info() -> str:
     """
     info_lines = ["📋 CLIP2_FUNCTIONS 可用函数列表："]
     
-    function_descriptions = {
-        "pour_liquid": "倾倒液体动画 - 模拟从一个容器向另一个容器倾倒液体的动作",
-        "default_bounce_animation": "默认弹跳动画 - 简单的上下弹跳动作",
-        "insert_power_cable": "插入电源线动画 - 模拟将电源线插入设备的动作",
-        "wear_gloves": "戴手套动画 - 模拟戴上实验手套的动作",
-        "notebook_writing": "笔记本书写动画 - 模拟在笔记本上书写的动作",
-        "move_object_into": "物体移入动画 - 将一个物体移动到另一个物体中",
-        "camera_focus_only": "纯相机聚焦动画 - 仅相机移动，无物体动画"
-    }
-    
     for func_name in CLIP2_FUNCTIONS.keys():
-        description = function_descriptions.get(func_name, "未知功能")
+        description = CLIP2_TEMPLATES[func_name].description if func_name in CLIP2_TEMPLATES else "未知功能"
         info_lines.append(f"  - \"{func_name}\": {description}")
     
     info_lines.append("\n⚠️ 使用提示：")
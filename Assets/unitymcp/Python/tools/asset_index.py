@@ -0,0 +1,487 @@
+"""
+本地工程资产索引
+
+启动后第一次查询时扫描一次Assets目录和所有.meta中的GUID，之后由后台线程按
+config.asset_index_poll_interval轮询目录修改时间，只重新扫描发生变化的目录，
+使索引与磁盘保持一致（Unity的AssetDatabase以.meta为准，没有.meta的文件不算资产）。
+open_scene、new_scene、import_asset、add_graph_pool等工具调用前的存在性检查因此只需
+一次字典查找，不再让Unity通过GET_ASSET_LIST返回整个匹配列表；索引还支持按路径前缀、
+类型和glob查询，并按游标分页返回。
+
+资产类型与Unity的GetMainAssetTypeAtPath一致：按扩展名确定，.asset等YAML资产读取第一个文档的
+类型（MonoBehaviour取m_Script引用的脚本类名），无法确定时为None，按类型的检查交给Unity。
+不在Unity工程中运行或设置enable_asset_index=False时，所有查询都转发给Unity，
+大列表按config.asset_page_size分页获取。
+"""
+
+from typing import List, Dict, Any, Optional, Iterable
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+from pathlib import Path
+import logging
+import os
+import re
+import threading
+import time
+from config import config
+from .unity_yaml import get_project_root
+
+logger = logging.getLogger("UnityMCP")
+
+# 扩展名到Unity主资产类型名
+EXTENSION_TYPES = {
+    '.unity': 'SceneAsset', '.prefab': 'GameObject', '.mat': 'Material', '.shader': 'Shader',
+    '.compute': 'ComputeShader', '.cs': 'MonoScript', '.asmdef': 'AssemblyDefinitionAsset',
+    '.anim': 'AnimationClip', '.controller': 'AnimatorController', '.overrideController': 'AnimatorOverrideController',
+    '.mask': 'AvatarMask', '.playable': 'TimelineAsset', '.physicMaterial': 'PhysicMaterial',
+    '.renderTexture': 'RenderTexture', '.cubemap': 'Cubemap', '.flare': 'Flare', '.guiskin': 'GUISkin',
+    '.mixer': 'AudioMixerController', '.fontsettings': 'Font', '.spriteatlas': 'SpriteAtlas',
+    '.fbx': 'GameObject', '.obj': 'GameObject', '.blend': 'GameObject', '.dae': 'GameObject',
+    '.3ds': 'GameObject', '.max': 'GameObject', '.gltf': 'GameObject', '.glb': 'GameObject',
+    '.png': 'Texture2D', '.jpg': 'Texture2D', '.jpeg': 'Texture2D', '.tga': 'Texture2D', '.psd': 'Texture2D',
+    '.tif': 'Texture2D', '.tiff': 'Texture2D', '.bmp': 'Texture2D', '.gif': 'Texture2D', '.exr': 'Texture2D',
+    '.hdr': 'Texture2D', '.iff': 'Texture2D', '.pict': 'Texture2D',
+    '.wav': 'AudioClip', '.mp3': 'AudioClip', '.ogg': 'AudioClip', '.aif': 'AudioClip', '.aiff': 'AudioClip',
+    '.ttf': 'Font', '.otf': 'Font',
+    '.mp4': 'VideoClip', '.mov': 'VideoClip', '.webm': 'VideoClip', '.avi': 'VideoClip', '.m4v': 'VideoClip',
+    '.txt': 'TextAsset', '.json': 'TextAsset', '.xml': 'TextAsset', '.csv': 'TextAsset', '.bytes': 'TextAsset',
+    '.html': 'TextAsset', '.htm': 'TextAsset', '.md': 'TextAsset', '.yaml': 'TextAsset', '.fnt': 'TextAsset'
+}
+# 内容决定类型的YAML资产
+YAML_TYPED_EXTENSIONS = {'.asset'}
+FOLDER_TYPE = 'DefaultAsset'  # 文件夹和没有专门导入器的文件
+
+# 工具使用的类型别名按扩展名匹配：Unity中场景的主资产类型为SceneAsset，预制体为GameObject（与模型相同）
+TYPE_ALIASES = {'Scene': '.unity', 'Prefab': '.prefab'}
+
+DOCUMENT_TYPE_RE = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*):\s*$')
+SCRIPT_GUID_RE = re.compile(r'^\s*m_Script: \{fileID: -?\d+, guid: ([0-9a-f]{32})')
+MAX_TYPE_LINES = 40
+
+class AssetEntry:
+    """一个带.meta的资产或文件夹"""
+
+    __slots__ = ('path', 'guid', 'meta_mtime', 'is_folder', 'asset_type', 'type_resolved')
+
+    def __init__(self, path: str, guid: Optional[str], meta_mtime: int, is_folder: bool):
+        self.path = path
+        self.guid = guid
+        self.meta_mtime = meta_mtime
+        self.is_folder = is_folder
+        self.asset_type: Optional[str] = None
+        self.type_resolved = False
+
+    @property
+    def name(self) -> str:
+        """不带扩展名的资产名（与Unity的Path.GetFileNameWithoutExtension一致）"""
+        file_name = self.path.rsplit('/', 1)[-1]
+        return file_name if self.is_folder else os.path.splitext(file_name)[0]
+
+    @property
+    def extension(self) -> str:
+        return '' if self.is_folder else os.path.splitext(self.path)[1]
+
+    def to_dict(self, asset_type: Optional[str]) -> Dict[str, Any]:
+        return {'name': self.name, 'path': self.path, 'type': asset_type or 'Unknown', 'guid': self.guid}
+
+def _read_guid(meta_path: str) -> Optional[str]:
+    try:
+        with open(meta_path, 'r', encoding='utf-8', errors='ignore') as f:
+            for _ in range(3):
+                line = f.readline()
+                if line.startswith('guid: '):
+                    return line[6:].strip()
+    except OSError:
+        return None
+    return None
+
+def _normalize(path: str) -> str:
+    return path.replace('\\', '/').strip().strip('/')
+
+class AssetIndex:
+    """Assets目录下全部资产的路径、GUID和类型索引，线程安全"""
+
+    def __init__(self):
+        self.root: Optional[Path] = None
+        self.built_at = 0.0
+        self.refreshed_at = 0.0
+        self._entries: Dict[str, AssetEntry] = {}
+        self._guids: Dict[str, str] = {}
+        self._dirs: Dict[str, int] = {}  # 目录（"Assets/..."）到修改时间(ns)
+        self._sorted: Optional[List[str]] = None  # 按路径排序，前缀查询时二分查找
+        self._lock = threading.RLock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def available(self) -> bool:
+        """当前服务是否运行在Unity工程中且启用了索引"""
+        if not config.enable_asset_index:
+            return False
+        root = get_project_root()
+        return (root / 'Assets').is_dir() and (root / 'ProjectSettings').is_dir()
+
+    def ensure_built(self):
+        """第一次使用或工程根目录变化时扫描整个Assets目录，并启动后台监视线程"""
+        root = get_project_root()
+        with self._lock:
+            if self.root == root:
+                return
+            started = time.perf_counter()
+            self.root = root
+            self._entries.clear()
+            self._guids.clear()
+            self._dirs.clear()
+            self._sorted = None
+            self._scan_directory('Assets')
+            self.built_at = self.refreshed_at = time.monotonic()
+            logger.info(f"Indexed {len(self._entries)} assets in {(time.perf_counter() - started) * 1000:.0f} ms")
+        self.start_watching()
+
+    def refresh(self) -> int:
+        """
+        重新扫描修改时间发生变化的目录
+
+        返回值：
+            int: 重新扫描的目录数
+        """
+        with self._lock:
+            if self.root is None:
+                return 0
+            changed = [directory for directory, mtime in list(self._dirs.items())
+                       if directory in self._dirs and self._mtime(directory) != mtime]
+            for directory in changed:
+                if directory in self._dirs:
+                    self._scan_directory(directory)
+            self.refreshed_at = time.monotonic()
+            return len(changed)
+
+    def start_watching(self):
+        """启动按修改时间轮询的后台线程（asset_index_poll_interval为0时不启动）"""
+        interval = config.asset_index_poll_interval
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="AssetIndexWatcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                changed = self.refresh()
+                if changed:
+                    logger.debug(f"Asset index rescanned {changed} changed directories")
+            except Exception as e:
+                logger.warning(f"Asset index refresh failed: {str(e)}")
+
+    def get(self, path: str) -> Optional[AssetEntry]:
+        """
+        按"Assets/..."路径查找资产；未命中时检查所在目录是否刚发生变化，保证新建的资产立即可见
+
+        参数：
+            path: 资产路径
+
+        返回值：
+            Optional[AssetEntry]: 资产，不存在时为None
+        """
+        self.ensure_built()
+        path = _normalize(path)
+        entry = self._entries.get(path)
+        if entry is None:
+            directory = path.rsplit('/', 1)[0] if '/' in path else ''
+            with self._lock:
+                mtime = self._dirs.get(directory)
+                if mtime is not None and self._mtime(directory) != mtime:
+                    self._scan_directory(directory)
+                entry = self._entries.get(path)
+        return entry
+
+    def exists(self, path: str, asset_type: Optional[str] = None) -> Optional[bool]:
+        """
+        资产是否存在
+
+        参数：
+            path: "Assets/..."资产路径
+            asset_type: 可选的Unity类型名，另支持"Scene"和"Prefab"
+
+        返回值：
+            Optional[bool]: 是否存在；资产存在但类型无法从磁盘确定时为None
+        """
+        entry = self.get(path)
+        if entry is None:
+            return False
+        return self._matches_type(entry, asset_type)
+
+    def path_for_guid(self, guid: str) -> Optional[str]:
+        """
+        通过.meta中的GUID查找资产路径；未命中时重新扫描变化的目录
+
+        参数：
+            guid: 资产GUID
+
+        返回值：
+            Optional[str]: "Assets/..."形式的资产路径，找不到时为None
+        """
+        self.ensure_built()
+        path = self._guids.get(guid)
+        if path is None and time.monotonic() - self.refreshed_at > min(config.asset_index_poll_interval, 1.0):
+            self.refresh()
+            path = self._guids.get(guid)
+        return path
+
+    def query(self, asset_type: Optional[str] = None, search_pattern: Optional[str] = None,
+              folder: str = "Assets", prefix: Optional[str] = None, glob: Optional[str] = None,
+              cursor: int = 0, limit: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        查询资产列表，语义与GET_ASSET_LIST一致
+
+        参数：
+            asset_type: Unity类型名，另支持"Scene"和"Prefab"
+            search_pattern: 名称过滤，空格分隔的每一项都需出现在文件名中（不区分大小写），含*?[时按glob匹配文件名
+            folder: 递归搜索的文件夹
+            prefix: 资产路径前缀
+            glob: 完整资产路径的glob模式，如"Assets/Scenes/**.unity"
+            cursor: 分页游标（结果中的偏移）
+            limit: 每页数量，0表示全部
+
+        返回值：
+            Optional[Dict[str, Any]]: {"assets", "total", "next_cursor"}；
+            有资产的类型无法确定而需要按类型过滤时为None，应改为询问Unity
+        """
+        self.ensure_built()
+        folder = _normalize(folder or "Assets")
+        tokens = [token.lower() for token in (search_pattern or '').split() if token != '*']
+        start = folder + '/'
+        if prefix:
+            prefix = prefix.replace('\\', '/').lstrip('/')
+            if prefix.startswith(start):
+                start = prefix
+            elif not start.startswith(prefix):
+                start = None
+        with self._lock:
+            paths = self._range(start) if start is not None else []
+            matches = []
+            for path in paths:
+                entry = self._entries[path]
+                if glob and not fnmatchcase(path, glob):
+                    continue
+                if tokens and not self._matches_name(entry, tokens):
+                    continue
+                matched = self._matches_type(entry, asset_type)
+                if matched is None:
+                    return None
+                if matched:
+                    matches.append(entry)
+
+        cursor = max(int(cursor or 0), 0)
+        page = matches[cursor:cursor + limit] if limit > 0 else matches[cursor:]
+        next_cursor = cursor + len(page)
+        return {
+            "assets": [entry.to_dict(self._resolve_type(entry)) for entry in page],
+            "total": len(matches),
+            "next_cursor": next_cursor if next_cursor < len(matches) else None
+        }
+
+    def _range(self, prefix: str) -> List[str]:
+        """路径以prefix开头的全部资产，按路径排序"""
+        if self._sorted is None:
+            self._sorted = sorted(self._entries)
+        start = bisect_left(self._sorted, prefix)
+        end = start
+        while end < len(self._sorted) and self._sorted[end].startswith(prefix):
+            end += 1
+        return self._sorted[start:end]
+
+    @staticmethod
+    def _matches_name(entry: AssetEntry, tokens: Iterable[str]) -> bool:
+        file_name = entry.path.rsplit('/', 1)[-1].lower()
+        return all(fnmatchcase(file_name, token) if any(c in token for c in '*?[') else token in file_name
+                   for token in tokens)
+
+    def _matches_type(self, entry: AssetEntry, asset_type: Optional[str]) -> Optional[bool]:
+        if not asset_type:
+            return True
+        alias = TYPE_ALIASES.get(asset_type)
+        if alias is not None:
+            return entry.extension.lower() == alias
+        resolved = self._resolve_type(entry)
+        if resolved is None:
+            return None
+        return resolved == asset_type
+
+    def _resolve_type(self, entry: AssetEntry) -> Optional[str]:
+        if not entry.type_resolved:
+            if entry.is_folder:
+                entry.asset_type = FOLDER_TYPE
+            elif entry.extension.lower() in YAML_TYPED_EXTENSIONS:
+                entry.asset_type = self._read_yaml_type(entry.path)
+            else:
+                # 没有对应导入器的文件在Unity中为DefaultAsset
+                entry.asset_type = EXTENSION_TYPES.get(entry.extension) or EXTENSION_TYPES.get(entry.extension.lower()) \
+                    or FOLDER_TYPE
+            entry.type_resolved = True
+        return entry.asset_type
+
+    def _read_yaml_type(self, path: str) -> Optional[str]:
+        """读取YAML资产第一个文档的类型，MonoBehaviour取m_Script引用的脚本类名"""
+        try:
+            with open(self.root / path, 'r', encoding='utf-8-sig', errors='strict') as f:
+                if not f.readline().startswith('%YAML'):
+                    return None
+                type_name = None
+                for _ in range(MAX_TYPE_LINES):
+                    line = f.readline()
+                    if not line:
+                        break
+                    if type_name is None:
+                        match = DOCUMENT_TYPE_RE.match(line)
+                        if match:
+                            type_name = match.group(1)
+                            if type_name != 'MonoBehaviour':
+                                return type_name
+                        continue
+                    match = SCRIPT_GUID_RE.match(line)
+                    if match:
+                        script = self._guids.get(match.group(1))
+                        return Path(script).stem if script and script.endswith('.cs') else None
+        except (OSError, UnicodeDecodeError):
+            return None
+        return None
+
+    def _mtime(self, directory: str) -> Optional[int]:
+        try:
+            return os.stat(self.root / directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan_directory(self, directory: str):
+        """扫描一个目录的直接子项，新出现的子目录递归扫描，消失的子目录连同其内容一起移除"""
+        mtime = self._mtime(directory)
+        if mtime is None:
+            self._remove_directory(directory)
+            return
+        self._dirs[directory] = mtime
+        try:
+            with os.scandir(self.root / directory) as iterator:
+                children = {item.name: item for item in iterator}
+        except OSError:
+            children = {}
+
+        base = directory + '/'
+        seen = set()
+        for file_name, item in children.items():
+            if not file_name.endswith('.meta'):
+                continue
+            asset_name = file_name[:-5]
+            asset = children.get(asset_name)
+            if asset is None or asset_name.startswith('.') or asset_name.endswith('~'):
+                continue
+            path = base + asset_name
+            seen.add(path)
+            try:
+                meta_mtime = item.stat().st_mtime_ns
+            except OSError:
+                continue
+            is_folder = asset.is_dir()
+            entry = self._entries.get(path)
+            if entry is not None and entry.meta_mtime == meta_mtime and entry.is_folder == is_folder:
+                # 已有资产：只有内容可能决定类型的资产需要重新判断类型
+                entry.type_resolved = entry.type_resolved and entry.extension.lower() not in YAML_TYPED_EXTENSIONS
+            else:
+                self._remove_entry(path)
+                guid = _read_guid(os.path.join(self.root, directory, file_name))
+                self._entries[path] = AssetEntry(path, guid, meta_mtime, is_folder)
+                if guid:
+                    self._guids[guid] = path
+                self._sorted = None
+            if is_folder and path not in self._dirs:
+                self._scan_directory(path)
+
+        for path in [path for path in self._entries_in(directory) if path not in seen]:
+            if self._entries[path].is_folder:
+                self._remove_directory(path)
+            self._remove_entry(path)
+        for child in [child for child in self._dirs if child.startswith(base) and '/' not in child[len(base):]
+                      and child not in seen]:
+            self._remove_directory(child)
+
+    def _entries_in(self, directory: str) -> List[str]:
+        base = directory + '/'
+        return [path for path in self._range(base) if '/' not in path[len(base):]]
+
+    def _remove_entry(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            if entry.guid and self._guids.get(entry.guid) == path:
+                del self._guids[entry.guid]
+            self._sorted = None
+
+    def _remove_directory(self, directory: str):
+        self._dirs.pop(directory, None)
+        base = directory + '/'
+        for child in [child for child in self._dirs if child.startswith(base)]:
+            del self._dirs[child]
+        for path in self._range(base):
+            self._remove_entry(path)
+
+# 全局资产索引
+asset_index = AssetIndex()
+
+async def list_assets(unity, asset_type: Optional[str] = None, search_pattern: str = "*",
+                      folder: str = "Assets") -> List[Dict[str, Any]]:
+    """
+    获取资产列表：优先由本地索引回答，否则按页向Unity请求GET_ASSET_LIST
+
+    参数：
+        unity: 异步Unity连接
+        asset_type: Unity类型名，另支持"Scene"和"Prefab"
+        search_pattern: 名称过滤
+        folder: 搜索的文件夹
+
+    返回值：
+        List[Dict[str, Any]]: 资产列表，每项包含name、path、type、guid
+    """
+    if asset_index.available:
+        result = asset_index.query(asset_type=asset_type, search_pattern=search_pattern, folder=folder)
+        if result is not None:
+            return result["assets"]
+
+    assets: List[Dict[str, Any]] = []
+    cursor = 0
+    while True:
+        response = await unity.send_command("GET_ASSET_LIST", {
+            "type": asset_type,
+            "search_pattern": search_pattern,
+            "folder": folder,
+            "cursor": cursor,
+            "page_size": config.asset_page_size
+        })
+        assets.extend(response.get("assets", []))
+        # 不支持分页的旧版本不返回next_cursor，一次返回全部
+        next_cursor = response.get("next_cursor")
+        if next_cursor is None or next_cursor <= cursor:
+            return assets
+        cursor = next_cursor
+
+async def asset_exists(unity, path: str, asset_type: Optional[str] = None) -> bool:
+    """
+    指定路径的资产是否存在：优先由本地索引回答，无法确定时询问Unity
+
+    参数：
+        unity: 异步Unity连接
+        path: "Assets/..."资产路径
+        asset_type: 可选的Unity类型名，另支持"Scene"和"Prefab"
+
+    返回值：
+        bool: 是否存在
+    """
+    if asset_index.available:
+        exists = asset_index.exists(path, asset_type)
+        if exists is not None:
+            return exists
+    folder = '/'.join(path.split('/')[:-1]) or "Assets"
+    assets = await list_assets(unity, asset_type, path.split('/')[-1], folder)
+    return any(asset.get("path") == path for asset in assets)
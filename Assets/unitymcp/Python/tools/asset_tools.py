@@ -3,14 +3,15 @@ import os
 from typing import Optional
 from venv import logger
 from mcp.server.fastmcp import FastMCP, Context
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection
+from .asset_index import asset_exists
 import time
 
 def register_asset_tools(mcp: FastMCP):
     """Register all asset management tools with the MCP server."""
     
     @mcp.tool()
-    def import_asset(
+    async def import_asset(
         ctx: Context,
         source_path: str,
         target_path: str,
@@ -28,7 +29,7 @@ def register_asset_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Parameter validation
             if not source_path or not isinstance(source_path, str):
@@ -41,22 +42,12 @@ def register_asset_tools(mcp: FastMCP):
             if not os.path.exists(source_path):
                 return f"Error importing asset: Source file '{source_path}' does not exist"
             
-            # Extract the target directory and filename
-            target_dir = '/'.join(target_path.split('/')[:-1])
-            target_filename = target_path.split('/')[-1]
-            
             # Check if an asset already exists at the target path
-            existing_assets = unity.send_command("GET_ASSET_LIST", {
-                "search_pattern": target_filename,
-                "folder": target_dir or "Assets"
-            }).get("assets", [])
-            
-            # Check if any asset matches the exact path
-            asset_exists = any(asset.get("path") == target_path for asset in existing_assets)
-            if asset_exists and not overwrite:
+            target_exists = await asset_exists(unity, target_path)
+            if target_exists and not overwrite:
                 return f"Asset already exists at '{target_path}'. Use overwrite=True to replace it."
                 
-            response = unity.send_command("IMPORT_ASSET", {
+            response = await unity.send_command("IMPORT_ASSET", {
                 "source_path": source_path,
                 "target_path": target_path,
                 "overwrite": overwrite
@@ -70,7 +61,7 @@ def register_asset_tools(mcp: FastMCP):
             return f"Error importing asset: {str(e)} (Source: {source_path}, Target: {target_path})"
 
     @mcp.tool()
-    def instantiate_prefab(
+    async def instantiate_prefab(
         ctx: Context,
         prefab_path: str,
         position_x: float = 0.0,
@@ -96,7 +87,7 @@ def register_asset_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Parameter validation
             if not prefab_path or not isinstance(prefab_path, str):
@@ -116,26 +107,16 @@ def register_asset_tools(mcp: FastMCP):
                 if not isinstance(param_value, (int, float)):
                     return f"Error instantiating prefab: {param_name} must be a number"
             
-            # Check if the prefab exists
-            prefab_dir = '/'.join(prefab_path.split('/')[:-1]) or "Assets"
-            prefab_name = prefab_path.split('/')[-1]
-            
-            # Ensure prefab has .prefab extension for searching
-            if not prefab_name.lower().endswith('.prefab'):
-                prefab_name = f"{prefab_name}.prefab"
+            # Ensure prefab has .prefab extension
+            if not prefab_path.lower().endswith('.prefab'):
                 prefab_path = f"{prefab_path}.prefab"
                 
-            prefab_assets = unity.send_command("GET_ASSET_LIST", {
-                "type": "Prefab",
-                "search_pattern": prefab_name,
-                "folder": prefab_dir
-            }).get("assets", [])
-            
-            prefab_exists = any(asset.get("path") == prefab_path for asset in prefab_assets)
+            # Check if the prefab exists
+            prefab_exists = await asset_exists(unity, prefab_path, "Prefab")
             if not prefab_exists:
                 return f"Prefab '{prefab_path}' not found in the project."
             
-            response = unity.send_command("INSTANTIATE_PREFAB", {
+            response = await unity.send_command("INSTANTIATE_PREFAB", {
                 "prefab_path": prefab_path,
                 "position_x": position_x,
                 "position_y": position_y,
@@ -153,7 +134,7 @@ def register_asset_tools(mcp: FastMCP):
             return f"Error instantiating prefab: {str(e)} (Path: {prefab_path})"
 
     @mcp.tool()
-    def create_prefab(
+    async def create_prefab(
         ctx: Context,
         object_name: str,
         prefab_path: str,
@@ -171,7 +152,7 @@ def register_asset_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Parameter validation
             if not object_name or not isinstance(object_name, str):
@@ -181,9 +162,9 @@ def register_asset_tools(mcp: FastMCP):
                 return f"Error creating prefab: prefab_path must be a valid string"
             
             # Check if the GameObject exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
+            found_objects = (await unity.send_command("FIND_OBJECTS_BY_NAME", {
                 "name": object_name
-            }).get("objects", [])
+            })).get("objects", [])
             
             if not found_objects:
                 return f"GameObject '{object_name}' not found in the scene."
@@ -193,20 +174,11 @@ def register_asset_tools(mcp: FastMCP):
                 prefab_path = f"{prefab_path}.prefab"
             
             # Check if a prefab already exists at this path
-            prefab_dir = '/'.join(prefab_path.split('/')[:-1]) or "Assets"
-            prefab_name = prefab_path.split('/')[-1]
-            
-            prefab_assets = unity.send_command("GET_ASSET_LIST", {
-                "type": "Prefab",
-                "search_pattern": prefab_name,
-                "folder": prefab_dir
-            }).get("assets", [])
-            
-            prefab_exists = any(asset.get("path") == prefab_path for asset in prefab_assets)
+            prefab_exists = await asset_exists(unity, prefab_path, "Prefab")
             if prefab_exists and not overwrite:
                 return f"Prefab already exists at '{prefab_path}'. Use overwrite=True to replace it."
             
-            response = unity.send_command("CREATE_PREFAB", {
+            response = await unity.send_command("CREATE_PREFAB", {
                 "object_name": object_name,
                 "prefab_path": prefab_path,
                 "overwrite": overwrite
@@ -220,7 +192,7 @@ def register_asset_tools(mcp: FastMCP):
             return f"Error creating prefab: {str(e)} (Object: {object_name}, Path: {prefab_path})"
 
     @mcp.tool()
-    def apply_prefab(
+    async def apply_prefab(
         ctx: Context,
         object_name: str
     ) -> str:
@@ -234,18 +206,18 @@ def register_asset_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if the GameObject exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
+            found_objects = (await unity.send_command("FIND_OBJECTS_BY_NAME", {
                 "name": object_name
-            }).get("objects", [])
+            })).get("objects", [])
             
             if not found_objects:
                 return f"GameObject '{object_name}' not found in the scene."
             
             # Check if the object is a prefab instance
-            object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
+            object_props = await unity.send_command("GET_OBJECT_PROPERTIES", {
                 "name": object_name
             })
             
@@ -254,7 +226,7 @@ def register_asset_tools(mcp: FastMCP):
             if not is_prefab_instance:
                 return f"GameObject '{object_name}' is not a prefab instance."
             
-            response = unity.send_command("APPLY_PREFAB", {
+            response = await unity.send_command("APPLY_PREFAB", {
                 "object_name": object_name
             })
             return response.get("message", "Prefab changes applied successfully")
@@ -262,7 +234,7 @@ def register_asset_tools(mcp: FastMCP):
             return f"Error applying prefab changes: {str(e)}" 
         
     @mcp.tool()
-    def glb_batch_convert(ctx: Context, course_folder: str, poll_interval: float = 2.0, timeout: float = 600.0) -> str:
+    async def glb_batch_convert(ctx: Context, course_folder: str, poll_interval: float = 2.0, timeout: float = 600.0) -> str:
         """
         批量将指定目录下的GLB模型转为预制件（自动AI补全比例）。
         参数:
@@ -271,8 +243,8 @@ def register_asset_tools(mcp: FastMCP):
             str: 操作结果
         """
         try:
-            unity = get_unity_connection()
-            response = unity.send_command("GLB_BATCH_CONVERT", {
+            unity = await get_async_unity_connection()
+            response = await unity.send_command("GLB_BATCH_CONVERT", {
                 "course_folder": course_folder
             })
             return json.dumps(response, ensure_ascii=False, indent=2)
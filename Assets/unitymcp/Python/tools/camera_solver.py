@@ -0,0 +1,163 @@
+"""
+相机取景求解器
+
+在本地复现Unity端AutoPositionCameraToObjects的相机定位算法：合并目标物体的AABB，
+按FOV和边距计算距离（最小2.5米），俯视角限制在30-40度，多物体时额外提高1.2米。
+输入为GET_OBJECT_INFO结果（通常来自场景缓存），使用NumPy一次求解任意数量的相机位置，
+无需再向Unity发送请求。
+"""
+
+from typing import List, Dict, Any, Tuple
+import numpy as np
+
+# 与ObjectCommandHandler.AutoPositionCameraToObjects保持一致的默认值和限制
+DEFAULT_FOV = 45.0
+DEFAULT_PITCH_ANGLE = 35.0
+DEFAULT_PADDING = 3.0
+MIN_DISTANCE = 2.5
+MIN_PITCH_ANGLE = 30.0
+MAX_PITCH_ANGLE = 40.0
+MULTI_OBJECT_Y_BOOST = 1.2
+
+def object_bounds(info: Dict[str, Any]) -> Tuple[List[float], List[float]]:
+    """
+    按Renderer、Collider、Transform位置的顺序取物体的AABB
+
+    参数：
+        info: GET_OBJECT_INFO返回的物体信息
+
+    返回值：
+        Tuple: (min, max) 世界坐标
+    """
+    bounds = info.get("bounds") or {}
+    for key in ("renderer", "collider"):
+        item = bounds.get(key) or {}
+        if item.get("exists", False):
+            return item["min"], item["max"]
+    return info["position"], info["position"]
+
+def merge_bounds(mins: np.ndarray, maxs: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    合并每组物体的AABB
+
+    参数：
+        mins: (M, 3) 所有物体的最小点，同一组的物体连续排列
+        maxs: (M, 3) 所有物体的最大点
+        offsets: (N,) 每组第一个物体在mins中的下标，每组至少一个物体
+
+    返回值：
+        Tuple: (centers, sizes)，形状均为(N, 3)
+    """
+    group_min = np.minimum.reduceat(mins, offsets, axis=0)
+    group_max = np.maximum.reduceat(maxs, offsets, axis=0)
+    return (group_min + group_max) * 0.5, group_max - group_min
+
+def solve_framing(
+    centers: np.ndarray,
+    sizes: np.ndarray,
+    fov: Any = DEFAULT_FOV,
+    pitch_angle: Any = DEFAULT_PITCH_ANGLE,
+    padding: Any = DEFAULT_PADDING,
+    object_counts: Any = 1
+) -> Dict[str, np.ndarray]:
+    """
+    批量计算相机取景位置，fov、pitch_angle、padding和object_counts可以是标量或长度为N的数组
+
+    参数：
+        centers: (N, 3) 合并bounds中心
+        sizes: (N, 3) 合并bounds尺寸
+        fov: 相机FOV（度）
+        pitch_angle: 俯视角度（度），自动限制在30-40度
+        padding: 边距系数
+        object_counts: 每组物体数量，大于1时相机额外提高1.2米
+
+    返回值：
+        Dict: position (N, 3)、rotation (N, 3)、distance (N,)，distance为相机到bounds中心的距离
+    """
+    centers = np.asarray(centers, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    fov = np.asarray(fov, dtype=np.float64)
+    padding = np.asarray(padding, dtype=np.float64)
+    pitch_angle = np.clip(np.asarray(pitch_angle, dtype=np.float64), MIN_PITCH_ANGLE, MAX_PITCH_ANGLE)
+    pitch = np.radians(pitch_angle)
+
+    max_dimension = np.maximum(sizes[:, 0], sizes[:, 2]) * padding
+    distance = np.maximum(max_dimension / (2.0 * np.tan(np.radians(fov) / 2.0)), MIN_DISTANCE)
+    boost = np.where(np.asarray(object_counts) > 1, MULTI_OBJECT_Y_BOOST, 0.0)
+
+    offsets = np.zeros_like(centers)
+    offsets[:, 1] = distance * np.sin(pitch) + boost
+    offsets[:, 2] = -distance * np.cos(pitch)
+
+    rotations = np.zeros_like(centers)
+    rotations[:, 0] = pitch_angle
+
+    return {
+        "position": centers + offsets,
+        "rotation": rotations,
+        "distance": np.linalg.norm(offsets, axis=1)
+    }
+
+def solve_camera_poses(requests: List[Dict[str, Any]], object_infos: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    批量求解AUTO_POSITION_CAMERA_TO_OBJECTS请求
+
+    参数：
+        requests: AUTO_POSITION_CAMERA_TO_OBJECTS参数列表（object_names、fov、pitch_angle、padding）
+        object_infos: 物体名称到GET_OBJECT_INFO结果的映射，获取失败的物体视为未找到
+
+    返回值：
+        List[Dict]: 与requests一一对应、与Unity返回格式相同的结果（success、adjustedCamera、calculatedDistance等）
+    """
+    results: List[Dict[str, Any]] = [None] * len(requests)
+    solvable = []
+    mins, maxs, offsets = [], [], []
+    for index, request in enumerate(requests):
+        object_names = request.get("object_names") or []
+        found = [name for name in object_names if (object_infos.get(name) or {}).get("success", False)]
+        if not found:
+            results[index] = {
+                "success": False,
+                "message": f"None of the specified objects were found: {', '.join(object_names)}"
+            }
+            continue
+        offsets.append(len(mins))
+        for name in found:
+            low, high = object_bounds(object_infos[name])
+            mins.append(low)
+            maxs.append(high)
+        solvable.append((index, request, found))
+
+    if not solvable:
+        return results
+
+    centers, sizes = merge_bounds(np.array(mins, dtype=np.float64), np.array(maxs, dtype=np.float64), np.array(offsets))
+    fov = np.array([request.get("fov", DEFAULT_FOV) for _, request, _ in solvable], dtype=np.float64)
+    solution = solve_framing(
+        centers,
+        sizes,
+        fov=fov,
+        pitch_angle=[request.get("pitch_angle", DEFAULT_PITCH_ANGLE) for _, request, _ in solvable],
+        padding=[request.get("padding", DEFAULT_PADDING) for _, request, _ in solvable],
+        object_counts=[len(found) for _, _, found in solvable]
+    )
+
+    positions = solution["position"].tolist()
+    rotations = solution["rotation"].tolist()
+    distances = solution["distance"].tolist()
+    for row, (index, request, found) in enumerate(solvable):
+        not_found = [name for name in request.get("object_names") if name not in found]
+        results[index] = {
+            "success": True,
+            "applied": False,
+            "targetObjectsFound": len(found),
+            "targetObjectsNotFound": len(not_found),
+            "notFoundObjectNames": not_found,
+            "adjustedCamera": {
+                "position": positions[row],
+                "rotation": rotations[row],
+                "fieldOfView": float(fov[row])
+            },
+            "calculatedDistance": distances[row]
+        }
+    return results
@@ -0,0 +1,302 @@
+"""
+clip2关键帧模板
+
+每种clip2交互（倾倒液体、插电源线、戴手套等）声明为一张参数化的关键帧表：关键帧时间只依赖
+模板参数（如pour_duration），位置的每个分量为"锚点物体（源物体或目标物体）的坐标 + 偏移项"，
+偏移项为常数、模板参数或由物体包围盒计算的派生量，旋转为源物体旋转加常数偏移。
+
+同一模板的多个交互把源/目标物体的位置、旋转和包围盒堆叠为NumPy数组后一次求值；
+关键帧时间不依赖物体，因此clip2时长和关键帧数量可以直接从模板查到，不需要先生成关键帧。
+"""
+
+from typing import List, Dict, Any, Optional, Tuple, Callable, Union
+import numpy as np
+
+SOURCE = 0  # 锚点：第一个物体（被移动/操作的物体）
+TARGET = 1  # 锚点：第二个物体（参照物/目标容器）
+
+# 偏移项：常数，或模板参数/派生量的名称
+Term = Union[float, str]
+# 位置分量：(锚点, 偏移项...)，按顺序依次相加
+Component = Tuple[Any, ...]
+
+def at(anchor: int, x: Tuple[Term, ...] = (), y: Tuple[Term, ...] = (), z: Tuple[Term, ...] = ()) -> Tuple[Component, Component, Component]:
+    """
+    三个分量使用同一锚点的位置
+
+    参数：
+        anchor: SOURCE或TARGET
+        x, y, z: 各分量的偏移项
+
+    返回值：
+        Tuple: 三个分量的(锚点, 偏移项...)
+    """
+    return (anchor, *x), (anchor, *y), (anchor, *z)
+
+class Key:
+    """模板中的一个关键帧：时间、位置各分量的(锚点, 偏移项...)以及相对源物体旋转的偏移"""
+
+    __slots__ = ("time", "position", "rotation")
+
+    def __init__(self, time: float, position: Tuple[Component, Component, Component] = at(SOURCE),
+                 rotation: Tuple[float, float, float] = (0.0, 0.0, 0.0)):
+        self.time = time
+        self.position = position
+        self.rotation = rotation
+
+class Poses:
+    """一组交互的源/目标物体姿态，按交互堆叠为数组"""
+
+    def __init__(self, pairs: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]):
+        """
+        参数：
+            pairs: 每个交互的(源物体GET_OBJECT_INFO结果, 目标物体GET_OBJECT_INFO结果或None)
+        """
+        count = len(pairs)
+        self.position = np.zeros((2, count, 3))
+        self.rotation = np.zeros((count, 3))  # 源物体旋转
+        self.size = np.zeros((2, count, 3))  # renderer包围盒尺寸
+        self.has_bounds = np.zeros((2, count), dtype=bool)
+        for row, pair in enumerate(pairs):
+            self.rotation[row] = pair[0]["rotation"][:3]
+            for anchor, info in enumerate(pair):
+                if info is None:
+                    continue
+                self.position[anchor, row] = info["position"][:3]
+                renderer = (info.get("bounds") or {}).get("renderer") or {}
+                if renderer.get("exists", False):
+                    self.size[anchor, row] = renderer["size"][:3]
+                    self.has_bounds[anchor, row] = True
+
+    def __len__(self) -> int:
+        return self.rotation.shape[0]
+
+class Clip2Template:
+    """一种clip2交互的参数化关键帧表"""
+
+    def __init__(self, name: str, min_objects: int, params: Dict[str, float],
+                 keys: Union[List[Key], Callable[[Dict[str, float]], List[Key]]],
+                 derive: Callable[[Poses, Dict[str, float]], Dict[str, np.ndarray]] = None,
+                 lift_rows: Tuple[int, ...] = (), description: str = ""):
+        """
+        参数：
+            name: CLIP2_FUNCTIONS中的名称
+            min_objects: 需要的物体数量
+            params: 模板参数及默认值
+            keys: 关键帧表，或由参数生成关键帧表的函数（关键帧数量随参数变化时）
+            derive: 由姿态和参数计算派生量的函数，返回名称到(n,)数组的字典
+            lift_rows: 按lift_height抬升、可按场景调整抬升高度的关键帧序号
+            description: 说明
+        """
+        self.name = name
+        self.min_objects = min_objects
+        self.params = params
+        self._keys = keys
+        self.derive = derive
+        self.lift_rows = list(lift_rows)
+        self.description = description
+        self._default_times = self.times()
+
+    def resolve(self, overrides: Dict[str, Any] = None) -> Dict[str, float]:
+        """模板默认参数覆盖为overrides中的值（忽略None和未知参数）"""
+        params = dict(self.params)
+        for name, value in (overrides or {}).items():
+            if name in params and value is not None:
+                params[name] = value
+        return params
+
+    def keys(self, params: Dict[str, float] = None) -> List[Key]:
+        params = params or self.params
+        return self._keys(params) if callable(self._keys) else self._keys
+
+    def times(self, params: Dict[str, float] = None) -> List[float]:
+        """关键帧时间，只依赖参数"""
+        params = params or self.params
+        return [key.time(params) if callable(key.time) else key.time for key in self.keys(params)]
+
+    @property
+    def duration(self) -> float:
+        """默认参数下的动画时长"""
+        return self._default_times[-1]
+
+    @property
+    def key_count(self) -> int:
+        """默认参数下的关键帧数量"""
+        return len(self._default_times)
+
+    def evaluate(self, poses: Poses, params: Dict[str, float] = None) -> Tuple[List[float], np.ndarray, np.ndarray]:
+        """
+        对一组交互一次求值关键帧表
+
+        参数：
+            poses: 交互的源/目标物体姿态
+            params: 已resolve的模板参数
+
+        返回值：
+            Tuple: 关键帧时间(K,)，位置(n, K, 3)，旋转(n, K, 3)
+        """
+        params = params or self.params
+        keys = self.keys(params)
+        # 偏移项名称可以是派生量或模板参数
+        values = {**params, **(self.derive(poses, params) if self.derive else {})}
+        positions = np.empty((len(poses), len(keys), 3))
+        rotations = np.empty((len(poses), len(keys), 3))
+        for column, key in enumerate(keys):
+            for axis, (anchor, *terms) in enumerate(key.position):
+                value = poses.position[anchor, :, axis]
+                for term in terms:
+                    value = value + (values[term] if isinstance(term, str) else term)
+                positions[:, column, axis] = value
+            for axis, offset in enumerate(key.rotation):
+                rotations[:, column, axis] = poses.rotation[:, axis] + offset if offset else poses.rotation[:, axis]
+        return self.times(params), positions, rotations
+
+def to_keyframes(times: List[float], positions: np.ndarray, rotations: np.ndarray) -> List[List[Dict[str, Any]]]:
+    """
+    将evaluate的结果转换为每个交互的关键帧字典列表
+
+    参数：
+        times: 关键帧时间(K,)
+        positions: 位置(n, K, 3)
+        rotations: 旋转(n, K, 3)
+
+    返回值：
+        List[List[Dict]]: 每个交互的关键帧列表，每项包含position、rotation、time
+    """
+    return [
+        [
+            {"position": {"x": position[0], "y": position[1], "z": position[2]},
+             "rotation": {"x": rotation[0], "y": rotation[1], "z": rotation[2]},
+             "time": time}
+            for time, position, rotation in zip(times, interaction_positions, interaction_rotations)
+        ]
+        for interaction_positions, interaction_rotations in zip(positions.tolist(), rotations.tolist())
+    ]
+
+def _pour_derive(poses: Poses, params: Dict[str, float]) -> Dict[str, np.ndarray]:
+    # 倾倒高度：目标容器高度 + 源容器高度的一半 + 安全距离，没有目标容器bounds时使用pour_height
+    source_height, target_height = poses.size[SOURCE, :, 1], poses.size[TARGET, :, 1]
+    calculated = np.where(poses.has_bounds[SOURCE], target_height + source_height * 0.5 + 0.2, target_height + 0.3)
+    return {"pour_height": np.where(poses.has_bounds[TARGET], calculated, params["pour_height"])}
+
+def _insert_power_cable_derive(poses: Poses, params: Dict[str, float]) -> Dict[str, np.ndarray]:
+    # 插口在设备后方60%深度处，没有设备bounds时为0.5米
+    return {"insert_z": np.where(poses.has_bounds[TARGET], poses.size[TARGET, :, 2] * 0.6, 0.5)}
+
+def _notebook_writing_derive(poses: Poses, params: Dict[str, float]) -> Dict[str, np.ndarray]:
+    # 抖动距离为笔记本Z轴bounds的0.1倍，没有bounds时为0.1米
+    shake = np.where(poses.has_bounds[SOURCE], poses.size[SOURCE, :, 2] * 0.1, 0.1)
+    return {"shake": shake, "shake_back": -shake}
+
+def _move_object_into_derive(poses: Poses, params: Dict[str, float]) -> Dict[str, np.ndarray]:
+    # 插入到目标容器下部（高度的30%处），任一物体没有bounds时为容器位置下方0.2米
+    both = poses.has_bounds[SOURCE] & poses.has_bounds[TARGET]
+    return {"insert_y": np.where(both, -(poses.size[TARGET, :, 1] * 0.3), -0.2)}
+
+def _notebook_writing_keys(params: Dict[str, float]) -> List[Key]:
+    # 每次抖动：向前 -> 向后 -> 回原位，最后在原位保持0.2秒
+    keys = [Key(0.0)]
+    time, step = 0.0, params["shake_duration"] / 3
+    for _ in range(int(params["shake_count"])):
+        time += step
+        keys.append(Key(time, at(SOURCE, z=("shake",))))
+        time += step
+        keys.append(Key(time, at(SOURCE, z=("shake_back",))))
+        time += step
+        keys.append(Key(time))
+    keys.append(Key(time + 0.2))
+    return keys
+
+# 插电源线：x、z跟随设备，y保持电源线原高度
+def _behind_device(*z_terms: Term) -> Tuple[Component, Component, Component]:
+    return (TARGET, 0.0), (SOURCE,), (TARGET, "insert_z", *z_terms)
+
+CLIP2_TEMPLATES: Dict[str, Clip2Template] = {template.name: template for template in [
+    Clip2Template(
+        "pour_liquid", 2, {"pour_duration": 3.0, "pour_height": 0.2, "lift_height": 2.0},
+        [
+            Key(0.0),
+            Key(0.3, at(SOURCE, y=("lift_height",))),  # 先抬升防穿模
+            Key(1.3, at(TARGET, y=("pour_height",))),  # 移动到目标容器上方
+            Key(1.8, at(TARGET, y=("pour_height",)), (-90.0, 0.0, 0.0)),  # X轴旋转-90度开始倾倒
+            Key(lambda p: 1.8 + p["pour_duration"], at(TARGET, y=("pour_height",)), (-90.0, 0.0, 0.0)),
+            Key(lambda p: 2.8 + p["pour_duration"], at(TARGET, y=("pour_height",))),  # 复位
+            Key(lambda p: 3.8 + p["pour_duration"], at(SOURCE, y=("lift_height",))),
+            Key(lambda p: 4.1 + p["pour_duration"])
+        ],
+        derive=_pour_derive, lift_rows=(1, 6),
+        description="倾倒液体动画 - 模拟从一个容器向另一个容器倾倒液体的动作"
+    ),
+    Clip2Template(
+        "default_bounce_animation", 1, {},
+        [Key(0.0), Key(1.0, at(SOURCE, y=(0.5,))), Key(2.0)],
+        description="默认弹跳动画 - 简单的上下弹跳动作"
+    ),
+    Clip2Template(
+        "insert_power_cable", 2, {"insert_duration": 2.0},
+        [
+            Key(0.0),
+            Key(0.8, at(SOURCE, z=(5.0,))),  # 先向Z轴正方向移动到设备远后方
+            Key(1.8, _behind_device(3.0)),  # 设备正后方准备位置
+            Key(2.3, _behind_device(1.5, 0.3)),  # 插口后方0.3米
+            Key(lambda p: 2.3 + p["insert_duration"], _behind_device(1.5)),  # 完全插入
+            Key(lambda p: 3.0 + p["insert_duration"], _behind_device(1.5))
+        ],
+        derive=_insert_power_cable_derive,
+        description="插入电源线动画 - 模拟将电源线插入设备的动作"
+    ),
+    Clip2Template(
+        "wear_gloves", 1, {"bounce_duration": 1.0, "disappear_duration": 1.0},
+        [
+            Key(0.0),
+            Key(lambda p: p["bounce_duration"] / 2, at(SOURCE, y=(0.5,))),
+            Key(lambda p: p["bounce_duration"]),
+            # 移出相机视线
+            Key(lambda p: p["bounce_duration"] + p["disappear_duration"] - 0.1, at(SOURCE, y=(5.0,), z=(-15.0,))),
+            Key(lambda p: p["bounce_duration"] + p["disappear_duration"], at(SOURCE, y=(10.0,), z=(-20.0,)))
+        ],
+        description="戴手套动画 - 模拟戴上实验手套的动作"
+    ),
+    Clip2Template(
+        "notebook_writing", 1, {"shake_duration": 0.5, "shake_count": 2},
+        _notebook_writing_keys, derive=_notebook_writing_derive,
+        description="笔记本书写动画 - 模拟在笔记本上书写的动作"
+    ),
+    Clip2Template(
+        "move_object_into", 2, {"move_duration": 3.0, "lift_height": 1.0},
+        [
+            Key(0.0),
+            Key(0.8, at(SOURCE, y=("lift_height",))),
+            Key(1.8, at(TARGET, y=("lift_height",))),  # 目标容器上方
+            Key(2.3, at(TARGET, y=("insert_y", 0.3))),  # 插入位置上方0.3米
+            Key(lambda p: 2.3 + p["move_duration"], at(TARGET, y=("insert_y",))),
+            Key(lambda p: 3.0 + p["move_duration"], at(TARGET, y=("insert_y",)))
+        ],
+        derive=_move_object_into_derive, lift_rows=(1, 2),
+        description="物体移入动画 - 将一个物体移动到另一个物体中"
+    ),
+    Clip2Template(
+        "camera_focus_only", 1, {"focus_duration": 3.0},
+        [Key(0.0), Key(lambda p: p["focus_duration"])],
+        description="纯相机聚焦动画 - 仅相机移动，无物体动画"
+    )
+]}
+
+def evaluate_template(name: str, pairs: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]],
+                      params: Dict[str, Any] = None) -> List[List[Dict[str, Any]]]:
+    """
+    用一次向量化求值生成多个同类交互的关键帧
+
+    参数：
+        name: 模板名称
+        pairs: 每个交互的(源物体信息, 目标物体信息或None)
+        params: 覆盖模板默认值的参数
+
+    返回值：
+        List[List[Dict]]: 与pairs一一对应的关键帧列表
+    """
+    if not pairs:
+        return []
+    template = CLIP2_TEMPLATES[name]
+    times, positions, rotations = template.evaluate(Poses(pairs), template.resolve(params))
+    return to_keyframes(times, positions, rotations)
@@ -1,19 +1,21 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import Optional, List, Dict, Any
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection, send_unity_command
+from command_metrics import command_metrics
+from editor_pool import editor_pool
 
 def register_editor_tools(mcp: FastMCP):
     """Register all editor control tools with the MCP server."""
     
     @mcp.tool()
-    def undo(ctx: Context) -> str:
+    async def undo(ctx: Context) -> str:
         """Undo the last action performed in the Unity editor.
         
         Returns:
             str: Success message or error details
         """
         try:
-            response = get_unity_connection().send_command("EDITOR_CONTROL", {
+            response = await send_unity_command("EDITOR_CONTROL", {
                 "command": "UNDO"
             })
             return response.get("message", "Undo performed successfully")
@@ -21,14 +23,14 @@ def register_editor_tools(mcp: FastMCP):
             return f"Error performing undo: {str(e)}"
 
     @mcp.tool()
-    def redo(ctx: Context) -> str:
+    async def redo(ctx: Context) -> str:
         """Redo the last undone action in the Unity editor.
         
         Returns:
             str: Success message or error details
         """
         try:
-            response = get_unity_connection().send_command("EDITOR_CONTROL", {
+            response = await send_unity_command("EDITOR_CONTROL", {
                 "command": "REDO"
             })
             return response.get("message", "Redo performed successfully")
@@ -36,14 +38,14 @@ def register_editor_tools(mcp: FastMCP):
             return f"Error performing redo: {str(e)}"
 
     @mcp.tool()
-    def play(ctx: Context) -> str:
+    async def play(ctx: Context) -> str:
         """Start the game in play mode within the Unity editor.
         
         Returns:
             str: Success message or error details
         """
         try:
-            response = get_unity_connection().send_command("EDITOR_CONTROL", {
+            response = await send_unity_command("EDITOR_CONTROL", {
                 "command": "PLAY"
             })
             return response.get("message", "Entered play mode")
@@ -51,14 +53,14 @@ def register_editor_tools(mcp: FastMCP):
             return f"Error entering play mode: {str(e)}"
 
     @mcp.tool()
-    def pause(ctx: Context) -> str:
+    async def pause(ctx: Context) -> str:
         """Pause the game while in play mode.
         
         Returns:
             str: Success message or error details
         """
         try:
-            response = get_unity_connection().send_command("EDITOR_CONTROL", {
+            response = await send_unity_command("EDITOR_CONTROL", {
                 "command": "PAUSE"
             })
             return response.get("message", "Game paused")
@@ -66,14 +68,14 @@ def register_editor_tools(mcp: FastMCP):
             return f"Error pausing game: {str(e)}"
 
     @mcp.tool()
-    def stop(ctx: Context) -> str:
+    async def stop(ctx: Context) -> str:
         """Stop the game and exit play mode.
         
         Returns:
             str: Success message or error details
         """
         try:
-            response = get_unity_connection().send_command("EDITOR_CONTROL", {
+            response = await send_unity_command("EDITOR_CONTROL", {
                 "command": "STOP"
             })
             return response.get("message", "Exited play mode")
@@ -81,7 +83,7 @@ def register_editor_tools(mcp: FastMCP):
             return f"Error stopping game: {str(e)}"
 
     @mcp.tool()
-    def build(ctx: Context, platform: str, build_path: str) -> str:
+    async def build(ctx: Context, platform: str, build_path: str) -> str:
         """Build the project for a specified platform.
         
         Args:
@@ -120,7 +122,7 @@ def register_editor_tools(mcp: FastMCP):
                     if not os.access(build_path, os.W_OK):
                         return f"Error: Existing build directory '{build_path}' is not writable."
             
-            response = get_unity_connection().send_command("EDITOR_CONTROL", {
+            response = await send_unity_command("EDITOR_CONTROL", {
                 "command": "BUILD",
                 "params": {
                     "platform": platform,
@@ -132,7 +134,7 @@ def register_editor_tools(mcp: FastMCP):
             return f"Error building project: {str(e)}"
 
     @mcp.tool()
-    def execute_command(ctx: Context, command_name: str, validate_command: bool = True) -> str:
+    async def execute_command(ctx: Context, command_name: str, validate_command: bool = True) -> str:
         """Execute a specific editor command or custom script within the Unity editor.
         
         Args:
@@ -143,14 +145,14 @@ def register_editor_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Optionally validate if the command exists
             if validate_command:
                 # Get a list of available commands from Unity
-                available_commands = unity.send_command("EDITOR_CONTROL", {
+                available_commands = (await unity.send_command("EDITOR_CONTROL", {
                     "command": "GET_AVAILABLE_COMMANDS"
-                }).get("commands", [])
+                })).get("commands", [])
                 
                 # Check if the command exists in the list
                 if available_commands and command_name not in available_commands:
@@ -166,7 +168,7 @@ def register_editor_tools(mcp: FastMCP):
                     
                     return f"Error: Command '{command_name}' not found.{suggestion_msg}"
             
-            response = unity.send_command("EDITOR_CONTROL", {
+            response = await unity.send_command("EDITOR_CONTROL", {
                 "command": "EXECUTE_COMMAND",
                 "params": {
                     "commandName": command_name
@@ -177,7 +179,7 @@ def register_editor_tools(mcp: FastMCP):
             return f"Error executing command: {str(e)}"
             
     @mcp.tool()
-    def read_console(
+    async def read_console(
         ctx: Context,
         show_logs: bool = True,
         show_warnings: bool = True,
@@ -209,7 +211,7 @@ def register_editor_tools(mcp: FastMCP):
             if search_term is not None:
                 params["search_term"] = search_term
 
-            response = get_unity_connection().send_command("EDITOR_CONTROL", {
+            response = await send_unity_command("EDITOR_CONTROL", {
                 "command": "READ_CONSOLE",
                 "params": params
             })
@@ -269,7 +271,7 @@ def register_editor_tools(mcp: FastMCP):
             }]
 
     @mcp.tool()
-    def get_available_commands(ctx: Context) -> List[str]:
+    async def get_available_commands(ctx: Context) -> List[str]:
         """Get a list of all available editor commands that can be executed.
         
         This tool provides direct access to the list of commands that can be executed
@@ -279,10 +281,10 @@ def register_editor_tools(mcp: FastMCP):
             List[str]: List of available command paths
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Send request for available commands
-            response = unity.send_command("EDITOR_CONTROL", {
+            response = await unity.send_command("EDITOR_CONTROL", {
                 "command": "GET_AVAILABLE_COMMANDS"
             })
             
@@ -292,4 +294,52 @@ def register_editor_tools(mcp: FastMCP):
             # Return the commands list
             return commands
         except Exception as e:
-            return [f"Error fetching commands: {str(e)}"]
\ No newline at end of file
+            return [f"Error fetching commands: {str(e)}"]
+    @mcp.tool()
+    async def get_command_metrics(ctx: Context, reset: bool = False, trace_path: Optional[str] = None) -> Dict[str, Any]:
+        """Get per-command latency and payload statistics for the Unity bridge.
+        
+        Each Editor command type reports its count, p50/p95/p99 and total latency,
+        request/response bytes, errors, timeouts, scene cache hits and how often it was
+        sent inside a BATCH. Commands are ordered by total time, so the ones that
+        dominate a course build come first.
+        
+        Args:
+            reset: Clear the counters after taking the snapshot
+            trace_path: Append every following command to this JSONL file, "" stops tracing
+            
+        Returns:
+            Dict[str, Any]: Metrics snapshot, also available as the unity://metrics resource
+        """
+        snapshot = command_metrics.snapshot()
+        if reset:
+            command_metrics.reset()
+        if trace_path is not None:
+            command_metrics.set_trace_path(trace_path)
+            snapshot["trace_path"] = trace_path or None
+        return snapshot
+
+    @mcp.tool()
+    async def get_editor_pool_status(ctx: Context, check_health: bool = False,
+                                     endpoints: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get the Unity Editors that sharded jobs are spread across.
+        
+        The pool is the primary editor plus config.unity_endpoints. Each editor reports
+        its health, consecutive failures, running/completed/failed jobs, busy time and
+        the course or NodeGraph keys pinned to it.
+        
+        Args:
+            check_health: Ping every editor first, including ones marked down
+            endpoints: Replace the extra editors with these "host:port" addresses
+            
+        Returns:
+            Dict[str, Any]: Status of every editor in the pool
+        """
+        try:
+            if endpoints is not None:
+                editor_pool.configure(endpoints)
+            if check_health:
+                await editor_pool.check_health()
+            return editor_pool.status()
+        except Exception as e:
+            return {"error": f"Failed to get editor pool status: {str(e)}"}
@@ -2,13 +2,14 @@
 
 from typing import Dict, Any
 from mcp.server.fastmcp import FastMCP, Context
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection
+from .asset_index import list_assets
 
 def register_event_tools(mcp: FastMCP):
     """Register all object inspection and manipulation tools with the MCP server."""
 
     @mcp.tool()
-    def create_base(
+    async def create_base(
         ctx: Context,
         coursename: str,
         study_goal: str
@@ -37,9 +38,9 @@ def register_event_tools(mcp: FastMCP):
             unity_result: Unity返回的结果
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             # 调用Unity中的CreateBase命令，传入课程名称和学习目标
-            result = unity.send_command("CREATE_BASE", {
+            result = await unity.send_command("CREATE_BASE", {
                 "coursename": coursename,
                 "studyGoal": study_goal
             })
@@ -63,7 +64,7 @@ def register_event_tools(mcp: FastMCP):
 
 
     @mcp.tool()
-    def add_graph_pool(
+    async def add_graph_pool(
         ctx: Context,
         node_graph_name: str
     ) -> Dict[str, Any]:
@@ -82,18 +83,14 @@ def register_event_tools(mcp: FastMCP):
         if not node_graph_name:
             return {"success": False, "message": "nodeGraph name is required!"}
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             # 查找NodeGraph资源
-            assets = unity.send_command("GET_ASSET_LIST", {
-                "type": "NodeGraph",
-                "search_pattern": node_graph_name,
-                "folder": "Assets/Resources/Course/NodeGraph"
-            }).get("assets", [])
+            assets = await list_assets(unity, "NodeGraph", node_graph_name, "Assets/Resources/Course/NodeGraph")
             asset = next((a for a in assets if a.get("name") == node_graph_name), None)
             if not asset:
                 return {"success": False, "message": f"Cannot find NodeGraph with name: {node_graph_name} in Assets/Resources/Course/NodeGraph"}
             # 通知Unity添加到EventManager
-            result = unity.send_command("ADD_GRAPH_POOL", {
+            result = await unity.send_command("ADD_GRAPH_POOL", {
                 "nodeGraphName": node_graph_name
             })
             return {"success": True, "message": f"Successfully added NodeGraph: {node_graph_name}", "unity_result": result}
@@ -101,7 +98,7 @@ def register_event_tools(mcp: FastMCP):
             return {"success": False, "message": str(ex)}
 
     # @mcp.tool()
-    def add_event(
+    async def add_event(
         ctx: Context,
     ) -> Dict[str, Any]:
         """
@@ -116,9 +113,9 @@ def register_event_tools(mcp: FastMCP):
             unity_result: Unity返回的结果
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             # 批量注册所有事件
-            result = unity.send_command("ADD_EVENT",{})
+            result = await unity.send_command("ADD_EVENT",{})
             if not result.get("success", False):
                 return {"success": False, "message": result.get("message", "Unknown error"), "unity_result": result}
             return {"success": True, "message": "成功批量注册所有 UnityEvent", "unity_result": result}
@@ -126,7 +123,7 @@ def register_event_tools(mcp: FastMCP):
             return {"success": False, "message": str(ex)}
 
     @mcp.tool()
-    def create_unity_event(
+    async def create_unity_event(
         ctx: Context
     ) -> Dict[str, Any]:
         """
@@ -139,9 +136,9 @@ def register_event_tools(mcp: FastMCP):
             unity_result: Unity返回的结果
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             # 通知Unity生成事件监听器脚本
-            result = unity.send_command("CREATE_UNITY_EVENT", {})
+            result = await unity.send_command("CREATE_UNITY_EVENT", {})
             if not result.get("success", False):
                 return {
                     "success": False, 
@@ -157,7 +154,7 @@ def register_event_tools(mcp: FastMCP):
             return {"success": False, "message": str(ex)}
 
     @mcp.tool()
-    def flow_event_forth(
+    async def flow_event_forth(
         ctx: Context,
         coursename: str
     ) -> Dict[str, Any]:
@@ -179,9 +176,9 @@ def register_event_tools(mcp: FastMCP):
         if not coursename:
             return {"success": False, "message": "coursename is required!"}
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             # 调用Unity中的一个高级命令来执行整个FlowEventForth流程
-            result = unity.send_command("FLOW_EVENT_FORTH", {
+            result = await unity.send_command("FLOW_EVENT_FORTH", {
                 "coursename": coursename
             })
             if not result.get("success", False):
@@ -199,7 +196,7 @@ def register_event_tools(mcp: FastMCP):
             return {"success": False, "message": str(ex)}
 
     @mcp.tool()
-    def add_event_object(
+    async def add_event_object(
         ctx: Context,
         coursename: str
     ) -> Dict[str, Any]:
@@ -219,9 +216,9 @@ def register_event_tools(mcp: FastMCP):
         if not coursename:
             return {"success": False, "message": "coursename is required!"}
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             # I will assume the command is registered as "ADD_EVENT_OBJECT"
-            result = unity.send_command("ADD_EVENT_OBJECT", {
+            result = await unity.send_command("ADD_EVENT_OBJECT", {
                 "coursename": coursename
             })
 
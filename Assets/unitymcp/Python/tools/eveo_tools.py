@@ -2,13 +2,13 @@
 
 from typing import Dict, Any
 from mcp.server.fastmcp import FastMCP, Context
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection
 
 def register_eveo_tools(mcp: FastMCP):
     """Register all object inspection and manipulation tools with the MCP server."""
 
     @mcp.tool()
-    def add_event_object():
+    async def add_event_object():
         """
         批量实例化 Assets/Resources/Course/Perfabs 下所有 prefab，
         并为每个物体添加 ObjectRegister 脚本，统一设置为 GameObjectRoot 的子物体。
@@ -16,8 +16,8 @@ def register_eveo_tools(mcp: FastMCP):
 
         """
         try:
-            unity = get_unity_connection()
-            response = unity.send_command("ADD_EVENT_OBJECT", {})
+            unity = await get_async_unity_connection()
+            response = await unity.send_command("ADD_EVENT_OBJECT", {})
             if not response.get("success", False):
                 return f"Error: {response.get('error', 'Unknown error')}"
             created = response.get("created", [])
@@ -0,0 +1,341 @@
+"""
+Excel步骤表的增量导入
+
+import_excel_to_nodegraph发送命令前先读取Excel第一张工作表（与DataInfoCreator相同：跳过表头，
+取A-N共14列），为每个步骤行计算哈希，与NodeGraph旁边的行清单对比，只把新增、修改和删除的行
+发给Unity。清单保存为"<NodeGraph目录>/.<名称>.excel_rows.json"，以.开头的文件Unity不会导入。
+
+语音文件保存在Assets/Resources/Lesson/{行号}_{eventName}/{voiceName}.wav。清单记录每行
+语音所对应配音文案的哈希：只有配音文案变化（或从未生成）的行重新生成语音；文案未变但行号或
+voiceName变化的行只移动已有的语音文件。
+
+只支持xlsx（Unity端的ExcelUtility也只能读取xlsx），读取失败、eventName为空或重复、没有清单时
+仍然完整导入。
+"""
+
+from typing import List, Dict, Any, Optional
+from pathlib import Path
+import hashlib
+import json
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from .unity_yaml import get_project_root, resolve_asset_path
+
+# DataInfoCreator读取的列，依次为A-N列
+STEP_FIELDS = (
+    "flowGraph", "eventName", "eventContent", "handTip",
+    "enterEventName", "enterEventContent", "exitEventName", "exitEventContent",
+    "voiceName", "voiceContent",
+    "cameraTimelineName", "cameraTimelineContent", "objectTimelineName", "objectTimelineContent"
+)
+
+# TTSUtillity生成的语音所在目录
+VOICE_ROOT = "Assets/Resources/Lesson"
+
+MANIFEST_VERSION = 1
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CELL_REF_RE = re.compile(r"([A-Z]+)(\d+)")
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+def _string_item(item: ET.Element) -> str:
+    """共享字符串或内联字符串的文本（跳过拼音注释rPh）"""
+    parts = []
+    for child in item:
+        if child.tag == f"{_MAIN_NS}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{_MAIN_NS}r":
+            parts.extend(t.text or "" for t in child.iter(f"{_MAIN_NS}t"))
+    return "".join(parts)
+
+def _format_number(text: str) -> str:
+    """与Convert.ToString(double)一致：整数不带小数点，其余保留15位有效数字"""
+    try:
+        value = float(text)
+    except ValueError:
+        return text
+    return format(value, ".15g").replace("e", "E")
+
+def _first_sheet_path(archive: zipfile.ZipFile) -> str:
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    sheet = workbook.find(f"{_MAIN_NS}sheets/{_MAIN_NS}sheet")
+    if sheet is None:
+        raise ValueError("工作簿中没有工作表")
+    relations = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    relation_id = sheet.get(f"{_REL_NS}id")
+    for relation in relations.iter(f"{_PACKAGE_REL_NS}Relationship"):
+        if relation.get("Id") == relation_id:
+            target = relation.get("Target")
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    raise ValueError("找不到第一张工作表")
+
+def read_xlsx_rows(path: Path, columns: int = len(STEP_FIELDS)) -> List[List[str]]:
+    """
+    读取xlsx第一张工作表前columns列的单元格文本，去掉末尾的空行
+
+    参数：
+        path: xlsx文件路径
+        columns: 读取的列数
+
+    返回值：
+        List[List[str]]: 从第1行开始的各行，空单元格为""
+    """
+    with zipfile.ZipFile(path) as archive:
+        shared = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            strings = ET.fromstring(archive.read("xl/sharedStrings.xml"))
+            shared = [_string_item(item) for item in strings.iter(f"{_MAIN_NS}si")]
+        sheet = ET.fromstring(archive.read(_first_sheet_path(archive)))
+
+    rows: List[List[str]] = []
+    for row_number, row in enumerate(sheet.iter(f"{_MAIN_NS}row"), 1):
+        row_index = int(row.get("r", row_number)) - 1
+        while len(rows) <= row_index:
+            rows.append([""] * columns)
+        values = rows[row_index]
+        for column, cell in enumerate(row.iter(f"{_MAIN_NS}c")):
+            match = _CELL_REF_RE.match(cell.get("r", ""))
+            if match:
+                column = _column_index(match.group(1))
+            if column >= columns:
+                continue
+            cell_type = cell.get("t", "n")
+            if cell_type == "inlineStr":
+                inline = cell.find(f"{_MAIN_NS}is")
+                values[column] = _string_item(inline) if inline is not None else ""
+                continue
+            value = cell.find(f"{_MAIN_NS}v")
+            if value is None or value.text is None:
+                continue
+            if cell_type == "s":
+                values[column] = shared[int(value.text)]
+            elif cell_type == "b":
+                values[column] = "True" if value.text == "1" else "False"
+            elif cell_type == "n":
+                values[column] = _format_number(value.text)
+            else:
+                values[column] = value.text
+
+    while rows and not any(rows[-1]):
+        rows.pop()
+    return rows
+
+def read_step_rows(path: Path) -> List[Dict[str, str]]:
+    """
+    读取Excel中的步骤行，结构与DataInfoCreator生成的FlowNodeTempAsset相同
+
+    参数：
+        path: xlsx文件路径
+
+    返回值：
+        List[Dict[str, str]]: 按表格顺序排列的步骤行（不含表头）
+    """
+    return [dict(zip(STEP_FIELDS, values)) for values in read_xlsx_rows(path)[1:]]
+
+def resolve_excel_path(excel_path: str) -> Path:
+    """与ImportExcelToNodeGraph相同：相对路径相对于Assets目录，可省略"Assets/"前缀"""
+    path = Path(excel_path)
+    if path.is_absolute():
+        return path
+    for prefix in ("Assets/", "Assets\\"):
+        if excel_path.startswith(prefix):
+            excel_path = excel_path[len(prefix):]
+    return get_project_root() / "Assets" / excel_path
+
+def manifest_path(node_graph_path: str) -> Path:
+    """NodeGraph旁边的行清单路径"""
+    if not node_graph_path.startswith("Assets/"):
+        node_graph_path = f"Assets/{node_graph_path}"
+    asset = resolve_asset_path(node_graph_path)
+    return asset.with_name(f".{asset.stem}.excel_rows.json")
+
+def load_row_manifest(node_graph_path: str) -> Optional[Dict[str, Any]]:
+    """
+    读取行清单，不存在或无法解析时返回None
+
+    参数：
+        node_graph_path: NodeGraph资产路径
+
+    返回值：
+        Optional[Dict[str, Any]]: 清单，rows为按表格顺序排列的行记录
+    """
+    try:
+        manifest = json.loads(manifest_path(node_graph_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+def write_row_manifest(node_graph_path: str, excel_path: str, entries: List[Dict[str, Any]]):
+    """写入行清单，entries为row_entries或ExcelRowDiff.entries的结果"""
+    manifest = {"version": MANIFEST_VERSION, "excel": excel_path, "rows": entries}
+    manifest_path(node_graph_path).write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+
+def remove_row_manifest(node_graph_path: str):
+    """删除行清单，下次导入时完整导入"""
+    try:
+        manifest_path(node_graph_path).unlink()
+    except FileNotFoundError:
+        pass
+
+def _hash(values: List[str]) -> str:
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def row_hash(row: Dict[str, str]) -> str:
+    """步骤行所有列的哈希"""
+    return _hash([row[field] for field in STEP_FIELDS])
+
+def narration_hash(row: Dict[str, str]) -> Optional[str]:
+    """配音文案的哈希，没有配音文案时为None"""
+    return _hash([row["voiceContent"]]) if row["voiceContent"] else None
+
+def voice_asset_path(folder: str, voice_name: str) -> str:
+    return f"{VOICE_ROOT}/{folder}/{voice_name}.wav"
+
+def check_step_rows(rows: List[Dict[str, str]]) -> Optional[str]:
+    """
+    检查步骤行能否按eventName增量导入
+
+    返回值：
+        Optional[str]: 无法增量导入的原因，可以时为None
+    """
+    if not rows:
+        return "Excel中没有步骤行"
+    seen = set()
+    for index, row in enumerate(rows):
+        name = row["eventName"]
+        if not name:
+            return f"第{index + 2}行的eventName为空"
+        if name in seen:
+            return f"eventName重复: {name}"
+        seen.add(name)
+    return None
+
+def row_entries(rows: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    完整导入后的行清单记录：完整导入不生成语音，语音文件已存在的行以导入时的配音文案作为基准，
+    其余行记为没有语音，之后增量导入并生成语音时为这些行生成
+
+    参数：
+        rows: read_step_rows返回的步骤行
+
+    返回值：
+        List[Dict[str, Any]]: 每行的eventName、flowGraph、hash、narration、voice、voiceFolder、voiceName
+    """
+    entries = []
+    for index, row in enumerate(rows):
+        folder = f"{index}_{row['eventName']}"
+        narration = narration_hash(row)
+        exists = narration is not None and resolve_asset_path(voice_asset_path(folder, row["voiceName"])).is_file()
+        entries.append({
+            "eventName": row["eventName"],
+            "flowGraph": row["flowGraph"],
+            "hash": row_hash(row),
+            "narration": narration,
+            "voice": narration if exists else None,
+            "voiceFolder": folder,
+            "voiceName": row["voiceName"]
+        })
+    return entries
+
+class ExcelRowDiff:
+    """步骤行与行清单的差异，以及应用差异后要写入的清单记录"""
+
+    def __init__(self, manifest: Dict[str, Any], rows: List[Dict[str, str]], generate_voice: bool):
+        previous = manifest["rows"]
+        old = {entry["eventName"]: entry for entry in previous}
+        names = {row["eventName"] for row in rows}
+
+        self.expected: List[str] = [entry["eventName"] for entry in previous]
+        self.added: List[Dict[str, str]] = []
+        self.changed: List[Dict[str, str]] = []
+        self.removed: List[str] = [entry["eventName"] for entry in previous if entry["eventName"] not in names]
+        self.voice_rows: List[Dict[str, str]] = []
+        self.voice_moves: List[Dict[str, str]] = []
+        self.entries: List[Dict[str, Any]] = []
+
+        for index, row in enumerate(rows):
+            entry = old.get(row["eventName"])
+            digest = row_hash(row)
+            if entry is None:
+                self.added.append(row)
+            elif entry["hash"] != digest:
+                self.changed.append(row)
+
+            narration = narration_hash(row)
+            folder = f"{index}_{row['eventName']}"
+            voice = entry.get("voice") if entry else None
+            if narration is None:
+                voice = None
+            # 语音由编辑器异步生成，可能失败（网络、API Key、编辑器关闭），清单记录的语音文件必须确实存在
+            elif voice == narration and resolve_asset_path(voice_asset_path(entry["voiceFolder"], entry["voiceName"])).is_file():
+                if (entry["voiceFolder"], entry["voiceName"]) != (folder, row["voiceName"]):
+                    self.voice_moves.append({
+                        "from": voice_asset_path(entry["voiceFolder"], entry["voiceName"]),
+                        "to": voice_asset_path(folder, row["voiceName"])
+                    })
+            elif generate_voice:
+                self.voice_rows.append({"content": row["voiceContent"], "fileName": row["voiceName"], "fold": folder})
+                voice = narration
+            else:
+                voice = None
+            self.entries.append({
+                "eventName": row["eventName"],
+                "flowGraph": row["flowGraph"],
+                "hash": digest,
+                "narration": narration,
+                "voice": voice,
+                "voiceFolder": folder,
+                "voiceName": row["voiceName"]
+            })
+
+        # 行的顺序或分组变化时需要重新排列节点
+        layout = [(row["eventName"], row["flowGraph"]) for row in rows]
+        self.order: Optional[List[str]] = None
+        if layout != [(entry["eventName"], entry["flowGraph"]) for entry in previous]:
+            self.order = [name for name, _ in layout]
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed or self.order
+                    or self.voice_rows or self.voice_moves)
+
+    def mark_missing_voices(self, asset_paths: List[str]):
+        """移动失败（原语音文件不存在）的行标记为没有语音，之后生成语音时重新生成"""
+        missing = set(asset_paths)
+        for entry in self.entries:
+            if voice_asset_path(entry["voiceFolder"], entry["voiceName"]) in missing:
+                entry["voice"] = None
+
+    def command_params(self, node_graph_path: str, generate_voice: bool) -> Dict[str, Any]:
+        """APPLY_EXCEL_ROWS_TO_NODEGRAPH的参数"""
+        return {
+            "nodeGraphPath": node_graph_path,
+            "rows": self.added + self.changed,
+            "removed": self.removed,
+            "expected": self.expected,
+            "order": self.order,
+            "voiceMoves": self.voice_moves,
+            "voiceRows": self.voice_rows,
+            "generateVoice": generate_voice
+        }
+
+def diff_step_rows(manifest: Dict[str, Any], rows: List[Dict[str, str]], generate_voice: bool) -> ExcelRowDiff:
+    """
+    对比步骤行与行清单
+
+    参数：
+        manifest: load_row_manifest返回的清单
+        rows: read_step_rows返回的步骤行（已通过check_step_rows）
+        generate_voice: 是否为配音文案变化的行生成语音
+
+    返回值：
+        ExcelRowDiff: 新增、修改、删除的行，是否需要重新排列，以及语音的生成和移动
+    """
+    return ExcelRowDiff(manifest, rows, generate_voice)
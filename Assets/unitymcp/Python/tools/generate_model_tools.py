@@ -1,10 +1,10 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import List, Dict, Any, Optional
 import json
-from unity_connection import get_unity_connection
+from async_unity_connection import send_unity_command
 
 @mcp.tool()
-def generate_3d_model(
+async def generate_3d_model(
     ctx: Context,
     prompt: str,
     randomize_seed: bool = True,
@@ -35,7 +35,7 @@ def generate_3d_model(
     """
     try:
         # 发送命令到Unity
-        response = get_unity_connection().send_command("GENERATE_MODEL", {
+        response = await send_unity_command("GENERATE_MODEL", {
             "prompt": prompt,
             "randomize_seed": randomize_seed,
             "seed": seed,
@@ -5,13 +5,13 @@ from typing import List, Dict, Any, Optional
 # 导入 json 模块，用于处理 JSON 格式数据
 import json
 # 导入自定义模块中的函数，用于获取与 Unity 的连接
-from unity_connection import get_unity_connection
+from async_unity_connection import send_unity_command
 
 def register_generate_tools(mcp):
     """注册3D模型生成相关工具"""
     
     @mcp.tool()  # 使用装饰器将函数注册为 MCP 工具
-    def generate_3d_model(
+    async def generate_3d_model(
         ctx: Context,  # MCP 上下文参数，包含调用工具的环境信息
         prompt: str,   # 必需参数：用于描述要生成的 3D 模型的文本提示
         randomize_seed: bool = True,  # 控制是否使用随机种子
@@ -42,7 +42,7 @@ def register_generate_tools(mcp):
         """
         try:
             # 发送命令到Unity，调用 Unity 端的 3D 模型生成功能
-            response = get_unity_connection().send_command("GENERATE_MODEL", {
+            response = await send_unity_command("GENERATE_MODEL", {
                 "prompt": prompt,  # 传递用户提供的文本提示
                 "randomize_seed": randomize_seed,  # 控制是否使用随机种子
                 "seed": seed,  # 固定种子值（当不使用随机种子时）
@@ -0,0 +1,353 @@
+"""
+关键帧路径引擎
+
+关键帧统一存为float32数组，每行为 (time, pos x, pos y, pos z, rot x, rot y, rot z)，
+缺少位置或旋转的分量用NaN表示。路径采样（linear、curve、bezier与Unity端算法一致，
+另支持catmull_rom）和按弧长重采样都在本地用NumPy完成，发送给Unity时编码为
+keyframe_buffer，而不是大量嵌套的{"x","y","z"}字典。
+"""
+
+from typing import List, Dict, Any
+import base64
+import numpy as np
+
+KEYFRAME_STRIDE = 7  # time, position xyz, rotation xyz
+POSITION = slice(1, 4)
+ROTATION = slice(4, 7)
+
+PATH_TYPES = ("linear", "curve", "bezier", "catmull_rom")
+BEZIER_SUBDIVISIONS = 8  # 与CreateAnimationCommandHandler.InterpolateBezier一致
+CURVE_LIFT = 0.2  # 曲线/贝塞尔中间点按两点距离抬高的比例
+
+def _vector(value: Any) -> List[float]:
+    if isinstance(value, dict):
+        return [float(value.get("x", 0.0)), float(value.get("y", 0.0)), float(value.get("z", 0.0))]
+    if isinstance(value, (list, tuple)) and len(value) >= 3:
+        return [float(value[0]), float(value[1]), float(value[2])]
+    return [np.nan, np.nan, np.nan]
+
+def keyframes_to_array(keyframes: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    将关键帧字典列表转换为关键帧数组
+
+    参数：
+        keyframes: 关键帧列表，每项包含time以及可选的position、rotation（字典或长度为3的列表）
+
+    返回值：
+        np.ndarray: (N, 7) float32数组，缺少的位置或旋转为NaN
+    """
+    array = np.full((len(keyframes), KEYFRAME_STRIDE), np.nan, dtype=np.float32)
+    for row, keyframe in enumerate(keyframes):
+        array[row, 0] = float(keyframe.get("time", 0.0))
+        array[row, POSITION] = _vector(keyframe.get("position"))
+        array[row, ROTATION] = _vector(keyframe.get("rotation"))
+    return array
+
+def array_to_keyframes(array: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    将关键帧数组转换回关键帧字典列表
+
+    参数：
+        array: (N, 7) 关键帧数组
+
+    返回值：
+        List[Dict]: 关键帧列表，NaN的位置或旋转不输出
+    """
+    keyframes = []
+    for row in np.asarray(array, dtype=np.float64).tolist():
+        keyframe = {"time": row[0]}
+        if not np.isnan(row[1]):
+            keyframe["position"] = {"x": row[1], "y": row[2], "z": row[3]}
+        if not np.isnan(row[4]):
+            keyframe["rotation"] = {"x": row[4], "y": row[5], "z": row[6]}
+        keyframes.append(keyframe)
+    return keyframes
+
+def fill_missing_times(times: np.ndarray, duration: float) -> np.ndarray:
+    """
+    为没有时间（NaN）的路径点按序号在前后有时间的点之间线性插值
+
+    首尾点缺少时间时分别取0和duration，没有任何时间时均匀分配，结果限制在[0, duration]
+
+    参数：
+        times: (N,) 路径点时间，缺少时间为NaN
+        duration: 动画总时长
+
+    返回值：
+        np.ndarray: (N,) 完整的时间
+    """
+    times = np.array(times, dtype=np.float64)
+    if np.isnan(times).all():
+        return np.linspace(0.0, duration, len(times))
+    if np.isnan(times[0]):
+        times[0] = 0.0
+    if np.isnan(times[-1]):
+        times[-1] = duration
+    known = ~np.isnan(times)
+    indices = np.arange(len(times))
+    times[~known] = np.interp(indices[~known], indices[known], times[known])
+    return np.clip(times, 0.0, duration)
+
+def validate_keyframes(array: np.ndarray) -> List[str]:
+    """
+    检查关键帧数组是否可以发送给Unity
+
+    参数：
+        array: (N, 7) 关键帧数组
+
+    返回值：
+        List[str]: 问题描述列表，为空表示有效
+    """
+    problems = []
+    if array.ndim != 2 or array.shape[1] != KEYFRAME_STRIDE:
+        return [f"关键帧数组形状应为(N, {KEYFRAME_STRIDE})，实际为{array.shape}"]
+    if not np.isfinite(array[:, 0]).all():
+        problems.append("存在无效的关键帧时间")
+    if (array[:, 0] < 0).any():
+        problems.append("存在负数关键帧时间")
+    if np.isinf(array[:, 1:]).any():
+        problems.append("存在无穷大的位置或旋转")
+    for name, columns in (("位置", POSITION), ("旋转", ROTATION)):
+        partial = np.isnan(array[:, columns]).any(axis=1) & ~np.isnan(array[:, columns]).all(axis=1)
+        if partial.any():
+            problems.append(f"第{int(np.argmax(partial))}个关键帧的{name}不完整")
+    return problems
+
+def _segment_samples(count: int) -> np.ndarray:
+    return np.arange(1, count, dtype=np.float64) / count
+
+def _interpolate_points(points: np.ndarray, times: np.ndarray, path_type: str, samples_per_segment: int):
+    """返回各段内部插值点 (times, points)，不含原始关键帧"""
+    p0, p3 = points[:-1], points[1:]
+    if path_type == "curve":
+        # 与InterpolateCurve一致：每段中点按距离抬高
+        mid = (p0 + p3) * 0.5
+        mid[:, 1] += np.linalg.norm(p3 - p0, axis=1) * CURVE_LIFT
+        return (times[:-1] + times[1:]) * 0.5, mid
+
+    u = _segment_samples(samples_per_segment)[None, :, None]  # (1, K, 1)
+    if path_type == "bezier":
+        # 与InterpolateBezier一致：控制点位于1/3和2/3处并按距离抬高
+        lift = np.zeros_like(p0)
+        lift[:, 1] = np.linalg.norm(p3 - p0, axis=1) * CURVE_LIFT
+        p1 = p0 + (p3 - p0) * 0.33 + lift
+        p2 = p0 + (p3 - p0) * 0.66 + lift
+        a, b, c, d = (p[:, None, :] for p in (p0, p1, p2, p3))
+        sampled = ((1 - u) ** 3) * a + 3 * ((1 - u) ** 2) * u * b + 3 * (1 - u) * u * u * c + u ** 3 * d
+    else:
+        # 均匀Catmull-Rom，首尾使用镜像的虚拟控制点，曲线经过所有关键帧
+        padded = np.vstack([2 * points[0] - points[1], points, 2 * points[-1] - points[-2]])
+        a, b, c, d = (padded[i:i + len(points) - 1][:, None, :] for i in range(4))
+        sampled = 0.5 * (
+            2 * b
+            + (c - a) * u
+            + (2 * a - 5 * b + 4 * c - d) * u ** 2
+            + (3 * b - a - 3 * c + d) * u ** 3
+        )
+    sample_times = times[:-1, None] + (times[1:] - times[:-1])[:, None] * u[..., 0]
+    return sample_times.reshape(-1), sampled.reshape(-1, 3)
+
+def sample_path(array: np.ndarray, path_type: str = "linear", samples_per_segment: int = BEZIER_SUBDIVISIONS) -> np.ndarray:
+    """
+    按路径类型在位置关键帧之间插入采样点
+
+    参数：
+        array: (N, 7) 关键帧数组
+        path_type: "linear"、"curve"、"bezier"或"catmull_rom"
+        samples_per_segment: bezier和catmull_rom每段的分段数
+
+    返回值：
+        np.ndarray: 按时间排序的关键帧数组，插入的采样点只有位置（旋转为NaN）
+    """
+    if path_type not in PATH_TYPES:
+        raise ValueError(f"不支持的路径类型: {path_type}，可选值: {', '.join(PATH_TYPES)}")
+    array = array[np.argsort(array[:, 0], kind="stable")]
+    has_position = ~np.isnan(array[:, 1])
+    if path_type == "linear" or has_position.sum() < 2:
+        return array
+
+    keys = array[has_position].astype(np.float64)
+    sample_times, sample_points = _interpolate_points(keys[:, POSITION], keys[:, 0], path_type, max(int(samples_per_segment), 1))
+    samples = np.full((len(sample_times), KEYFRAME_STRIDE), np.nan, dtype=np.float32)
+    samples[:, 0] = sample_times
+    samples[:, POSITION] = sample_points
+    merged = np.vstack([array, samples])
+    return merged[np.argsort(merged[:, 0], kind="stable")]
+
+def path_length(array: np.ndarray) -> float:
+    """
+    计算位置关键帧路径的总长度
+
+    参数：
+        array: (N, 7) 关键帧数组
+
+    返回值：
+        float: 路径长度（米）
+    """
+    positions = array[~np.isnan(array[:, 1])][:, POSITION].astype(np.float64)
+    return float(np.linalg.norm(np.diff(positions, axis=0), axis=1).sum())
+
+def resample_by_arc_length(array: np.ndarray, count: int, constant_speed: bool = False) -> np.ndarray:
+    """
+    沿路径按弧长等距重采样
+
+    参数：
+        array: (N, 7) 已按时间排序的关键帧数组（通常为sample_path的结果）
+        count: 重采样后的关键帧数量（至少2个）
+        constant_speed: True时时间按弧长均匀分配（匀速），否则保留原路径的时间节奏
+
+    返回值：
+        np.ndarray: (count, 7) 关键帧数组，旋转按对应的原始时间线性插值（没有旋转关键帧时为NaN）
+    """
+    keys = array[~np.isnan(array[:, 1])].astype(np.float64)
+    if len(keys) < 2:
+        return array
+    count = max(int(count), 2)
+    positions = keys[:, POSITION]
+    arc = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(positions, axis=0), axis=1))])
+    targets = np.linspace(0.0, arc[-1], count)
+
+    resampled = np.full((count, KEYFRAME_STRIDE), np.nan, dtype=np.float64)
+    source_times = np.interp(targets, arc, keys[:, 0])
+    for axis in range(3):
+        resampled[:, 1 + axis] = np.interp(targets, arc, positions[:, axis])
+    if constant_speed and arc[-1] > 0:
+        resampled[:, 0] = keys[0, 0] + (keys[-1, 0] - keys[0, 0]) * targets / arc[-1]
+    else:
+        resampled[:, 0] = source_times
+
+    rotations = array[~np.isnan(array[:, 4])].astype(np.float64)
+    if len(rotations):
+        for axis in range(3):
+            resampled[:, 4 + axis] = np.interp(source_times, rotations[:, 0], rotations[:, 4 + axis])
+    return resampled.astype(np.float32)
+
+def auto_tangents(times: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    计算AnimationCurve.AddKey的自动平滑切线：端点取与相邻帧的斜率，中间帧取左右两段斜率的平均值
+
+    参数：
+        times: (K,) 严格递增的关键帧时间
+        values: (K, C) 关键帧值
+
+    返回值：
+        np.ndarray: (K, C) 切线斜率
+    """
+    values = np.asarray(values, dtype=np.float64)
+    slopes = np.zeros_like(values)
+    if len(times) > 1:
+        segment = np.diff(values, axis=0) / np.diff(np.asarray(times, dtype=np.float64))[:, None]
+        slopes[0] = segment[0]
+        slopes[-1] = segment[-1]
+        slopes[1:-1] = (segment[:-1] + segment[1:]) * 0.5
+    return slopes
+
+def evaluate_curve(times: np.ndarray, values: np.ndarray, slopes: np.ndarray, sample_times: np.ndarray) -> np.ndarray:
+    """
+    按Unity的Hermite插值计算曲线在sample_times处的值（首尾之外保持端点值）
+
+    参数：
+        times: (K,) 严格递增的关键帧时间
+        values: (K, C) 关键帧值
+        slopes: (K, C) 切线斜率
+        sample_times: (S,) 采样时间
+
+    返回值：
+        np.ndarray: (S, C) 曲线值
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    sample_times = np.clip(np.asarray(sample_times, dtype=np.float64), times[0], times[-1])
+    if len(times) == 1:
+        return np.repeat(values[:1], len(sample_times), axis=0)
+    segment = np.clip(np.searchsorted(times, sample_times, side="right") - 1, 0, len(times) - 2)
+    dt = times[segment + 1] - times[segment]
+    u = ((sample_times - times[segment]) / dt)[:, None]
+    u2, u3 = u * u, u * u * u
+    return (
+        (2 * u3 - 3 * u2 + 1) * values[segment]
+        + (u3 - 2 * u2 + u) * slopes[segment] * dt[:, None]
+        + (-2 * u3 + 3 * u2) * values[segment + 1]
+        + (u3 - u2) * slopes[segment + 1] * dt[:, None]
+    )
+
+def _channel_errors(columns: slice, values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """位置为欧氏距离（米）；旋转为欧拉角各分量的最大差值（度），Unity按分量插值欧拉角曲线"""
+    if columns == POSITION:
+        return np.linalg.norm(values - reference, axis=1)
+    return np.abs(values - reference).max(axis=1)
+
+def reduce_keyframes(array: np.ndarray, position_tolerance: float = 0.001, rotation_tolerance: float = 0.1) -> np.ndarray:
+    """
+    误差有界的关键帧精简
+
+    位置和旋转分别作为独立曲线处理（与Unity端各自用有该分量的关键帧建曲线一致）。
+    按Ramer-Douglas-Peucker的方式从首尾关键帧开始，用保留的关键帧和AddKey的自动切线重建曲线，
+    在每个原始关键帧时间计算误差，每个区间补回误差最大的一帧，直到全部满足容差；
+    误差按Unity实际求值的Hermite曲线计算，而不是折线。
+    同一时间的重复关键帧只保留第一个（AddKey会忽略后续的同一时间关键帧）。
+
+    参数：
+        array: (N, 7) 关键帧数组
+        position_tolerance: 位置容差（米）
+        rotation_tolerance: 旋转容差（度，欧拉角各分量）
+
+    返回值：
+        np.ndarray: (N,) 保留关键帧的布尔掩码，保持输入顺序
+    """
+    array = np.asarray(array)
+    keep = np.zeros(len(array), dtype=bool)
+    order = np.argsort(array[:, 0], kind="stable")
+    # 为一个分量保留的关键帧也会出现在另一分量的曲线中，重复检查直到保留集合不再变化
+    previous = None
+    while previous is None or (keep != previous).any():
+        previous = keep.copy()
+        _reduce_channels(array, order, keep, position_tolerance, rotation_tolerance)
+    return keep
+
+def _reduce_channels(array: np.ndarray, order: np.ndarray, keep: np.ndarray, position_tolerance: float, rotation_tolerance: float):
+    for columns, tolerance in ((POSITION, position_tolerance), (ROTATION, rotation_tolerance)):
+        tolerance = max(float(tolerance), 1e-6)
+        rows = order[~np.isnan(array[order, columns.start])]
+        if len(rows) == 0:
+            continue
+        times = array[rows, 0].astype(np.float64)
+        rows = rows[np.concatenate(([True], np.diff(times) > 0))]
+        times = array[rows, 0].astype(np.float64)
+        values = array[rows, columns].astype(np.float64)
+        if len(rows) < 3:
+            keep[rows] = True
+            continue
+
+        channel_keep = keep[rows].copy()
+        channel_keep[[0, -1]] = True
+        while True:
+            kept = np.flatnonzero(channel_keep)
+            curve = evaluate_curve(times[kept], values[kept], auto_tangents(times[kept], values[kept]), times)
+            errors = _channel_errors(columns, values, curve)
+            errors[channel_keep] = 0.0
+            violations = np.flatnonzero(errors > tolerance)
+            if len(violations) == 0:
+                break
+            # 每个保留区间补回误差最大的一帧
+            violations = violations[np.argsort(-errors[violations], kind="stable")]
+            _, first = np.unique(np.searchsorted(kept, violations), return_index=True)
+            channel_keep[violations[first]] = True
+        keep[rows[channel_keep]] = True
+
+def encode_keyframe_buffer(array: np.ndarray) -> Dict[str, Any]:
+    """
+    将关键帧数组编码为发送给Unity的keyframe_buffer参数
+
+    参数：
+        array: (N, 7) 关键帧数组
+
+    返回值：
+        Dict: stride、count和base64编码的小端float32数据
+    """
+    data = np.ascontiguousarray(array, dtype="<f4")
+    return {
+        "stride": KEYFRAME_STRIDE,
+        "count": int(data.shape[0]),
+        "data": base64.b64encode(data.tobytes()).decode("ascii")
+    }
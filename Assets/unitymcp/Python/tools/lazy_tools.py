@@ -0,0 +1,384 @@
+"""
+工具延迟注册
+
+服务启动时不导入tools下的工具模块：各工具的名称、描述和参数JSON Schema来自轻量的
+tool_manifest.json，先注册为占位工具供客户端列出；某个工具第一次被调用时才导入实现它的模块，
+执行该模块的register函数，把这个模块的占位工具全部替换为真正的工具再执行调用。
+导入工具模块（及其依赖）和为近百个工具生成参数模型原本占启动时间的约三分之一。
+
+清单记录了tools目录下所有源码（换行符统一为LF，不受git的autocrlf影响）以及pydantic和mcp
+版本的哈希。随源码发布的清单不一致时使用用户缓存目录中的清单；两者都不一致（或不存在）时按原方式
+立即注册全部工具，并把注册结果写入用户缓存目录，下次启动即可延迟注册，不会修改工程中的文件。
+立即注册只使用FastMCP公开的add_tool；占位工具需要写入FastMCP私有的工具表，启动时先检查当前mcp版本的
+Tool字段和工具表与清单相符，不相符时同样立即注册。config.lazy_tool_loading=False时总是立即注册。各阶段耗时记录在startup_profile中，由
+unity://startup资源返回。
+
+    python -m tools.lazy_tools build     重新生成随源码发布的清单
+    python -m tools.lazy_tools profile   逐项测量导入和注册耗时
+"""
+
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from pathlib import Path
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import pydantic
+from pydantic import Field
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.server.fastmcp.tools.base import Tool
+from mcp.server.fastmcp.utilities.func_metadata import func_metadata
+from config import config
+from . import TOOL_MODULES, get_registrar
+
+logger = logging.getLogger("UnityMCP")
+
+MANIFEST_PATH = Path(__file__).with_name("tool_manifest.json")
+MANIFEST_VERSION = 2
+# 构造占位工具时传给Tool的字段
+PLACEHOLDER_FIELDS = {"fn", "name", "description", "parameters", "fn_metadata", "is_async", "context_kwarg"}
+
+# 启动各阶段耗时（毫秒）与注册方式，server.py补充导入和连接Unity的耗时
+startup_profile: Dict[str, Any] = {}
+
+_load_lock = threading.Lock()
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def cache_manifest_path() -> Path:
+    """
+    用户缓存目录中的清单路径，按tools目录区分不同工程
+
+    返回值：
+    - Windows为%LOCALAPPDATA%/UnityMCP下，其他系统为$XDG_CACHE_HOME（默认~/.cache）/unity-mcp下的文件路径
+    """
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        root = Path(os.environ["LOCALAPPDATA"]) / "UnityMCP"
+    else:
+        root = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "unity-mcp"
+    project = hashlib.sha1(str(Path(__file__).resolve().parent).encode("utf-8")).hexdigest()[:12]
+    return root / f"tool_manifest-{project}.json"
+
+def source_hash() -> str:
+    """
+    计算tools目录下所有源码以及pydantic和mcp版本的哈希，清单中的参数Schema和占位工具依赖它们
+
+    返回值：
+    - 十六进制sha1字符串
+    """
+    versions = f"{MANIFEST_VERSION}:{pydantic.VERSION}:{importlib.metadata.version('mcp')}"
+    digest = hashlib.sha1(versions.encode("utf-8"))
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes().replace(b"\r\n", b"\n"))
+    return digest.hexdigest()
+
+class ToolCollector:
+    """代替FastMCP传给工具模块的register函数，只收集工具函数而不注册"""
+
+    def __init__(self):
+        self.functions: List[Tuple[Callable, Optional[str], Optional[str]]] = []
+
+    def tool(self, name: str = None, description: str = None):
+        def decorator(fn):
+            self.functions.append((fn, name, description))
+            return fn
+        return decorator
+
+    def build(self) -> List[Tool]:
+        return [Tool.from_function(fn, name=name, description=description) for fn, name, description in self.functions]
+
+def _collect(module: str) -> List[Tool]:
+    """导入工具模块并收集其register函数定义的工具，记录耗时"""
+    started = time.perf_counter()
+    register = get_registrar(module)
+    imported = time.perf_counter()
+    collector = ToolCollector()
+    register(collector)
+    tools = collector.build()
+    startup_profile.setdefault("modules", {})[module] = {
+        "import_ms": round((imported - started) * 1000, 1),
+        "register_ms": _elapsed_ms(imported),
+        "tools": len(tools)
+    }
+    return tools
+
+def _entry(tool: Tool) -> Dict[str, Any]:
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "parameters": tool.parameters,
+        "is_async": tool.is_async,
+        "context_kwarg": tool.context_kwarg
+    }
+
+def build_manifest() -> Dict[str, Any]:
+    """
+    导入全部工具模块并生成清单，与FastMCP一样同名工具以先注册者为准
+
+    返回值：
+    - 清单字典：version、source_hash，以及按注册顺序排列的modules（每项含module和tools）
+    """
+    seen = set()
+    modules = []
+    for module, _ in TOOL_MODULES:
+        tools = [tool for tool in _collect(module) if tool.name not in seen]
+        seen.update(tool.name for tool in tools)
+        modules.append({"module": module, "tools": [_entry(tool) for tool in tools]})
+    return {"version": MANIFEST_VERSION, "source_hash": source_hash(), "modules": modules}
+
+def write_manifest(manifest: Dict[str, Any], path: Path = MANIFEST_PATH) -> bool:
+    """
+    写入清单文件，目录不可写时忽略
+
+    参数：
+    - manifest: build_manifest返回的清单
+    - path: 清单路径，默认为随源码发布的清单，启动时重建的清单写入cache_manifest_path()
+
+    返回值：
+    - 是否写入成功
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+        return True
+    except OSError as e:
+        logger.warning(f"Could not write tool manifest {path}: {str(e)}")
+        return False
+
+def load_manifest() -> Optional[Dict[str, Any]]:
+    """
+    读取随源码发布的清单，与当前源码不一致时读取用户缓存目录中的清单
+
+    返回值：
+    - 清单字典，都不存在、无法解析或与当前源码不一致时为None
+    """
+    expected = source_hash()
+    for path in (MANIFEST_PATH, cache_manifest_path()):
+        try:
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if manifest.get("version") == MANIFEST_VERSION and manifest.get("source_hash") == expected:
+            return manifest
+    return None
+
+def _not_loaded(**kwargs):
+    raise ToolError("Tool module is not loaded")
+
+class LazyTool(Tool):
+    """清单中的占位工具，第一次调用时加载实现它的模块"""
+
+    module: str = Field(description="实现该工具的tools模块")
+    tool_manager: Any = Field(exclude=True, repr=False)
+
+    async def run(self, arguments: Dict[str, Any], context=None, **kwargs) -> Any:
+        return await load_tool(self).run(arguments, context=context, **kwargs)
+
+_placeholder_metadata = None
+
+def _lazy_tool(entry: Dict[str, Any], module: str, tool_manager: Any) -> LazyTool:
+    global _placeholder_metadata
+    if _placeholder_metadata is None:
+        _placeholder_metadata = func_metadata(_not_loaded)
+    return LazyTool(
+        fn=_not_loaded,
+        name=entry["name"],
+        description=entry["description"],
+        parameters=entry["parameters"],
+        fn_metadata=_placeholder_metadata,
+        is_async=entry["is_async"],
+        context_kwarg=entry["context_kwarg"],
+        module=module,
+        tool_manager=tool_manager
+    )
+
+def load_tool(lazy: LazyTool) -> Tool:
+    """
+    加载占位工具所在的模块，替换该模块的全部占位工具
+
+    参数：
+    - lazy: 被调用的占位工具
+
+    返回值：
+    - 真正的工具
+    """
+    tools = lazy.tool_manager._tools
+    with _load_lock:
+        current = tools.get(lazy.name)
+        if isinstance(current, LazyTool):
+            started = time.perf_counter()
+            for tool in _collect(lazy.module):
+                existing = tools.get(tool.name)
+                if isinstance(existing, LazyTool) and existing.module == lazy.module:
+                    tools[tool.name] = tool
+            logger.info(f"Loaded tool module {lazy.module} on first call to {lazy.name} in {_elapsed_ms(started)}ms")
+            current = tools.get(lazy.name)
+            if isinstance(current, LazyTool):
+                raise ToolError(f"Tool {lazy.name} is no longer defined by tools.{lazy.module}")
+        return current
+
+def supports_placeholders(mcp, manifest: Dict[str, Any]) -> bool:
+    """
+    检查当前mcp版本能否注册占位工具：FastMCP的私有工具表是字典，Tool的必填字段都由清单提供，
+    Tool.run接受arguments和context，并且能用清单的第一项构造占位工具
+
+    参数：
+    - mcp: FastMCP实例
+    - manifest: load_manifest返回的清单
+
+    返回值：
+    - 是否可以延迟注册
+    """
+    try:
+        tools = getattr(getattr(mcp, "_tool_manager", None), "_tools", None)
+        required = {name for name, field in Tool.model_fields.items() if field.is_required()}
+        run_parameters = inspect.signature(Tool.run).parameters
+        if not isinstance(tools, dict) or not required <= PLACEHOLDER_FIELDS or not PLACEHOLDER_FIELDS <= set(Tool.model_fields):
+            return False
+        if "arguments" not in run_parameters or "context" not in run_parameters:
+            return False
+        entry = next((entry for module in manifest["modules"] for entry in module["tools"]), None)
+        if entry is not None:
+            _lazy_tool(entry, "", mcp._tool_manager)
+        return True
+    except Exception as e:
+        logger.warning(f"Lazy tool placeholders are not supported by this mcp version: {str(e)}")
+        return False
+
+def _register_eagerly(mcp) -> List[Dict[str, Any]]:
+    """通过FastMCP公开的add_tool注册全部工具，同名工具以先注册者为准，返回清单的modules"""
+    seen = set()
+    modules = []
+    for module, _ in TOOL_MODULES:
+        started = time.perf_counter()
+        register = get_registrar(module)
+        imported = time.perf_counter()
+        collector = ToolCollector()
+        register(collector)
+        added = []
+        for fn, name, description in collector.functions:
+            mcp.add_tool(fn, name=name, description=description)
+            if (name or fn.__name__) not in seen:
+                seen.add(name or fn.__name__)
+                added.append((fn, name, description))
+        startup_profile.setdefault("modules", {})[module] = {
+            "import_ms": round((imported - started) * 1000, 1),
+            "register_ms": _elapsed_ms(imported),
+            "tools": len(added)
+        }
+        # 清单只在需要写入用户缓存目录时生成，生成参数Schema的耗时不计入注册
+        if config.lazy_tool_loading:
+            modules.append({"module": module, "tools": [
+                _entry(Tool.from_function(fn, name=name, description=description)) for fn, name, description in added]})
+    startup_profile["tools"] = len(seen)
+    return modules
+
+def register_tools(mcp) -> Dict[str, Any]:
+    """
+    注册全部工具：清单有效且当前mcp版本支持占位工具时注册占位工具，否则立即注册并把清单写入用户缓存目录
+
+    参数：
+    - mcp: FastMCP实例
+
+    返回值：
+    - startup_profile
+    """
+    started = time.perf_counter()
+    manifest = load_manifest() if config.lazy_tool_loading else None
+    if manifest is not None and supports_placeholders(mcp, manifest):
+        tools = mcp._tool_manager._tools
+        for module in manifest["modules"]:
+            for entry in module["tools"]:
+                if entry["name"] not in tools:
+                    tools[entry["name"]] = _lazy_tool(entry, module["module"], mcp._tool_manager)
+        startup_profile["mode"] = "lazy"
+        startup_profile["tools"] = len(tools)
+    else:
+        modules = _register_eagerly(mcp)
+        startup_profile["mode"] = "eager"
+        if manifest is None and config.lazy_tool_loading and write_manifest(
+                {"version": MANIFEST_VERSION, "source_hash": source_hash(), "modules": modules},
+                cache_manifest_path()):
+            logger.info(f"Tool manifest rebuilt in {cache_manifest_path()}, tools will load lazily from the next start")
+
+    startup_profile["register_tools_ms"] = _elapsed_ms(started)
+    return startup_profile
+
+def _import_times(module: str) -> Dict[str, float]:
+    """用python -X importtime在新进程中导入module，返回它直接导入的各模块的累计耗时（毫秒）"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=str(Path(__file__).parent.parent), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    times = {}
+    children = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S.*)$", line)
+        if not match:
+            continue
+        elapsed, depth, name = int(match.group(1)) / 1000, len(match.group(2)) // 2, match.group(3)
+        # 子模块先于父模块输出，遇到顶层导入时才知道之前的第二层属于谁
+        if depth == 1:
+            children[name] = elapsed
+        elif depth == 0:
+            if name == module:
+                times = {**children, module: elapsed}
+            children = {}
+    return times
+
+def profile_startup() -> Dict[str, Any]:
+    """
+    生成启动耗时报告
+
+    在新进程中导入server并记录它直接导入的各模块的累计耗时和startup_profile，
+    再在当前进程中依次测量每个工具模块的导入和注册耗时（共享依赖计入第一个导入它的模块）。
+
+    返回值：
+    - 字典：imports（server及其直接导入的模块，按耗时降序的[名称, 毫秒]）、server（新进程的startup_profile）、
+      modules（每个工具模块的import_ms、register_ms、tools）
+    """
+    statement = "import json, server, tools.lazy_tools as t; print(json.dumps(t.startup_profile))"
+    result = subprocess.run([sys.executable, "-c", statement], cwd=str(Path(__file__).parent.parent),
+                            capture_output=True, text=True)
+    server_profile = json.loads(result.stdout.strip().splitlines()[-1]) if result.returncode == 0 else {}
+    imports = sorted(_import_times("server").items(), key=lambda item: -item[1])
+    for module, _ in TOOL_MODULES:
+        _collect(module)
+    return {"imports": imports, "server": server_profile, "modules": startup_profile.get("modules", {})}
+
+def main(argv: List[str] = None) -> int:
+    command = (argv if argv is not None else sys.argv[1:] or ["profile"])[0]
+    if command == "build":
+        manifest = build_manifest()
+        if not write_manifest(manifest):
+            return 1
+        print(f"Wrote {sum(len(module['tools']) for module in manifest['modules'])} tools to {MANIFEST_PATH}")
+        return 0
+    if command == "profile":
+        report = profile_startup()
+        print("Modules imported by server (cumulative ms):")
+        for name, elapsed in report["imports"][:15]:
+            print(f"  {name:<40} {elapsed:>8.1f}")
+        print("Server startup:")
+        for key, value in report["server"].items():
+            if key != "modules":
+                print(f"  {key:<40} {value:>8}")
+        print("Tool modules loaded eagerly or on first call (ms):")
+        print(f"  {'module':<24} {'import':>8} {'register':>9} {'tools':>6}")
+        for module, row in report["modules"].items():
+            print(f"  {module:<24} {row['import_ms']:>8.1f} {row['register_ms']:>9.1f} {row['tools']:>6}")
+        return 0
+    print("usage: python -m tools.lazy_tools [build|profile]")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,13 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import List, Optional
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection
+from .asset_index import list_assets
 
 def register_material_tools(mcp: FastMCP):
     """Register all material-related tools with the MCP server."""
     
     @mcp.tool()
-    def set_material(
+    async def set_material(
         ctx: Context,
         object_name: str,
         material_name: Optional[str] = None,
@@ -27,10 +28,10 @@ def register_material_tools(mcp: FastMCP):
             str: Status message indicating success or failure.
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if the object exists
-            object_response = unity.send_command("FIND_OBJECTS_BY_NAME", {
+            object_response = await unity.send_command("FIND_OBJECTS_BY_NAME", {
                 "name": object_name
             })
             
@@ -40,11 +41,7 @@ def register_material_tools(mcp: FastMCP):
             
             # If a material name is specified, check if it exists
             if material_name:
-                material_assets = unity.send_command("GET_ASSET_LIST", {
-                    "type": "Material",
-                    "search_pattern": material_name,
-                    "folder": "Assets/Materials"
-                }).get("assets", [])
+                material_assets = await list_assets(unity, "Material", material_name, "Assets/Materials")
                 
                 material_exists = any(asset.get("name") == material_name for asset in material_assets)
                 
@@ -76,7 +73,7 @@ def register_material_tools(mcp: FastMCP):
             if color:
                 params["color"] = color
                 
-            result = unity.send_command("SET_MATERIAL", params)
+            result = await unity.send_command("SET_MATERIAL", params)
             material_name = result.get("material_name", "unknown")
             material_path = result.get("path")
             
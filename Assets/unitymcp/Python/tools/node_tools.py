@@ -1,22 +1,22 @@
 from mcp.server.fastmcp import FastMCP, Context
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection
 from typing import Optional
 
 def register_node_tools(mcp: FastMCP):
     """Register all Node Graph management tools with the MCP server."""
 
     # @mcp.tool()
-    def create_node_graph(
+    async def create_node_graph(
         ctx: Context,
         file_name: str = None
     ) -> str:
         """在unity的Assets/Resources/Course/NodeGraph目录下创建一个NodeGraph文件，并打开他"""
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             params = {
                 "fileName": file_name or "NewNodeGraph"
             }
-            response = unity.send_command("CREATE_NODE_GRAPH", params)
+            response = await unity.send_command("CREATE_NODE_GRAPH", params)
             if not response.get("success", False):
                 return f"Error creating Node Graph: {response.get('error', 'Unknown error')}"
             return f"Node Graph created successfully at path: {response.get('path', '')}"
@@ -24,19 +24,19 @@ def register_node_tools(mcp: FastMCP):
             return f"Error creating Node Graph: {str(e)}"
 
     # @mcp.tool()
-    def create_start_node(
+    async def create_start_node(
         ctx: Context
     ) -> str:
         """Create a Start Node in the currently open Node Graph and auto-connect its output to the first FlowEventNode.
         """
         try:
-            unity = get_unity_connection()
-            response = unity.send_command("CREATE_START_NODE", {})
+            unity = await get_async_unity_connection()
+            response = await unity.send_command("CREATE_START_NODE", {})
             if not response.get("success", False):
                 return f"Error creating Start Node: {response.get('error', 'Unknown error')}"
 
             # 获取所有节点信息
-            nodes_info = unity.send_command("GET_ALL_NODES_INFO", {})
+            nodes_info = await unity.send_command("GET_ALL_NODES_INFO", {})
             if not nodes_info.get("success", False):
                 return f"Start Node created, but failed to get nodes info: {nodes_info.get('error', 'Unknown error')}"
 
@@ -52,7 +52,7 @@ def register_node_tools(mcp: FastMCP):
                     "inputNodeEventname": exec_node.get("eventName"),
                     "inputPortName": "Input"
                 }
-                connect_response = unity.send_command("CONNECT_NODES", connect_params)
+                connect_response = await unity.send_command("CONNECT_NODES", connect_params)
                 if not connect_response.get("success", False):
                     return f"Start Node created, but failed to auto connect: {connect_response.get('error', 'Unknown error')}"
                 return f"Start Node created and auto connected successfully"
@@ -61,7 +61,7 @@ def register_node_tools(mcp: FastMCP):
             return f"Error creating Start Node: {str(e)}"
 
     # @mcp.tool()
-    def create_combine_node(
+    async def create_combine_node(
         ctx: Context,
         description: str = None,
         auto_connect: bool = True
@@ -80,16 +80,16 @@ def register_node_tools(mcp: FastMCP):
         
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             params = {}
             if description:
                 params["Description"] = description
-            response = unity.send_command("CREATE_COMBINE_NODE", params)
+            response = await unity.send_command("CREATE_COMBINE_NODE", params)
             if not response.get("success", False):
                 return f"Error creating Combine Node: {response.get('error', 'Unknown error')}"
             
             if auto_connect:
-                connect_response = unity.send_command("AUTO_CONNECT_COMBINE_NODE", {})
+                connect_response = await unity.send_command("AUTO_CONNECT_COMBINE_NODE", {})
                 if not connect_response.get("success", False):
                     return f"Combine Node created but failed to auto connect: {connect_response.get('error', 'Unknown error')}"
                 return f"Combine Node created and auto connected successfully"
@@ -99,7 +99,7 @@ def register_node_tools(mcp: FastMCP):
             return f"Error creating Combine Node: {str(e)}"
 
     # @mcp.tool()
-    def create_flow_event_node(
+    async def create_flow_event_node(
         ctx: Context,
         eventname: str = None,
         heigh_light: Optional[list] = None,
@@ -128,7 +128,7 @@ def register_node_tools(mcp: FastMCP):
         """
 
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             params = {
                 "eventname": eventname,
                 "heighLight": heigh_light or [],
@@ -139,7 +139,7 @@ def register_node_tools(mcp: FastMCP):
                 "endevent": endevent,
                 "action": action
             }
-            response = unity.send_command("CREATE_FLOW_EVENT_NODE", params)
+            response = await unity.send_command("CREATE_FLOW_EVENT_NODE", params)
             if not response.get("success", False):
                 return f"Error creating Flow Event Node: {response.get('error', 'Unknown error')}"
             return f"Flow Event Node created successfully"
@@ -147,7 +147,7 @@ def register_node_tools(mcp: FastMCP):
             return f"Error creating Flow Event Node: {str(e)}"
 
     # @mcp.tool()
-    def connect_nodes(
+    async def connect_nodes(
         ctx: Context,
         output_node_eventname: str,
         output_port_name: str,
@@ -164,14 +164,14 @@ def register_node_tools(mcp: FastMCP):
         """
         try:
 
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             params = {
                 "outputNodeEventname": output_node_eventname,
                 "outputPortName": output_port_name,
                 "inputNodeEventname": input_node_eventname,
                 "inputPortName": input_port_name
             }
-            response = unity.send_command("CONNECT_NODES", params)
+            response = await unity.send_command("CONNECT_NODES", params)
             if not response.get("success", False):
                 return f"Error connecting nodes: {response.get('error', 'Unknown error')}"
             return f"Nodes connected successfully"
@@ -179,11 +179,11 @@ def register_node_tools(mcp: FastMCP):
             return f"Error connecting nodes: {str(e)}"
 
     # @mcp.tool()
-    def get_all_nodes_info(ctx: Context) -> dict:
+    async def get_all_nodes_info(ctx: Context) -> dict:
         """在当前打开的nodegraph中获取所有节点的信息，包括他的阶段文案"""
         try:
-            unity = get_unity_connection()
-            response = unity.send_command("GET_ALL_NODES_INFO", {})
+            unity = await get_async_unity_connection()
+            response = await unity.send_command("GET_ALL_NODES_INFO", {})
             if not response.get("success", False):
                 return {"error": response.get("error", "Unknown error")}
             # 确保每个节点都包含description字段
@@ -196,11 +196,11 @@ def register_node_tools(mcp: FastMCP):
             return {"error": str(e)}
         
     # @mcp.tool()
-    def auto_connect_combine_node(ctx: Context) -> str:
+    async def auto_connect_combine_node(ctx: Context) -> str:
         """Auto connect CombineNode and FlowEventNode based on CombineNode's description."""
         try:
-            unity = get_unity_connection()
-            response = unity.send_command("AUTO_CONNECT_COMBINE_NODE", {})
+            unity = await get_async_unity_connection()
+            response = await unity.send_command("AUTO_CONNECT_COMBINE_NODE", {})
             if not response.get("success", False):
                 return f"Error auto connecting CombineNode: {response.get('error', 'Unknown error')}"
             return "Auto connected CombineNode successfully"
@@ -208,7 +208,7 @@ def register_node_tools(mcp: FastMCP):
             return f"Error auto connecting CombineNode: {str(e)}"
 
     # @mcp.tool()
-    def add_highlight_objects_to_flow_event_node(
+    async def add_highlight_objects_to_flow_event_node(
         ctx: Context,
         event_name: str,
         object_names: list
@@ -224,12 +224,12 @@ def register_node_tools(mcp: FastMCP):
             str: 成功消息或错误详情
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             params = {
                 "eventName": event_name,
                 "objectNames": object_names
             }
-            response = unity.send_command("ADD_HIGHLIGHT_OBJECTS_TO_FLOW_EVENT_NODE", params)
+            response = await unity.send_command("ADD_HIGHLIGHT_OBJECTS_TO_FLOW_EVENT_NODE", params)
             if not response.get("success", False):
                 return f"Error adding highlight objects: {response.get('error', 'Unknown error')}"
             return response.get("message", "Successfully added highlight objects")
@@ -237,7 +237,7 @@ def register_node_tools(mcp: FastMCP):
             return f"Error adding highlight objects: {str(e)}"
 
     # @mcp.tool()
-    def add_audio_to_flow_event_node(
+    async def add_audio_to_flow_event_node(
         ctx: Context,
         event_name: str,
         audio_name: str
@@ -253,12 +253,12 @@ def register_node_tools(mcp: FastMCP):
             str: 成功消息或错误详情
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             params = {
                 "eventName": event_name,
                 "audioName": audio_name
             }
-            response = unity.send_command("ADD_AUDIO_TO_FLOW_EVENT_NODE", params)
+            response = await unity.send_command("ADD_AUDIO_TO_FLOW_EVENT_NODE", params)
             if not response.get("success", False):
                 return f"Error adding audio: {response.get('error', 'Unknown error')}"
             return response.get("message", "Successfully added audio")
@@ -266,7 +266,7 @@ def register_node_tools(mcp: FastMCP):
             return f"Error adding audio: {str(e)}"
 
     # @mcp.tool()
-    def add_timelines_to_flow_event_node(
+    async def add_timelines_to_flow_event_node(
         ctx: Context,
         event_name: str,
         timeline_names: list
@@ -282,12 +282,12 @@ def register_node_tools(mcp: FastMCP):
             str: 成功消息或错误详情
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             params = {
                 "eventName": event_name,
                 "timelineNames": timeline_names
             }
-            response = unity.send_command("ADD_TIMELINES_TO_FLOW_EVENT_NODE", params)
+            response = await unity.send_command("ADD_TIMELINES_TO_FLOW_EVENT_NODE", params)
             if not response.get("success", False):
                 return f"Error adding timelines: {response.get('error', 'Unknown error')}"
             return response.get("message", "Successfully added timelines")
@@ -295,7 +295,7 @@ def register_node_tools(mcp: FastMCP):
             return f"Error adding timelines: {str(e)}"
 
     # @mcp.tool()
-    def set_flow_event_node_end_action(
+    async def set_flow_event_node_end_action(
         ctx: Context,
         event_name: str,
         end_action
@@ -310,12 +310,12 @@ def register_node_tools(mcp: FastMCP):
             str: 成功消息或错误详情
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             params = {
                 "eventName": event_name,
                 "endAction": end_action
             }
-            response = unity.send_command("SET_FLOW_EVENT_NODE_END_ACTION", params)
+            response = await unity.send_command("SET_FLOW_EVENT_NODE_END_ACTION", params)
             if not response.get("success", False):
                 return f"Error setting endAction: {response.get('error', 'Unknown error')}"
             return response.get("message", "Successfully set endAction")
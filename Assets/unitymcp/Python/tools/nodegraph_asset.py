@@ -0,0 +1,490 @@
+"""
+NodeGraph资产离线读取
+
+直接解析NodeGraph的.asset文件（SerializedScriptableObject：Odin序列化的节点列表 + Unity序列化的
+startNodeDatas/stateEndNodeDatas/groupSavedData/links），按GUID、节点名和eventName建立索引。
+返回结构与NodeGraphCommandHandler中的GET_NODEGRAPH_INFO、GET_FLOW_EVENT_NODES等命令一致，
+因此规划、分类类工具可以在不打开Unity编辑器的情况下运行。
+解析结果按文件的修改时间和大小缓存，文件变化后下一次查询自动重新解析。
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+import os
+from .unity_yaml import load_documents, resolve_asset_path, find_asset_path_by_guid, read_meta_guid
+
+DEFAULT_NODEGRAPH_PATH = "Assets/NodeGraphTool/Test"
+
+# Odin序列化EntryType
+ODIN_STRING = 1
+ODIN_GUID = 2
+ODIN_INTEGER = 3
+ODIN_FLOAT = 4
+ODIN_BOOLEAN = 5
+ODIN_NULL = 6
+ODIN_START_OF_NODE = 7
+ODIN_END_OF_NODE = 8
+ODIN_INTERNAL_REFERENCE = 9
+ODIN_EXTERNAL_REFERENCE_BY_INDEX = 10
+ODIN_EXTERNAL_REFERENCE_BY_GUID = 11
+ODIN_START_OF_ARRAY = 12
+ODIN_END_OF_ARRAY = 13
+ODIN_EXTERNAL_REFERENCE_BY_STRING = 16
+
+# 与NodeGraph.cs字段及GET_NODEGRAPH_INFO返回的nodes键对应（返回键, 资产字段）
+NODE_LISTS = [
+    ("startNodes", "startNodeDatas"),
+    ("eventNodes", "eventNodes"),
+    ("stateNodes", "stateNodes"),
+    ("combineNodes", "combineNodes"),
+    ("compareNodes", "compareNodes"),
+    ("flowEventNodes", "flowEventNodes"),
+    ("stateEndNodes", "stateEndNodeDatas"),
+    ("stateStartNodes", "stateStartNodeDatas"),
+    ("floatNodes", "floatNodes"),
+    ("intNodes", "intNodes"),
+    ("vector2Nodes", "vector2Nodes"),
+    ("vector3Nodes", "vector3Nodes"),
+    ("vector4Nodes", "vector4Nodes"),
+    ("colorNodes", "colorNodes"),
+    ("stickyNodes", "stickyNodes"),
+]
+
+EVENT_END_ACTIONS = ["Hold", "HoldForCombine", "NextEvent"]
+COMPARE_TYPES = ["Less", "LessOrEqual", "Equal", "GreaterOrEqual", "Greater", "NotEqual"]
+FLOW_EVENT_STRING_FIELDS = [
+    "description", "flowGraph", "eventName", "eventContent", "handTip"
+]
+FLOW_EVENT_TEXT_FIELDS = [
+    "enterEventName", "enterEventContent", "exitEventName", "exitEventContent",
+    "voiceName", "voiceContent"
+]
+FLOW_EVENT_TIMELINE_FIELDS = [
+    "cameraTimelineName", "cameraTimelineContent", "objectTimelineName", "objectTimelineContent"
+]
+
+class UnityObjectReference:
+    """Odin外部引用指向的Unity对象（fileID + 资产GUID）"""
+
+    __slots__ = ('file_id', 'guid')
+
+    def __init__(self, file_id: str, guid: Optional[str]):
+        self.file_id = file_id
+        self.guid = guid
+
+    @property
+    def asset_path(self) -> Optional[str]:
+        """引用对象所在的资产路径，找不到时为None"""
+        return find_asset_path_by_guid(self.guid) if self.guid else None
+
+    @property
+    def name(self) -> Optional[str]:
+        """引用对象的名称（主资产名称即文件名）"""
+        asset_path = self.asset_path
+        return Path(asset_path).stem if asset_path else None
+
+    def __repr__(self) -> str:
+        return f"UnityObjectReference(file_id={self.file_id}, guid={self.guid})"
+
+def _make_reference(data: Any) -> Optional[UnityObjectReference]:
+    if not isinstance(data, dict) or str(data.get('fileID', '0')) == '0':
+        return None
+    return UnityObjectReference(str(data['fileID']), data.get('guid'))
+
+class _OdinReader:
+    """将Odin SerializationNodes的扁平条目还原为dict/list树"""
+
+    def __init__(self, entries: List[Dict[str, Any]], referenced_objects: List[Any]):
+        self.entries = entries
+        self.referenced = [_make_reference(item) for item in referenced_objects or []]
+        self.references: Dict[str, Any] = {}
+        self.i = 0
+
+    def read_fields(self) -> Dict[str, Any]:
+        """读取顶层的命名字段"""
+        fields = {}
+        while self.i < len(self.entries):
+            name = self.entries[self.i].get('Name', '')
+            fields[name] = self._read_value()
+        return fields
+
+    def _read_value(self) -> Any:
+        entry = self.entries[self.i]
+        self.i += 1
+        entry_type = int(entry.get('Entry', ODIN_NULL))
+        data = entry.get('Data', '')
+        if entry_type in (ODIN_STRING, ODIN_GUID):
+            return data
+        if entry_type == ODIN_INTEGER:
+            return int(data)
+        if entry_type == ODIN_FLOAT:
+            return float(data)
+        if entry_type == ODIN_BOOLEAN:
+            return data == 'true'
+        if entry_type == ODIN_START_OF_NODE:
+            return self._read_node(data)
+        if entry_type == ODIN_INTERNAL_REFERENCE:
+            return self.references.get(data)
+        if entry_type == ODIN_EXTERNAL_REFERENCE_BY_INDEX:
+            index = int(data)
+            return self.referenced[index] if 0 <= index < len(self.referenced) else None
+        if entry_type == ODIN_EXTERNAL_REFERENCE_BY_GUID:
+            return UnityObjectReference('', data)
+        if entry_type == ODIN_EXTERNAL_REFERENCE_BY_STRING:
+            return data
+        if entry_type == ODIN_START_OF_ARRAY:
+            return self._read_array()
+        return None
+
+    def _read_array(self) -> List[Any]:
+        items = []
+        while self.i < len(self.entries) and int(self.entries[self.i].get('Entry', 0)) != ODIN_END_OF_ARRAY:
+            items.append(self._read_value())
+        self.i += 1
+        return items
+
+    def _read_node(self, header: str) -> Any:
+        """读取StartOfNode到EndOfNode之间的内容；集合节点返回list，其余返回dict（字段无名时返回list）"""
+        reference_id, _, type_name = header.partition('|')
+        if not type_name:
+            reference_id, type_name = '', header
+        named: Dict[str, Any] = {}
+        unnamed: List[Any] = []
+        result: Any = None
+        while self.i < len(self.entries):
+            entry = self.entries[self.i]
+            entry_type = int(entry.get('Entry', 0))
+            if entry_type == ODIN_END_OF_NODE:
+                self.i += 1
+                break
+            if entry_type == ODIN_START_OF_ARRAY:
+                self.i += 1
+                result = self._read_array()
+                if reference_id:
+                    self.references[reference_id] = result
+                continue
+            name = entry.get('Name', '')
+            value = self._read_value()
+            if name:
+                named[name] = value
+            else:
+                unnamed.append(value)
+        if result is None:
+            result = named if named or not unnamed else unnamed
+            if reference_id:
+                self.references[reference_id] = result
+        return result
+
+def decode_odin(serialization_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    解码SerializedScriptableObject的serializationData
+
+    参数：
+        serialization_data: YAML中的serializationData映射
+
+    返回值：
+        Dict[str, Any]: 字段名到值的映射；Unity对象引用为UnityObjectReference，空引用为None
+    """
+    entries = serialization_data.get('SerializationNodes') or []
+    reader = _OdinReader(entries, serialization_data.get('ReferencedUnityObjects') or [])
+    return reader.read_fields()
+
+def _number(value: Any) -> Any:
+    """YAML标量转数字，整数值保持int"""
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return int(number) if number.is_integer() else number
+
+def _position(value: Any) -> Dict[str, Any]:
+    keys = ("x", "y", "width", "height")
+    if isinstance(value, list):
+        return {key: _number(item) for key, item in zip(keys, value)}
+    if isinstance(value, dict):
+        return {key: _number(value.get(key, 0)) for key in keys}
+    return {key: 0 for key in keys}
+
+def _components(value: Any, keys: Tuple[str, ...]) -> Dict[str, Any]:
+    """Vector/Color结构体：Odin以无名条目或命名条目保存"""
+    if isinstance(value, list):
+        return {key: _number(item) for key, item in zip(keys, value)}
+    if isinstance(value, dict):
+        return {key: _number(value.get(key, 0)) for key in keys}
+    return {key: 0 for key in keys}
+
+def _enum_name(value: Any, names: List[str]) -> str:
+    index = _number(value)
+    return names[index] if isinstance(index, int) and 0 <= index < len(names) else str(index)
+
+def _reference_name(value: Any) -> Optional[str]:
+    return value.name if isinstance(value, UnityObjectReference) else None
+
+def _reference_path(value: Any) -> Optional[str]:
+    return value.asset_path if isinstance(value, UnityObjectReference) else None
+
+def serialize_node(list_key: str, node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    按NodeGraphCommandHandler.SerializeNode的规则序列化单个节点
+
+    参数：
+        list_key: 节点所在列表（NODE_LISTS中的返回键）
+        node: 解码后的节点字段
+
+    返回值：
+        Dict[str, Any]: 与Unity端返回一致的节点信息
+    """
+    data: Dict[str, Any] = {
+        "guid": node.get("GUID"),
+        "nodeName": node.get("NodeName"),
+        "position": _position(node.get("Position")),
+    }
+
+    if list_key == "eventNodes":
+        data["description"] = node.get("description")
+        data["eventName"] = node.get("eventName")
+        data["objectName"] = _reference_name(node.get("obj"))
+        data["timelineAsset"] = _reference_name(node.get("timelineAsset"))
+    elif list_key == "stateNodes":
+        data["description"] = node.get("description")
+        data["stateName"] = node.get("stateName")
+        data["mainUI"] = _reference_name(node.get("mainUI"))
+        data["eventCount"] = node.get("eventCount", 0)
+    elif list_key == "flowEventNodes":
+        timeline_assets = node.get("timelineAssets") or []
+        for field in FLOW_EVENT_STRING_FIELDS:
+            data[field] = node.get(field)
+        data["itemCount"] = node.get("itemCount", 0)
+        # timelineCount是timelineAssets.Count的只读属性，旧资产中保存的值不作为依据
+        data["timelineCount"] = len(timeline_assets)
+        for field in FLOW_EVENT_TEXT_FIELDS:
+            data[field] = node.get(field)
+        data["inAudioClip"] = _reference_path(node.get("inAudioClip"))
+        for field in FLOW_EVENT_TIMELINE_FIELDS:
+            data[field] = node.get(field)
+        data["endActionEnum"] = _enum_name(node.get("endActionEnum", 0), EVENT_END_ACTIONS)
+
+        selectable_ids = node.get("selectableObectsID") or []
+        if selectable_ids:
+            data["selectableObectsID"] = [
+                {"name": item.get("name"), "id": item.get("ID", 0)}
+                for item in selectable_ids if isinstance(item, dict)
+            ]
+        if timeline_assets:
+            # 与Unity端一致：丢失的资产引用加载为null后被过滤
+            timeline_paths = [_reference_path(asset) for asset in timeline_assets]
+            data["timelineAssets"] = [asset_path for asset_path in timeline_paths if asset_path]
+    elif list_key in ("floatNodes", "intNodes"):
+        data["value"] = node.get("a", 0)
+    elif list_key == "vector2Nodes":
+        data["value"] = _components(node.get("a"), ("x", "y"))
+    elif list_key == "vector3Nodes":
+        data["value"] = _components(node.get("a"), ("x", "y", "z"))
+    elif list_key == "vector4Nodes":
+        data["value"] = _components(node.get("a"), ("x", "y", "z", "w"))
+    elif list_key == "colorNodes":
+        data["value"] = _components(node.get("a"), ("r", "g", "b", "a"))
+        data["isHdr"] = node.get("isHdr", False)
+    elif list_key == "combineNodes":
+        data["description"] = node.get("description")
+        data["inputCount"] = node.get("inputCount", 0)
+    elif list_key == "compareNodes":
+        data["compareType"] = _enum_name(node.get("compare", 0), COMPARE_TYPES)
+    elif list_key == "stickyNodes":
+        data["description"] = node.get("description")
+
+    return data
+
+class NodeGraphAsset:
+    """
+    一个已解析的NodeGraph资产及其索引
+
+    nodes: {返回键: [解码后的节点字段]}
+    by_guid: {GUID: (返回键, 节点字段)}
+    flow_event_by_name: {eventName: FlowEventNode字段}（同名取第一个，与Unity端FirstOrDefault一致）
+    """
+
+    def __init__(self, name: str, asset_path: str, document_data: Dict[str, Any]):
+        self.name = name
+        self.asset_path = asset_path
+
+        fields = decode_odin(document_data.get('serializationData') or {})
+        for key in ('startNodeDatas', 'stateEndNodeDatas'):
+            if key not in fields:
+                fields[key] = document_data.get(key) or []
+
+        self.nodes: Dict[str, List[Dict[str, Any]]] = {
+            list_key: [node for node in (fields.get(field) or []) if isinstance(node, dict)]
+            for list_key, field in NODE_LISTS
+        }
+        self.links: List[Dict[str, Any]] = [
+            link for link in (document_data.get('links') or []) if isinstance(link, dict)
+        ]
+        self.groups: List[Dict[str, Any]] = [
+            group for group in (document_data.get('groupSavedData') or []) if isinstance(group, dict)
+        ]
+
+        self.by_guid: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.flow_event_by_name: Dict[str, Dict[str, Any]] = {}
+        for list_key, nodes in self.nodes.items():
+            for node in nodes:
+                if node.get("GUID"):
+                    self.by_guid.setdefault(node["GUID"], (list_key, node))
+        for node in self.nodes["flowEventNodes"]:
+            self.flow_event_by_name.setdefault(node.get("eventName"), node)
+
+        self._serialized: Dict[str, List[Dict[str, Any]]] = {}
+        self._info: Optional[Dict[str, Any]] = None
+
+    def serialized(self, list_key: str) -> List[Dict[str, Any]]:
+        """序列化后的节点列表（首次访问时生成）"""
+        if list_key not in self._serialized:
+            self._serialized[list_key] = [serialize_node(list_key, node) for node in self.nodes[list_key]]
+        return self._serialized[list_key]
+
+    @property
+    def total_node_count(self) -> int:
+        return sum(len(nodes) for nodes in self.nodes.values())
+
+    def get_node_by_guid(self, guid: str) -> Optional[Dict[str, Any]]:
+        """按GUID查找任意类型的节点，返回序列化后的节点信息"""
+        found = self.by_guid.get(guid)
+        return serialize_node(*found) if found else None
+
+    def get_info(self) -> Dict[str, Any]:
+        """与GET_NODEGRAPH_INFO相同结构的完整信息"""
+        if self._info is None:
+            self._info = {
+                "success": True,
+                "name": self.name,
+                "path": self.asset_path,
+                "nodes": {list_key: self.serialized(list_key) for list_key, _ in NODE_LISTS},
+                "connections": [
+                    {
+                        "sourceGuid": link.get("BaseNodeGUID"),
+                        "sourcePort": link.get("OutputPortName"),
+                        "sourceType": link.get("BaseNodeType"),
+                        "targetGuid": link.get("TargetNodeGUID"),
+                        "targetPort": link.get("TargetPortName"),
+                        "targetType": link.get("TargetNodeType"),
+                    }
+                    for link in self.links
+                ],
+                "groups": [
+                    {
+                        "guid": group.get("GUID"),
+                        "title": group.get("title"),
+                        "position": {
+                            "x": _number(group.get("posX", 0)),
+                            "y": _number(group.get("posY", 0)),
+                            "width": _number(group.get("width", 0)),
+                            "height": _number(group.get("height", 0)),
+                        },
+                        "nodeGuids": group.get("nodeGuids") or [],
+                    }
+                    for group in self.groups
+                ],
+                "totalNodeCount": self.total_node_count,
+            }
+        return self._info
+
+    def get_flow_event_nodes(self) -> Dict[str, Any]:
+        """与GET_FLOW_EVENT_NODES相同结构"""
+        nodes = self.serialized("flowEventNodes")
+        return {
+            "success": True,
+            "name": self.name,
+            "path": self.asset_path,
+            "flowEventNodes": nodes,
+            "nodeCount": len(nodes),
+        }
+
+    def get_flow_event_node_names(self) -> Dict[str, Any]:
+        """与GET_FLOW_EVENT_NODE_NAMES相同结构"""
+        names = [node.get("eventName") for node in self.nodes["flowEventNodes"] if node.get("eventName")]
+        return {
+            "success": True,
+            "name": self.name,
+            "path": self.asset_path,
+            "nodeNames": names,
+            "nodeCount": len(names),
+        }
+
+    def get_flow_event_node_by_name(self, event_name: str) -> Dict[str, Any]:
+        """与GET_FLOW_EVENT_NODE_BY_NAME相同结构"""
+        node = self.flow_event_by_name.get(event_name)
+        if node is None:
+            return {"success": False, "message": f"未找到名为'{event_name}'的FlowEventNode节点"}
+        return {
+            "success": True,
+            "name": self.name,
+            "path": self.asset_path,
+            "eventName": event_name,
+            "nodeInfo": serialize_node("flowEventNodes", node),
+        }
+
+# NodeGraph资产的m_Script引用该脚本的GUID；其他Odin SerializedScriptableObject同样带有serializationData
+NODEGRAPH_SCRIPT_PATH = "Assets/NodeGraphTool/Runtime/Core/NodeGraph.cs"
+
+def nodegraph_script_guid() -> Optional[str]:
+    """NodeGraph脚本的GUID（由工程资产索引回答，索引不可用时读取.meta），找不到脚本时为None"""
+    from .asset_index import asset_index
+    if asset_index.available:
+        entry = asset_index.get(NODEGRAPH_SCRIPT_PATH)
+        return entry.guid if entry is not None else None
+    return read_meta_guid(str(resolve_asset_path(NODEGRAPH_SCRIPT_PATH)))
+
+# 已解析的资产: {资产路径: (磁盘路径, (mtime_ns, size), NodeGraphAsset)}
+_asset_cache: Dict[str, Tuple[str, Tuple[int, int], NodeGraphAsset]] = {}
+
+def _asset_path(name: str, path: str) -> str:
+    path = (path or DEFAULT_NODEGRAPH_PATH).replace("\\", "/").strip("/")
+    return f"{path}/{name}.asset"
+
+def load_nodegraph(name: str, path: str = DEFAULT_NODEGRAPH_PATH) -> NodeGraphAsset:
+    """
+    读取NodeGraph资产（带缓存，文件修改时间或大小变化后重新解析）
+
+    参数：
+        name: 节点图文件名(不含扩展名)
+        path: 资产所在目录，例如"Assets/NodeGraphTool/Test"
+
+    返回值：
+        NodeGraphAsset: 已解析的资产
+
+    异常：
+        FileNotFoundError: 资产文件不存在
+        ValueError: 文件不是NodeGraph资产
+    """
+    asset_path = _asset_path(name, path)
+    cached = _asset_cache.get(asset_path)
+    file_path = cached[0] if cached is not None else str(resolve_asset_path(asset_path))
+
+    stat = os.stat(file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if cached is not None and cached[1] == signature:
+        return cached[2]
+
+    documents = load_documents(file_path)
+    script_guid = nodegraph_script_guid()
+    graph_data = next(
+        (doc.data for doc in documents
+         if doc.type_name == 'MonoBehaviour' and isinstance(doc.data, dict) and 'serializationData' in doc.data
+         and (script_guid is None or (doc.data.get('m_Script') or {}).get('guid') == script_guid)),
+        None
+    )
+    if graph_data is None:
+        raise ValueError(f"不是NodeGraph资产: {asset_path}")
+
+    asset = NodeGraphAsset(name, asset_path, graph_data)
+    _asset_cache[asset_path] = (file_path, signature, asset)
+    return asset
+
+def invalidate_nodegraph_cache(name: Optional[str] = None, path: str = DEFAULT_NODEGRAPH_PATH):
+    """清除缓存（name为空时清除全部），用于在同一时间戳内多次写入文件的情况"""
+    if name is None:
+        _asset_cache.clear()
+    else:
+        _asset_cache.pop(_asset_path(name, path), None)
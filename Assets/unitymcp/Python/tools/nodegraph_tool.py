@@ -1,6 +1,11 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from mcp.server.fastmcp import FastMCP, Context
-from unity_connection import get_unity_connection
+from async_unity_connection import send_unity_command
+from editor_pool import editor_pool
+from .nodegraph_asset import load_nodegraph, NodeGraphAsset, DEFAULT_NODEGRAPH_PATH
+from .excel_rows import (read_step_rows, resolve_excel_path, check_step_rows, load_row_manifest,
+                         write_row_manifest, remove_row_manifest, row_entries, diff_step_rows)
+import uuid
 
 def clean_path(path: str) -> str:
     """去除前导斜杠，统一为正斜杠"""
@@ -10,21 +15,152 @@ def clean_path(path: str) -> str:
     path = path.replace("\\", "/")
     return path
 
+async def query_nodegraph(
+        command_type: str,
+        params: Dict[str, Any],
+        offline: bool,
+        read_asset: Callable[[NodeGraphAsset], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    执行只读的NodeGraph查询：offline为True或无法连接Unity时直接读取.asset文件
+
+    参数：
+        command_type: Unity端命令
+        params: 命令参数，包含name和path
+        offline: 是否跳过Unity直接读取资产文件
+        read_asset: 从已解析资产生成与Unity端相同结构结果的函数
+
+    返回值：
+        Dict[str, Any]: Unity端或离线读取的结果
+    """
+    if not offline:
+        try:
+            return await send_unity_command(command_type, params)
+        except ConnectionError:
+            pass
+
+    path = params.get("path") or DEFAULT_NODEGRAPH_PATH
+    try:
+        asset = load_nodegraph(params["name"], path)
+    except FileNotFoundError:
+        return {"success": False, "message": f"NodeGraph资产未找到: {path}/{params['name']}.asset"}
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return read_asset(asset)
+
+class NodeGraphEditSession:
+    """NodeGraph编辑会话：在本地排队FlowEventNode的修改，提交时通过一次BULK_UPDATE_FLOW_EVENT_NODES
+    应用全部修改并只保存一次资产。
+
+    用法：
+        async with NodeGraphEditSession("实验流程", "Assets/实验") as session:
+            session.add_timeline_assets("步骤1", "Assets/Timeline/步骤1.playable")
+            session.set_fields("步骤1", {"voiceName": "步骤1"})
+        # 正常退出时自动提交，出现异常时丢弃全部修改；提交结果保存在session.result中
+    """
+
+    def __init__(self, name: str, path: str = "Assets/NodeGraphTool/Test", atomic: bool = True):
+        self.name = name
+        self.path = clean_path(path)
+        self.atomic = atomic
+        self.updates: Dict[str, Dict[str, Any]] = {}
+        self.closed = False
+        self.result: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.updates)
+
+    def _update(self, event_name: str) -> Dict[str, Any]:
+        if self.closed:
+            raise RuntimeError(f"NodeGraph编辑会话已结束: {self.name}")
+        return self.updates.setdefault(event_name, {"eventName": event_name, "timelineAssets": [], "fields": {}})
+
+    def add_timeline_assets(self, event_name: str, *asset_paths: Optional[str], replace: bool = False):
+        """添加timeline资产引用（已存在的不会重复添加），replace为True时替换节点原有的全部timeline"""
+        update = self._update(event_name)
+        if replace:
+            update["replaceTimelineAssets"] = True
+            update["timelineAssets"] = []
+        for asset_path in asset_paths:
+            asset_path = clean_path(asset_path) if asset_path else asset_path
+            if asset_path and asset_path not in update["timelineAssets"]:
+                update["timelineAssets"].append(asset_path)
+
+    def set_fields(self, event_name: str, fields: Dict[str, Any]):
+        """设置节点字段，如voiceName、eventContent、endActionEnum；资产字段（如inAudioClip）传资产路径"""
+        self._update(event_name)["fields"].update(fields)
+
+    def discard(self):
+        """丢弃排队的全部修改"""
+        self.updates.clear()
+        self.closed = True
+
+    async def commit(self, save: bool = True) -> Dict[str, Any]:
+        """
+        提交排队的全部修改
+
+        参数：
+            save: 是否保存NodeGraph资产
+
+        返回值：
+            Dict[str, Any]: BULK_UPDATE_FLOW_EVENT_NODES的结果，results中包含每个节点的更新结果
+        """
+        if self.closed:
+            return {"success": False, "error": f"NodeGraph编辑会话已结束: {self.name}"}
+        self.closed = True
+        if not self.updates:
+            self.result = {"success": True, "message": "没有需要提交的修改", "results": []}
+            return self.result
+        try:
+            response = await send_unity_command("BULK_UPDATE_FLOW_EVENT_NODES", {
+                "name": self.name,
+                "path": self.path,
+                "updates": list(self.updates.values()),
+                "save": save,
+                "atomic": self.atomic
+            })
+            self.result = response if response.get("success", False) else {
+                **response,
+                "success": False,
+                "error": response.get("message", "批量更新FlowEventNode失败")
+            }
+        except Exception as e:
+            self.result = {"success": False, "error": f"执行操作时出错: {str(e)}"}
+        return self.result
+
+    async def __aenter__(self) -> "NodeGraphEditSession":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None and not self.closed:
+            await self.commit()
+        else:
+            self.discard()
+        return False
+
+# begin_nodegraph_edit创建的编辑会话: session_id -> NodeGraphEditSession
+_edit_sessions: Dict[str, NodeGraphEditSession] = {}
+
 def register_nodegraph_tools(mcp):
     """注册所有NodeGraph相关工具"""
     mcp.tool()(create_empty_nodegraph)
     mcp.tool()(get_nodegraph_info)
     mcp.tool()(import_excel_to_nodegraph)
+    mcp.tool()(import_excels_to_nodegraphs)
     mcp.tool()(get_flow_event_nodes)
     mcp.tool()(get_flow_event_node_names)
     mcp.tool()(get_flow_event_node_by_name)
     mcp.tool()(update_flow_event_node_timeline_assets)
     mcp.tool()(update_timeline_count_smart)
     mcp.tool()(save_nodegraph_changes)
+    mcp.tool()(begin_nodegraph_edit)
+    mcp.tool()(queue_flow_event_node_update)
+    mcp.tool()(commit_nodegraph_edit)
+    mcp.tool()(discard_nodegraph_edit)
     
     
 
-def create_empty_nodegraph(
+async def create_empty_nodegraph(
         ctx: Context,
         name: str,
         path: str = "Assets/NodeGraphTool/Test"
@@ -41,7 +177,7 @@ def create_empty_nodegraph(
     """
     path = clean_path(path)
     try:
-        response = get_unity_connection().send_command("CREATE_EMPTY_NODEGRAPH", {
+        response = await send_unity_command("CREATE_EMPTY_NODEGRAPH", {
             "name": name,
             "path": path
         })
@@ -56,10 +192,11 @@ def create_empty_nodegraph(
 
 
 
-def get_nodegraph_info(
+async def get_nodegraph_info(
         ctx: Context,
         name: str,
-        path: str = ""
+        path: str = "",
+        offline: bool = False
 ) -> str:
     """获取NodeGraph文件的详细信息。
 
@@ -67,16 +204,17 @@ def get_nodegraph_info(
         ctx: MCP上下文
         node_graph_path: NodeGraph文件的完整路径，如"Assets/myGraph.asset"
         默认的path为"Assets/{课程名称}/{节点图名称}.asset"
+        offline: 为True时不经过Unity，直接读取.asset文件（Unity未连接时自动使用）
 
     返回值：
         str: NodeGraph的详细信息
     """
     path = clean_path(path)
     try:
-        response = get_unity_connection().send_command("GET_NODEGRAPH_INFO", {
+        response = await query_nodegraph("GET_NODEGRAPH_INFO", {
             "name": name,
             "path": path
-        })
+        }, offline, NodeGraphAsset.get_info)
 
         if response.get("success") == True:
             name = response.get("name", "未知名称")
@@ -95,88 +233,177 @@ def get_nodegraph_info(
 
             return (response)
         else:
-            return f"获取NodeGraph信息失败: {response.get('error', '未知错误')}"
+            return f"获取NodeGraph信息失败: {response.get('error', response.get('message', '未知错误'))}"
     except Exception as e:
         return f"执行操作时出错: {str(e)}"
 
 
-def import_excel_to_nodegraph(
+def _format_import_result(response: Dict[str, Any]) -> str:
+    """格式化IMPORT_EXCEL_TO_NODEGRAPH的结果"""
+    # 提取基本信息
+    path = response.get("path", "未知路径")
+    nodes_created = response.get("nodesCreated", 0)
+    links_created = response.get("linksCreated", 0)
+
+    # 提取节点详情
+    node_details = response.get("nodeDetails", {})
+    start_nodes = node_details.get("startNodes", 0)
+    flow_event_nodes = node_details.get("flowEventNodes", 0)
+    combine_nodes = node_details.get("combineNodes", 0)
+    empty_nodes = node_details.get("emptyNodes", 0)
+
+    # 提取其他详情
+    data_count = response.get("dataCount", 0)
+    generated_voice = "是" if response.get("generatedVoice", False) else "否"
+
+    # 提取布局信息
+    layout = response.get("layout", {})
+    columns_count = layout.get("columnsCount", 0)
+    max_row_count = layout.get("maxRowCount", 0)
+    layout_width = layout.get("layoutWidth", 0)
+    layout_height = layout.get("layoutHeight", 0)
+
+    return f"""成功导入Excel数据到NodeGraph:
+        - 路径: {path}
+        - 创建节点数: {nodes_created}
+        - 创建连接数: {links_created}
+        - 数据条目数: {data_count}
+        - 生成语音: {generated_voice}
+        
+        节点详情:
+        - 开始节点: {start_nodes}
+        - 流程事件节点: {flow_event_nodes}
+        - 组合节点: {combine_nodes}
+        - 空事件节点: {empty_nodes}
+        
+        布局信息:
+        - 列数: {columns_count}
+        - 最大行数: {max_row_count}
+        - 布局尺寸: {layout_width}x{layout_height}
+        """
+
+async def import_excel_to_nodegraph(
         ctx: Context,
         node_graph_path: str,
         excel_path: str,
-        generate_voice: bool = True
+        generate_voice: bool = True,
+        incremental: bool = True
 ) -> str:
     """将Excel文件数据导入到NodeGraph SO文件中。
 
+    默认增量导入：读取Excel的每个步骤行，与上次导入时保存在NodeGraph旁的行清单对比，只把新增、
+    修改和删除的行发给Unity，未变化的节点及其Timeline保持不变；只为配音文案变化的行生成语音，
+    行号变化的行移动已有语音。第一次导入、Excel不是xlsx、eventName为空或重复，或NodeGraph
+    已与行清单不一致时完整导入。
+
     参数：
         ctx: MCP上下文
         node_graph_path: NodeGraph文件路径，如"Assets/NodeGraphTool/Test/myGraph.asset"
         excel_path: Excel文件路径，支持相对路径或绝对路径
         generate_voice: 是否生成语音文件，默认为True
+        incremental: 是否增量导入，默认为True；为False时总是完整导入并重建全部节点
 
     返回值：
         str: 导入结果信息
     """
     node_graph_path = clean_path(node_graph_path)
     excel_path = clean_path(excel_path)
+
+    # 预处理：读取步骤行，无法读取或无法按eventName对比时只能完整导入
+    try:
+        rows = read_step_rows(resolve_excel_path(excel_path))
+        if check_step_rows(rows) is not None:
+            rows = None
+    except Exception:
+        rows = None
+
     try:
-        response = get_unity_connection().send_command("IMPORT_EXCEL_TO_NODEGRAPH", {
+        manifest = load_row_manifest(node_graph_path) if incremental and rows is not None else None
+        if manifest is not None:
+            diff = diff_step_rows(manifest, rows, generate_voice)
+            if diff.is_empty():
+                return f"Excel与上次导入时相同，NodeGraph无需更新: {node_graph_path}"
+
+            response = await send_unity_command("APPLY_EXCEL_ROWS_TO_NODEGRAPH",
+                                                diff.command_params(node_graph_path, generate_voice))
+            if response.get("success") == True:
+                diff.mark_missing_voices(response.get("missingVoices", []))
+                write_row_manifest(node_graph_path, excel_path, diff.entries)
+                return f"""成功增量导入Excel数据到NodeGraph:
+                - 路径: {response.get("path", node_graph_path)}
+                - 新增行: {len(diff.added)}
+                - 修改行: {len(diff.changed)}
+                - 删除行: {len(diff.removed)}
+                - 重新排列节点: {"是" if diff.order is not None else "否"}
+                - 生成语音: {response.get("voicesGenerating", 0)}
+                - 移动语音: {response.get("voicesMoved", 0)}
+                - 节点总数: {response.get("nodeCount", 0)}
+                - 连接总数: {response.get("linkCount", 0)}
+                """
+            if not response.get("needsFullImport"):
+                return f"增量导入Excel数据失败: {response.get('message', '未知错误')}"
+            # NodeGraph已被修改，与行清单不一致，改为完整导入
+
+        response = await send_unity_command("IMPORT_EXCEL_TO_NODEGRAPH", {
             "nodeGraphPath": node_graph_path,
             "excelPath": excel_path,
             "generateVoice": generate_voice
         })
 
         if response.get("success") == True:
-            # 提取基本信息
-            path = response.get("path", "未知路径")
-            nodes_created = response.get("nodesCreated", 0)
-            links_created = response.get("linksCreated", 0)
-            
-            # 提取节点详情
-            node_details = response.get("nodeDetails", {})
-            start_nodes = node_details.get("startNodes", 0)
-            flow_event_nodes = node_details.get("flowEventNodes", 0)
-            combine_nodes = node_details.get("combineNodes", 0)
-            empty_nodes = node_details.get("emptyNodes", 0)
-            
-            # 提取其他详情
-            data_count = response.get("dataCount", 0)
-            generated_voice = "是" if response.get("generatedVoice", False) else "否"
-            
-            # 提取布局信息
-            layout = response.get("layout", {})
-            columns_count = layout.get("columnsCount", 0)
-            max_row_count = layout.get("maxRowCount", 0)
-            layout_width = layout.get("layoutWidth", 0)
-            layout_height = layout.get("layoutHeight", 0)
-            
-            return f"""成功导入Excel数据到NodeGraph:
-                - 路径: {path}
-                - 创建节点数: {nodes_created}
-                - 创建连接数: {links_created}
-                - 数据条目数: {data_count}
-                - 生成语音: {generated_voice}
-                
-                节点详情:
-                - 开始节点: {start_nodes}
-                - 流程事件节点: {flow_event_nodes}
-                - 组合节点: {combine_nodes}
-                - 空事件节点: {empty_nodes}
-                
-                布局信息:
-                - 列数: {columns_count}
-                - 最大行数: {max_row_count}
-                - 布局尺寸: {layout_width}x{layout_height}
-                """
+            # 只有与Unity读取到的行数一致时才以本次导入作为之后增量导入的基准
+            if rows is not None and response.get("dataCount") == len(rows):
+                write_row_manifest(node_graph_path, excel_path, row_entries(rows))
+            else:
+                remove_row_manifest(node_graph_path)
+            return _format_import_result(response)
         else:
             return f"导入Excel数据失败: {response.get('error', '未知错误')}"
     except Exception as e:
         return f"执行操作时出错: {str(e)}"
     
-def get_flow_event_nodes(
+async def import_excels_to_nodegraphs(
+        ctx: Context,
+        imports: List[Dict[str, str]],
+        generate_voice: bool = True
+) -> Dict[str, Any]:
+    """将多个Excel分别导入各自的NodeGraph，分散到编辑器池中的多个Unity编辑器并行执行。
+
+    每个NodeGraph固定在第一次处理它的编辑器上，之后对同一NodeGraph的操作仍发往该编辑器；
+    只有主编辑器时按顺序执行。各编辑器需要能访问相同的Excel文件和工程资产。
+
+    参数：
+        ctx: MCP上下文
+        imports: 导入列表，每项包含node_graph_path和excel_path
+        generate_voice: 是否生成语音文件，默认为True
+
+    返回值：
+        Dict[str, Any]: 按NodeGraph路径给出执行的编辑器和导入结果信息
+    """
+    jobs = {}
+    for item in imports:
+        node_graph_path = clean_path(item.get("node_graph_path"))
+        excel_path = item.get("excel_path")
+        if not node_graph_path or not excel_path:
+            return {"error": f"每项导入都需要node_graph_path和excel_path: {item}"}
+        jobs[node_graph_path] = (lambda node_graph_path=node_graph_path, excel_path=excel_path:
+                                 import_excel_to_nodegraph(ctx, node_graph_path, excel_path, generate_voice))
+
+    results = await editor_pool.map(jobs)
+    report = {}
+    for node_graph_path, result in results.items():
+        endpoint = editor_pool.endpoint_for(node_graph_path)
+        report[node_graph_path] = {
+            "editor": endpoint.address if endpoint else None,
+            "result": f"执行操作时出错: {str(result)}" if isinstance(result, Exception) else result
+        }
+    return {"imports": report, "editors": editor_pool.status()["editors"]}
+
+async def get_flow_event_nodes(
         ctx: Context,
         name: str,
-        path: str
+        path: str,
+        offline: bool = False
 ) -> Dict[str, Any]:
     """获取NodeGraph文件中的所有FlowEventNode节点信息。
 
@@ -184,16 +411,17 @@ def get_flow_event_nodes(
         ctx: MCP上下文
         name: 节点图文件名(不含扩展名)
         path: 资产路径，例如"Assets/紫外可见光光度计测量实验",后面不加{文件名}.asset
+        offline: 为True时不经过Unity，直接读取.asset文件（Unity未连接时自动使用）
 
     返回值：
         Dict[str, Any]: FlowEventNode节点的详细信息
     """
     path = clean_path(path)
     try:
-        response = get_unity_connection().send_command("GET_FLOW_EVENT_NODES", {
+        response = await query_nodegraph("GET_FLOW_EVENT_NODES", {
             "name": name,
             "path": path
-        })
+        }, offline, NodeGraphAsset.get_flow_event_nodes)
 
         if response.get("success") == True:
             return response
@@ -208,10 +436,11 @@ def get_flow_event_nodes(
             "error": f"执行操作时出错: {str(e)}"
         }
     
-def get_flow_event_node_names(
+async def get_flow_event_node_names(
         ctx: Context,
         name: str,
-        path: str = "Assets/NodeGraphTool/Test"
+        path: str = "Assets/NodeGraphTool/Test",
+        offline: bool = False
 ) -> Dict[str, Any]:
     """获取NodeGraph文件中的所有FlowEventNode节点名称列表。
 
@@ -219,16 +448,17 @@ def get_flow_event_node_names(
         ctx: MCP上下文
         name: 节点图文件名(不含扩展名)
         path: 资产路径，默认为"Assets/NodeGraphTool/Test"
+        offline: 为True时不经过Unity，直接读取.asset文件（Unity未连接时自动使用）
 
     返回值：
         Dict[str, Any]: FlowEventNode节点名称的列表信息
     """
     path = clean_path(path)
     try:
-        response = get_unity_connection().send_command("GET_FLOW_EVENT_NODE_NAMES", {
+        response = await query_nodegraph("GET_FLOW_EVENT_NODE_NAMES", {
             "name": name,
             "path": path
-        })
+        }, offline, NodeGraphAsset.get_flow_event_node_names)
 
         if response.get("success") == True:
             return response
@@ -244,11 +474,12 @@ def get_flow_event_node_names(
         }
     
     
-def get_flow_event_node_by_name(
+async def get_flow_event_node_by_name(
         ctx: Context,
         name: str,
         event_name: str,
-        path: str = "Assets/NodeGraphTool/Test"
+        path: str = "Assets/NodeGraphTool/Test",
+        offline: bool = False
 ) -> Dict[str, Any]:
     """根据事件名称获取NodeGraph中特定FlowEventNode节点的完整信息。
 
@@ -257,17 +488,18 @@ def get_flow_event_node_by_name(
         name: 节点图文件名(不含扩展名)
         event_name: 要查找的FlowEventNode节点的名称
         path: 资产路径，默认为"Assets/NodeGraphTool/Test"
+        offline: 为True时不经过Unity，直接读取.asset文件（Unity未连接时自动使用）
 
     返回值：
         Dict[str, Any]: 指定FlowEventNode节点的完整信息
     """
     path = clean_path(path)
     try:
-        response = get_unity_connection().send_command("GET_FLOW_EVENT_NODE_BY_NAME", {
+        response = await query_nodegraph("GET_FLOW_EVENT_NODE_BY_NAME", {
             "name": name,
             "eventName": event_name,
             "path": path
-        })
+        }, offline, lambda asset: asset.get_flow_event_node_by_name(event_name))
 
         if response.get("success") == True:
             return response
@@ -282,7 +514,7 @@ def get_flow_event_node_by_name(
             "error": f"执行操作时出错: {str(e)}"
         }
 
-def update_flow_event_node_timeline_assets(
+async def update_flow_event_node_timeline_assets(
         ctx: Context,
         name: str,
         event_name: str,
@@ -307,120 +539,54 @@ def update_flow_event_node_timeline_assets(
     camera_timeline_asset = clean_path(camera_timeline_asset) if camera_timeline_asset else camera_timeline_asset
     object_timeline_asset = clean_path(object_timeline_asset) if object_timeline_asset else object_timeline_asset
     
-    try:
-        # 1. 获取添加前的状态
-        before_response = get_unity_connection().send_command("GET_FLOW_EVENT_NODE_BY_NAME", {
-            "name": name,
-            "eventName": event_name,
-            "path": path
-        })
-        
-        before_count = 0
-        if before_response.get("success", False):
-            before_node_data = before_response.get("nodeData", {})
-            before_timeline_assets = before_node_data.get("timelineAssets", [])
-            before_count = sum(1 for t in before_timeline_assets if t and t.strip())
-        
-        # 2. 更新timeline资产
-        response = get_unity_connection().send_command("UPDATE_FLOW_EVENT_NODE_TIMELINE_ASSETS", {
-            "name": name,
-            "eventName": event_name,
-            "cameraTimelineAsset": camera_timeline_asset,
-            "objectTimelineAsset": object_timeline_asset,
-            "path": path
-        })
-
-        if not response.get("success", False):
-            return {
-                "success": False,
-                "error": response.get("message", f"更新FlowEventNode '{event_name}' 的Timeline资产失败")
-            }
-        
-        # 3. 获取更新后的状态并计算timeline数量
-        after_response = get_unity_connection().send_command("GET_FLOW_EVENT_NODE_BY_NAME", {
-            "name": name,
-            "eventName": event_name,
-            "path": path
-        })
-        
-        if after_response.get("success", False):
-            after_node_data = after_response.get("nodeData", {})
-            after_timeline_assets = after_node_data.get("timelineAssets", [])
-            
-            # 计算有效的timeline数量（非空的timeline资产）
-            valid_timeline_count = 0
-            timeline_info = []
-            
-            for timeline in after_timeline_assets:
-                if timeline and timeline.strip():  # 检查timeline不为空
-                    valid_timeline_count += 1
-                    timeline_info.append(timeline.strip())
-            
-            # 4. 通过重新更新来同步timelineCount（包含计算的数量）
-            sync_response = get_unity_connection().send_command("UPDATE_FLOW_EVENT_NODE_TIMELINE_ASSETS", {
-                "name": name,
-                "eventName": event_name,
-                "cameraTimelineAsset": camera_timeline_asset,
-                "objectTimelineAsset": object_timeline_asset,
-                "timelineCount": valid_timeline_count,  # 添加计算出的timelineCount
-                "path": path
-            })
-            
-            # 5. 保存修改
-            save_response = get_unity_connection().send_command("SAVE_NODEGRAPH_CHANGES", {
-                "name": name,
-                "path": path
-            })
-            
-            # 6. 构建详细的返回信息
-            added_timelines = []
-            if camera_timeline_asset:
-                added_timelines.append(f"相机Timeline: {camera_timeline_asset}")
-            if object_timeline_asset:
-                added_timelines.append(f"物体Timeline: {object_timeline_asset}")
-            
-            result = {
-                "success": True,
-                "message": response.get("message", "Timeline资产更新成功"),
-                "timeline_count_before": before_count,
-                "timeline_count_after": valid_timeline_count,
-                "timeline_count_changed": valid_timeline_count != before_count,
-                "timeline_assets": timeline_info,
-                "added_timelines": added_timelines,
-                "sync_success": sync_response.get("success", False),
-                "save_success": save_response.get("success", False)
-            }
-            
-            # 添加详细状态信息
-            if valid_timeline_count != before_count:
-                count_change = valid_timeline_count - before_count
-                change_text = f"增加了{count_change}个" if count_change > 0 else f"减少了{abs(count_change)}个"
-                result["message"] += f" | timelineCount {change_text}timeline (从{before_count}变为{valid_timeline_count})"
-            else:
-                result["message"] += f" | timelineCount保持为{valid_timeline_count}"
-            
-            if not sync_response.get("success", False):
-                result["warning"] = "Timeline资产更新成功，但timelineCount同步可能失败"
-            
-            if not save_response.get("success", False):
-                result["warning"] = result.get("warning", "") + " | NodeGraph保存可能失败"
-            
-            return result
-        else:
-            return {
-                "success": True,
-                "message": response.get("message", "Timeline资产更新成功"),
-                "warning": "无法重新获取节点状态以更新timelineCount"
-            }
-            
-    except Exception as e:
+    # 一次批量更新请求完成添加timeline、计数和保存
+    session = NodeGraphEditSession(name, path)
+    session.add_timeline_assets(event_name, camera_timeline_asset, object_timeline_asset)
+    response = await session.commit()
+    node_results = response.get("results") or [{}]
+    node_result = node_results[0]
+    
+    if not response.get("success", False) or not node_result.get("success", False):
         return {
             "success": False,
-            "error": f"执行操作时出错: {str(e)}"
+            "error": node_result.get("message") or response.get("error", f"更新FlowEventNode '{event_name}' 的Timeline资产失败")
         }
+    
+    before_count = node_result.get("timelineCountBefore", 0)
+    valid_timeline_count = node_result.get("timelineCountAfter", 0)
+    
+    added_timelines = []
+    if camera_timeline_asset:
+        added_timelines.append(f"相机Timeline: {camera_timeline_asset}")
+    if object_timeline_asset:
+        added_timelines.append(f"物体Timeline: {object_timeline_asset}")
+    
+    result = {
+        "success": True,
+        "message": f"成功更新FlowEventNode '{event_name}' 的Timeline资产",
+        "timeline_count_before": before_count,
+        "timeline_count_after": valid_timeline_count,
+        "timeline_count_changed": valid_timeline_count != before_count,
+        "timeline_assets": node_result.get("timelineAssets", []),
+        "added_timelines": added_timelines,
+        "save_success": response.get("saved", False)
+    }
+    
+    # 添加详细状态信息
+    if valid_timeline_count != before_count:
+        count_change = valid_timeline_count - before_count
+        change_text = f"增加了{count_change}个" if count_change > 0 else f"减少了{abs(count_change)}个"
+        result["message"] += f" | timelineCount {change_text}timeline (从{before_count}变为{valid_timeline_count})"
+    else:
+        result["message"] += f" | timelineCount保持为{valid_timeline_count}"
+    
+    if not result["save_success"]:
+        result["warning"] = "NodeGraph保存可能失败"
+    
+    return result
 
 
-def update_timeline_count_smart(
+async def update_timeline_count_smart(
         ctx: Context,
         name: str,
         event_name: str,
@@ -440,7 +606,7 @@ def update_timeline_count_smart(
     path = clean_path(path)
     try:
         # 1. 获取当前节点状态
-        node_response = get_unity_connection().send_command("GET_FLOW_EVENT_NODE_BY_NAME", {
+        node_response = await send_unity_command("GET_FLOW_EVENT_NODE_BY_NAME", {
             "name": name,
             "eventName": event_name,
             "path": path
@@ -469,50 +635,25 @@ def update_timeline_count_smart(
                 "no_update_needed": True
             }
         
-        # 3. 尝试通过Unity命令更新timelineCount
-        # 使用一个特殊的UPDATE命令来直接更新计数
-        update_response = get_unity_connection().send_command("UPDATE_FLOW_EVENT_NODE_FIELD", {
-            "name": name,
-            "eventName": event_name,
-            "fieldName": "timelineCount",
-            "fieldValue": valid_timeline_count,
-            "path": path
-        })
-        
-        # 4. 如果专用命令不存在，尝试通过重新设置timeline资产来触发计数更新
-        if not update_response.get("success", False):
-            # 获取当前的timeline资产
-            camera_timeline = node_data.get("cameraTimelineName", "")
-            object_timeline = node_data.get("objectTimelineName", "")
-            
-            # 通过重新设置来触发计数更新（带计数参数）
-            fallback_response = get_unity_connection().send_command("UPDATE_FLOW_EVENT_NODE_TIMELINE_ASSETS_WITH_COUNT", {
-                "name": name,
-                "eventName": event_name,
-                "cameraTimelineAsset": camera_timeline if camera_timeline and camera_timeline.strip() else None,
-                "objectTimelineAsset": object_timeline if object_timeline and object_timeline.strip() else None,
-                "timelineCount": valid_timeline_count,
-                "path": path
-            })
-            
-            if fallback_response.get("success", False):
-                update_response = fallback_response
-        
-        # 5. 保存修改
-        save_response = get_unity_connection().send_command("SAVE_NODEGRAPH_CHANGES", {
-            "name": name,
-            "path": path
-        })
+        # 3. timelineCount由timelineAssets自动计算，不一致说明列表中有已删除的资产：
+        #    用有效的资产路径重建列表，批量更新时一并保存
+        valid_assets = [t.strip() for t in timeline_assets if t and t.strip()]
+        session = NodeGraphEditSession(name, path)
+        session.add_timeline_assets(event_name, *valid_assets, replace=True)
+        response = await session.commit()
+        node_result = (response.get("results") or [{}])[0]
+        success = response.get("success", False) and node_result.get("success", False)
         
         return {
-            "success": update_response.get("success", False),
-            "message": f"timelineCount从{current_count}更新为{valid_timeline_count}" if update_response.get("success", False) else "timelineCount更新失败",
+            "success": success,
+            "message": f"timelineCount从{current_count}更新为{valid_timeline_count}" if success else
+                       f"timelineCount更新失败: {node_result.get('message') or response.get('error', '未知错误')}",
             "timeline_count_before": current_count,
-            "timeline_count_after": valid_timeline_count,
-            "timeline_assets": [t for t in timeline_assets if t and t.strip()],
+            "timeline_count_after": node_result.get("timelineCountAfter", valid_timeline_count),
+            "timeline_assets": valid_assets,
             "valid_timeline_count": valid_timeline_count,
-            "update_method": "direct_field" if update_response.get("success", False) else "fallback",
-            "save_success": save_response.get("success", False)
+            "update_method": "bulk_update",
+            "save_success": response.get("saved", False)
         }
         
     except Exception as e:
@@ -521,7 +662,7 @@ def update_timeline_count_smart(
             "error": f"执行智能timelineCount更新时出错: {str(e)}"
         }
 
-def save_nodegraph_changes(
+async def save_nodegraph_changes(
         ctx: Context,
         name: str,
         path: str = "Assets/NodeGraphTool/Test"
@@ -538,7 +679,7 @@ def save_nodegraph_changes(
     """
     path = clean_path(path)
     try:
-        response = get_unity_connection().send_command("SAVE_NODEGRAPH_CHANGES", {
+        response = await send_unity_command("SAVE_NODEGRAPH_CHANGES", {
             "name": name,
             "path": path
         })
@@ -554,4 +695,98 @@ def save_nodegraph_changes(
         return {
             "success": False,
             "error": f"执行操作时出错: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+async def begin_nodegraph_edit(
+        ctx: Context,
+        name: str,
+        path: str = "Assets/NodeGraphTool/Test",
+        atomic: bool = True
+) -> Dict[str, Any]:
+    """开始NodeGraph编辑会话，之后的修改在本地排队，commit_nodegraph_edit时一次应用并只保存一次。
+
+    参数：
+        ctx: MCP上下文
+        name: NodeGraph文件名(不含扩展名)
+        path: NodeGraph文件所在路径，默认为"Assets/NodeGraphTool/Test"
+        atomic: 为True时任一修改无效则全部不应用
+
+    返回值：
+        Dict[str, Any]: 包含session_id
+    """
+    session_id = uuid.uuid4().hex[:12]
+    _edit_sessions[session_id] = NodeGraphEditSession(name, path, atomic)
+    return {
+        "success": True,
+        "session_id": session_id,
+        "message": f"已开始编辑 {clean_path(path)}/{name}.asset"
+    }
+
+async def queue_flow_event_node_update(
+        ctx: Context,
+        session_id: str,
+        event_name: str,
+        camera_timeline_asset: Optional[str] = None,
+        object_timeline_asset: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """在编辑会话中排队一个FlowEventNode的修改（不会立即发送到Unity）。
+
+    参数：
+        ctx: MCP上下文
+        session_id: begin_nodegraph_edit返回的会话ID
+        event_name: FlowEventNode节点的事件名称
+        camera_timeline_asset: 要添加的相机Timeline资产路径
+        object_timeline_asset: 要添加的物体Timeline资产路径
+        fields: 要设置的节点字段，如{"voiceName": "...", "eventContent": "..."}，资产字段传资产路径
+
+    返回值：
+        Dict[str, Any]: 排队结果
+    """
+    session = _edit_sessions.get(session_id)
+    if session is None:
+        return {"success": False, "error": f"编辑会话不存在或已结束: {session_id}"}
+    session.add_timeline_assets(event_name, camera_timeline_asset, object_timeline_asset)
+    if fields:
+        session.set_fields(event_name, fields)
+    return {"success": True, "queued_nodes": len(session)}
+
+async def commit_nodegraph_edit(
+        ctx: Context,
+        session_id: str,
+        save: bool = True
+) -> Dict[str, Any]:
+    """提交编辑会话：一次批量更新所有排队的节点，并只保存一次NodeGraph资产。
+
+    参数：
+        ctx: MCP上下文
+        session_id: begin_nodegraph_edit返回的会话ID
+        save: 是否保存NodeGraph资产
+
+    返回值：
+        Dict[str, Any]: 每个节点的更新结果
+    """
+    session = _edit_sessions.pop(session_id, None)
+    if session is None:
+        return {"success": False, "error": f"编辑会话不存在或已结束: {session_id}"}
+    return await session.commit(save)
+
+async def discard_nodegraph_edit(
+        ctx: Context,
+        session_id: str
+) -> Dict[str, Any]:
+    """丢弃编辑会话中排队的全部修改。
+
+    参数：
+        ctx: MCP上下文
+        session_id: begin_nodegraph_edit返回的会话ID
+
+    返回值：
+        Dict[str, Any]: 丢弃结果
+    """
+    session = _edit_sessions.pop(session_id, None)
+    if session is None:
+        return {"success": False, "error": f"编辑会话不存在或已结束: {session_id}"}
+    discarded = len(session)
+    session.discard()
+    return {"success": True, "message": f"已丢弃{discarded}个节点的修改"}
@@ -2,13 +2,14 @@
 
 from typing import Optional, List, Dict, Any
 from mcp.server.fastmcp import FastMCP, Context
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection, send_unity_command
+from .asset_index import list_assets
 
 def register_object_tools(mcp: FastMCP):
     """Register all object inspection and manipulation tools with the MCP server."""
     
     @mcp.tool()
-    def get_object_properties(
+    async def get_object_properties(
         ctx: Context,
         name: str
     ) -> Dict[str, Any]:
@@ -22,7 +23,7 @@ def register_object_tools(mcp: FastMCP):
             Dict containing the object's properties, components, and their values
         """
         try:
-            response = get_unity_connection().send_command("GET_OBJECT_PROPERTIES", {
+            response = await send_unity_command("GET_OBJECT_PROPERTIES", {
                 "name": name
             })
             return response
@@ -30,7 +31,7 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to get object properties: {str(e)}"}
 
     @mcp.tool()
-    def get_component_properties(
+    async def get_component_properties(
         ctx: Context,
         object_name: str,
         component_type: str
@@ -46,7 +47,7 @@ def register_object_tools(mcp: FastMCP):
             Dict containing the component's properties and their values
         """
         try:
-            response = get_unity_connection().send_command("GET_COMPONENT_PROPERTIES", {
+            response = await send_unity_command("GET_COMPONENT_PROPERTIES", {
                 "object_name": object_name,
                 "component_type": component_type
             })
@@ -55,7 +56,7 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to get component properties: {str(e)}"}
 
     @mcp.tool()
-    def find_objects_by_name(
+    async def find_objects_by_name(
         ctx: Context,
         name: str
     ) -> List[Dict[str, str]]:
@@ -69,7 +70,7 @@ def register_object_tools(mcp: FastMCP):
             List of dicts containing object names and their paths
         """
         try:
-            response = get_unity_connection().send_command("FIND_OBJECTS_BY_NAME", {
+            response = await send_unity_command("FIND_OBJECTS_BY_NAME", {
                 "name": name
             })
             return response.get("objects", [])
@@ -77,7 +78,7 @@ def register_object_tools(mcp: FastMCP):
             return [{"error": f"Failed to find objects: {str(e)}"}]
 
     @mcp.tool()
-    def find_objects_by_tag(
+    async def find_objects_by_tag(
         ctx: Context,
         tag: str
     ) -> List[Dict[str, str]]:
@@ -91,7 +92,7 @@ def register_object_tools(mcp: FastMCP):
             List of dicts containing object names and their paths
         """
         try:
-            response = get_unity_connection().send_command("FIND_OBJECTS_BY_TAG", {
+            response = await send_unity_command("FIND_OBJECTS_BY_TAG", {
                 "tag": tag
             })
             return response.get("objects", [])
@@ -99,7 +100,7 @@ def register_object_tools(mcp: FastMCP):
             return [{"error": f"Failed to find objects: {str(e)}"}]
 
     @mcp.tool()
-    def get_scene_info(ctx: Context) -> Dict[str, Any]:
+    async def get_scene_info(ctx: Context) -> Dict[str, Any]:
         """Get information about the current scene.
 
         Args:
@@ -109,13 +110,13 @@ def register_object_tools(mcp: FastMCP):
             Dict containing scene information including name and root objects
         """
         try:
-            response = get_unity_connection().send_command("GET_SCENE_INFO")
+            response = await send_unity_command("GET_SCENE_INFO")
             return response
         except Exception as e:
             return {"error": f"Failed to get scene info: {str(e)}"}
 
     @mcp.tool()
-    def get_hierarchy(ctx: Context) -> Dict[str, Any]:
+    async def get_hierarchy(ctx: Context) -> Dict[str, Any]:
         """Get the current hierarchy of game objects in the scene.
 
         Args:
@@ -125,13 +126,13 @@ def register_object_tools(mcp: FastMCP):
             Dict containing the scene hierarchy as a tree structure
         """
         try:
-            response = get_unity_connection().send_command("GET_HIERARCHY")
+            response = await send_unity_command("GET_HIERARCHY")
             return response
         except Exception as e:
             return {"error": f"Failed to get hierarchy: {str(e)}"}
 
     @mcp.tool()
-    def select_object(
+    async def select_object(
         ctx: Context,
         name: str
     ) -> Dict[str, str]:
@@ -145,7 +146,7 @@ def register_object_tools(mcp: FastMCP):
             Dict containing the name of the selected object
         """
         try:
-            response = get_unity_connection().send_command("SELECT_OBJECT", {
+            response = await send_unity_command("SELECT_OBJECT", {
                 "name": name
             })
             return response
@@ -153,7 +154,7 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to select object: {str(e)}"}
 
     @mcp.tool()
-    def get_selected_object(ctx: Context) -> Optional[Dict[str, str]]:
+    async def get_selected_object(ctx: Context) -> Optional[Dict[str, str]]:
         """Get the currently selected game object in the Unity Editor.
 
         Args:
@@ -163,13 +164,13 @@ def register_object_tools(mcp: FastMCP):
             Dict containing the selected object's name and path, or None if no object is selected
         """
         try:
-            response = get_unity_connection().send_command("GET_SELECTED_OBJECT")
+            response = await send_unity_command("GET_SELECTED_OBJECT")
             return response.get("selected")
         except Exception as e:
             return {"error": f"Failed to get selected object: {str(e)}"}
 
     @mcp.tool()
-    def get_asset_list(
+    async def get_asset_list(
         ctx: Context,
         type: Optional[str] = None,
         search_pattern: str = "*",
@@ -187,17 +188,12 @@ def register_object_tools(mcp: FastMCP):
             List of dicts containing asset information
         """
         try:
-            response = get_unity_connection().send_command("GET_ASSET_LIST", {
-                "type": type,
-                "search_pattern": search_pattern,
-                "folder": folder
-            })
-            return response.get("assets", [])
+            return await list_assets(await get_async_unity_connection(), type, search_pattern, folder)
         except Exception as e:
             return [{"error": f"Failed to get asset list: {str(e)}"}]
             
     @mcp.tool()
-    def execute_context_menu_item(
+    async def execute_context_menu_item(
         ctx: Context,
         object_name: str,
         component: str,
@@ -215,18 +211,18 @@ def register_object_tools(mcp: FastMCP):
             Dict containing the result of the operation
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if the object exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
+            found_objects = (await unity.send_command("FIND_OBJECTS_BY_NAME", {
                 "name": object_name
-            }).get("objects", [])
+            })).get("objects", [])
             
             if not found_objects:
                 return {"error": f"Object with name '{object_name}' not found in the scene."}
             
             # Check if the component exists on the object
-            object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
+            object_props = await unity.send_command("GET_OBJECT_PROPERTIES", {
                 "name": object_name
             })
             
@@ -240,7 +236,7 @@ def register_object_tools(mcp: FastMCP):
                 return {"error": f"Component '{component}' is not attached to object '{object_name}'."}
             
             # Now execute the context menu item
-            response = unity.send_command("EXECUTE_CONTEXT_MENU_ITEM", {
+            response = await unity.send_command("EXECUTE_CONTEXT_MENU_ITEM", {
                 "object_name": object_name,
                 "component": component,
                 "context_menu_item": context_menu_item
@@ -250,7 +246,7 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to execute context menu item: {str(e)}"} 
 
     @mcp.tool()
-    def get_all_scene_objects(ctx: Context) -> Dict[str, Any]:
+    async def get_all_scene_objects(ctx: Context) -> Dict[str, Any]:
         """Get all game objects in the current scene.
 
         Args:
@@ -260,13 +256,43 @@ def register_object_tools(mcp: FastMCP):
             Dict containing list of all objects with their basic information
         """
         try:
-            response = get_unity_connection().send_command("GET_ALL_SCENE_OBJECTS")
+            response = await send_unity_command("GET_ALL_SCENE_OBJECTS")
             return response
         except Exception as e:
             return {"error": f"Failed to get all scene objects: {str(e)}"}
 
     @mcp.tool()
-    def get_object_transform_info(
+    async def refresh_scene_cache(ctx: Context) -> Dict[str, Any]:
+        """Rebuild the local scene snapshot used to answer GET_OBJECT_INFO lookups.
+
+        Call this after editing the scene by hand in the Unity Editor, or before a long
+        timeline generation run to load every object's transform and bounds in one call.
+
+        Args:
+            ctx: The MCP context
+
+        Returns:
+            Dict with the number of cached objects and the cache statistics
+        """
+        try:
+            unity = await get_async_unity_connection()
+            cache = unity.cache
+            cache.invalidate()
+            revision = cache.revision
+            response = await unity.send_command("GET_ALL_SCENE_OBJECTS", {"include_transforms": True})
+            cached = cache.prime(response.get("objects", []), revision)
+            return {
+                "cached_objects": cached,
+                "scene_objects": response.get("count", 0),
+                "revision": cache.revision,
+                "hits": cache.hits,
+                "misses": cache.misses
+            }
+        except Exception as e:
+            return {"error": f"Failed to refresh scene cache: {str(e)}"}
+
+    @mcp.tool()
+    async def get_object_transform_info(
         ctx: Context,
         name: str
     ) -> Dict[str, Any]:
@@ -280,7 +306,7 @@ def register_object_tools(mcp: FastMCP):
             Dict containing detailed transform information including local and world coordinates
         """
         try:
-            response = get_unity_connection().send_command("GET_OBJECT_TRANSFORM_INFO", {
+            response = await send_unity_command("GET_OBJECT_TRANSFORM_INFO", {
                 "name": name
             })
             return response
@@ -288,7 +314,7 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to get object transform info: {str(e)}"}
 
     @mcp.tool()
-    def find_camera_objects(ctx: Context) -> Dict[str, Any]:
+    async def find_camera_objects(ctx: Context) -> Dict[str, Any]:
         """Find all camera objects in the scene.
 
         Args:
@@ -298,13 +324,13 @@ def register_object_tools(mcp: FastMCP):
             Dict containing list of all camera objects with their properties
         """
         try:
-            response = get_unity_connection().send_command("FIND_CAMERA_OBJECTS")
+            response = await send_unity_command("FIND_CAMERA_OBJECTS")
             return response
         except Exception as e:
             return {"error": f"Failed to find camera objects: {str(e)}"}
 
     @mcp.tool()
-    def find_objects_by_name_pattern(
+    async def find_objects_by_name_pattern(
         ctx: Context,
         pattern: str,
         case_sensitive: bool = False,
@@ -324,7 +350,7 @@ def register_object_tools(mcp: FastMCP):
             Dict containing list of matching objects with enhanced search info
         """
         try:
-            response = get_unity_connection().send_command("FIND_OBJECTS_BY_NAME_PATTERN", {
+            response = await send_unity_command("FIND_OBJECTS_BY_NAME_PATTERN", {
                 "pattern": pattern,
                 "case_sensitive": case_sensitive,
                 "exact_match": exact_match,
@@ -335,7 +361,7 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to find objects by pattern: {str(e)}"} 
 
     @mcp.tool()
-    def get_object_bounds(
+    async def get_object_bounds(
         ctx: Context,
         name: str
     ) -> Dict[str, Any]:
@@ -349,7 +375,7 @@ def register_object_tools(mcp: FastMCP):
             Dict containing bounds information from both Renderer and Collider, plus transform info
         """
         try:
-            response = get_unity_connection().send_command("GET_OBJECT_BOUNDS", {
+            response = await send_unity_command("GET_OBJECT_BOUNDS", {
                 "name": name
             })
             return response
@@ -357,7 +383,7 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to get object bounds: {str(e)}"}
 
     @mcp.tool()
-    def get_combined_bounds(
+    async def get_combined_bounds(
         ctx: Context,
         object_names: List[str]
     ) -> Dict[str, Any]:
@@ -371,7 +397,7 @@ def register_object_tools(mcp: FastMCP):
             Dict containing the combined bounds information and details about found/not found objects
         """
         try:
-            response = get_unity_connection().send_command("GET_COMBINED_BOUNDS", {
+            response = await send_unity_command("GET_COMBINED_BOUNDS", {
                 "object_names": object_names
             })
             return response
@@ -379,7 +405,7 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to get combined bounds: {str(e)}"}
 
     @mcp.tool()
-    def position_camera_to_frame_objects(
+    async def position_camera_to_frame_objects(
         ctx: Context,
         object_names: List[str],
         camera_name: str = "Main Camera",
@@ -411,13 +437,13 @@ def register_object_tools(mcp: FastMCP):
             if view_direction is not None:
                 params["view_direction"] = view_direction
                 
-            response = get_unity_connection().send_command("POSITION_CAMERA_TO_FRAME_OBJECTS", params)
+            response = await send_unity_command("POSITION_CAMERA_TO_FRAME_OBJECTS", params)
             return response
         except Exception as e:
             return {"error": f"Failed to position camera: {str(e)}"}
 
     @mcp.tool()
-    def auto_position_camera_to_objects(
+    async def auto_position_camera_to_objects(
         ctx: Context,
         object_names: List[str],
         camera_name: str = "Main Camera",
@@ -473,7 +499,7 @@ def register_object_tools(mcp: FastMCP):
                 "apply_to_camera": apply_to_camera
             }
                 
-            response = get_unity_connection().send_command("AUTO_POSITION_CAMERA_TO_OBJECTS", params)
+            response = await send_unity_command("AUTO_POSITION_CAMERA_TO_OBJECTS", params)
             return response
         except Exception as e:
             return {"error": f"Failed to auto position camera: {str(e)}"} 
\ No newline at end of file
@@ -0,0 +1,453 @@
+"""
+避障路径规划
+
+在本地复现CreateAnimationCommandHandler.ApplyObstacleAvoidance：逐段检测关键帧路径是否
+穿过障碍物，按相同的避障点策略（向上、向右、向左、右上、左上、高空、绕行、螺旋）插入
+避障关键帧，并用一半的检测半径验证新路径。障碍物为GET_ALL_SCENE_OBJECTS返回的碰撞体AABB，
+存放在均匀网格中，每次检测只需检查线段附近网格内的物体。
+
+另提供动画轨道的穿模预检：按固定帧率采样Unity实际求值的关键帧曲线，
+一次向量化计算移动物体的扫掠AABB与全部障碍物AABB的重叠，并求出避开它们所需的最小抬升高度。
+"""
+
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+import math
+import numpy as np
+from .keyframe_engine import KEYFRAME_STRIDE, POSITION, ROTATION, auto_tangents, evaluate_curve
+
+# 跨越网格数超过此值的物体（如地面）不放入网格，每次检测都直接检查
+MAX_CELLS_PER_OBJECT = 4096
+MIN_CELL_SIZE = 0.1
+UP = np.array([0.0, 1.0, 0.0])
+
+class ObstacleIndex:
+    """碰撞体AABB的均匀网格索引"""
+
+    def __init__(self, names: List[str], paths: List[str], layers: List[str],
+                 mins: np.ndarray, maxs: np.ndarray, cell_size: float = None):
+        self.names = list(names)
+        self.paths = list(paths)
+        self.layers = np.array(layers, dtype=object)
+        self.mins = np.asarray(mins, dtype=np.float64).reshape(-1, 3)
+        self.maxs = np.asarray(maxs, dtype=np.float64).reshape(-1, 3)
+        if cell_size is None:
+            extents = (self.maxs - self.mins).max(axis=1) if len(self.mins) else np.array([1.0])
+            cell_size = float(np.median(extents))
+        self.cell_size = max(cell_size, MIN_CELL_SIZE)
+        self.cells: Dict[Tuple[int, int, int], List[int]] = {}
+        self.large: List[int] = []
+
+        low = np.floor(self.mins / self.cell_size).astype(np.int64)
+        high = np.floor(self.maxs / self.cell_size).astype(np.int64)
+        for index in range(len(self.mins)):
+            span = high[index] - low[index] + 1
+            if int(np.prod(span)) > MAX_CELLS_PER_OBJECT:
+                self.large.append(index)
+                continue
+            for x in range(low[index, 0], high[index, 0] + 1):
+                for y in range(low[index, 1], high[index, 1] + 1):
+                    for z in range(low[index, 2], high[index, 2] + 1):
+                        self.cells.setdefault((x, y, z), []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_scene_objects(cls, objects: List[Dict[str, Any]], cell_size: float = None) -> "ObstacleIndex":
+        """
+        从GET_ALL_SCENE_OBJECTS(include_transforms=True)的结果构建索引，只包含激活且带碰撞体的物体
+
+        参数：
+            objects: 场景物体列表
+            cell_size: 网格尺寸（米），默认取物体尺寸的中位数
+
+        返回值：
+            ObstacleIndex: 障碍物索引
+        """
+        names, paths, layers, mins, maxs = [], [], [], [], []
+        for obj in objects:
+            collider = (obj.get("bounds") or {}).get("collider") or {}
+            if not collider.get("exists", False) or not obj.get("activeInHierarchy", False):
+                continue
+            names.append(obj.get("name"))
+            paths.append(obj.get("path") or obj.get("name"))
+            layers.append(obj.get("layerName", "Default"))
+            mins.append(collider["min"])
+            maxs.append(collider["max"])
+        return cls(names, paths, layers, np.array(mins).reshape(-1, 3), np.array(maxs).reshape(-1, 3), cell_size)
+
+    def select(self, layers: Optional[Iterable[str]] = None, exclude: Optional[Any] = None) -> np.ndarray:
+        """
+        按层级名称选择参与检测的障碍物，并排除移动物体本身及其子物体
+
+        参数：
+            layers: 障碍物层级名称列表，None表示全部层级
+            exclude: 移动物体名称，或需要排除的多个物体名称
+
+        返回值：
+            np.ndarray: (M,) 布尔掩码
+        """
+        mask = np.ones(len(self.names), dtype=bool)
+        if layers is not None:
+            mask &= np.isin(self.layers, list(layers))
+        if exclude:
+            excluded = {exclude} if isinstance(exclude, str) else set(exclude)
+            excluded_paths = [path for name, path in zip(self.names, self.paths) if name in excluded]
+            for index, path in enumerate(self.paths):
+                if any(path == root or path.startswith(root + "/") for root in excluded_paths):
+                    mask[index] = False
+        return mask
+
+    def _candidates(self, start: np.ndarray, end: np.ndarray, radius: float) -> np.ndarray:
+        length = float(np.linalg.norm(end - start))
+        steps = max(int(math.ceil(length / (self.cell_size * 0.5))), 1)
+        points = start + (end - start) * np.linspace(0.0, 1.0, steps + 1)[:, None]
+        low = np.floor((points - radius) / self.cell_size).astype(np.int64)
+        high = np.floor((points + radius) / self.cell_size).astype(np.int64)
+        reach = int((high - low).max()) + 1
+        offsets = np.stack(np.meshgrid(*[np.arange(reach)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+        cells = low[:, None, :] + offsets[None, :, :]
+        cells = cells[(cells <= high[:, None, :]).all(axis=2)]
+        found = set(self.large)
+        for cell in set(map(tuple, cells.tolist())):
+            found.update(self.cells.get(cell, ()))
+        return np.fromiter(found, dtype=np.int64, count=len(found))
+
+    def first_hit(self, start: Any, end: Any, radius: float, mask: np.ndarray = None) -> Optional[Tuple[int, float]]:
+        """
+        检测半径为radius的球沿线段start→end移动时最先碰到的障碍物
+
+        与Physics.SphereCast一致，起点已经与之重叠的障碍物不计入
+
+        参数：
+            start: 起点
+            end: 终点
+            radius: 检测半径
+            mask: select()返回的障碍物掩码
+
+        返回值：
+            Optional[Tuple]: (障碍物下标, 碰撞位置在线段上的比例)，没有障碍物时为None
+        """
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+        candidates = self._candidates(start, end, radius)
+        if mask is not None and len(candidates):
+            candidates = candidates[mask[candidates]]
+        if not len(candidates):
+            return None
+
+        low = self.mins[candidates] - radius
+        high = self.maxs[candidates] + radius
+        direction = end - start
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse = 1.0 / direction
+            t1 = (low - start) * inverse
+            t2 = (high - start) * inverse
+        # 与坐标轴平行的线段：起点在该轴范围内则不受限制
+        parallel = direction == 0
+        inside = (start >= low) & (start <= high)
+        t_near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2)).max(axis=1)
+        t_far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2)).min(axis=1)
+
+        hits = (t_near >= 0) & (t_near <= 1) & (t_near <= t_far)
+        if not hits.any():
+            return None
+        nearest = np.flatnonzero(hits)[np.argmin(t_near[hits])]
+        return int(candidates[nearest]), float(t_near[nearest])
+
+    def bounds(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """返回障碍物的 (center, size)"""
+        return (self.mins[index] + self.maxs[index]) * 0.5, self.maxs[index] - self.mins[index]
+
+def _normalized(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 1e-5 else np.zeros(3)
+
+def avoidance_point(start: np.ndarray, end: np.ndarray, center: np.ndarray, size: np.ndarray,
+                    avoidance_height: float, attempt: int) -> np.ndarray:
+    """
+    计算第attempt次尝试的避障点，与CalculateSmartAvoidancePoint的策略一致
+
+    参数：
+        start: 线段起点
+        end: 线段终点
+        center: 障碍物bounds中心
+        size: 障碍物bounds尺寸
+        avoidance_height: 避障高度
+        attempt: 尝试序号
+
+    返回值：
+        np.ndarray: 避障点
+    """
+    direction = _normalized(end - start)
+    projection = start + direction * np.dot(center - start, direction)
+    margin = max(np.linalg.norm(size) * 0.5, 2.0)
+    right = _normalized(np.cross(direction, UP))
+
+    if attempt == 0:  # 向上避障
+        return projection + UP * (size[1] * 0.5 + avoidance_height + margin)
+    if attempt == 1:  # 向右避障
+        return projection + right * (size[0] * 0.5 + avoidance_height + margin)
+    if attempt == 2:  # 向左避障
+        return projection - right * (size[0] * 0.5 + avoidance_height + margin)
+    if attempt == 3:  # 右上避障
+        return projection + _normalized(right + UP) * (margin + avoidance_height)
+    if attempt == 4:  # 左上避障
+        return projection + _normalized(-right + UP) * (margin + avoidance_height)
+    if attempt == 5:  # 高空直接跨越
+        return projection + UP * (size[1] + avoidance_height * 2 + margin)
+    if attempt == 6:  # 向后绕行
+        return projection - direction * margin + right * (size[0] + margin)
+    # 螺旋尝试：每次绕Y轴旋转30度
+    angle = math.radians(attempt * 30.0)
+    spiral = np.array([math.sin(angle), 0.0, math.cos(angle)])
+    return projection + spiral * (np.linalg.norm(size) * 0.5 + margin + avoidance_height) + UP * margin
+
+def plan_avoidance(
+    array: np.ndarray,
+    index: ObstacleIndex,
+    mask: np.ndarray,
+    detection_radius: float = 0.5,
+    avoidance_height: float = 2.0,
+    max_attempts: int = 3
+) -> Tuple[np.ndarray, int, bool]:
+    """
+    为关键帧数组的每段路径规划避障，在被阻挡的路段中间插入一个避障关键帧
+
+    参数：
+        array: (N, 7) 关键帧数组
+        index: 障碍物索引
+        mask: 参与检测的障碍物掩码
+        detection_radius: 障碍物检测半径
+        avoidance_height: 避障高度
+        max_attempts: 每段最大尝试次数
+
+    返回值：
+        Tuple: (新的关键帧数组, 检测到的障碍物数量, 是否应用了避障)
+    """
+    array = array[np.argsort(array[:, 0], kind="stable")]
+    keys = array[~np.isnan(array[:, 1])].astype(np.float64)
+    inserted = []
+    obstacles_detected = 0
+
+    for current, following in zip(keys[:-1], keys[1:]):
+        start, end = current[POSITION], following[POSITION]
+        hit = index.first_hit(start, end, detection_radius, mask)
+        if hit is None:
+            continue
+        obstacles_detected += 1
+        center, size = index.bounds(hit[0])
+        for attempt in range(max_attempts):
+            point = avoidance_point(start, end, center, size, avoidance_height, attempt)
+            if index.first_hit(start, point, detection_radius * 0.5, mask) is not None:
+                continue
+            if index.first_hit(point, end, detection_radius * 0.5, mask) is not None:
+                continue
+            # 按距离比例分配避障点的时间
+            to_point = np.linalg.norm(point - start)
+            total = to_point + np.linalg.norm(end - point)
+            row = np.full(KEYFRAME_STRIDE, np.nan)
+            row[0] = current[0] + (following[0] - current[0]) * (to_point / total if total > 0 else 0.5)
+            row[POSITION] = point
+            inserted.append(row)
+            break
+
+    if not inserted:
+        return array, obstacles_detected, False
+    merged = np.vstack([array, np.array(inserted, dtype=np.float32)])
+    return merged[np.argsort(merged[:, 0], kind="stable")], obstacles_detected, True
+
+DEFAULT_SAMPLE_RATE = 60.0  # 与timeline帧率一致
+DEFAULT_CLEARANCE = 0.02
+MAX_LIFT = 10.0
+
+def euler_matrices(euler: np.ndarray) -> np.ndarray:
+    """
+    Unity欧拉角（度，按Z、X、Y顺序旋转）转换为旋转矩阵
+
+    参数：
+        euler: (S, 3) 欧拉角
+
+    返回值：
+        np.ndarray: (S, 3, 3) 旋转矩阵
+    """
+    x, y, z = np.radians(np.asarray(euler, dtype=np.float64)).T
+    cx, sx, cy, sy, cz, sz = np.cos(x), np.sin(x), np.cos(y), np.sin(y), np.cos(z), np.sin(z)
+    return np.stack([
+        np.stack([cy * cz + sy * sx * sz, -cy * sz + sy * sx * cz, sy * cx], axis=-1),
+        np.stack([cx * sz, cx * cz, -sx], axis=-1),
+        np.stack([-sy * cz + cy * sx * sz, sy * sz + cy * sx * cz, cy * cx], axis=-1),
+    ], axis=-2)
+
+def _channel_track(array: np.ndarray, columns: slice, sample_times: np.ndarray, values: np.ndarray = None) -> Optional[np.ndarray]:
+    """按AddKey曲线在sample_times采样一个分量（同一时间只取第一帧），values可替换关键帧值"""
+    rows = np.flatnonzero(~np.isnan(array[:, columns.start]))
+    if len(rows) == 0:
+        return None
+    times = array[rows, 0].astype(np.float64)
+    unique = np.concatenate(([True], np.diff(times) > 0))
+    rows, times = rows[unique], times[unique]
+    keys = (array[rows, columns] if values is None else values[rows]).astype(np.float64)
+    return evaluate_curve(times, keys, auto_tangents(times, keys), sample_times)
+
+def _overlap(low: np.ndarray, high: np.ndarray, obstacle_low: np.ndarray, obstacle_high: np.ndarray, axes: slice) -> np.ndarray:
+    return ((low[:, None, axes] < obstacle_high[None, :, axes]) & (high[:, None, axes] > obstacle_low[None, :, axes])).all(axis=2)
+
+def check_track_clearance(
+    array: np.ndarray,
+    bounds_min: Any,
+    bounds_max: Any,
+    index: ObstacleIndex,
+    mask: np.ndarray = None,
+    lift_rows: Optional[Iterable[int]] = None,
+    sample_rate: float = DEFAULT_SAMPLE_RATE,
+    clearance: float = DEFAULT_CLEARANCE,
+    min_lift: float = 0.0,
+    max_lift: float = MAX_LIFT
+) -> Dict[str, Any]:
+    """
+    检查物体沿关键帧轨道运动时是否穿过场景物体，并计算避开它们的最小抬升高度
+
+    轨道按sample_rate采样（与Unity用AddKey建立的曲线一致），物体包围盒随旋转变换，
+    相邻采样点的包围盒合并为扫掠AABB，一次与所有障碍物AABB做重叠检测。
+    首尾姿态已经接触的物体（如放置物体的桌面、目标容器）不计入。
+    抬升高度作用在lift_rows指定的关键帧上：曲线对关键帧值是线性的，每个采样点的高度随抬升量线性变化，
+    因此每对（采样区间, 障碍物）对应一段会发生重叠的抬升区间，取不在任何区间内的最小值。
+
+    参数：
+        array: (N, 7) 关键帧数组（位置为物体轴心）
+        bounds_min: 物体在第一个关键帧姿态下的AABB最小点
+        bounds_max: 物体在第一个关键帧姿态下的AABB最大点
+        index: 障碍物索引
+        mask: 参与检测的障碍物掩码
+        lift_rows: 可以抬升的关键帧行号，None表示不计算抬升
+        sample_rate: 采样帧率
+        clearance: 与障碍物保持的最小间距（米）
+        min_lift: 最小抬升高度
+        max_lift: 允许的最大抬升高度
+
+    返回值：
+        Dict: collisions（当前轨道穿过的物体及时间段）、lift（需要在lift_rows上增加的高度，无法通过抬升避开时为None）、
+              samples、checked_obstacles
+    """
+    array = np.asarray(array)
+    order = np.argsort(array[:, 0], kind="stable")
+    lift_indicator = None
+    if lift_rows is not None:
+        lift_indicator = np.zeros((len(array), 1))
+        lift_indicator[list(lift_rows)] = 1.0
+        lift_indicator = lift_indicator[order]
+    array = array[order]
+    positions_rows = ~np.isnan(array[:, 1])
+    if positions_rows.sum() == 0:
+        return {"collisions": [], "lift": 0.0, "samples": 0, "checked_obstacles": 0}
+    times = array[positions_rows, 0].astype(np.float64)
+    count = max(int(math.ceil((times.max() - times.min()) * sample_rate)), 1) + 1
+    sample_times = np.linspace(times.min(), times.max(), count)
+
+    positions = _channel_track(array, POSITION, sample_times)
+    rotations = _channel_track(array, ROTATION, sample_times)
+    bounds_min = np.asarray(bounds_min, dtype=np.float64)
+    bounds_max = np.asarray(bounds_max, dtype=np.float64)
+    center = (bounds_min + bounds_max) * 0.5 - positions[0]
+    half = (bounds_max - bounds_min) * 0.5
+    if rotations is not None and np.ptp(rotations, axis=0).max() > 1e-3:
+        # 相对第一个姿态的旋转作用在包围盒上（轴心为关键帧位置）
+        delta = euler_matrices(rotations) @ euler_matrices(rotations[:1])[0].T
+        centers = positions + np.einsum("sij,j->si", delta, center)
+        halves = np.einsum("sij,j->si", np.abs(delta), half)
+    else:
+        centers = positions + center
+        halves = np.broadcast_to(half, positions.shape)
+    low, high = centers - halves, centers + halves
+
+    # 抬升权重：每个采样点高度对抬升量的导数
+    if lift_indicator is not None:
+        weights = _channel_track(array, slice(1, 2), sample_times, lift_indicator)[:, 0]
+    else:
+        weights = np.zeros(count)
+
+    # 先用整条轨道（含最大抬升）的包围盒筛选障碍物，再做一次向量化检测
+    selected = np.ones(len(index), dtype=bool) if mask is None else mask.copy()
+    reach_high = high.max(axis=0) + clearance
+    reach_low = low.min(axis=0) - clearance
+    if lift_rows is not None:
+        reach_high[1] += max_lift * max(float(weights.max()), 0.0)
+    selected &= ((index.mins < reach_high) & (index.maxs > reach_low)).all(axis=1)
+    candidates = np.flatnonzero(selected)
+    obstacle_low = index.mins[candidates] - clearance
+    obstacle_high = index.maxs[candidates] + clearance
+    # 首尾姿态已接触的物体不计入
+    resting = _overlap(low[[0, -1]], high[[0, -1]], obstacle_low, obstacle_high, slice(0, 3)).any(axis=0)
+    candidates, obstacle_low, obstacle_high = candidates[~resting], obstacle_low[~resting], obstacle_high[~resting]
+
+    sweep_low = np.minimum(low[:-1], low[1:]) if count > 1 else low
+    sweep_high = np.maximum(high[:-1], high[1:]) if count > 1 else high
+    horizontal = _overlap(sweep_low, sweep_high, obstacle_low, obstacle_high, slice(0, 3, 2))
+    pairs = np.nonzero(horizontal)
+    collided = horizontal.copy()
+    collided[pairs] = (sweep_low[pairs[0], 1] < obstacle_high[pairs[1], 1]) & (sweep_high[pairs[0], 1] > obstacle_low[pairs[1], 1])
+
+    collisions = []
+    for column in np.flatnonzero(collided.any(axis=0)):
+        hit_samples = np.flatnonzero(collided[:, column])
+        obstacle = int(candidates[column])
+        # 连续的采样区间合并为一段穿模时间
+        for run in np.split(hit_samples, np.flatnonzero(np.diff(hit_samples) > 1) + 1):
+            collisions.append({
+                "object": index.names[obstacle],
+                "path": index.paths[obstacle],
+                "start_time": round(float(sample_times[run[0]]), 3),
+                "end_time": round(float(sample_times[min(run[-1] + 1, count - 1)]), 3),
+            })
+    collisions.sort(key=lambda item: item["start_time"])
+
+    lift = None
+    if lift_rows is not None:
+        lift = _minimal_lift(pairs, sweep_low, sweep_high, weights, obstacle_low, obstacle_high, count, min_lift)
+        if lift is not None and lift > max_lift:
+            lift = None
+    return {
+        "collisions": collisions,
+        "lift": lift,
+        "samples": count,
+        "checked_obstacles": int(len(candidates)),
+    }
+
+def _linear_interval(weight: np.ndarray, bound: np.ndarray, less: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """满足 d * weight < bound（less）或 d * weight > bound 的d区间 (lower, upper)，无解时lower为inf"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        limit = bound / weight
+    holds_at_zero = bound > 0 if less else bound < 0
+    constant_lower = np.where(holds_at_zero, -np.inf, np.inf)
+    constant_upper = np.where(holds_at_zero, np.inf, -np.inf)
+    # weight为正时 d < limit（less）或 d > limit，为负时方向相反
+    below = (weight > 0) == less
+    lower = np.where(weight == 0, constant_lower, np.where(below, -np.inf, limit))
+    upper = np.where(weight == 0, constant_upper, np.where(below, limit, np.inf))
+    return lower, upper
+
+def _minimal_lift(pairs, sweep_low, sweep_high, weights, obstacle_low, obstacle_high, count, min_lift) -> Optional[float]:
+    """求不落在任何重叠区间内的最小抬升量，无法避开时返回None"""
+    samples, obstacles = pairs
+    if len(samples) == 0:
+        return float(min_lift)
+    if count > 1:
+        weight_low = np.minimum(weights[:-1], weights[1:])[samples]
+        weight_high = np.maximum(weights[:-1], weights[1:])[samples]
+    else:
+        weight_low = weight_high = weights[samples]
+    # 采样区间在抬升d后的高度范围保守估计为 [low + d * weight_low, high + d * weight_high]
+    # 与障碍物重叠的条件：low + d * weight_low < top 且 high + d * weight_high > bottom
+    lower_top, upper_top = _linear_interval(weight_low, obstacle_high[obstacles, 1] - sweep_low[samples, 1], less=True)
+    lower_bottom, upper_bottom = _linear_interval(weight_high, obstacle_low[obstacles, 1] - sweep_high[samples, 1], less=False)
+    lower = np.maximum(lower_top, lower_bottom)
+    upper = np.minimum(upper_top, upper_bottom)
+    blocked = lower < upper
+    lift = float(min_lift)
+    for low, high in sorted(zip(lower[blocked].tolist(), upper[blocked].tolist())):
+        if low >= lift:
+            break
+        if high > lift:
+            lift = high
+    return lift if math.isfinite(lift) else None
@@ -1,24 +1,25 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import List, Dict, Any, Optional
 import json
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection
+from .asset_index import asset_exists
 import os
 
 def register_scene_tools(mcp: FastMCP):
     """Register all scene-related tools with the MCP server."""
     
     @mcp.tool()
-    def get_scene_info(ctx: Context) -> str:
+    async def get_scene_info(ctx: Context) -> str:
         """Retrieve detailed info about the current Unity scene."""
         try:
-            unity = get_unity_connection()
-            result = unity.send_command("GET_SCENE_INFO")
+            unity = await get_async_unity_connection()
+            result = await unity.send_command("GET_SCENE_INFO")
             return json.dumps(result, indent=2)
         except Exception as e:
             return f"Error getting scene info: {str(e)}"
 
     @mcp.tool()
-    def open_scene(ctx: Context, scene_path: str) -> str:
+    async def open_scene(ctx: Context, scene_path: str) -> str:
         """Open a specified scene in the Unity editor.
         
         Args:
@@ -28,41 +29,34 @@ def register_scene_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if the scene exists in the project
-            scenes = unity.send_command("GET_ASSET_LIST", {
-                "type": "Scene",
-                "search_pattern": scene_path.split('/')[-1],
-                "folder": '/'.join(scene_path.split('/')[:-1]) or "Assets"
-            }).get("assets", [])
-            
-            # Check if any scene matches the exact path
-            scene_exists = any(scene.get("path") == scene_path for scene in scenes)
+            scene_exists = await asset_exists(unity, scene_path, "Scene")
             if not scene_exists:
                 return f"Scene at '{scene_path}' not found in the project."
                 
-            result = unity.send_command("OPEN_SCENE", {"scene_path": scene_path})
+            result = await unity.send_command("OPEN_SCENE", {"scene_path": scene_path})
             return result.get("message", "Scene opened successfully")
         except Exception as e:
             return f"Error opening scene: {str(e)}"
 
     @mcp.tool()
-    def save_scene(ctx: Context) -> str:
+    async def save_scene(ctx: Context) -> str:
         """Save the current scene to its file.
         
         Returns:
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
-            result = unity.send_command("SAVE_SCENE")
+            unity = await get_async_unity_connection()
+            result = await unity.send_command("SAVE_SCENE")
             return result.get("message", "Scene saved successfully")
         except Exception as e:
             return f"Error saving scene: {str(e)}"
 
     @mcp.tool()
-    def new_scene(ctx: Context, scene_path: str, overwrite: bool = False) -> str:
+    async def new_scene(ctx: Context, scene_path: str, overwrite: bool = False) -> str:
         """Create a new empty scene in the Unity editor.
         
         Args:
@@ -73,38 +67,31 @@ def register_scene_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if a scene with this path already exists
-            scenes = unity.send_command("GET_ASSET_LIST", {
-                "type": "Scene",
-                "search_pattern": scene_path.split('/')[-1],
-                "folder": '/'.join(scene_path.split('/')[:-1]) or "Assets"
-            }).get("assets", [])
-            
-            # Check if any scene matches the exact path
-            scene_exists = any(scene.get("path") == scene_path for scene in scenes)
+            scene_exists = await asset_exists(unity, scene_path, "Scene")
             if scene_exists and not overwrite:
                 return f"Scene at '{scene_path}' already exists. Use overwrite=True to replace it."
             
             # Create new scene
-            result = unity.send_command("NEW_SCENE", {
+            result = await unity.send_command("NEW_SCENE", {
                 "scene_path": scene_path,
                 "overwrite": overwrite
             })
             
             # Save the scene to ensure it's properly created
-            unity.send_command("SAVE_SCENE")
+            await unity.send_command("SAVE_SCENE")
             
             # Get scene info to verify it's loaded
-            scene_info = unity.send_command("GET_SCENE_INFO")
+            scene_info = await unity.send_command("GET_SCENE_INFO")
             
             return result.get("message", "New scene created successfully")
         except Exception as e:
             return f"Error creating new scene: {str(e)}"
 
     @mcp.tool()
-    def change_scene(ctx: Context, scene_path: str, save_current: bool = False) -> str:
+    async def change_scene(ctx: Context, scene_path: str, save_current: bool = False) -> str:
         """Change to a different scene, optionally saving the current one.
         
         Args:
@@ -115,8 +102,8 @@ def register_scene_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
-            result = unity.send_command("CHANGE_SCENE", {
+            unity = await get_async_unity_connection()
+            result = await unity.send_command("CHANGE_SCENE", {
                 "scene_path": scene_path,
                 "save_current": save_current
             })
@@ -125,7 +112,7 @@ def register_scene_tools(mcp: FastMCP):
             return f"Error changing scene: {str(e)}"
 
     @mcp.tool()
-    def get_object_info(ctx: Context, object_name: str) -> str:
+    async def get_object_info(ctx: Context, object_name: str) -> str:
         """
         Get info about a specific game object.
         
@@ -133,14 +120,14 @@ def register_scene_tools(mcp: FastMCP):
             object_name: Name of the game object.
         """
         try:
-            unity = get_unity_connection()
-            result = unity.send_command("GET_OBJECT_INFO", {"name": object_name})
+            unity = await get_async_unity_connection()
+            result = await unity.send_command("GET_OBJECT_INFO", {"name": object_name})
             return json.dumps(result, indent=2)
         except Exception as e:
             return f"Error getting object info: {str(e)}"
 
     @mcp.tool()
-    def create_object(
+    async def create_object(
         ctx: Context,
         type: str = "CUBE",
         name: str = None,
@@ -164,19 +151,19 @@ def register_scene_tools(mcp: FastMCP):
             Confirmation message with the created object's name.
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if an object with the specified name already exists (if name is provided)
             if name:
-                found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
+                found_objects = (await unity.send_command("FIND_OBJECTS_BY_NAME", {
                     "name": name
-                }).get("objects", [])
+                })).get("objects", [])
                 
                 if found_objects and not replace_if_exists:
                     return f"Object with name '{name}' already exists. Use replace_if_exists=True to replace it."
                 elif found_objects and replace_if_exists:
                     # Delete the existing object
-                    unity.send_command("DELETE_OBJECT", {"name": name})
+                    await unity.send_command("DELETE_OBJECT", {"name": name})
             
             # Create the new object
             params = {
@@ -188,13 +175,13 @@ def register_scene_tools(mcp: FastMCP):
             if name:
                 params["name"] = name
                 
-            result = unity.send_command("CREATE_OBJECT", params)
+            result = await unity.send_command("CREATE_OBJECT", params)
             return f"Created {type} game object: {result['name']}"
         except Exception as e:
             return f"Error creating game object: {str(e)}"
 
     @mcp.tool()
-    def modify_object(
+    async def modify_object(
         ctx: Context,
         name: str,
         location: Optional[List[float]] = None,
@@ -227,28 +214,28 @@ def register_scene_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if the object exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
+            found_objects = (await unity.send_command("FIND_OBJECTS_BY_NAME", {
                 "name": name
-            }).get("objects", [])
+            })).get("objects", [])
             
             if not found_objects:
                 return f"Object with name '{name}' not found in the scene."
             
             # If set_parent is provided, check if parent object exists
             if set_parent is not None:
-                parent_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
+                parent_objects = (await unity.send_command("FIND_OBJECTS_BY_NAME", {
                     "name": set_parent
-                }).get("objects", [])
+                })).get("objects", [])
                 
                 if not parent_objects:
                     return f"Parent object '{set_parent}' not found in the scene."
             
             # If we're adding a component, we could also check if it's already attached
             if add_component is not None:
-                object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
+                object_props = await unity.send_command("GET_OBJECT_PROPERTIES", {
                     "name": name
                 })
                 
@@ -260,7 +247,7 @@ def register_scene_tools(mcp: FastMCP):
             
             # If we're removing a component, check if it exists
             if remove_component is not None:
-                object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
+                object_props = await unity.send_command("GET_OBJECT_PROPERTIES", {
                     "name": name
                 })
                 
@@ -296,13 +283,13 @@ def register_scene_tools(mcp: FastMCP):
             if set_property is not None:
                 params["set_property"] = set_property
                 
-            result = unity.send_command("MODIFY_OBJECT", params)
+            result = await unity.send_command("MODIFY_OBJECT", params)
             return f"Modified game object: {result['name']}"
         except Exception as e:
             return f"Error modifying game object: {str(e)}"
 
     @mcp.tool()
-    def delete_object(ctx: Context, name: str, ignore_missing: bool = False) -> str:
+    async def delete_object(ctx: Context, name: str, ignore_missing: bool = False) -> str:
         """
         Remove a game object from the scene.
         
@@ -314,12 +301,12 @@ def register_scene_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if the object exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
+            found_objects = (await unity.send_command("FIND_OBJECTS_BY_NAME", {
                 "name": name
-            }).get("objects", [])
+            })).get("objects", [])
             
             if not found_objects:
                 if ignore_missing:
@@ -327,13 +314,13 @@ def register_scene_tools(mcp: FastMCP):
                 else:
                     return f"Error: Object '{name}' not found in the scene."
             
-            result = unity.send_command("DELETE_OBJECT", {"name": name})
+            result = await unity.send_command("DELETE_OBJECT", {"name": name})
             return f"Deleted game object: {name}"
         except Exception as e:
             return f"Error deleting game object: {str(e)}"
 
     @mcp.tool()
-    def set_skybox(ctx: Context, material_path: str) -> str:
+    async def set_skybox(ctx: Context, material_path: str) -> str:
         """设置当前场景的天空盒材质。
         Args:
             material_path: 天空盒材质的完整路径（如"Assets/Skybox/SunnyDay.mat"）
@@ -341,27 +328,27 @@ def register_scene_tools(mcp: FastMCP):
             str: 成功消息或错误详情
         """
         try:
-            unity = get_unity_connection()
-            result = unity.send_command("SET_SKYBOX", {"material_path": material_path})
+            unity = await get_async_unity_connection()
+            result = await unity.send_command("SET_SKYBOX", {"material_path": material_path})
             return result.get("message", result)
         except Exception as e:
             return f"Error setting skybox: {str(e)}"
 
     @mcp.tool()
-    def clear_skybox(ctx: Context) -> str:
+    async def clear_skybox(ctx: Context) -> str:
         """清除当前场景的天空盒（设为null）。
         Returns:
             str: 成功消息或错误详情
         """
         try:
-            unity = get_unity_connection()
-            result = unity.send_command("CLEAR_SKYBOX", {})
+            unity = await get_async_unity_connection()
+            result = await unity.send_command("CLEAR_SKYBOX", {})
             return result.get("message", result)
         except Exception as e:
             return f"Error clearing skybox: {str(e)}"
 
     @mcp.tool()
-    def create_skybox_material(ctx: Context, image_path: str, material_path: str, skybox_type: str = "Panoramic") -> str:
+    async def create_skybox_material(ctx: Context, image_path: str, material_path: str, skybox_type: str = "Panoramic") -> str:
         """由HDR/EXR图片创建天空盒材质球。
         Args:
             image_path: 图片资源路径（如Assets/Skybox/xxx.exr或xxx.hdr）
@@ -371,9 +358,9 @@ def register_scene_tools(mcp: FastMCP):
             str: 成功消息或错误详情
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             # 先尝试原始路径
-            result = unity.send_command("CREATE_SKYBOX_MATERIAL", {
+            result = await unity.send_command("CREATE_SKYBOX_MATERIAL", {
                 "image_path": image_path,
                 "material_path": material_path,
                 "skybox_type": skybox_type
@@ -388,7 +375,7 @@ def register_scene_tools(mcp: FastMCP):
                 alt_path = base + ".exr"
             else:
                 return result.get("error", result)
-            result2 = unity.send_command("CREATE_SKYBOX_MATERIAL", {
+            result2 = await unity.send_command("CREATE_SKYBOX_MATERIAL", {
                 "image_path": alt_path,
                 "material_path": material_path,
                 "skybox_type": skybox_type
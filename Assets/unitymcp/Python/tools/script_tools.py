@@ -1,12 +1,12 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import List
-from unity_connection import get_unity_connection
+from async_unity_connection import get_async_unity_connection, send_unity_command
 
 def register_script_tools(mcp: FastMCP):
     """Register all script-related tools with the MCP server."""
     
     @mcp.tool()
-    def view_script(ctx: Context, script_path: str, require_exists: bool = True) -> str:
+    async def view_script(ctx: Context, script_path: str, require_exists: bool = True) -> str:
         """View the contents of a Unity script file.
         
         Args:
@@ -26,7 +26,7 @@ def register_script_tools(mcp: FastMCP):
             print(f"ViewScript - Using normalized script path: {script_path}")
             
             # Send command to Unity to read the script file
-            response = get_unity_connection().send_command("VIEW_SCRIPT", {
+            response = await send_unity_command("VIEW_SCRIPT", {
                 "script_path": script_path,
                 "require_exists": require_exists
             })
@@ -39,7 +39,7 @@ def register_script_tools(mcp: FastMCP):
             return f"Error viewing script: {str(e)}"
 
     @mcp.tool()
-    def create_script(
+    async def create_script(
         ctx: Context,
         script_name: str,
         script_type: str = "MonoBehaviour",
@@ -65,7 +65,7 @@ def register_script_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Determine script path based on script_folder parameter
             if script_folder:
@@ -109,13 +109,13 @@ def register_script_tools(mcp: FastMCP):
             if content:
                 params["content"] = content
                 
-            response = unity.send_command("CREATE_SCRIPT", params)
+            response = await unity.send_command("CREATE_SCRIPT", params)
             return response.get("message", "Script created successfully")
         except Exception as e:
             return f"Error creating script: {str(e)}"
 
     @mcp.tool()
-    def update_script(
+    async def update_script(
         ctx: Context,
         script_path: str,
         content: str,
@@ -135,7 +135,7 @@ def register_script_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Normalize script path to ensure it has the correct format
             # Make sure the path starts with Assets/ but not Assets/Assets/
@@ -165,11 +165,11 @@ def register_script_tools(mcp: FastMCP):
                     params["create_folder_if_missing"] = True
                     
                 # Send command to Unity to update/create the script
-                response = unity.send_command("UPDATE_SCRIPT", params)
+                response = await unity.send_command("UPDATE_SCRIPT", params)
                 return response.get("message", "Script updated successfully")
             else:
                 # Standard update without creation flags
-                response = unity.send_command("UPDATE_SCRIPT", {
+                response = await unity.send_command("UPDATE_SCRIPT", {
                     "script_path": script_path,
                     "content": content
                 })
@@ -178,7 +178,7 @@ def register_script_tools(mcp: FastMCP):
             return f"Error updating script: {str(e)}"
 
     @mcp.tool()
-    def list_scripts(ctx: Context, folder_path: str = "Assets") -> str:
+    async def list_scripts(ctx: Context, folder_path: str = "Assets") -> str:
         """List all script files in a specified folder.
         
         Args:
@@ -190,7 +190,7 @@ def register_script_tools(mcp: FastMCP):
         """
         try:
             # Send command to Unity to list scripts
-            response = get_unity_connection().send_command("LIST_SCRIPTS", {
+            response = await send_unity_command("LIST_SCRIPTS", {
                 "folder_path": folder_path
             })
             scripts = response.get("scripts", [])
@@ -201,7 +201,7 @@ def register_script_tools(mcp: FastMCP):
             return f"Error listing scripts: {str(e)}"
 
     @mcp.tool()
-    def attach_script(
+    async def attach_script(
         ctx: Context,
         object_name: str,
         script_name: str,
@@ -219,10 +219,10 @@ def register_script_tools(mcp: FastMCP):
             str: Success message or error details
         """
         try:
-            unity = get_unity_connection()
+            unity = await get_async_unity_connection()
             
             # Check if the object exists
-            object_response = unity.send_command("FIND_OBJECTS_BY_NAME", {
+            object_response = await unity.send_command("FIND_OBJECTS_BY_NAME", {
                 "name": object_name
             })
             
@@ -251,7 +251,7 @@ def register_script_tools(mcp: FastMCP):
                         script_path = f"{script_path}/{script_basename}"
             
             # Check if the script is already attached
-            object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
+            object_props = await unity.send_command("GET_OBJECT_PROPERTIES", {
                 "name": object_name
             })
             
@@ -274,7 +274,7 @@ def register_script_tools(mcp: FastMCP):
             if script_path:
                 params["script_path"] = script_path
                 
-            response = unity.send_command("ATTACH_SCRIPT", params)
+            response = await unity.send_command("ATTACH_SCRIPT", params)
             return response.get("message", "Script attached successfully")
         except Exception as e:
             return f"Error attaching script: {str(e)}" 
\ No newline at end of file
@@ -0,0 +1,346 @@
+"""
+timeline描述解析器
+
+一次扫描描述文本：Aho-Corasick关键词自动机找出所有动作/方向/程度关键词，预编译的正则
+找出所有数字，之后各参数（时长、角度、距离、高度、坐标、旋转）只根据数字前后的上下文判断，
+规则与原extract_*函数的正则一致。解析结果按描述文本缓存，重复的步骤描述无需再次解析。
+"""
+
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from collections import deque
+from functools import lru_cache
+import re
+
+# 动画类型关键词
+AROUND_KEYWORDS = ('围绕', '绕着', '环绕')
+CAMERA_KEYWORDS = ('镜头', '相机', '摄像', 'camera')
+PANORAMA_KEYWORDS = ('环视', '360', '旋转一圈', '转圈', '环绕')
+SWEEP_KEYWORDS = ('扫视', '左右', '扫射', '摆动')
+CLOSEUP_KEYWORDS = ('特写', '靠近', '接近', '拉近')
+MOVE_KEYWORDS = ('移动', '运动', '位移', '移到')
+ROTATE_KEYWORDS = ('旋转', '转动', '转向')
+BOUNCE_KEYWORDS = ('弹跳', '上下', '震动', '摆动')
+
+# 参数推断关键词
+PARAMETER_KEYWORDS = (
+    '俯视', '向下', '仰视', '向上', '大幅', '宽', '小幅', '窄',
+    '很近', '紧', '很远', '远', '适中', '中等', '高', '低',
+    '前', '后', '左', '右', '上', '下', '左转', '右转', '转身', '掉头'
+)
+
+# 零宽前瞻：每个数字位置都给出从该位置开始的最长数字，与原正则回溯后尝试的起点一致
+NUMBER_RE = re.compile(r'(?=(\d+(?:\.\d+)?))')
+WHITESPACE_RE = re.compile(r'\s*')
+COORDINATE_SEPARATOR_RE = re.compile(r'[,，]\s*')
+
+class KeywordAutomaton:
+    """Aho-Corasick多模式匹配自动机，一次扫描找出文本中出现的所有关键词"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.outputs: List[List[str]] = [[]]
+        self.fail: List[int] = [0]
+        for keyword in dict.fromkeys(keywords):
+            state = 0
+            for char in keyword:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.outputs.append([])
+                    self.fail.append(0)
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.outputs[state].append(keyword)
+
+        # 广度优先构建失败指针（根节点的子节点指向根），并合并失败链上的输出
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self.transitions[state].items():
+                queue.append(target)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                if state:
+                    self.fail[target] = self.transitions[fallback].get(char, 0)
+                self.outputs[target] = self.outputs[target] + self.outputs[self.fail[target]]
+
+    def scan(self, text: str) -> Dict[str, int]:
+        """
+        扫描文本
+
+        参数：
+            text: 待扫描文本
+
+        返回值：
+            Dict[str, int]: 出现的关键词及其第一次出现的起始位置
+        """
+        found: Dict[str, int] = {}
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self.transitions[state]:
+                state = self.fail[state]
+            state = self.transitions[state].get(char, 0)
+            for keyword in self.outputs[state]:
+                if keyword not in found:
+                    found[keyword] = position - len(keyword) + 1
+        return found
+
+KEYWORD_AUTOMATON = KeywordAutomaton(
+    AROUND_KEYWORDS + CAMERA_KEYWORDS + PANORAMA_KEYWORDS + SWEEP_KEYWORDS + CLOSEUP_KEYWORDS
+    + MOVE_KEYWORDS + ROTATE_KEYWORDS + BOUNCE_KEYWORDS + PARAMETER_KEYWORDS
+)
+
+class DescriptionFeatures:
+    """一段描述中的关键词和数字，提供各参数的提取方法"""
+
+    __slots__ = ('text', 'keywords', 'numbers')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.keywords = KEYWORD_AUTOMATON.scan(text)
+        self.numbers: List[Tuple[float, int, int]] = [
+            (float(match.group(1)), match.start(), match.end(1)) for match in NUMBER_RE.finditer(text)
+        ]
+
+    def has_any(self, keywords: Iterable[str]) -> bool:
+        return any(keyword in self.keywords for keyword in keywords)
+
+    def _followed_by(self, end: int, chars: str) -> bool:
+        position = WHITESPACE_RE.match(self.text, end).end()
+        return position < len(self.text) and self.text[position] in chars
+
+    def _preceded_by(self, start: int, prefixes: Tuple[str, ...]) -> bool:
+        while start > 0 and self.text[start - 1].isspace():
+            start -= 1
+        return any(self.text.endswith(prefix, 0, start) for prefix in prefixes)
+
+    def _first(self, prefixes: Tuple[str, ...] = None, suffix: str = None) -> Optional[float]:
+        for value, start, end in self.numbers:
+            if prefixes and not self._preceded_by(start, prefixes):
+                continue
+            if suffix and not self._followed_by(end, suffix):
+                continue
+            return value
+        return None
+
+    def duration(self, default: float = 3.0) -> float:
+        """持续时间：'X秒'/'X s'，其次'持续X'"""
+        value = self._first(suffix='秒s')
+        if value is None:
+            value = self._first(prefixes=('持续',))
+        return default if value is None else value
+
+    def angle(self, default: float = 0.0) -> float:
+        """俯仰角度：俯视为正，仰视为负，否则取'X度'"""
+        if self.has_any(('俯视', '向下')):
+            value = self._first(prefixes=('俯视', '俯'))
+            return 20.0 if value is None else value
+        if self.has_any(('仰视', '向上')):
+            value = self._first(prefixes=('仰视', '仰'))
+            return -20.0 if value is None else -value
+        value = self._first(suffix='度')
+        return default if value is None else value
+
+    def sweep_angle(self, default: float = 45.0) -> float:
+        """扫视角度：'扫视X度'，其次按大幅/小幅推断"""
+        value = self._first(prefixes=('扫视', '扫'), suffix='度')
+        if value is not None:
+            return value
+        if self.has_any(('大幅', '宽')):
+            return 60.0
+        if self.has_any(('小幅', '窄')):
+            return 30.0
+        return default
+
+    def distance(self, default: float = 5.0) -> float:
+        """距离：'X米'/'X单位'/'X m'，其次按远近推断"""
+        value = self._first(suffix='米单位m')
+        if value is not None:
+            return value
+        if self.has_any(('很近', '紧')):
+            return 2.0
+        if self.has_any(('很远', '远')):
+            return 10.0
+        if self.has_any(('适中', '中等')):
+            return 5.0
+        return default
+
+    def height(self, default: float = 2.0) -> float:
+        """高度：'高度X'，其次按高低推断"""
+        value = self._first(prefixes=('高度', '高'))
+        if value is not None:
+            return value
+        if '高' in self.keywords:
+            return 5.0
+        if '低' in self.keywords:
+            return 1.0
+        return default
+
+    def coordinates(self) -> Optional[Tuple[float, float, float]]:
+        """第一组'X,Y,Z'坐标"""
+        by_start = {start: (value, end) for value, start, end in self.numbers}
+        for value, _, end in self.numbers:
+            coordinates = [value]
+            while len(coordinates) < 3:
+                separator = COORDINATE_SEPARATOR_RE.match(self.text, end)
+                following = by_start.get(separator.end()) if separator else None
+                if following is None:
+                    break
+                coordinates.append(following[0])
+                end = following[1]
+            if len(coordinates) == 3:
+                return tuple(coordinates)
+        return None
+
+    def position(self) -> Optional[Dict[str, float]]:
+        """目标位置：方向词给出±5的偏移，具体坐标优先"""
+        position = {'x': 0.0, 'y': 0.0, 'z': 0.0}
+        if '前' in self.keywords:
+            position['z'] = 5.0
+        elif '后' in self.keywords:
+            position['z'] = -5.0
+        if '左' in self.keywords:
+            position['x'] = -5.0
+        elif '右' in self.keywords:
+            position['x'] = 5.0
+        if '上' in self.keywords:
+            position['y'] = 5.0
+        elif '下' in self.keywords:
+            position['y'] = -5.0
+        coordinates = self.coordinates()
+        if coordinates:
+            position['x'], position['y'], position['z'] = coordinates
+        return position if any(v != 0.0 for v in position.values()) else None
+
+    def rotation(self) -> Optional[Dict[str, float]]:
+        """目标旋转：左转/右转/转身，'旋转X度'优先"""
+        rotation = {'x': 0.0, 'y': 0.0, 'z': 0.0}
+        if '左转' in self.keywords:
+            rotation['y'] = -90.0
+        elif '右转' in self.keywords:
+            rotation['y'] = 90.0
+        elif self.has_any(('转身', '掉头')):
+            rotation['y'] = 180.0
+        value = self._first(prefixes=('旋转',), suffix='度')
+        if value is not None:
+            rotation['y'] = value
+        return rotation if any(v != 0.0 for v in rotation.values()) else None
+
+@lru_cache(maxsize=4096)
+def parse_description(description: str) -> DescriptionFeatures:
+    """
+    解析描述文本（按文本缓存，返回的对象不要修改）
+
+    参数：
+        description: 描述文本
+
+    返回值：
+        DescriptionFeatures: 关键词和数字
+    """
+    return DescriptionFeatures(description)
+
+def parse_timeline_parameters(description: str, object_name: str, target_object_name: str = None) -> Dict[str, Any]:
+    """
+    根据描述选择动画函数并提取全部参数
+
+    参数：
+        description: 自然语言描述
+        object_name: 要操作的物体名称
+        target_object_name: 目标物体名称（可选）
+
+    返回值：
+        Dict[str, Any]: 包含function和对应参数的字典，无法生成时包含error
+    """
+    features = parse_description(description.lower().strip())
+
+    # 围绕目标旋转，适用于所有物体
+    if features.has_any(AROUND_KEYWORDS) and target_object_name:
+        return {
+            'function': 'rotate_around_target_animation',
+            'moving_object_name': object_name,
+            'target_object_name': target_object_name,
+            'radius': features.distance(default=5.0),
+            'height': features.height(default=2.0),
+            'duration': features.duration(default=8.0)
+        }
+
+    # 相机动画模式识别
+    if features.has_any(CAMERA_KEYWORDS):
+        if features.has_any(PANORAMA_KEYWORDS):
+            return {
+                'function': 'camera_panorama_animation',
+                'name': object_name,
+                'pitch_angle': features.angle(default=-20.0),
+                'duration': features.duration(default=10.0)
+            }
+        if features.has_any(SWEEP_KEYWORDS):
+            return {
+                'function': 'camera_sweep_animation',
+                'name': object_name,
+                'pitch_angle': features.angle(default=0.0),
+                'sweep_angle': features.sweep_angle(default=45.0),
+                'duration': features.duration(default=8.0)
+            }
+        if features.has_any(CLOSEUP_KEYWORDS):
+            if target_object_name is None:
+                return {'error': '特写动画需要指定目标物体'}
+            return {
+                'function': 'camera_closeup_animation',
+                'name': object_name,
+                'target_object_name': target_object_name,
+                'closeup_distance': features.distance(default=3.0),
+                'duration': features.duration(default=10.0)
+            }
+
+    # 物体移动动画
+    if features.has_any(MOVE_KEYWORDS):
+        target_position = features.position()
+        if target_position:
+            return {
+                'function': 'create_multipoint_animation',
+                'name': object_name,
+                'points': [
+                    {'position': {'x': 0, 'y': 0, 'z': 0}},  # 起点
+                    {'position': target_position}  # 终点
+                ],
+                'duration': features.duration(default=3.0)
+            }
+
+    # 旋转动画
+    if features.has_any(ROTATE_KEYWORDS):
+        rotation = features.rotation()
+        if rotation:
+            return {
+                'function': 'create_multipoint_animation',
+                'name': object_name,
+                'points': [
+                    {'rotation': {'x': 0, 'y': 0, 'z': 0}},  # 起始旋转
+                    {'rotation': rotation}  # 目标旋转
+                ],
+                'include_rotation': True,
+                'duration': features.duration(default=2.0)
+            }
+
+    # 弹跳或简单动画
+    if features.has_any(BOUNCE_KEYWORDS):
+        return {
+            'function': 'create_multipoint_animation',
+            'name': object_name,
+            'points': [
+                {'position': {'x': 0, 'y': 0, 'z': 0}},     # 起点
+                {'position': {'x': 0, 'y': 1, 'z': 0}},     # 中间点（上升）
+                {'position': {'x': 0, 'y': 0, 'z': 0}}      # 回到起点
+            ],
+            'duration': features.duration(default=2.0)
+        }
+
+    # 无法识别时创建简单的默认动画（至少两个点）
+    return {
+        'function': 'create_multipoint_animation',
+        'name': object_name,
+        'points': [
+            {'position': {'x': 0, 'y': 0, 'z': 0}},      # 起点
+            {'position': {'x': 0, 'y': 0.5, 'z': 0}}     # 轻微上移
+        ],
+        'duration': features.duration(default=3.0)
+    }
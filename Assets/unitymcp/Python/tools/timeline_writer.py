@@ -0,0 +1,641 @@
+"""
+Timeline资产直接写入
+
+不经过Unity编辑器，直接由关键帧数组生成TimelineAsset(.playable)、AnimationClip(.anim)及其.meta。
+文件结构与CreateAnimationCommandHandler.CreateCombinedTimeline通过AssetDatabase生成的完全一致：
+相机轨道（初始状态、移动到物体前、返回初始位置）和物体轨道（初始状态、物体动画），
+每个片段一个.anim文件，片段名、轨道名、时长和曲线切线规则都与Unity端相同。
+写入只涉及本地文件，可以在多个工作进程中并行生成整门课程的timeline，
+之后由IMPORT_TIMELINE_ASSETS一次刷新AssetDatabase并注册轨道绑定。
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import hashlib
+import numpy as np
+from .keyframe_engine import keyframes_to_array, auto_tangents, POSITION, ROTATION
+from .unity_yaml import Flow, Double, write_documents, write_native_meta
+
+# Timeline包中脚本的GUID（com.unity.timeline）
+TIMELINE_ASSET_SCRIPT = Flow(fileID=11500000, guid="bfda56da833e2384a9677cd3c976a436", type=3)
+ANIMATION_TRACK_SCRIPT = Flow(fileID=11500000, guid="d21dcc2386d650c4597f3633c75a1f98", type=3)
+ANIMATION_PLAYABLE_ASSET_SCRIPT = Flow(fileID=11500000, guid="030f85c3f73729f4f976f66ffb23b875", type=3)
+
+TIMELINE_FILE_ID = 11400000
+ANIMATION_CLIP_FILE_ID = 7400000
+MONO_BEHAVIOUR_CLASS_ID = 114
+ANIMATION_CLIP_CLASS_ID = 74
+TRANSFORM_CLASS_ID = 4
+
+FRAMERATE = 60
+INITIAL_CLIP_DURATION = 0.01  # 与CreateCombinedTimeline的初始状态片段一致
+DEFAULT_PITCH = 35.0
+AUTO_TANGENT_WEIGHT = 1.0 / 3.0  # AnimationCurve.AddKey生成的关键帧权重
+
+NULL_REFERENCE = Flow(fileID=0)
+
+class VectorCurve:
+    """
+    Transform的三分量曲线（位置或欧拉角）
+
+    times: (K,) 关键帧时间
+    values/in_slopes/out_slopes: (K, 3)
+    weight: 关键帧in/out权重（AnimationCurve.Linear/Constant为0，AddKey为1/3）
+    """
+
+    __slots__ = ('times', 'values', 'in_slopes', 'out_slopes', 'weight')
+
+    def __init__(self, times, values, in_slopes, out_slopes, weight: float = 0.0):
+        self.times = np.asarray(times, dtype=np.float32)
+        self.values = np.asarray(values, dtype=np.float32).reshape(-1, 3)
+        self.in_slopes = np.asarray(in_slopes, dtype=np.float32).reshape(-1, 3)
+        self.out_slopes = np.asarray(out_slopes, dtype=np.float32).reshape(-1, 3)
+        self.weight = weight
+
+    @property
+    def start_time(self) -> float:
+        return float(self.times[0])
+
+    @property
+    def stop_time(self) -> float:
+        return float(self.times[-1])
+
+def constant_curve(value, duration: float) -> VectorCurve:
+    """对应AnimationCurve.Constant(0, duration, value)"""
+    values = np.repeat(np.asarray(value, dtype=np.float64).reshape(1, 3), 2, axis=0)
+    zeros = np.zeros((2, 3))
+    return VectorCurve([0.0, duration], values, zeros, zeros)
+
+def linear_curve(start, end, duration: float) -> VectorCurve:
+    """对应AnimationCurve.Linear(0, start, duration, end)：首帧入切线和末帧出切线为0"""
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    slope = (end - start) / duration if duration else np.zeros(3)
+    zeros = np.zeros(3)
+    return VectorCurve([0.0, duration], [start, end], [zeros, slope], [slope, zeros])
+
+def smooth_curve(times, values) -> Optional[VectorCurve]:
+    """
+    对应逐个AnimationCurve.AddKey(time, value)得到的曲线
+
+    相同时间的关键帧只保留第一个；切线为自动平滑：端点取与相邻帧的斜率，
+    中间帧取左右两段斜率的平均值
+
+    参数：
+        times: (K,) 关键帧时间
+        values: (K, 3) 关键帧值
+
+    返回值：
+        Optional[VectorCurve]: 没有关键帧时为None
+    """
+    times = np.asarray(times, dtype=np.float32)
+    values = np.asarray(values, dtype=np.float64).reshape(-1, 3)
+    if len(times) == 0:
+        return None
+    order = np.argsort(times, kind='stable')
+    times, values = times[order], values[order]
+    keep = np.concatenate(([True], np.diff(times) > 0))
+    times, values = times[keep], values[keep]
+
+    slopes = auto_tangents(times, values)
+    return VectorCurve(times, values, slopes, slopes, AUTO_TANGENT_WEIGHT)
+
+def _vector3(value: Any, default=(0.0, 0.0, 0.0)) -> np.ndarray:
+    if isinstance(value, dict):
+        return np.array([float(value.get("x", 0.0)), float(value.get("y", 0.0)), float(value.get("z", 0.0))])
+    if isinstance(value, (list, tuple)) and len(value) >= 3:
+        return np.array([float(value[0]), float(value[1]), float(value[2])])
+    return np.array(default, dtype=np.float64)
+
+def _float32_equal(a: np.ndarray, b: np.ndarray) -> bool:
+    """Vector3 ==：Unity按float32比较（近似相等）"""
+    return bool(np.sum((np.float32(a) - np.float32(b)) ** 2) < 1e-10)
+
+def static_state_clip(position, rotation, duration: float) -> Dict[str, Any]:
+    """对应CreateStaticStateClip：位置和旋转保持不变，旋转为0时使用默认俯视角35度"""
+    rotation = _vector3(rotation)
+    if not np.any(rotation):
+        rotation = np.array([DEFAULT_PITCH, 0.0, 0.0])
+    return {"position": constant_curve(_vector3(position), duration), "rotation": constant_curve(rotation, duration)}
+
+def camera_movement_clip(start_position, end_position, start_rotation, end_rotation, duration: float) -> Dict[str, Any]:
+    """对应CreateCameraMovementClip：线性移动，rotation.x限制在30-40度"""
+    start_position, end_position = _vector3(start_position), _vector3(end_position)
+    start_rotation, end_rotation = _vector3(start_rotation), _vector3(end_rotation)
+    clip: Dict[str, Any] = {}
+    if not _float32_equal(start_position, end_position):
+        clip["position"] = linear_curve(start_position, end_position, duration)
+
+    if not _float32_equal(start_rotation, end_rotation):
+        start_rotation = start_rotation.copy()
+        end_rotation = end_rotation.copy()
+        start_rotation[0] = min(max(start_rotation[0], 30.0), 40.0)
+        end_rotation[0] = min(max(end_rotation[0], 30.0), 40.0)
+        clip["rotation"] = linear_curve(start_rotation, end_rotation, duration)
+    else:
+        rotation = start_rotation.copy()
+        if not np.any(start_rotation) and not np.any(end_rotation):
+            rotation = np.array([DEFAULT_PITCH, 0.0, 0.0])
+        else:
+            rotation[0] = min(max(rotation[0], 30.0), 40.0)
+        clip["rotation"] = constant_curve(rotation, duration)
+    return clip
+
+def keyframe_clip(keyframes: Any, duration: float) -> Dict[str, Any]:
+    """
+    对应CreateObjectAnimationClip：由关键帧生成物体动画片段
+
+    参数：
+        keyframes: CLIP2_FUNCTIONS返回的关键帧列表（time、position、rotation，向量为字典或列表），
+                   或keyframe_engine的(N, 7)关键帧数组
+        duration: 片段时长，没有关键帧时用于默认的上下弹跳动画
+
+    返回值：
+        Dict[str, Any]: position/rotation曲线，没有关键帧时为position_y弹跳曲线
+    """
+    array = keyframes if isinstance(keyframes, np.ndarray) else keyframes_to_array(list(keyframes or []))
+    if len(array) == 0:
+        # 默认动画：轻微上下移动（只有m_LocalPosition.y）
+        times = np.array([0.0, duration / 2, duration], dtype=np.float32)
+        values = np.zeros((3, 3))
+        values[1, 1] = 1.0
+        return {"position_y": smooth_curve(times, values)}
+
+    clip: Dict[str, Any] = {}
+    times = array[:, 0]
+    has_position = ~np.isnan(array[:, POSITION]).any(axis=1)
+    has_rotation = ~np.isnan(array[:, ROTATION]).any(axis=1)
+    if has_position.any():
+        clip["position"] = smooth_curve(times[has_position], array[has_position][:, POSITION])
+    if has_rotation.any():
+        clip["rotation"] = smooth_curve(times[has_rotation], array[has_rotation][:, ROTATION])
+    return clip
+
+def _vector_keys(curve: VectorCurve) -> List[Dict[str, Any]]:
+    weight = Flow(x=curve.weight, y=curve.weight, z=curve.weight)
+    keys = []
+    for time, value, in_slope, out_slope in zip(
+        curve.times.tolist(), curve.values.tolist(), curve.in_slopes.tolist(), curve.out_slopes.tolist()
+    ):
+        keys.append({
+            "serializedVersion": 3,
+            "time": time,
+            "value": Flow(x=value[0], y=value[1], z=value[2]),
+            "inSlope": Flow(x=in_slope[0], y=in_slope[1], z=in_slope[2]),
+            "outSlope": Flow(x=out_slope[0], y=out_slope[1], z=out_slope[2]),
+            "tangentMode": 0,
+            "weightedMode": 0,
+            "inWeight": weight,
+            "outWeight": weight,
+        })
+    return keys
+
+def _scalar_keys(curve: VectorCurve, component: int) -> List[Dict[str, Any]]:
+    keys = []
+    for time, value, in_slope, out_slope in zip(
+        curve.times.tolist(), curve.values[:, component].tolist(),
+        curve.in_slopes[:, component].tolist(), curve.out_slopes[:, component].tolist()
+    ):
+        keys.append({
+            "serializedVersion": 3,
+            "time": time,
+            "value": value,
+            "inSlope": in_slope,
+            "outSlope": out_slope,
+            "tangentMode": 0,
+            "weightedMode": 0,
+            "inWeight": curve.weight,
+            "outWeight": curve.weight,
+        })
+    return keys
+
+def _curve(keys: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"serializedVersion": 2, "m_Curve": keys, "m_PreInfinity": 2, "m_PostInfinity": 2, "m_RotationOrder": 4}
+
+def _float_curve(curve: VectorCurve, component: int, attribute: str) -> Dict[str, Any]:
+    return {
+        "serializedVersion": 2,
+        "curve": _curve(_scalar_keys(curve, component)),
+        "attribute": attribute,
+        "path": "",
+        "classID": TRANSFORM_CLASS_ID,
+        "script": NULL_REFERENCE,
+        "flags": 0,
+    }
+
+def _binding(attribute: int, custom_type: int) -> Dict[str, Any]:
+    return {
+        "serializedVersion": 2,
+        "path": 0,
+        "attribute": attribute,
+        "script": NULL_REFERENCE,
+        "typeID": TRANSFORM_CLASS_ID,
+        "customType": custom_type,
+        "isPPtrCurve": 0,
+        "isIntCurve": 0,
+        "isSerializeReferenceCurve": 0,
+    }
+
+def animation_clip_document(name: str, clip: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    生成AnimationClip文档内容（与SetCurve设置m_LocalPosition/m_LocalEulerAngles后保存的.anim一致）
+
+    参数：
+        name: 片段名称
+        clip: static_state_clip、camera_movement_clip或keyframe_clip的结果
+
+    返回值：
+        Dict[str, Any]: AnimationClip字段
+    """
+    position = clip.get("position")
+    rotation = clip.get("rotation")
+    position_y = clip.get("position_y")
+    curves = [curve for curve in (position, rotation, position_y) if curve is not None]
+    start_time = min((curve.start_time for curve in curves), default=0.0)
+    stop_time = max((curve.stop_time for curve in curves), default=1.0)
+
+    editor_curves = []
+    if rotation is not None:
+        editor_curves += [_float_curve(rotation, i, f"localEulerAnglesRaw.{axis}") for i, axis in enumerate("xyz")]
+    if position is not None:
+        editor_curves += [_float_curve(position, i, f"m_LocalPosition.{axis}") for i, axis in enumerate("xyz")]
+    float_curves = [_float_curve(position_y, 1, "m_LocalPosition.y")] if position_y is not None else []
+    if position_y is not None:
+        editor_curves += float_curves
+
+    bindings = []
+    if position is not None:
+        bindings.append(_binding(1, 0))
+    if rotation is not None:
+        bindings.append(_binding(4, 4))
+
+    return {
+        "m_ObjectHideFlags": 0,
+        "m_CorrespondingSourceObject": NULL_REFERENCE,
+        "m_PrefabInstance": NULL_REFERENCE,
+        "m_PrefabAsset": NULL_REFERENCE,
+        "m_Name": name,
+        "serializedVersion": 7,
+        "m_Legacy": 0,
+        "m_Compressed": 0,
+        "m_UseHighQualityCurve": 1,
+        "m_RotationCurves": [],
+        "m_CompressedRotationCurves": [],
+        "m_EulerCurves": [{"curve": _curve(_vector_keys(rotation)), "path": ""}] if rotation is not None else [],
+        "m_PositionCurves": [{"curve": _curve(_vector_keys(position)), "path": ""}] if position is not None else [],
+        "m_ScaleCurves": [],
+        "m_FloatCurves": float_curves,
+        "m_PPtrCurves": [],
+        "m_SampleRate": FRAMERATE,
+        "m_WrapMode": 0,
+        "m_Bounds": {"m_Center": Flow(x=0, y=0, z=0), "m_Extent": Flow(x=0, y=0, z=0)},
+        "m_ClipBindingConstant": {"genericBindings": bindings, "pptrCurveMapping": []},
+        "m_AnimationClipSettings": {
+            "serializedVersion": 2,
+            "m_AdditiveReferencePoseClip": NULL_REFERENCE,
+            "m_AdditiveReferencePoseTime": 0,
+            "m_StartTime": start_time,
+            "m_StopTime": stop_time,
+            "m_OrientationOffsetY": 0,
+            "m_Level": 0,
+            "m_CycleOffset": 0,
+            "m_HasAdditiveReferencePose": 0,
+            "m_LoopTime": 0,
+            "m_LoopBlend": 0,
+            "m_LoopBlendOrientation": 0,
+            "m_LoopBlendPositionY": 0,
+            "m_LoopBlendPositionXZ": 0,
+            "m_KeepOriginalOrientation": 0,
+            "m_KeepOriginalPositionY": 1,
+            "m_KeepOriginalPositionXZ": 0,
+            "m_HeightFromFeet": 0,
+            "m_Mirror": 0,
+        },
+        "m_EditorCurves": editor_curves,
+        "m_EulerEditorCurves": [],
+        "m_HasGenericRootTransform": 1 if bindings else 0,
+        "m_HasMotionFloatCurves": 0,
+        "m_Events": [],
+    }
+
+def write_animation_clip(file_path: str, clip: Dict[str, Any]) -> str:
+    """
+    写入.anim文件及其.meta（已有.meta时沿用GUID）
+
+    参数：
+        file_path: .anim文件磁盘路径，片段名称取文件名
+        clip: 片段曲线
+
+    返回值：
+        str: .anim资产GUID
+    """
+    name = Path(file_path).stem
+    write_documents(file_path, [(ANIMATION_CLIP_CLASS_ID, ANIMATION_CLIP_FILE_ID, "AnimationClip", animation_clip_document(name, clip))])
+    return write_native_meta(file_path, ANIMATION_CLIP_FILE_ID)
+
+def local_file_id(*parts: str) -> int:
+    """由资产路径和对象角色生成稳定的文件内对象ID（64位有符号），重新生成时引用不变"""
+    digest = hashlib.md5("/".join(parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little", signed=True) or 1
+
+def _mix_curve(start: float, end: float) -> Dict[str, Any]:
+    keys = []
+    for time, value in ((0, start), (1, end)):
+        keys.append({
+            "serializedVersion": 3, "time": time, "value": value, "inSlope": 0, "outSlope": 0,
+            "tangentMode": 0, "weightedMode": 0, "inWeight": 0, "outWeight": 0,
+        })
+    return _curve(keys)
+
+def _monobehaviour(hide_flags: int, script: Flow, name: str) -> Dict[str, Any]:
+    return {
+        "m_ObjectHideFlags": hide_flags,
+        "m_CorrespondingSourceObject": NULL_REFERENCE,
+        "m_PrefabInstance": NULL_REFERENCE,
+        "m_PrefabAsset": NULL_REFERENCE,
+        "m_GameObject": NULL_REFERENCE,
+        "m_Enabled": 1,
+        "m_EditorHideFlags": 0,
+        "m_Script": script,
+        "m_Name": name,
+        "m_EditorClassIdentifier": "",
+    }
+
+def timeline_documents(timeline_name: str, asset_path: str, tracks: List[Dict[str, Any]], fixed_duration: float) -> List[Tuple[int, int, str, Dict[str, Any]]]:
+    """
+    生成TimelineAsset、AnimationTrack和AnimationPlayableAsset文档
+
+    参数：
+        timeline_name: timeline名称
+        asset_path: .playable资产路径（用于生成稳定的对象ID）
+        tracks: 轨道列表，每项包含name和clips（name、display_name、start、duration、clip_guid）
+        fixed_duration: timeline固定时长
+
+    返回值：
+        List[Tuple]: (class_id, file_id, type_name, data)，按fileID排序
+    """
+    documents = []
+    track_ids = []
+    for track_index, track in enumerate(tracks):
+        track_id = local_file_id(asset_path, "track", str(track_index), track["name"])
+        track_ids.append(track_id)
+        clips = []
+        for clip_index, clip in enumerate(track["clips"]):
+            playable_id = local_file_id(asset_path, "clip", str(track_index), str(clip_index), clip["name"])
+            playable = _monobehaviour(1, ANIMATION_PLAYABLE_ASSET_SCRIPT, clip["name"])
+            playable.update({
+                "m_Clip": Flow(fileID=ANIMATION_CLIP_FILE_ID, guid=clip["clip_guid"], type=2),
+                "m_Position": Flow(x=0, y=0, z=0),
+                "m_EulerAngles": Flow(x=0, y=0, z=0),
+                "m_UseTrackMatchFields": 1,
+                "m_MatchTargetFields": 63,
+                "m_RemoveStartOffset": 0,  # 与SetRemoveStartOffsetToZero处理后的结果一致
+                "m_ApplyFootIK": 1,
+                "m_Loop": 0,
+                "m_Version": 1,
+                "m_Rotation": Flow(x=0, y=0, z=0, w=1),
+            })
+            documents.append((MONO_BEHAVIOUR_CLASS_ID, playable_id, "MonoBehaviour", playable))
+            clips.append({
+                "m_Version": 1,
+                "m_Start": Double(clip["start"]),
+                "m_ClipIn": 0,
+                "m_Asset": Flow(fileID=playable_id),
+                "m_Duration": Double(clip["duration"]),
+                "m_TimeScale": 1,
+                "m_ParentTrack": Flow(fileID=track_id),
+                "m_EaseInDuration": 0,
+                "m_EaseOutDuration": 0,
+                "m_BlendInDuration": -1,
+                "m_BlendOutDuration": -1,
+                "m_MixInCurve": _mix_curve(0, 1),
+                "m_MixOutCurve": _mix_curve(1, 0),
+                "m_BlendInCurveMode": 0,
+                "m_BlendOutCurveMode": 0,
+                "m_ExposedParameterNames": [],
+                "m_AnimationCurves": NULL_REFERENCE,
+                "m_Recordable": 0,
+                "m_PostExtrapolationMode": 1,
+                "m_PreExtrapolationMode": 1,
+                "m_PostExtrapolationTime": 0,
+                "m_PreExtrapolationTime": 0,
+                "m_DisplayName": clip["display_name"],
+            })
+
+        track_data = _monobehaviour(1, ANIMATION_TRACK_SCRIPT, track["name"])
+        track_data.update({
+            "m_Version": 3,
+            "m_AnimClip": NULL_REFERENCE,
+            "m_Locked": 0,
+            "m_Muted": 0,
+            "m_CustomPlayableFullTypename": "",
+            "m_Curves": NULL_REFERENCE,
+            "m_Parent": Flow(fileID=TIMELINE_FILE_ID),
+            "m_Children": [],
+            "m_Clips": clips,
+            "m_Markers": {"m_Objects": []},
+            "m_InfiniteClipPreExtrapolation": 1,
+            "m_InfiniteClipPostExtrapolation": 1,
+            "m_InfiniteClipOffsetPosition": Flow(x=0, y=0, z=0),
+            "m_InfiniteClipOffsetEulerAngles": Flow(x=0, y=0, z=0),
+            "m_InfiniteClipTimeOffset": 0,
+            "m_InfiniteClipRemoveOffset": 0,
+            "m_InfiniteClipApplyFootIK": 1,
+            "mInfiniteClipLoop": 0,
+            "m_MatchTargetFields": 63,
+            "m_Position": Flow(x=0, y=0, z=0),
+            "m_EulerAngles": Flow(x=0, y=0, z=0),
+            "m_AvatarMask": NULL_REFERENCE,
+            "m_ApplyAvatarMask": 1,
+            "m_TrackOffset": 0,  # TrackOffset.ApplyTransformOffsets
+            "m_InfiniteClip": NULL_REFERENCE,
+            "m_OpenClipOffsetRotation": Flow(x=0, y=0, z=0, w=1),
+            "m_Rotation": Flow(x=0, y=0, z=0, w=1),
+            "m_ApplyOffsets": 0,
+        })
+        documents.append((MONO_BEHAVIOUR_CLASS_ID, track_id, "MonoBehaviour", track_data))
+
+    timeline = _monobehaviour(0, TIMELINE_ASSET_SCRIPT, timeline_name)
+    timeline.update({
+        "m_Version": 0,
+        "m_Tracks": [Flow(fileID=track_id) for track_id in track_ids],
+        "m_FixedDuration": Double(fixed_duration),
+        "m_EditorSettings": {"m_Framerate": FRAMERATE, "m_ScenePreview": 1},
+        "m_DurationMode": 1,  # FixedLength
+        "m_MarkerTrack": NULL_REFERENCE,
+    })
+    documents.append((MONO_BEHAVIOUR_CLASS_ID, TIMELINE_FILE_ID, "MonoBehaviour", timeline))
+    return sorted(documents, key=lambda document: document[1])
+
+def _double_of_float(value: float) -> float:
+    """C#中float参数参与double运算时的值"""
+    return float(np.float32(value))
+
+def write_combined_timeline(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    写入一个组合timeline（与CREATE_COMBINED_TIMELINE生成的资产相同）
+
+    参数：
+        spec: combined_timeline_spec的结果
+
+    返回值：
+        Dict[str, Any]: 与CREATE_COMBINED_TIMELINE相近的结果，另含files（写入的文件）和bindings（轨道与物体的绑定）
+    """
+    timeline_name = spec["timeline_name"]
+    asset_path = f"{spec['timeline_folder']}/{timeline_name}.playable"
+    folder = Path(spec["folder_path"])
+    clip_duration = _double_of_float(spec["clip_duration"])
+    clip2_duration = _double_of_float(spec["clip2_duration"])
+    camera = spec["camera"]
+    target = spec["target"]
+
+    # 与CreateCombinedTimeline相同的片段、文件名和时间安排
+    layout = [
+        ("camera", "_CameraClip0", "相机初始状态", INITIAL_CLIP_DURATION, 0.0,
+         static_state_clip(camera["initial_position"], camera["initial_rotation"], INITIAL_CLIP_DURATION)),
+        ("camera", "_CameraClip1", "相机移动到物体前", clip_duration, INITIAL_CLIP_DURATION,
+         camera_movement_clip(camera["initial_position"], camera["target_position"],
+                              camera["initial_rotation"], camera["target_rotation"], clip_duration)),
+        ("object", "_ObjectClip0", "物体初始状态", INITIAL_CLIP_DURATION, 0.0,
+         static_state_clip(target["initial_position"], target["initial_rotation"], INITIAL_CLIP_DURATION)),
+        ("object", "_ObjectClip", "物体动画", clip2_duration, INITIAL_CLIP_DURATION + clip_duration,
+         keyframe_clip(target.get("keyframes"), clip2_duration)),
+        ("camera", "_CameraClip3", "相机返回初始位置", clip_duration, INITIAL_CLIP_DURATION + clip_duration + clip2_duration,
+         camera_movement_clip(camera["target_position"], camera["initial_position"],
+                              camera["target_rotation"], camera["initial_rotation"], clip_duration)),
+    ]
+
+    tracks = {
+        "camera": {"name": f"{spec['camera_name']}_Track", "clips": []},
+        "object": {"name": f"{spec['target_object_names'][0]}_Track", "clips": []},
+    }
+    files = []
+    clips = []
+    for track_key, suffix, display_name, duration, start, clip in layout:
+        clip_name = f"{timeline_name}{suffix}"
+        clip_file = folder / f"{clip_name}.anim"
+        clip_guid = write_animation_clip(str(clip_file), clip)
+        files.append(f"{spec['timeline_folder']}/{clip_name}.anim")
+        tracks[track_key]["clips"].append({
+            "name": clip_name, "display_name": display_name, "start": start, "duration": duration, "clip_guid": clip_guid
+        })
+        clips.append({"name": display_name, "start": start, "duration": duration})
+
+    total_duration = INITIAL_CLIP_DURATION + 2 * clip_duration + clip2_duration
+    timeline_file = folder / f"{timeline_name}.playable"
+    write_documents(str(timeline_file), timeline_documents(
+        timeline_name, asset_path, [tracks["camera"], tracks["object"]], total_duration
+    ))
+    timeline_guid = write_native_meta(str(timeline_file), TIMELINE_FILE_ID)
+    files.append(asset_path)
+
+    return {
+        "success": True,
+        "message": f"成功写入组合Timeline '{timeline_name}'，包含{len(clips)}个clip",
+        "timeline_name": timeline_name,
+        "timeline_path": asset_path,
+        "timeline_guid": timeline_guid,
+        "files": files,
+        "bindings": [
+            {"track": tracks["camera"]["name"], "object": spec["camera_name"]},
+            {"track": tracks["object"]["name"], "object": spec["target_object_names"][0]},
+        ],
+        "total_duration": total_duration,
+        "clips": sorted(clips, key=lambda clip: clip["start"]),
+    }
+
+def combined_timeline_spec(
+    params: Dict[str, Any],
+    folder_path: str,
+    camera_info: Dict[str, Any],
+    target_info: Dict[str, Any],
+    camera_pose: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    由CREATE_COMBINED_TIMELINE参数和场景信息生成write_combined_timeline的输入（可跨进程传递）
+
+    参数：
+        params: build_combined_timeline_params生成的参数
+        folder_path: timeline_folder对应的磁盘目录
+        camera_info: 相机的GET_OBJECT_INFO结果（当前位置即相机初始状态）
+        target_info: 第一个目标物体的GET_OBJECT_INFO结果
+        camera_pose: 目标物体的相机定位结果（AUTO_POSITION_CAMERA_TO_OBJECTS格式），失败时为None
+
+    返回值：
+        Dict[str, Any]: timeline规格
+
+    异常：
+        ValueError: 找不到相机或目标物体
+    """
+    camera_name = params.get("camera_name") or "Main Camera"
+    target_object_names = [
+        name.strip() for name in (params.get("target_object_name") or "").split(",") if name.strip()
+    ]
+    if not camera_info or not camera_info.get("success", True) or "position" not in camera_info:
+        raise ValueError(f"无法找到相机 '{camera_name}'")
+    if not target_object_names or not target_info or not target_info.get("success", True) or "position" not in target_info:
+        raise ValueError(f"无法找到目标物体 '{target_object_names[0] if target_object_names else ''}'")
+
+    pitch_angle = float(params.get("pitch_angle", DEFAULT_PITCH))
+    if camera_pose and camera_pose.get("success", False):
+        adjusted = camera_pose.get("adjustedCamera", {})
+        target_position = list(adjusted.get("position", [0, 0, 0]))
+        target_rotation = list(adjusted.get("rotation", [pitch_angle, 0, 0]))
+    else:
+        # 与Unity端一致的降级方式：位于目标物体中心前方3米、上方1.5米
+        target_position = (_vector3(target_info.get("position")) + np.array([0.0, 1.5, -3.0])).tolist()
+        target_rotation = [pitch_angle, 0.0, 0.0]
+
+    object_params = params.get("object_params") or {}
+    keyframes = object_params.get("keyframes") or []
+    if isinstance(keyframes, np.ndarray):
+        keyframes = keyframes.tolist()
+    clip_duration = params.get("clip_duration", 5.0)
+    return {
+        "timeline_name": params.get("timeline_name") or "CombinedTimeline",
+        "timeline_folder": (params.get("timeline_folder") or "Assets/Timeline").rstrip("/"),
+        "folder_path": str(folder_path),
+        "camera_name": camera_name,
+        "target_object_names": target_object_names,
+        "clip_duration": clip_duration,
+        "clip2_duration": params.get("clip2_duration", clip_duration),
+        "camera": {
+            "initial_position": list(camera_info.get("position")),
+            "initial_rotation": list(camera_info.get("rotation", [0, 0, 0])),
+            "target_position": target_position,
+            "target_rotation": target_rotation,
+        },
+        "target": {
+            "initial_position": list(target_info.get("position")),
+            "initial_rotation": list(target_info.get("rotation", [0, 0, 0])),
+            "keyframes": keyframes,
+        },
+    }
+
+def _write_combined_timeline_safe(spec: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return write_combined_timeline(spec)
+    except Exception as e:
+        return {
+            "success": False,
+            "timeline_name": spec.get("timeline_name"),
+            "message": f"写入组合Timeline时发生错误: {str(e)}"
+        }
+
+def write_combined_timelines(specs: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+    """
+    并行写入多个组合timeline，单个失败不影响其他timeline
+
+    参数：
+        specs: combined_timeline_spec结果列表
+        max_workers: 工作进程数，1表示在当前进程中依次写入
+
+    返回值：
+        List[Dict]: 与specs一一对应的write_combined_timeline结果
+    """
+    workers = min(max(int(max_workers), 1), len(specs))
+    if workers <= 1:
+        return [_write_combined_timeline_safe(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_write_combined_timeline_safe, specs))
@@ -0,0 +1,495 @@
+"""
+Unity YAML读写
+
+Unity序列化资产（.asset、.playable、.anim、.prefab等）使用YAML 1.1的一个子集：每个对象是一个
+"--- !u!{classID} &{fileID}"文档，内容只有块映射、块序列、简单的流映射/流序列和标量。
+读取时逐行流式解析，每读完一个文档就返回，不依赖PyYAML，也不需要打开Unity编辑器；
+标量一律保留为字符串（引号字符串会解码转义），数值由调用方按字段含义转换。
+写入时按Unity的格式输出（序列与键同缩进、非ASCII字符串转义为\\uXXXX、float按float32最短表示），
+并生成或沿用.meta中的GUID。
+"""
+
+from typing import List, Dict, Any, Iterator, Iterable, Tuple, Optional
+from pathlib import Path
+import numpy as np
+import os
+import re
+import uuid
+
+DOCUMENT_HEADER_RE = re.compile(r'^--- !u!(\d+) &(-?\d+)')
+ESCAPE_RE = re.compile(r'\\(x[0-9A-Fa-f]{2}|u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+SIMPLE_ESCAPES = {
+    '0': '\0', 'a': '\a', 'b': '\b', 't': '\t', '\t': '\t', 'n': '\n', 'v': '\v', 'f': '\f',
+    'r': '\r', 'e': '\x1b', ' ': ' ', '"': '"', '/': '/', '\\': '\\',
+    'N': '\x85', '_': '\xa0', 'L': ' ', 'P': ' '
+}
+
+class UnityDocument:
+    """一个Unity YAML文档（一个序列化对象）"""
+
+    __slots__ = ('class_id', 'file_id', 'type_name', 'data')
+
+    def __init__(self, class_id: int, file_id: str, type_name: str, data: Any):
+        self.class_id = class_id
+        self.file_id = file_id
+        self.type_name = type_name
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"UnityDocument({self.type_name}, class_id={self.class_id}, file_id={self.file_id})"
+
+def _unescape(match: re.Match) -> str:
+    escape = match.group(1)
+    if escape[0] in 'xuU':
+        return chr(int(escape[1:], 16))
+    return SIMPLE_ESCAPES.get(escape, escape)
+
+def _quoted_closed(text: str) -> bool:
+    """判断引号字符串在本行是否已经结束"""
+    quote = text[0]
+    i = 1
+    while i < len(text):
+        if quote == '"' and text[i] == '\\':
+            i += 2
+            continue
+        if text[i] == quote:
+            if quote == "'" and i + 1 < len(text) and text[i + 1] == "'":
+                i += 2
+                continue
+            return True
+        i += 1
+    return False
+
+def parse_scalar(text: str) -> Any:
+    """
+    解析单行的值：引号字符串、流映射/流序列或普通标量
+
+    参数：
+        text: 冒号或"- "之后的文本
+
+    返回值：
+        Any: str、dict、list，空值为""
+    """
+    text = text.strip()
+    if not text:
+        return ''
+    if text[0] == '"' and text.endswith('"') and len(text) > 1:
+        return ESCAPE_RE.sub(_unescape, text[1:-1])
+    if text[0] == "'" and text.endswith("'") and len(text) > 1:
+        return text[1:-1].replace("''", "'")
+    if text[0] in '{[':
+        value, _ = _parse_flow(text, 0)
+        return value
+    return text
+
+def _parse_flow(text: str, i: int) -> Tuple[Any, int]:
+    """解析流映射{a: b, c: d}和流序列[a, b]，返回(值, 结束位置)"""
+    while i < len(text) and text[i] == ' ':
+        i += 1
+    if text[i] in '{[':
+        closing = '}' if text[i] == '{' else ']'
+        is_mapping = text[i] == '{'
+        result: Any = {} if is_mapping else []
+        i += 1
+        while True:
+            while i < len(text) and text[i] in ' ,':
+                i += 1
+            if i >= len(text) or text[i] == closing:
+                return result, i + 1
+            if is_mapping:
+                colon = text.index(':', i)
+                key = text[i:colon].strip()
+                value, i = _parse_flow(text, colon + 1)
+                result[key] = value
+            else:
+                value, i = _parse_flow(text, i)
+                result.append(value)
+    if text[i] in '"\'':
+        quote = text[i]
+        j = i + 1
+        while j < len(text):
+            if quote == '"' and text[j] == '\\':
+                j += 2
+                continue
+            if text[j] == quote:
+                if quote == "'" and j + 1 < len(text) and text[j + 1] == "'":
+                    j += 2
+                    continue
+                break
+            j += 1
+        return parse_scalar(text[i:j + 1]), j + 1
+    j = i
+    while j < len(text) and text[j] not in ',}]':
+        j += 1
+    return text[i:j].strip(), j
+
+def _split_key(content: str) -> Optional[Tuple[str, str]]:
+    """拆分"key: value"或"key:"，不是映射项时返回None"""
+    if content[0] in '"\'{[':
+        return None
+    colon = content.find(': ')
+    if colon < 0:
+        return (content[:-1], '') if content.endswith(':') else None
+    return content[:colon], content[colon + 2:]
+
+class _BlockParser:
+    """按缩进解析一个文档的行"""
+
+    def __init__(self, lines: List[Tuple[int, str]]):
+        self.lines = lines
+        self.i = 0
+
+    def parse(self) -> Any:
+        if not self.lines:
+            return None
+        return self._block(self.lines[0][0])
+
+    def _block(self, indent: int) -> Any:
+        content = self.lines[self.i][1]
+        if content == '-' or content.startswith('- '):
+            return self._sequence(indent)
+        return self._mapping(indent)
+
+    def _value(self, rest: str, indent: int) -> Any:
+        """解析"key: rest"中的值，包括跨多行的标量；rest为空时解析下一层块"""
+        if rest:
+            return self._scalar_with_continuation(rest, indent)
+        if self.i < len(self.lines):
+            next_indent, next_content = self.lines[self.i]
+            if next_indent > indent:
+                return self._block(next_indent)
+            # Unity把映射值中的序列与键写在同一缩进
+            if next_indent == indent and (next_content == '-' or next_content.startswith('- ')):
+                return self._sequence(indent)
+        return ''
+
+    def _scalar_with_continuation(self, rest: str, indent: int) -> Any:
+        stripped = rest.strip()
+        quoted = stripped[:1] in ('"', "'")
+        if quoted and _quoted_closed(stripped):
+            return parse_scalar(stripped)
+        if not quoted and stripped[:1] in '{[':
+            # 流映射/流序列可能跨行
+            while self.i < len(self.lines) and self.lines[self.i][0] > indent and stripped.count(stripped[0]) > stripped.count('}' if stripped[0] == '{' else ']'):
+                stripped += ' ' + self.lines[self.i][1]
+                self.i += 1
+            return parse_scalar(stripped)
+
+        parts = [stripped]
+        while self.i < len(self.lines) and self.lines[self.i][0] > indent:
+            line = self.lines[self.i][1]
+            self.i += 1
+            if quoted and parts[-1].endswith('\\') and not parts[-1].endswith('\\\\'):
+                parts[-1] = parts[-1][:-1] + line  # 转义换行：直接连接
+            else:
+                parts.append(line)
+            if quoted and _quoted_closed(' '.join(parts)):
+                break
+        # 折叠：换行变为空格，空行变为换行
+        text = ''
+        for part in parts:
+            if not part:
+                text += '\n'
+            elif text and not text.endswith('\n'):
+                text += ' ' + part
+            else:
+                text += part
+        return parse_scalar(text)
+
+    def _mapping(self, indent: int) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        while self.i < len(self.lines):
+            line_indent, content = self.lines[self.i]
+            if line_indent != indent or content == '-' or content.startswith('- '):
+                break
+            split = _split_key(content)
+            if split is None:
+                break
+            self.i += 1
+            key, rest = split
+            result[key] = self._value(rest, indent)
+        return result
+
+    def _sequence(self, indent: int) -> List[Any]:
+        result: List[Any] = []
+        while self.i < len(self.lines):
+            line_indent, content = self.lines[self.i]
+            if line_indent != indent or not (content == '-' or content.startswith('- ')):
+                break
+            rest = content[2:].strip() if content != '-' else ''
+            if not rest:
+                self.i += 1
+                result.append(self._block(self.lines[self.i][0]) if self.i < len(self.lines) and self.lines[self.i][0] > indent else '')
+            elif _split_key(rest) is not None:
+                # "- key: value"：把本行当作缩进indent+2的映射第一行
+                self.lines[self.i] = (indent + 2, rest)
+                result.append(self._mapping(indent + 2))
+            else:
+                self.i += 1
+                result.append(self._scalar_with_continuation(rest, indent))
+        return result
+
+def parse_block(lines: Iterable[str]) -> Any:
+    """
+    解析一段不含文档头的YAML块
+
+    参数：
+        lines: 文本行
+
+    返回值：
+        Any: 解析结果
+    """
+    indented = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        stripped = line.lstrip(' ')
+        if stripped.startswith('#'):
+            continue
+        indented.append((len(line) - len(stripped), stripped.rstrip()))
+    # 去掉首尾空行（块内空行保留给多行标量折叠）
+    while indented and not indented[0][1]:
+        indented.pop(0)
+    while indented and not indented[-1][1]:
+        indented.pop()
+    return _BlockParser(indented).parse()
+
+def _make_document(header: re.Match, lines: List[str]) -> UnityDocument:
+    data = parse_block(lines)
+    if isinstance(data, dict) and len(data) == 1:
+        type_name, body = next(iter(data.items()))
+    else:
+        type_name, body = '', data
+    return UnityDocument(int(header.group(1)), header.group(2), type_name, body)
+
+def iter_documents(lines: Iterable[str]) -> Iterator[UnityDocument]:
+    """
+    流式读取Unity YAML，每读完一个文档返回一次
+
+    参数：
+        lines: 文本行（如打开的文件对象）
+
+    返回值：
+        Iterator[UnityDocument]: 按文件顺序的文档
+    """
+    header = None
+    body: List[str] = []
+    for line in lines:
+        if line.startswith('---'):
+            if header is not None:
+                yield _make_document(header, body)
+            header = DOCUMENT_HEADER_RE.match(line)
+            body = []
+        elif header is not None:
+            body.append(line)
+        # 文档头之前的%YAML/%TAG指令忽略
+    if header is not None:
+        yield _make_document(header, body)
+
+def load_documents(path: str) -> List[UnityDocument]:
+    """
+    读取Unity YAML资产文件的全部文档
+
+    参数：
+        path: 文件路径
+
+    返回值：
+        List[UnityDocument]: 文档列表
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return list(iter_documents(f))
+
+# 已解析的工程根目录: {config.unity_project_path: Path}
+_project_roots: Dict[str, Path] = {}
+
+def get_project_root() -> Path:
+    """
+    Unity工程根目录：config.unity_project_path，未设置时为本服务所在工程
+    （<工程>/Assets/unitymcp/Python）
+    """
+    from config import config
+    configured = getattr(config, 'unity_project_path', '')
+    root = _project_roots.get(configured)
+    if root is None:
+        root = Path(configured).resolve() if configured else Path(__file__).resolve().parents[4]
+        _project_roots[configured] = root
+    return root
+
+def resolve_asset_path(asset_path: str) -> Path:
+    """将"Assets/..."形式的资产路径转换为磁盘路径"""
+    path = Path(asset_path)
+    return path if path.is_absolute() else get_project_root() / asset_path.lstrip('/\\')
+
+def find_asset_path_by_guid(guid: str) -> Optional[str]:
+    """
+    通过.meta文件中的GUID查找资产路径（由工程资产索引回答，未找到时重新扫描发生变化的目录）
+
+    参数：
+        guid: 资产GUID
+
+    返回值：
+        Optional[str]: "Assets/..."形式的资产路径，找不到时为None
+    """
+    from .asset_index import asset_index
+    return asset_index.path_for_guid(guid)
+
+class Flow(dict):
+    """以流映射{a: b}形式输出的映射（如{fileID: 0}、{x: 0, y: 0, z: 0}）"""
+
+class Double(float):
+    """按double输出的数值（如TimelineClip.m_Start），普通float按float32输出"""
+
+PLAIN_SCALAR_RE = re.compile(r'^[A-Za-z0-9_./()\[\]-][ -~]*$')
+YAML_HEADER = "%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n"
+
+def format_float(value: float) -> str:
+    """按Unity的方式输出float32：最短可还原表示，整数值不带小数点"""
+    return np.format_float_positional(np.float32(value), trim='-')
+
+def format_double(value: float) -> str:
+    """按Unity的方式输出double"""
+    text = repr(float(value))
+    return text[:-2] if text.endswith('.0') else text
+
+def format_string(value: str) -> str:
+    """按Unity的方式输出字符串：简单ASCII不加引号，其余使用双引号并将非ASCII字符转义为\\uXXXX"""
+    if value == '':
+        return ''
+    if PLAIN_SCALAR_RE.match(value) and ': ' not in value and ' #' not in value and not value.endswith((' ', ':')):
+        return value
+    escaped = []
+    for char in value:
+        code = ord(char)
+        if char in '"\\':
+            escaped.append('\\' + char)
+        elif char == '\n':
+            escaped.append('\\n')
+        elif 0x20 <= code < 0x7f:
+            escaped.append(char)
+        elif code > 0xffff:
+            escaped.append('\\U%08X' % code)
+        else:
+            escaped.append('\\u%04X' % code)
+    return '"' + ''.join(escaped) + '"'
+
+def format_scalar(value: Any) -> str:
+    """输出标量：bool为0/1，Double按double，float按float32"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, Double):
+        return format_double(value)
+    if isinstance(value, (float, np.floating)):
+        return format_float(value)
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    return format_string(str(value))
+
+def _format_flow(value: Any) -> str:
+    if isinstance(value, dict):
+        return '{' + ', '.join(f"{key}: {_format_flow(item)}" for key, item in value.items()) + '}'
+    if isinstance(value, list):
+        return '[' + ', '.join(_format_flow(item) for item in value) + ']'
+    return format_scalar(value)
+
+def _emit_value(lines: List[str], prefix: str, value: Any, indent: int):
+    """输出"prefix值"，prefix为"key:"或"-"，块结构换行后按indent缩进"""
+    if isinstance(value, Flow) or (isinstance(value, (dict, list)) and not value):
+        lines.append(f"{prefix} {_format_flow(value)}")
+    elif isinstance(value, dict):
+        lines.append(prefix)
+        _emit_mapping(lines, value, indent + 2)
+    elif isinstance(value, list):
+        lines.append(prefix)
+        # Unity把映射值中的序列与键写在同一缩进
+        _emit_sequence(lines, value, indent)
+    else:
+        text = format_scalar(value)
+        lines.append(f"{prefix} {text}" if text else f"{prefix} ")
+
+def _emit_mapping(lines: List[str], mapping: Dict[str, Any], indent: int):
+    pad = ' ' * indent
+    for key, value in mapping.items():
+        _emit_value(lines, f"{pad}{key}:", value, indent)
+
+def _emit_sequence(lines: List[str], items: List[Any], indent: int):
+    pad = ' ' * indent
+    for item in items:
+        if isinstance(item, dict) and item and not isinstance(item, Flow):
+            # "- key: value"：第一项与"-"同行，其余项缩进indent+2
+            nested: List[str] = []
+            _emit_mapping(nested, item, indent + 2)
+            nested[0] = f"{pad}- " + nested[0][indent + 2:]
+            lines.extend(nested)
+        else:
+            _emit_value(lines, f"{pad}-", item, indent)
+
+def dump_document(class_id: int, file_id: int, type_name: str, data: Dict[str, Any]) -> str:
+    """
+    输出一个Unity YAML文档
+
+    参数：
+        class_id: Unity类ID（114为MonoBehaviour，74为AnimationClip）
+        file_id: 文件内对象ID
+        type_name: 类型名
+        data: 字段映射，按插入顺序输出
+
+    返回值：
+        str: 文档文本（以换行结尾）
+    """
+    lines = [f"--- !u!{class_id} &{file_id}", f"{type_name}:"]
+    _emit_mapping(lines, data, 2)
+    return '\n'.join(lines) + '\n'
+
+def _write_text(path: Path, text: str):
+    """先写临时文件再替换，避免Unity导入写了一半的文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+def write_documents(path: str, documents: Iterable[Tuple[int, int, str, Dict[str, Any]]]):
+    """
+    写入Unity YAML资产文件
+
+    参数：
+        path: 文件路径
+        documents: (class_id, file_id, type_name, data)列表
+    """
+    _write_text(Path(path), YAML_HEADER + ''.join(dump_document(*document) for document in documents))
+
+def read_meta_guid(asset_file: str) -> Optional[str]:
+    """读取资产.meta中的GUID，没有.meta时返回None"""
+    try:
+        with open(f"{asset_file}.meta", 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                if line.startswith('guid: '):
+                    return line[6:].strip()
+    except OSError:
+        return None
+    return None
+
+def write_native_meta(asset_file: str, main_object_file_id: int) -> str:
+    """
+    写入NativeFormatImporter的.meta文件；已有.meta时沿用其GUID，保持其他资产对它的引用有效
+
+    参数：
+        asset_file: 资产文件路径
+        main_object_file_id: 主对象fileID（TimelineAsset为11400000，AnimationClip为7400000）
+
+    返回值：
+        str: 资产GUID
+    """
+    guid = read_meta_guid(asset_file) or uuid.uuid4().hex
+    _write_text(Path(f"{asset_file}.meta"), (
+        "fileFormatVersion: 2\n"
+        f"guid: {guid}\n"
+        "NativeFormatImporter:\n"
+        "  externalObjects: {}\n"
+        f"  mainObjectFileID: {main_object_file_id}\n"
+        "  userData: \n"
+        "  assetBundleName: \n"
+        "  assetBundleVariant: \n"
+    ))
+    return guid
@@ -1,9 +1,18 @@
 import socket
 import json
 import logging
-from dataclasses import dataclass
-from typing import Dict, Any
+import struct
+import threading
+import time
+import itertools
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, Any, List
 from config import config
+from scene_cache import scene_cache
+from scene_mirror import scene_mirror
+import packed_encoding
+from command_metrics import command_metrics, CommandSample
 
 # Configure logging using settings from config
 logging.basicConfig(
@@ -12,12 +21,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger("UnityMCP")
 
+# Framed wire mode: 8-byte big-endian length header followed by a UTF-8 JSON body
+FRAME_PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct(">Q")
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+
 @dataclass
 class UnityConnection:
     """Manages the socket connection to the Unity Editor."""
     host: str = config.unity_host
     port: int = config.unity_port
     sock: socket.socket = None  # Socket for Unity communication
+    framed: bool = False  # True once the bridge has accepted length-prefixed framing
+    multiplexed: bool = False  # True when commands carry request IDs and may be pipelined
+    supports_batch: bool = False  # True when the bridge understands the BATCH command
+    encoding: str = "json"  # Frame body encoding agreed in the handshake, "json" or "packed"
+    last_heartbeat: float = 0.0  # time.monotonic() of the last successful heartbeat
+    connections: int = 0  # Successful connects, more than one means the socket was re-established
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)  # One request at a time (non-multiplexed)
+    _send_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)  # Serializes frame writes
+    _pending: Dict[str, Future] = field(default_factory=dict, repr=False)  # In-flight requests by ID
+    _request_ids: Any = field(default_factory=lambda: itertools.count(1), repr=False)
+    _closed: threading.Event = field(default_factory=threading.Event, repr=False)
 
     def connect(self) -> bool:
         """Establish a connection to the Unity Editor."""
@@ -26,27 +51,225 @@ class UnityConnection:
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((self.host, self.port))
+            self.framed = False
+            self.multiplexed = False
+            self.supports_batch = False
+            self.encoding = "json"
             logger.info(f"Connected to Unity at {self.host}:{self.port}")
+            if config.enable_framing:
+                self.negotiate_framing()
+            self._start_background_threads()
+            self.connections += 1
+            if self.connections > 1:
+                command_metrics.record_reconnect()
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Unity: {str(e)}")
             self.sock = None
             return False
 
+    def is_alive(self) -> bool:
+        """Whether the socket is still considered healthy by the heartbeat."""
+        return self.sock is not None and not self._closed.is_set()
+
+    def negotiate_framing(self) -> bool:
+        """Ask the bridge to switch this connection to length-prefixed framing.
+
+        The handshake itself is sent in legacy mode. Older bridges answer it with an
+        "Unknown command type" error, in which case the connection keeps using the
+        legacy sniffing parser.
+        """
+        handshake = {
+            "type": "HANDSHAKE",
+            "params": {
+                "protocol": "framed",
+                "version": FRAME_PROTOCOL_VERSION,
+                "header_bytes": FRAME_HEADER.size,
+                "multiplex": config.enable_multiplexing,
+                "encoding": config.wire_encoding
+            }
+        }
+        try:
+            self.sock.sendall(json.dumps(handshake).encode('utf-8'))
+            response = json.loads(self.receive_full_response(self.sock).decode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Framing handshake failed, using legacy protocol: {str(e)}")
+            self.disconnect()
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.connect((self.host, self.port))
+            return False
+
+        result = response.get("result") or {}
+        if response.get("status") == "success" and result.get("protocol") == "framed":
+            self.framed = True
+            self.multiplexed = bool(result.get("multiplex")) and config.enable_multiplexing
+            self.supports_batch = bool(result.get("batch"))
+            if result.get("encoding") == packed_encoding.PACKED_ENCODING:
+                self.encoding = packed_encoding.PACKED_ENCODING
+            logger.info(f"Using framed protocol v{result.get('version', FRAME_PROTOCOL_VERSION)}"
+                        f"{' with multiplexing' if self.multiplexed else ''}"
+                        f"{' and packed encoding' if self.encoding != 'json' else ''}")
+        else:
+            logger.info("Unity bridge does not support framing, using legacy protocol")
+        return self.framed
+
+    def encode(self, command: Dict[str, Any]) -> bytes:
+        """Serialize a command with the negotiated frame encoding."""
+        if self.encoding == packed_encoding.PACKED_ENCODING:
+            return packed_encoding.encode(command)
+        return json.dumps(command).encode('utf-8')
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        """Parse a response with the negotiated frame encoding."""
+        if self.encoding == packed_encoding.PACKED_ENCODING:
+            return packed_encoding.decode(data)
+        return json.loads(data)
+
+    def send_message(self, payload: bytes):
+        """Write one message, prefixed with its length when framing is active."""
+        if self.framed:
+            self.sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+        else:
+            self.sock.sendall(payload)
+
+    def receive_message(self, timeout: float = None) -> bytes:
+        """Read one complete message using the negotiated wire mode."""
+        if self.framed:
+            self.sock.settimeout(timeout or config.connection_timeout)
+            return self.receive_frame(self.sock)
+        return self.receive_full_response(self.sock, timeout=timeout)
+
+    def receive_frame(self, sock) -> bytes:
+        """Receive one length-prefixed frame into a preallocated buffer."""
+        try:
+            header = self._receive_exact(sock, FRAME_HEADER.size)
+            (length,) = FRAME_HEADER.unpack(header)
+            if length > MAX_FRAME_SIZE:
+                raise Exception(f"Frame of {length} bytes exceeds limit of {MAX_FRAME_SIZE} bytes")
+            data = self._receive_exact(sock, length)
+            logger.info(f"Received complete response ({length} bytes)")
+            return bytes(data)
+        except socket.timeout:
+            logger.warning("Socket timeout during receive")
+            raise Exception("Timeout receiving Unity response")
+
+    def _receive_exact(self, sock, size: int) -> bytearray:
+        """Fill a buffer of exactly `size` bytes from the socket."""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = sock.recv_into(view[received:], min(size - received, config.buffer_size))
+            if count == 0:
+                raise Exception("Connection closed before receiving data")
+            received += count
+        return buffer
+
     def disconnect(self):
         """Close the connection to the Unity Editor."""
+        self._closed.set()
         if self.sock:
+            try:
+                # shutdown() wakes a reader thread blocked in recv, close() alone leaves the connection open
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             try:
                 self.sock.close()
             except Exception as e:
                 logger.error(f"Error disconnecting from Unity: {str(e)}")
             finally:
                 self.sock = None
+        self._fail_pending(ConnectionError("Connection to Unity closed"))
+
+    def _start_background_threads(self):
+        """Start the response reader (multiplexed mode) and the heartbeat for the current socket."""
+        self._closed = threading.Event()
+        self.last_heartbeat = time.monotonic()
+        sock, closed = self.sock, self._closed
+        if self.multiplexed:
+            sock.settimeout(None)  # The reader blocks until a frame arrives; requests time out on their futures
+            threading.Thread(target=self._reader_loop, args=(sock, closed),
+                             name="UnityMCP-reader", daemon=True).start()
+        if config.heartbeat_interval > 0:
+            threading.Thread(target=self._heartbeat_loop, args=(sock, closed),
+                             name="UnityMCP-heartbeat", daemon=True).start()
+
+    def _reader_loop(self, sock, closed: threading.Event):
+        """Read tagged frames and resolve the matching pending requests."""
+        while not closed.is_set():
+            try:
+                data = self.receive_frame(sock)
+                response = self.decode(data)
+            except Exception as e:
+                if not closed.is_set():
+                    logger.error(f"Unity connection reader stopped: {str(e)}")
+                    self._mark_dead(sock, e)
+                return
+            future = self._pending.pop(str(response.pop("id", None)), None)
+            if future is None:
+                logger.debug("Dropping response for unknown or expired request")
+            elif not future.done():
+                future.set_result((response, len(data)))
+
+    def _heartbeat_loop(self, sock, closed: threading.Event):
+        """Ping the bridge periodically so that callers never need a per-call ping."""
+        while not closed.wait(config.heartbeat_interval):
+            try:
+                if self.multiplexed:
+                    response = self._request({"type": "ping", "params": {}}, config.heartbeat_timeout)
+                elif self._lock.acquire(blocking=False):
+                    try:
+                        self.send_message(b"ping")
+                        response = self.decode(self.receive_message(config.heartbeat_timeout))
+                    finally:
+                        self._lock.release()
+                else:
+                    continue  # A command is in flight, so the socket is being exercised anyway
+                if response.get("status") != "success":
+                    raise ConnectionError("Heartbeat response was not successful")
+                self.last_heartbeat = time.monotonic()
+            except Exception as e:
+                if not closed.is_set():
+                    logger.warning(f"Unity heartbeat failed: {str(e)}")
+                    self._mark_dead(sock, e)
+                return
+
+    def _mark_dead(self, sock, error: Exception):
+        """Tear down `sock` if it is still the active socket."""
+        if self.sock is sock:
+            self.disconnect()
+        self._fail_pending(error)
 
-    def receive_full_response(self, sock, buffer_size=config.buffer_size) -> bytes:
+    def _fail_pending(self, error: Exception):
+        """Fail every in-flight request with `error`."""
+        while self._pending:
+            _, future = self._pending.popitem()
+            if not future.done():
+                future.set_exception(error)
+
+    def _request(self, command: Dict[str, Any], timeout: float, sample: CommandSample = None) -> Dict[str, Any]:
+        """Send a tagged command and wait for the response with the same ID."""
+        request_id = str(next(self._request_ids))
+        future = Future()
+        self._pending[request_id] = future
+        try:
+            payload = self.encode({"id": request_id, **command})
+            with self._send_lock:
+                self.send_message(payload)
+            response, response_bytes = future.result(timeout=timeout)
+            if sample is not None:
+                sample.request_bytes, sample.response_bytes = len(payload), response_bytes
+            return response
+        except FutureTimeoutError:
+            raise Exception("Timeout receiving Unity response")
+        finally:
+            self._pending.pop(request_id, None)
+
+    def receive_full_response(self, sock, buffer_size=config.buffer_size, timeout: float = None) -> bytes:
         """Receive a complete response from Unity, handling chunked data."""
         chunks = []
-        sock.settimeout(config.connection_timeout)  # Use timeout from config
+        sock.settimeout(timeout or config.connection_timeout)  # Use timeout from config
         try:
             while True:
                 chunk = sock.recv(buffer_size)
@@ -100,35 +323,142 @@ class UnityConnection:
 
     def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Send a command to Unity and return its response."""
+        if scene_mirror.enabled and scene_cache.may_answer(command_type, params) and scene_mirror.needs_sync():
+            self._sync_mirror()
+        cached = scene_cache.lookup(command_type, params)
+        if cached is None and scene_mirror.handles(command_type, params):
+            cached = self._answer_from_mirror(command_type, params)
+        if cached is not None:
+            command_metrics.record_cached(command_type)
+            return cached
+
         if not self.sock and not self.connect():
             raise ConnectionError("Not connected to Unity")
-        
+
+        scene_mirror.note_command(command_type, params)
+        revision = scene_cache.before_command(command_type, params)
+        if self.multiplexed:
+            with command_metrics.measure(command_type) as sample:
+                result = self._send_multiplexed(command_type, params, sample)
+        else:
+            with self._lock, command_metrics.measure(command_type) as sample:
+                result = self._send_sequential(command_type, params, sample)
+        scene_cache.after_command(command_type, params, result, revision)
+        scene_mirror.note_command(command_type, params)
+        return result
+
+    def _answer_from_mirror(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Answer a hierarchy query locally, first fetching the scene changes when the mirror is stale."""
+        if scene_mirror.needs_sync() and not self._sync_mirror():
+            return None
+        return scene_mirror.answer(command_type, params)
+
+    def _sync_mirror(self) -> bool:
+        """Fetch the scene changes into the mirror; Editor edits they report also invalidate the scene cache."""
+        request, token = scene_mirror.sync_request()
+        try:
+            changes = self.send_command("GET_SCENE_CHANGES", request)
+        except Exception as e:
+            if "Unknown command type" in str(e):
+                scene_mirror.disable("bridge does not support GET_SCENE_CHANGES")
+            return False
+        scene_mirror.apply(changes, token)
+        scene_cache.note_scene_changes(changes)
+        return True
+
+    def send_batch(self, commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send several commands to Unity in one round trip.
+
+        Each entry of `commands` is a {"type": ..., "params": ...} dict. The returned list is
+        aligned with `commands` and holds one bridge response per command, either
+        {"status": "success", "result": ...} or {"status": "error", "error": ...}, so a failing
+        command does not affect the others. Bridges without BATCH support get the commands
+        one by one with the same per-item results.
+        """
+        if (scene_mirror.enabled and scene_mirror.needs_sync()
+                and any(scene_cache.may_answer(command.get("type"), command.get("params")) for command in commands)):
+            self._sync_mirror()
+        responses, missing = scene_cache.lookup_batch(commands)
+        if not missing:
+            command_metrics.record_batch(commands, missing, False)
+            return responses
+        if not self.sock and not self.connect():
+            raise ConnectionError("Not connected to Unity")
+
+        command_metrics.record_batch(commands, missing, self.supports_batch)
+        pending = [commands[index] for index in missing]
+        if self.supports_batch:
+            revision = scene_cache.before_batch(pending)
+            fetched = self.send_command("BATCH", {"commands": pending}).get("results", [])
+            scene_cache.after_batch(pending, fetched, revision)
+        else:
+            fetched = []
+            for command in pending:
+                try:
+                    result = self.send_command(command["type"], command.get("params"))
+                    fetched.append({"status": "success", "result": result})
+                except Exception as e:
+                    fetched.append({"status": "error", "error": str(e)})
+
+        for index, response in zip(missing, fetched):
+            responses[index] = response
+        return responses
+
+    def _send_multiplexed(self, command_type: str, params: Dict[str, Any] = None,
+                          sample: CommandSample = None) -> Dict[str, Any]:
+        """Send a tagged command; other threads may have commands in flight at the same time."""
+        if command_type != "ping":
+            logger.info(f"Sending command: {command_type} with params: {params}")
+        try:
+            response = self._request({"type": command_type, "params": params or {}}, config.connection_timeout, sample)
+        except Exception as e:
+            logger.error(f"Communication error with Unity: {str(e)}")
+            if command_type == "ping":
+                raise ConnectionError(f"Connection verification failed: {str(e)}")
+            raise Exception(f"Failed to communicate with Unity: {str(e)}")
+
+        if response.get("status") == "error":
+            error_message = response.get("error") or response.get("message", "Unknown Unity error")
+            logger.error(f"Unity error: {error_message}")
+            raise Exception(f"Failed to communicate with Unity: {error_message}")
+
+        self.last_heartbeat = time.monotonic()
+        return response.get("result", {})
+
+    def _send_sequential(self, command_type: str, params: Dict[str, Any] = None,
+                         sample: CommandSample = None) -> Dict[str, Any]:
+        """Send one command and block for its reply (legacy and non-multiplexed framed modes)."""
         # Special handling for ping command
         if command_type == "ping":
             try:
                 logger.debug("Sending ping to verify connection")
-                self.sock.sendall(b"ping")
-                response_data = self.receive_full_response(self.sock)
-                response = json.loads(response_data.decode('utf-8'))
+                self.send_message(b"ping")
+                response_data = self.receive_message()
+                if sample is not None:
+                    sample.request_bytes, sample.response_bytes = 4, len(response_data)
+                response = self.decode(response_data)
                 
                 if response.get("status") != "success":
                     logger.warning("Ping response was not successful")
-                    self.sock = None
+                    self.disconnect()
                     raise ConnectionError("Connection verification failed")
                     
                 return {"message": "pong"}
             except Exception as e:
                 logger.error(f"Ping error: {str(e)}")
-                self.sock = None
+                self.disconnect()
                 raise ConnectionError(f"Connection verification failed: {str(e)}")
         
         # Normal command handling
         command = {"type": command_type, "params": params or {}}
         try:
             logger.info(f"Sending command: {command_type} with params: {params}")
-            self.sock.sendall(json.dumps(command).encode('utf-8'))
-            response_data = self.receive_full_response(self.sock)
-            response = json.loads(response_data.decode('utf-8'))
+            payload = self.encode(command)
+            self.send_message(payload)
+            response_data = self.receive_message()
+            if sample is not None:
+                sample.request_bytes, sample.response_bytes = len(payload), len(response_data)
+            response = self.decode(response_data)
             
             if response.get("status") == "error":
                 error_message = response.get("error") or response.get("message", "Unknown Unity error")
@@ -138,47 +468,49 @@ class UnityConnection:
             return response.get("result", {})
         except Exception as e:
             logger.error(f"Communication error with Unity: {str(e)}")
-            self.sock = None
+            self.disconnect()
             raise Exception(f"Failed to communicate with Unity: {str(e)}")
 
 # Global Unity connection
 _unity_connection = None
+_unity_connection_lock = threading.Lock()
 
 def get_unity_connection() -> UnityConnection:
-    """Retrieve or establish a persistent Unity connection."""
+    """Retrieve or establish a persistent Unity connection.
+
+    Liveness of an existing connection is tracked by its background heartbeat, so
+    reusing it costs no round trip.
+    """
     global _unity_connection
-    if _unity_connection is not None:
-        try:
-            # Try to ping with a short timeout to verify connection
-            result = _unity_connection.send_command("ping")
-            # If we get here, the connection is still valid
-            logger.debug("Reusing existing Unity connection")
-            return _unity_connection
-        except Exception as e:
-            logger.warning(f"Existing connection failed: {str(e)}")
+    with _unity_connection_lock:
+        if _unity_connection is not None:
+            if _unity_connection.is_alive():
+                logger.debug("Reusing existing Unity connection")
+                return _unity_connection
+            logger.warning("Existing connection lost heartbeat, reconnecting")
+            command_metrics.record_reconnect()
             try:
                 _unity_connection.disconnect()
             except:
                 pass
             _unity_connection = None
-    
-    # Create a new connection
-    logger.info("Creating new Unity connection")
-    _unity_connection = UnityConnection()
-    if not _unity_connection.connect():
-        _unity_connection = None
-        raise ConnectionError("Could not connect to Unity. Ensure the Unity Editor and MCP Bridge are running.")
-    
-    try:
-        # Verify the new connection works
-        _unity_connection.send_command("ping")
-        logger.info("Successfully established new Unity connection")
-        return _unity_connection
-    except Exception as e:
-        logger.error(f"Could not verify new connection: {str(e)}")
+
+        # Create a new connection
+        logger.info("Creating new Unity connection")
+        connection = UnityConnection()
+        if not connection.connect():
+            raise ConnectionError("Could not connect to Unity. Ensure the Unity Editor and MCP Bridge are running.")
+
         try:
-            _unity_connection.disconnect()
-        except:
-            pass
-        _unity_connection = None
-        raise ConnectionError(f"Could not establish valid Unity connection: {str(e)}") 
\ No newline at end of file
+            # Verify the new connection works
+            connection.send_command("ping")
+            logger.info("Successfully established new Unity connection")
+            _unity_connection = connection
+            return _unity_connection
+        except Exception as e:
+            logger.error(f"Could not verify new connection: {str(e)}")
+            try:
+                connection.disconnect()
+            except:
+                pass
+            raise ConnectionError(f"Could not establish valid Unity connection: {str(e)}")